@@ -0,0 +1,93 @@
+"""Per-request overhead of the CSRF middleware
+
+Drives the ASGI app directly (no HTTP client or server in the loop) and
+compares the pure ASGI CSRFMiddleware with the BaseHTTPMiddleware
+implementation it replaced, for a safe GET and a token-checked POST.
+
+    python benchmarks/bench_csrf_middleware.py [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault("CSRF_SECRET", "bench")
+
+from fastapi import FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from core.csrf import CSRFProtection, CSRFMiddleware
+
+protection = CSRFProtection(secret="bench", ttl=3600)
+TOKEN = protection.generate_token()
+
+class BaseHTTPCSRFMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            csrf_token = request.headers.get("X-CSRF-Token")
+            session_id = request.headers.get("Authorization", "anonymous")
+            if not csrf_token or not protection.validate_token(csrf_token, session_id):
+                raise HTTPException(status_code=403, detail={"error": "CSRF token mismatch"})
+        return await call_next(request)
+
+def create_app(middleware, **options):
+    app = FastAPI()
+
+    @app.get('/items')
+    async def list_items():
+        return {"ok": True}
+
+    @app.post('/items')
+    async def create_item():
+        return {"ok": True}
+
+    app.add_middleware(middleware, **options)
+    return app
+
+async def drive(app, method, requests):
+    headers = [(b"x-csrf-token", TOKEN.encode())] if method == "POST" else []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": "/items", "raw_path": b"/items", "root_path": "", "query_string": b"",
+        "headers": headers, "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+    }
+
+    never = asyncio.Event()
+
+    def make_receive():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Client stays connected; Starlette cancels this once the response is sent
+            await never.wait()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), make_receive(), send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main(requests):
+    apps = {
+        "BaseHTTPMiddleware": create_app(BaseHTTPCSRFMiddleware),
+        "pure ASGI": create_app(CSRFMiddleware, protection=protection)
+    }
+    for method in ("GET", "POST"):
+        for name, app in apps.items():
+            per_request = await drive(app, method, requests)
+            print(f"{method:<5} {name:<20} {per_request:8.1f} us/request")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,90 @@
+"""Protobuf list -> HTTP body, per route shape, at 10k and 100k rows
+
+"dict loop + JSONResponse" is what the routes did before core.serialization:
+build a dict per message, then let FastAPI run jsonable_encoder and
+render with stdlib json. "MessageEncoder" is its per-column readers
+plus orjson into a ProtoJSONResponse.
+
+    python benchmarks/bench_serialization.py [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from google.protobuf.timestamp_pb2 import Timestamp
+import library_service_pb2
+from core.wire_format import amount, iso_time
+from routes.transactions import TRANSACTION_JSON
+from services.book_service import BOOK_JSON
+
+def books(n):
+    return library_service_pb2.GetBooksResponse(books=[
+        library_service_pb2.Book(book_id=i, title=f"Book {i}", author="Author", genre="Fiction", published_year=2000, available_copies=i % 4)
+        for i in range(n)
+    ]).books
+
+def transactions(n):
+    return library_service_pb2.GetTransactionsResponse(transactions=[
+        library_service_pb2.Transaction(
+            transaction_id=i, member_id=i % 500, book_id=i % 2000, transaction_type="BORROW", status="BORROWED",
+            transaction_time=Timestamp(seconds=1704067200 + i), due_time=Timestamp(seconds=1706659200 + i), fine_cents=i % 3 * 1000
+        )
+        for i in range(n)
+    ]).transactions
+
+def book_loop(messages):
+    return [{
+        "book_id": book.book_id,
+        "title": book.title,
+        "author": book.author,
+        "genre": book.genre,
+        "published_year": book.published_year,
+        "available_copies": book.available_copies,
+        "can_request": book.available_copies > 0
+    } for book in messages]
+
+def transaction_loop(messages, users, titles):
+    return [{
+        "transaction_id": txn.transaction_id,
+        "user_id": txn.member_id,
+        "username": users.get(txn.member_id, f"User {txn.member_id}"),
+        "book_id": txn.book_id,
+        "book_title": titles.get(txn.book_id, "Unknown Book"),
+        "transaction_type": txn.transaction_type,
+        "transaction_date": iso_time(txn, "transaction_time", "transaction_date"),
+        "due_date": iso_time(txn, "due_time", "due_date"),
+        "return_date": iso_time(txn, "return_time", "return_date"),
+        "status": txn.status,
+        "fine_amount": amount(txn, "fine_cents", "fine_amount")
+    } for txn in messages]
+
+def best_of(repeats, fn):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, len(body)
+
+def main(repeats):
+    users = {i: f"user{i}" for i in range(500)}
+    titles = {i: f"Book {i}" for i in range(2000)}
+    shapes = {
+        "books": (books, lambda m: book_loop(m), lambda m: BOOK_JSON.response(m)),
+        "transactions": (transactions, lambda m: transaction_loop(m, users, titles),
+                         lambda m: TRANSACTION_JSON.response(m, users=users, books=titles)),
+    }
+    for name, (make, loop, encoder) in shapes.items():
+        for n in (10_000, 100_000):
+            messages = make(n)
+            before, size = best_of(repeats, lambda: JSONResponse(jsonable_encoder(loop(messages))).body)
+            after, _ = best_of(repeats, lambda: encoder(messages).body)
+            print(f"{name:>12} {n:>7} rows  {size / 1e6:6.1f} MB   dict loop + JSONResponse {before:8.1f} ms"
+                  f"   MessageEncoder {after:7.1f} ms   {before / after:4.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,74 @@
+"""Per-call cost of the gateway -> grpc-server transports
+
+Serves a canned GetBooks response (no database) and calls it from an
+asyncio client over TCP loopback, a unix socket, and the in-process stub
+used by GRPC_SERVER_TARGET=inprocess. Calls are issued sequentially and
+with 32 in flight.
+
+    python benchmarks/bench_transports.py [calls]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent import futures
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+import grpc.aio
+import library_service_pb2
+import library_service_pb2_grpc
+from core.inprocess import InProcessStub
+
+RESPONSE = library_service_pb2.GetBooksResponse(books=[
+    library_service_pb2.Book(book_id=i, title=f"Book {i}", author="Author", genre="Fiction", published_year=2000, available_copies=3)
+    for i in range(50)
+])
+
+class CannedLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def GetBooks(self, request, context):
+        return RESPONSE
+
+async def drive(stub, calls, concurrency):
+    request = library_service_pb2.GetBooksRequest()
+    for _ in range(100):
+        await stub.GetBooks(request)
+
+    async def worker(n):
+        for _ in range(n):
+            await stub.GetBooks(request)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(calls // concurrency) for _ in range(concurrency)))
+    return (time.perf_counter() - start) / (calls // concurrency * concurrency) * 1e6
+
+async def main(calls):
+    socket_path = os.path.join(tempfile.mkdtemp(), "grpc.sock")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=20))
+    library_service_pb2_grpc.add_LibraryServiceServicer_to_server(CannedLibraryService(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.add_insecure_port(f"unix:{socket_path}")
+    server.start()
+
+    channels = {
+        "tcp loopback": grpc.aio.insecure_channel(f"127.0.0.1:{port}"),
+        "unix socket": grpc.aio.insecure_channel(f"unix:{socket_path}")
+    }
+    stubs = {name: library_service_pb2_grpc.LibraryServiceStub(channel) for name, channel in channels.items()}
+    stubs["in-process"] = InProcessStub(CannedLibraryService())
+    try:
+        for concurrency in (1, 32):
+            for name, stub in stubs.items():
+                per_call = await drive(stub, calls, concurrency)
+                print(f"concurrency {concurrency:<3} {name:<14} {per_call:8.1f} us/call")
+    finally:
+        for channel in channels.values():
+            await channel.close()
+        stubs["in-process"].close()
+        server.stop(None)
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -1 +1,7 @@
-# Core Package
\ No newline at end of file
+# Core Package
+import os
+import sys
+
+# Modules shared with the gRPC server (tracing, profiling, logging) live in
+# the repository's top-level shared/ package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Optional
+
+import grpc
+import grpc.aio
+from fastapi import HTTPException
+from core.metrics import registry
+from core.session import session_tokens
+from core.timing import TimedRoute
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Admission classes, most important first"""
+    ADMIN_WRITE = 0
+    USER_WRITE = 1
+    READ = 2
+
+admission_rejected = registry.counter(
+    "gateway_admission_rejected_total",
+    "Requests turned away before reaching the grpc-server, by reason (rate_limited, overloaded).",
+    ("reason", "priority")
+)
+
+class TokenBuckets:
+    """Per-key token buckets stored as one float per key
+
+    Uses the GCRA form of a token bucket: instead of (tokens, last_refill)
+    each key keeps the time at which its bucket will be full again. A key
+    whose bucket is full is the same as an absent key, so sweep() drops
+    those and memory only holds clients that were recently active.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic, sweep_interval: float = 60.0):
+        self.interval = 1.0 / rate
+        self.capacity = burst * self.interval
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self._full_at: Dict[str, float] = {}
+        self._next_sweep = clock() + sweep_interval
+
+    def __len__(self):
+        return len(self._full_at)
+
+    def take(self, key: str) -> float:
+        """Take one token; returns 0 if granted, else seconds until one is available"""
+        now = self.clock()
+        if now >= self._next_sweep:
+            self.sweep(now)
+        full_at = max(self._full_at.get(key, now), now) + self.interval
+        excess = full_at - now - self.capacity
+        if excess > 0:
+            return excess
+        self._full_at[key] = full_at
+        return 0.0
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        now = self.clock() if now is None else now
+        full = [key for key, full_at in self._full_at.items() if full_at <= now]
+        for key in full:
+            del self._full_at[key]
+        self._next_sweep = now + self.sweep_interval
+        return len(full)
+
+class ConcurrencyLimiter:
+    """In-flight cap per upstream RPC and in total, shared out by priority
+
+    Each class may only fill its share of the slots (of the RPC and of the
+    total), so searches can never occupy the capacity reserved for writes
+    and admin writes always find a free slot unless the upstream is
+    entirely busy with them.
+    """
+
+    DEFAULT_SHARES = {Priority.ADMIN_WRITE: 1.0, Priority.USER_WRITE: 0.75, Priority.READ: 0.5}
+
+    def __init__(self, limit: int, shares: Optional[Dict[Priority, float]] = None, total: Optional[int] = None):
+        self.limit = limit
+        shares = shares or self.DEFAULT_SHARES
+        self.limits = {priority: max(1, int(limit * share)) for priority, share in shares.items()}
+        self.total_limits = {priority: max(1, int(total * share)) for priority, share in shares.items()} if total else None
+        self.in_flight: Dict[str, int] = {}
+        self.total = 0
+
+    def try_acquire(self, key: str, priority: Priority) -> bool:
+        current = self.in_flight.get(key, 0)
+        if current >= self.limits[priority]:
+            return False
+        if self.total_limits is not None and self.total >= self.total_limits[priority]:
+            return False
+        self.in_flight[key] = current + 1
+        self.total += 1
+        return True
+
+    def release(self, key: str) -> None:
+        self.total -= 1
+        remaining = self.in_flight[key] - 1
+        if remaining:
+            self.in_flight[key] = remaining
+        else:
+            del self.in_flight[key]
+
+user_buckets = TokenBuckets(
+    rate=float(os.getenv('RATE_LIMIT_USER_RATE', '10')),
+    burst=int(os.getenv('RATE_LIMIT_USER_BURST', '20'))
+)
+ip_buckets = TokenBuckets(
+    rate=float(os.getenv('RATE_LIMIT_IP_RATE', '20')),
+    burst=int(os.getenv('RATE_LIMIT_IP_BURST', '40'))
+)
+# Per gateway process: at most 8 calls of one RPC and 16 in all, below the
+# grpc-server's 20 executor threads (GRPC_MAX_WORKERS)
+upstream_limiter = ConcurrencyLimiter(
+    int(os.getenv('UPSTREAM_MAX_CONCURRENCY', '8')),
+    total=int(os.getenv('UPSTREAM_MAX_TOTAL_CONCURRENCY', '16'))
+)
+OVERLOAD_RETRY_AFTER = int(os.getenv('OVERLOAD_RETRY_AFTER', '1'))
+
+registry.gauge(
+    "gateway_rate_limit_tracked_keys",
+    "Clients with a partially drained token bucket.",
+    ("scope",),
+    callback=lambda: [(("user",), len(user_buckets)), (("ip",), len(ip_buckets))]
+)
+
+_current_priority: ContextVar[Priority] = ContextVar("admission_priority", default=Priority.READ)
+# Set by AdmittedRoute for the duration of an endpoint; the interceptor marks
+# it (grpc.aio runs interceptors in a task of their own, so a mutable object
+# is the only way back)
+_current_admission: ContextVar[Optional["RouteAdmission"]] = ContextVar("route_admission", default=None)
+
+def classify(method: str, path: str, is_admin: bool) -> Priority:
+    """Priority from the method and the verified role; the path is not trusted"""
+    if method in ("GET", "HEAD"):
+        return Priority.READ
+    if is_admin:
+        return Priority.ADMIN_WRITE
+    return Priority.USER_WRITE
+
+def _reject(status: int, retry_after: float, message: str):
+    body = json.dumps({"detail": message}).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode())
+    ]
+    return {"type": "http.response.start", "status": status, "headers": headers}, {"type": "http.response.body", "body": body}
+
+class AdmissionMiddleware:
+    """Pure ASGI rate limiting by user and by client IP
+
+    Authenticated users draw from their own bucket, and every request from
+    the client IP's bucket; requests carrying an admin session are not rate
+    limited. Over the limit, the response is an immediate 429 with
+    Retry-After. The request's priority class is recorded for AdmittedRoute.
+    """
+
+    def __init__(self, app, users: Optional[TokenBuckets] = None, ips: Optional[TokenBuckets] = None,
+                 exempt_paths=("/metrics", "/debug")):
+        self.app = app
+        self.users = user_buckets if users is None else users
+        self.ips = ip_buckets if ips is None else ips
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        session = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    session = session_tokens.verify(token)
+                break
+        is_admin = session is not None and session.is_admin
+        priority = classify(scope["method"], scope["path"], is_admin)
+
+        if not is_admin:
+            wait = self.users.take(str(session.user_id)) if session is not None else 0.0
+            if not wait:
+                client = scope.get("client")
+                wait = self.ips.take(client[0] if client else "unknown")
+            if wait:
+                admission_rejected.inc("rate_limited", priority.name)
+                logger.info("Request rate limited", extra={
+                    "path": scope["path"],
+                    "user_id": session.user_id if session else None,
+                    "retry_after": wait,
+                    "action": "rate_limited"
+                })
+                start, body = _reject(429, wait, "Too many requests")
+                await send(start)
+                await send(body)
+                return
+
+        token = _current_priority.set(priority)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_priority.reset(token)
+
+class RouteAdmission:
+    __slots__ = ("rejected",)
+
+    def __init__(self):
+        self.rejected = False
+
+class UpstreamOverloaded(grpc.RpcError):
+    """No upstream slot left for the call's priority class"""
+
+    def code(self):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    def details(self):
+        return "Gateway upstream concurrency limit reached"
+
+def _rpc_name(method) -> str:
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+class AdmissionClientInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+    """Holds an upstream concurrency slot, keyed by RPC, for each unary call
+
+    Routes making several RPCs take a slot per call, and all routes calling
+    one RPC share its slots. Over the limit the call fails at once with
+    UpstreamOverloaded instead of queueing on the grpc-server. Export
+    streams are not counted here; the grpc-server caps those itself.
+    """
+
+    def __init__(self, limiter: Optional[ConcurrencyLimiter] = None):
+        self.limiter = limiter
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        limiter = self.limiter or upstream_limiter
+        rpc = _rpc_name(client_call_details.method)
+        priority = _current_priority.get()
+        if not limiter.try_acquire(rpc, priority):
+            admission_rejected.inc("overloaded", priority.name)
+            admission = _current_admission.get()
+            if admission is not None:
+                admission.rejected = True
+            raise UpstreamOverloaded()
+        try:
+            call = await continuation(client_call_details, request)
+            await call
+            return call
+        finally:
+            limiter.release(rpc)
+
+upstream_admission = AdmissionClientInterceptor()
+
+class AdmittedRoute(TimedRoute):
+    """TimedRoute that fails fast with 503 when an upstream call was not admitted
+
+    The slots themselves are taken per RPC by AdmissionClientInterceptor.
+    Endpoints usually turn upstream errors into a 500; if one of the
+    endpoint's calls was rejected for lack of a slot the response is a 503
+    with Retry-After instead, so clients back off rather than retry at once.
+    """
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+
+            async def call(**kwargs):
+                admission = RouteAdmission()
+                token = _current_admission.set(admission)
+                try:
+                    return await endpoint(**kwargs)
+                except Exception:
+                    if admission.rejected:
+                        raise HTTPException(
+                            status_code=503,
+                            detail="Service overloaded, retry shortly",
+                            headers={"Retry-After": str(OVERLOAD_RETRY_AFTER)}
+                        )
+                    raise
+                finally:
+                    _current_admission.reset(token)
+            self.dependant.call = call
+        return super().get_route_handler()
@@ -0,0 +1,218 @@
+import asyncio
+import gzip
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from core.metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-protobuf", "text/")
+# request.state flag set by mark_precompressed
+PRECOMPRESS = "precompress"
+
+compressed_responses = registry.counter(
+    "gateway_compressed_responses_total",
+    "Responses sent compressed, by encoding and whether the body came from the precompressed cache.",
+    ("encoding", "source")
+)
+compression_saved_bytes = registry.counter(
+    "gateway_compression_saved_bytes_total",
+    "Bytes not sent thanks to response compression.",
+    ("encoding",)
+)
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings we can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encoding: Optional[str], encodings: Tuple[str, ...]) -> Optional[str]:
+    """Best of encodings for an Accept-Encoding header; None for identity"""
+    if not accept_encoding:
+        return None
+    quality: Dict[str, float] = {}
+    wildcard = None
+    for entry in accept_encoding.split(","):
+        coding, *params = entry.strip().split(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q
+        else:
+            quality[coding] = q
+    acceptable = []
+    for preference, encoding in enumerate(encodings):
+        q = quality.get(encoding, wildcard if wildcard is not None else 0.0)
+        if q > 0:
+            acceptable.append((q, -preference, encoding))
+    return max(acceptable)[2] if acceptable else None
+
+def mark_precompressed(request) -> None:
+    """Keep this response's compressed body per ETag (one shared by many clients)"""
+    setattr(request.state, PRECOMPRESS, True)
+
+class PrecompressedCache:
+    """Compressed bodies of ETag-versioned responses, bounded LRU
+
+    Keyed by (path, query, ETag, encoding), so a body is compressed once
+    per version. Concurrent misses for the same key share one compression.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    async def get_or_compress(self, key: tuple, submit) -> bytes:
+        """Cached body for key, or the result of submit() (a Future), cached"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = submit()
+        try:
+            body = await asyncio.wrap_future(future)
+        finally:
+            self._inflight.pop(key, None)
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return body
+
+class CompressionMiddleware:
+    """Pure ASGI gzip/brotli compression of complete responses
+
+    A response is compressed when the client accepts br (preferred, when
+    the brotli package is installed) or gzip, its type is compressible, it
+    is not already encoded, and it is at least min_bytes
+    (GATEWAY_COMPRESSION_MIN_BYTES, 1 KiB). Compression runs on a small
+    thread pool (GATEWAY_COMPRESSION_WORKERS) so the event loop keeps
+    serving. Streaming responses (NDJSON exports) pass through as is.
+
+    Responses with an ETag whose route asked for it (mark_precompressed:
+    the unfiltered catalog, versioned by the availability event cursor)
+    are kept compressed in a PrecompressedCache, so every client fetching
+    the same version shares one compression. Per-query bodies are not
+    cached: the version moves on every issue or return, and each query
+    would be compressed once per version anyway.
+    """
+
+    def __init__(self, app, min_bytes: Optional[int] = None, executor: Optional[ThreadPoolExecutor] = None,
+                 cache: Optional[PrecompressedCache] = None):
+        self.app = app
+        self.min_bytes = min_bytes if min_bytes is not None else int(os.getenv('GATEWAY_COMPRESSION_MIN_BYTES', '1024'))
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=int(os.getenv('GATEWAY_COMPRESSION_WORKERS', '2')), thread_name_prefix="compression"
+        )
+        self.cache = cache or PrecompressedCache(int(os.getenv('GATEWAY_COMPRESSION_CACHE_ENTRIES', '64')))
+        self.gzip_level = int(os.getenv('GATEWAY_GZIP_LEVEL', '6'))
+        self.brotli_quality = int(os.getenv('GATEWAY_BROTLI_QUALITY', '4'))
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        # Shared with the route's request.state, see mark_precompressed
+        state = scope.setdefault("state", {})
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            headers = start.get("headers", [])
+            if message.get("more_body", False) or len(body) < self.min_bytes or not self._compressible(headers):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            etag = _header(headers, b"etag")
+            if etag is not None and state.get(PRECOMPRESS):
+                key = (scope["path"], scope.get("query_string", b""), etag, encoding)
+                compressed = self.cache.get(key)
+                source = "cached"
+                if compressed is None:
+                    compressed = await self.cache.get_or_compress(
+                        key, lambda: self.executor.submit(self._compress, body, encoding)
+                    )
+                    source = "compressed"
+            else:
+                compressed = await asyncio.wrap_future(self.executor.submit(self._compress, body, encoding))
+                source = "compressed"
+            compressed_responses.inc(encoding, source)
+            compression_saved_bytes.inc(encoding, amount=max(len(body) - len(compressed), 0))
+            await send({**start, "headers": _compressed_headers(headers, encoding, len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        if _header(headers, b"content-encoding") is not None:
+            return False
+        content_type = _header(headers, b"content-type")
+        return content_type is not None and content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def _compressed_headers(headers, encoding: str, length: int) -> list:
+    vary = None
+    result = []
+    for key, value in headers:
+        lower = key.lower()
+        if lower == b"content-length":
+            continue
+        if lower == b"vary":
+            vary = value
+            continue
+        result.append((key, value))
+    result.append((b"content-encoding", encoding.encode()))
+    result.append((b"content-length", str(length).encode()))
+    result.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    return result
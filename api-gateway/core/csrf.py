@@ -1,39 +1,84 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
 import secrets
+import time
 from typing import Optional
-from fastapi import HTTPException, Request
-from fastapi.security import HTTPBearer
-from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS_SESSION = "anonymous"
 
 class CSRFProtection:
-    def __init__(self):
-        self.tokens = {}
-    
-    def generate_token(self) -> str:
-        return secrets.token_urlsafe(32)
-    
+    """Stateless CSRF tokens: "<expiry>.<HMAC(session_id, expiry)>"
+
+    Nothing is stored, so every worker and replica that shares CSRF_SECRET
+    accepts tokens issued by any other, and memory does not grow with the
+    number of sessions. The session is the Authorization header, as before.
+    """
+
+    def __init__(self, secret: Optional[str] = None, ttl: Optional[int] = None, clock=time.time):
+        secret = secret or os.getenv('CSRF_SECRET')
+        if not secret:
+            # Tokens then only verify in the process that issued them
+            logger.warning("CSRF_SECRET is not set - using a per-process secret", extra={"action": "csrf_ephemeral_secret"})
+            secret = secrets.token_urlsafe(32)
+        self._key = secret.encode()
+        self.ttl = ttl or int(os.getenv('CSRF_TOKEN_TTL', '28800'))
+        self.clock = clock
+
+    def _signature(self, session_id: str, expires: str) -> str:
+        digest = hmac.new(self._key, f"{session_id}|{expires}".encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def generate_token(self, session_id: str = ANONYMOUS_SESSION) -> str:
+        expires = str(int(self.clock()) + self.ttl)
+        return f"{expires}.{self._signature(session_id, expires)}"
+
     def validate_token(self, token: str, session_id: str) -> bool:
-        return self.tokens.get(session_id) == token
-    
-    def store_token(self, token: str, session_id: str):
-        self.tokens[session_id] = token
-    
-    def remove_token(self, session_id: str):
-        self.tokens.pop(session_id, None)
+        expires, _, signature = token.partition(".")
+        if not signature or not expires.isdigit() or int(expires) < self.clock():
+            return False
+        return hmac.compare_digest(signature, self._signature(session_id, expires))
 
 csrf_protection = CSRFProtection()
 
-class CSRFMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, exempt_methods=None):
-        super().__init__(app)
-        self.exempt_methods = exempt_methods or ["GET", "HEAD", "OPTIONS"]
-    
-    async def dispatch(self, request: Request, call_next):
-        if request.method not in self.exempt_methods:
-            csrf_token = request.headers.get("X-CSRF-Token")
-            session_id = request.headers.get("Authorization", "anonymous")
-            
-            if not csrf_token or not csrf_protection.validate_token(csrf_token, session_id):
-                raise HTTPException(status_code=403, detail={"error": "CSRF token mismatch"})
-        
-        response = await call_next(request)
-        return response
\ No newline at end of file
+_FORBIDDEN_BODY = b'{"error":"CSRF token mismatch"}'
+_FORBIDDEN_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_FORBIDDEN_BODY)).encode())
+]
+
+class CSRFMiddleware:
+    """Pure ASGI CSRF check for unsafe methods
+
+    Runs inline in the request's own task: no extra task, no wrapped
+    receive/send streams, and safe methods pass straight through.
+    """
+
+    def __init__(self, app, exempt_methods=None, protection: Optional[CSRFProtection] = None):
+        self.app = app
+        self.exempt_methods = frozenset(exempt_methods or ("GET", "HEAD", "OPTIONS"))
+        self.protection = protection or csrf_protection
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.exempt_methods:
+            await self.app(scope, receive, send)
+            return
+
+        csrf_token = None
+        session_id = ANONYMOUS_SESSION
+        for name, value in scope["headers"]:
+            if name == b"x-csrf-token":
+                csrf_token = value.decode("latin-1")
+            elif name == b"authorization":
+                session_id = value.decode("latin-1")
+
+        if not csrf_token or not self.protection.validate_token(csrf_token, session_id):
+            await send({"type": "http.response.start", "status": 403, "headers": _FORBIDDEN_HEADERS})
+            await send({"type": "http.response.body", "body": _FORBIDDEN_BODY})
+            return
+
+        await self.app(scope, receive, send)
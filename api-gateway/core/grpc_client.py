@@ -1,10 +1,157 @@
-import grpc.aio
+import asyncio
+import json
 import os
+import socket
+import grpc.aio
 import library_service_pb2_grpc
+from core.timing import TimingClientInterceptor
+from core.admission import upstream_admission
+from core.tracing import TracingClientInterceptor
+from core.resilience import READ_METHODS, RETRY_THROTTLING, method_config, upstream_resilience
+from core import inprocess
+
+SERVICE_NAME = "library.LibraryService"
+
+def service_config() -> dict:
+    """round_robin over healthy backends, ejecting ones that keep failing
+
+    Subchannels follow the grpc.health.v1 status of each grpc-server, and
+    outlier detection ejects a backend whose failure rate stands out from
+    the others for an (increasing) ejection time. Idempotent reads are
+    retried with backoff, within the retry throttling budget.
+    """
+    return {
+        "loadBalancingConfig": [{
+            "outlier_detection_experimental": {
+                "interval": f"{os.getenv('GRPC_OUTLIER_INTERVAL', '10')}s",
+                "baseEjectionTime": f"{os.getenv('GRPC_OUTLIER_EJECTION_TIME', '30')}s",
+                "maxEjectionTime": "300s",
+                "maxEjectionPercent": int(os.getenv('GRPC_OUTLIER_MAX_EJECTION_PERCENT', '50')),
+                "failurePercentageEjection": {
+                    "threshold": int(os.getenv('GRPC_OUTLIER_FAILURE_PERCENT', '50')),
+                    "enforcementPercentage": 100,
+                    "minimumHosts": 2,
+                    "requestVolume": int(os.getenv('GRPC_OUTLIER_REQUEST_VOLUME', '20'))
+                },
+                "childPolicy": [{"round_robin": {}}]
+            }
+        }],
+        "healthCheckConfig": {"serviceName": SERVICE_NAME},
+        "methodConfig": method_config(),
+        "retryThrottling": RETRY_THROTTLING
+    }
+
+def channel_options() -> list:
+    """Service config plus message size limits (bytes, -1 for no limit)
+
+    List responses can be several megabytes; grpc-server compresses the
+    large ones (gzip/deflate, advertised by every channel in
+    grpc-accept-encoding), but the limit applies to the decompressed size.
+    The receive limit mirrors the server's GRPC_SERVER_MAX_SEND_MESSAGE_BYTES
+    and the send limit its GRPC_SERVER_MAX_RECEIVE_MESSAGE_BYTES.
+    """
+    return [
+        ("grpc.service_config", json.dumps(service_config())),
+        ("grpc.max_receive_message_length", int(os.getenv('GATEWAY_GRPC_MAX_RECEIVE_MESSAGE_BYTES', str(32 * 1024 * 1024)))),
+        ("grpc.max_send_message_length", int(os.getenv('GATEWAY_GRPC_MAX_SEND_MESSAGE_BYTES', str(4 * 1024 * 1024)))),
+    ]
+
+def configured_target() -> str:
+    return os.getenv('GRPC_SERVER_TARGET') or f"{os.getenv('GRPC_SERVER_HOST', 'localhost')}:{os.getenv('GRPC_SERVER_PORT', '50051')}"
+
+def resolve_target(target: str) -> str:
+    """gRPC target for the grpc-server backends
+
+    GRPC_SERVER_TARGET is either a gRPC target URI (e.g.
+    dns:///grpc-server:50051, which round-robins over every address the
+    name resolves to) or a comma-separated list of host:port, resolved
+    here into a static ipv4:/ipv6: address list. A co-located server is
+    reached over its unix socket(s) with unix:/path[,/path...], and
+    "inprocess" embeds the server (see core.inprocess; not in the gateway
+    Docker image, which has no grpc-server tree). Without it,
+    GRPC_SERVER_HOST:GRPC_SERVER_PORT is used as before.
+    """
+    if "," not in target or ":///" in target or target.startswith(("ipv4:", "ipv6:", "unix:")):
+        return target
+    ipv4, ipv6 = [], []
+    for entry in target.split(","):
+        host, _, port = entry.strip().rpartition(":")
+        for family, _, _, _, address in socket.getaddrinfo(host.strip("[]"), int(port), type=socket.SOCK_STREAM):
+            if family == socket.AF_INET:
+                ipv4.append(f"{address[0]}:{address[1]}")
+            elif family == socket.AF_INET6:
+                ipv6.append(f"[{address[0]}]:{address[1]}")
+    # A target can only hold one address family
+    if ipv4:
+        return "ipv4:" + ",".join(dict.fromkeys(ipv4))
+    return "ipv6:" + ",".join(dict.fromkeys(ipv6))
+
+def _serialize(message) -> bytes:
+    return message.SerializeToString()
+
+def _raw(call):
+    async def invoke(request, **kwargs):
+        response = await call(request, **kwargs)
+        # The in-process stub and the stale cache hand back messages
+        return response if isinstance(response, bytes) else response.SerializeToString()
+    return invoke
+
+class RawStub:
+    """Read methods of LibraryService returning the response bytes unparsed
+
+    For passing a response through to a client that speaks protobuf.
+    """
+
+    def __init__(self, calls: dict):
+        for name, call in calls.items():
+            setattr(self, name, _raw(call))
+
+    @classmethod
+    def for_channel(cls, channel):
+        return cls({
+            method: channel.unary_unary(f"/{SERVICE_NAME}/{method}", request_serializer=_serialize, response_deserializer=None)
+            for method in READ_METHODS
+        })
+
+_channels = {}
+
+def _channel_entry(target: str) -> tuple:
+    key = (asyncio.get_running_loop(), target)
+    entry = _channels.get(key)
+    if entry is None:
+        for stale in [k for k in _channels if k[0].is_closed()]:
+            del _channels[stale]
+        channel = grpc.aio.insecure_channel(
+            resolve_target(key[1]),
+            options=channel_options(),
+            interceptors=[upstream_admission, TracingClientInterceptor(), TimingClientInterceptor(), upstream_resilience]
+        )
+        entry = _channels[key] = (channel, library_service_pb2_grpc.LibraryServiceStub(channel), RawStub.for_channel(channel))
+    return entry
 
 # Async gRPC client connection
 async def get_grpc_client():
-    grpc_host = os.getenv('GRPC_SERVER_HOST', 'localhost')
-    grpc_port = os.getenv('GRPC_SERVER_PORT', '50051')
-    channel = grpc.aio.insecure_channel(f'{grpc_host}:{grpc_port}')
-    return library_service_pb2_grpc.LibraryServiceStub(channel)
\ No newline at end of file
+    """Stub on a channel shared by all requests of this event loop
+
+    Channels are expensive (connections, health watches, balancer state)
+    and bound to the loop they were created on, so one is kept per loop
+    and target rather than opened per request.
+    """
+    target = configured_target()
+    if target == inprocess.INPROCESS_TARGET:
+        return await inprocess.get_inprocess_stub()
+    return _channel_entry(target)[1]
+
+async def get_raw_grpc_client() -> RawStub:
+    """RawStub on the same channel as get_grpc_client()"""
+    target = configured_target()
+    if target == inprocess.INPROCESS_TARGET:
+        stub = await inprocess.get_inprocess_stub()
+        return RawStub({method: getattr(stub, method) for method in READ_METHODS})
+    return _channel_entry(target)[2]
+
+async def close_grpc_channels():
+    loop = asyncio.get_running_loop()
+    for key in [k for k in _channels if k[0] is loop]:
+        channel = _channels.pop(key)[0]
+        await channel.close()
@@ -0,0 +1,230 @@
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+import grpc.aio
+import library_service_pb2
+from core import tracing
+
+# GRPC_SERVER_TARGET value that selects the embedded backend
+INPROCESS_TARGET = "inprocess"
+
+DEFAULT_SERVER_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "grpc-server"
+)
+
+def load_servicer(server_root: str = None):
+    """LibraryServiceImpl from the grpc-server tree, imported into this process
+
+    Both trees have a top-level `services` package: the gateway's is set
+    aside while the server's modules are imported with its tree at the
+    front of sys.path. Afterwards sys.path and `services` are put back as
+    they were; the servicer holds on to the modules it imported, and the
+    password hashing workers find theirs by path (see passwords.py).
+
+    Needs a checkout with grpc-server/ next to api-gateway/ (or
+    GRPC_SERVER_PATH): the gateway Docker image only contains
+    api-gateway/, shared/ and proto/, so it cannot use this mode.
+    """
+    root = server_root or os.getenv('GRPC_SERVER_PATH', DEFAULT_SERVER_ROOT)
+    saved_path = list(sys.path)
+    gateway_modules = _pop_package("services")
+    sys.path.insert(0, root)
+    try:
+        module = importlib.import_module("services.library_service_main")
+        servicer = module.LibraryServiceImpl()
+    finally:
+        sys.path[:] = saved_path
+        _pop_package("services")
+        sys.modules.update(gateway_modules)
+        # The server's tracing module names the process when imported
+        tracing.set_service_name(tracing.SERVICE_NAME)
+    return servicer
+
+def _pop_package(name: str) -> dict:
+    return {key: sys.modules.pop(key) for key in list(sys.modules) if key == name or key.startswith(name + ".")}
+
+class _Abort(Exception):
+    pass
+
+def _rpc_error(code, details) -> grpc.aio.AioRpcError:
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details=details)
+
+class InProcessContext:
+    """The part of grpc.ServicerContext the library services use"""
+
+    def __init__(self, metadata=None, timeout=None):
+        self._metadata = tuple(metadata or ())
+        self._deadline = time.monotonic() + timeout if timeout is not None else None
+        self._cancelled = threading.Event()
+        self.code = None
+        self.details = None
+
+    def invocation_metadata(self):
+        return self._metadata
+
+    def peer(self):
+        return "inprocess"
+
+    def time_remaining(self):
+        return None if self._deadline is None else max(0.0, self._deadline - time.monotonic())
+
+    def is_active(self):
+        return not self._cancelled.is_set() and self.time_remaining() != 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+    def abort(self, code, details=""):
+        self.code, self.details = code, details
+        raise _Abort(details)
+
+    def error(self):
+        """What a real channel would have raised for this call, if anything"""
+        if self.code is not None and self.code != grpc.StatusCode.OK:
+            return _rpc_error(self.code, self.details or "")
+        if self.time_remaining() == 0.0 and not self._cancelled.is_set():
+            return _rpc_error(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline Exceeded")
+        return None
+
+def _invoke(fn, context):
+    try:
+        return fn()
+    except _Abort:
+        return None
+    except Exception as e:
+        context.set_code(grpc.StatusCode.UNKNOWN)
+        context.set_details(f"Exception calling application: {e}")
+        return None
+
+class _UnaryUnary:
+
+    def __init__(self, handler, executor):
+        self._handler = handler
+        self._executor = executor
+
+    def __call__(self, request, timeout=None, metadata=None, **kwargs):
+        return self._call(request, timeout, metadata)
+
+    async def _call(self, request, timeout, metadata):
+        context = InProcessContext(metadata, timeout)
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, _invoke, lambda: self._handler(request, context), context
+        )
+        try:
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            context.cancel()
+            raise _rpc_error(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline Exceeded")
+        except asyncio.CancelledError:
+            context.cancel()
+            raise
+        error = context.error()
+        if error is not None:
+            raise error
+        return response
+
+_END = object()
+
+class _ResponseStream:
+    """Async iterator over a synchronous servicer generator, one thread hop per message"""
+
+    def __init__(self, handler, request, context, executor):
+        self._handler = handler
+        self._request = request
+        self._context = context
+        self._executor = executor
+        self._iterator = None
+
+    def cancel(self):
+        self._context.cancel()
+        return True
+
+    def __aiter__(self):
+        return self
+
+    def _next(self):
+        if self._iterator is None:
+            self._iterator = iter(self._handler(self._request, self._context))
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            return _END
+
+    async def __anext__(self):
+        try:
+            message = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _invoke, self._next, self._context
+            )
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        if message is None or message is _END:
+            error = self._context.error()
+            if error is not None:
+                raise error
+            raise StopAsyncIteration
+        return message
+
+class _UnaryStream:
+
+    def __init__(self, handler, executor):
+        self._handler = handler
+        self._executor = executor
+
+    def __call__(self, request, timeout=None, metadata=None, **kwargs):
+        return _ResponseStream(self._handler, request, InProcessContext(metadata, timeout), self._executor)
+
+class InProcessStub:
+    """LibraryServiceStub look-alike that calls the servicer directly
+
+    Same call shapes as the grpc.aio stub: unary methods return an
+    awaitable, server-streaming ones an async iterator with cancel(), and
+    failures surface as grpc.aio.AioRpcError with the status the servicer
+    set. There is no serialization, HTTP/2 or interceptor on either side.
+    The servicer is synchronous (psycopg2), so calls run on a thread pool
+    of INPROCESS_MAX_WORKERS threads.
+    """
+
+    def __init__(self, servicer, executor: ThreadPoolExecutor = None):
+        self.servicer = servicer
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=int(os.getenv('INPROCESS_MAX_WORKERS', '20')), thread_name_prefix="inprocess-rpc"
+        )
+        for method in library_service_pb2.DESCRIPTOR.services_by_name["LibraryService"].methods:
+            handler = getattr(servicer, method.name)
+            call = _UnaryStream if method.server_streaming else _UnaryUnary
+            setattr(self, method.name, call(handler, self._executor))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+_stub = None
+_stub_lock = threading.Lock()
+
+def _create_stub():
+    global _stub
+    with _stub_lock:
+        if _stub is None:
+            _stub = InProcessStub(load_servicer())
+
+async def get_inprocess_stub() -> InProcessStub:
+    """Process-wide embedded backend
+
+    The first call imports the server and opens its DB pool, off the event
+    loop. Unlike channels the stub is not bound to a loop.
+    """
+    if _stub is None:
+        await asyncio.to_thread(_create_stub)
+    return _stub
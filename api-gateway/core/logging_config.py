@@ -1,35 +1,10 @@
-import logging
-import json
-import traceback
+from shared import logging_config as _shared
+from shared.logging_config import SamplingFilter, RateLimitFilter, ContextQueueHandler
 
-class JSONFormatter(logging.Formatter):
-    def format(self, record):
-        log_entry = {
-            "timestamp": self.formatTime(record),
-            "service": "api-gateway",
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "module": record.name,
-            "function": record.funcName,
-            "line": record.lineno
-        }
-        
-        # Add exception info if present
-        if record.exc_info:
-            log_entry["exception"] = traceback.format_exception(*record.exc_info)
-        
-        # Add extra fields if present
-        if hasattr(record, '__dict__'):
-            for key, value in record.__dict__.items():
-                if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename', 'module', 'lineno', 'funcName', 'created', 'msecs', 'relativeCreated', 'thread', 'threadName', 'processName', 'process', 'getMessage', 'exc_info', 'exc_text', 'stack_info']:
-                    log_entry[key] = value
-        return json.dumps(log_entry)
+class JSONFormatter(_shared.JSONFormatter):
+    service = "api-gateway"
+    source_location = True
 
 def setup_logging():
-    logging.basicConfig(level=logging.DEBUG)
-    logger = logging.getLogger(__name__)
-    handler = logging.StreamHandler()
-    handler.setFormatter(JSONFormatter())
-    logger.handlers = [handler]
-    logger.propagate = False
-    return logger
\ No newline at end of file
+    """Structured JSON logging for the gateway; see shared.logging_config.setup_logging"""
+    return _shared.setup_logging(JSONFormatter())
@@ -0,0 +1,116 @@
+"""Accept negotiation for list endpoints
+
+Besides JSON, list endpoints answer ``application/x-protobuf`` with the
+upstream Get* response bytes as received (RawStub, no parse or
+re-encode) and ``application/x-ndjson`` with one JSON object per line,
+written while the upstream Stream* RPC is still producing rows, so a
+full-table export holds one batch in gateway memory.
+"""
+import logging
+import os
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from core.grpc_client import get_grpc_client, get_raw_grpc_client
+from core.serialization import MessageEncoder
+
+logger = logging.getLogger(__name__)
+
+JSON = "application/json"
+PROTOBUF = "application/x-protobuf"
+NDJSON = "application/x-ndjson"
+
+# Preference order when the client accepts several equally
+MEDIA_TYPES = (JSON, NDJSON, PROTOBUF)
+
+# Rows per NDJSON chunk written to the client
+NDJSON_BATCH_ROWS = int(os.getenv('NDJSON_BATCH_ROWS', '500'))
+
+VARY = {"Vary": "Accept"}
+
+def negotiate(accept: Optional[str]) -> str:
+    """Media type for an Accept header; JSON when none of ours is acceptable"""
+    if not accept:
+        return JSON
+    quality = {}
+    for entry in accept.split(","):
+        media_range, *params = entry.strip().split(";")
+        media_range = media_range.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        # Specific ranges take precedence over wildcards
+        specificity = 0 if media_range == "*/*" else 1 if media_range.endswith("/*") else 2
+        for media_type in MEDIA_TYPES:
+            if media_range in (media_type, "*/*", media_type.split("/")[0] + "/*"):
+                if media_type not in quality or specificity > quality[media_type][0]:
+                    quality[media_type] = (specificity, q)
+    acceptable = [(q, -MEDIA_TYPES.index(media_type), media_type) for media_type, (_, q) in quality.items() if q > 0]
+    return max(acceptable)[2] if acceptable else JSON
+
+def response_type(request: Request) -> str:
+    return negotiate(request.headers.get("accept"))
+
+def vary_on_accept(response: Response) -> Response:
+    response.headers["Vary"] = "Accept"
+    return response
+
+class ProtobufResponse(Response):
+    """Serialized protobuf message, passed through as is"""
+    media_type = PROTOBUF
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+async def ndjson_response(stream, encoder: MessageEncoder, **tables) -> StreamingResponse:
+    """StreamingResponse writing the messages of a server-streaming call as NDJSON
+
+    The first message is awaited here, so a call that fails straight away
+    raises to the route (and becomes an error status) instead of sending
+    an empty 200. A failure later in the stream can only end it early.
+    """
+    iterator = stream.__aiter__()
+    try:
+        first = [await iterator.__anext__()]
+    except StopAsyncIteration:
+        first = []
+
+    async def body():
+        batch = first
+        try:
+            async for message in iterator:
+                batch.append(message)
+                if len(batch) >= NDJSON_BATCH_ROWS:
+                    yield encoder.ndjson(batch, **tables)
+                    batch = []
+            if batch:
+                yield encoder.ndjson(batch, **tables)
+        except Exception as e:
+            logger.error("NDJSON stream ended by upstream error", extra={"error": str(e)})
+            raise
+        finally:
+            # Client went away (or upstream failed): stop the upstream stream
+            cancel = getattr(stream, "cancel", None)
+            if cancel is not None:
+                cancel()
+
+    return StreamingResponse(body(), media_type=NDJSON, headers=VARY)
+
+async def list_response(media_type: str, upstream_request, unary: str, stream: str, encoder: MessageEncoder, **tables) -> Response:
+    """The PROTOBUF or NDJSON response for a list endpoint
+
+    unary and stream name the RPCs (e.g. GetBooks and StreamBooks); the
+    NDJSON rows are shaped by encoder, as the JSON response is.
+    """
+    if media_type == PROTOBUF:
+        raw_client = await get_raw_grpc_client()
+        return ProtobufResponse(await getattr(raw_client, unary)(upstream_request), headers=VARY)
+    client = await get_grpc_client()
+    return await ndjson_response(getattr(client, stream)(upstream_request), encoder, **tables)
@@ -0,0 +1,21 @@
+import asyncio
+
+from shared.profiler import (
+    MAX_SECONDS, DEFAULT_INTERVAL, MIN_INTERVAL, ProfilerBusyError, SamplingProfiler, AllocationTracker,
+    collapse_stack, start_profile
+)
+
+async def run_profile(mode: str, seconds: float, interval: float = DEFAULT_INTERVAL, limit: int = 25) -> str:
+    """Profile the gateway process for ``seconds`` without blocking the event loop
+
+    The event loop thread is sampled like any other, so its stacks show
+    only the coroutine running at that instant. Requests suspended at an
+    await are not sampled; time spent waiting on upstream calls shows up
+    as the loop sitting in select.
+    """
+    stop = start_profile(mode, seconds, interval, limit)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        report = stop()
+    return report
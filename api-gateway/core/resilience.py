@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Dict, Optional
+
+import grpc
+import grpc.aio
+
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "library.LibraryService"
+
+# Idempotent reads: retried by the channel, hedged if enabled, and served
+# from the stale cache while their breaker is open
+READ_METHODS = (
+    "GetBooks", "GetUsers", "GetTransactions", "GetBookRequests", "GetUserStats", "GetUserTransactions"
+)
+
+# Codes that say something about the backend rather than the request
+FAILURE_CODES = frozenset((
+    grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.UNKNOWN, grpc.StatusCode.INTERNAL
+))
+
+def method_config() -> list:
+    """Per-method part of the channel's service config: retries for reads"""
+    return [{
+        "name": [{"service": SERVICE_NAME, "method": method} for method in READ_METHODS],
+        "retryPolicy": {
+            "maxAttempts": int(os.getenv('GRPC_RETRY_MAX_ATTEMPTS', '3')),
+            "initialBackoff": "0.1s",
+            "maxBackoff": "1s",
+            "backoffMultiplier": 2,
+            "retryableStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"]
+        }
+    }]
+
+# Each failure costs a token and each success refunds 0.1; retries pause
+# while fewer than half the tokens are left
+RETRY_THROTTLING = {"maxTokens": 10, "tokenRatio": 0.1}
+
+class BreakerState(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+class CircuitBreaker:
+    """Opens after consecutive backend failures, probes again after a cooldown
+
+    While open every call is refused without touching the network. After
+    reset_timeout one call at a time is let through (half-open); a success
+    closes the breaker and a failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: BreakerState) -> None:
+        if state != self._state:
+            self._state = state
+            breaker_transitions.inc(self.name, state.name.lower())
+            logger.warning("Circuit breaker state changed", extra={
+                "rpc": self.name,
+                "state": state.name,
+                "action": "breaker_transition"
+            })
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._transition(BreakerState.CLOSED)
+
+    def record_cancelled(self) -> None:
+        """The caller went away; says nothing about the backend"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self._state == BreakerState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+            self._transition(BreakerState.OPEN)
+
+class StaleCache:
+    """Last good response per (method, request), bounded LRU"""
+
+    def __init__(self, max_entries: int = 256, max_age: float = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    @staticmethod
+    def _key(method: str, request) -> tuple:
+        return method, request.SerializeToString(deterministic=True)
+
+    def put(self, method: str, request, response) -> None:
+        key = self._key(method, request)
+        self._entries[key] = (self.clock(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, method: str, request):
+        entry = self._entries.get(self._key(method, request))
+        if entry is None or self.clock() - entry[0] > self.max_age:
+            return None
+        return entry[1]
+
+breaker_transitions = registry.counter(
+    "gateway_upstream_breaker_transitions_total",
+    "Circuit breaker state changes per upstream RPC.",
+    ("rpc", "state")
+)
+breaker_rejected = registry.counter(
+    "gateway_upstream_breaker_rejected_total",
+    "Upstream calls refused by an open circuit breaker with no stale response to serve.",
+    ("rpc",)
+)
+stale_served = registry.counter(
+    "gateway_upstream_stale_responses_total",
+    "Upstream reads answered from the stale cache because the backend failed or the breaker was open.",
+    ("rpc",)
+)
+hedged_calls = registry.counter(
+    "gateway_upstream_hedged_total",
+    "Upstream reads for which a hedged second attempt was sent.",
+    ("rpc",)
+)
+
+def _rpc_name(method) -> str:
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+class ResilienceInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+    """Circuit breaker, stale fallback and optional hedging for unary RPCs
+
+    Sits innermost on the channel, so tracing and timing see one logical
+    call. Retries happen below it, in the channel (see method_config()).
+    """
+
+    def __init__(self, hedge_delay: Optional[float] = None, cache: Optional[StaleCache] = None,
+                 failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        if hedge_delay is None:
+            hedge_delay = float(os.getenv('GRPC_HEDGE_DELAY_MS', '0')) / 1000
+        self.hedge_delay = hedge_delay
+        self.cache = cache or StaleCache(
+            max_entries=int(os.getenv('BREAKER_STALE_CACHE_SIZE', '256')),
+            max_age=float(os.getenv('BREAKER_STALE_MAX_AGE', '300'))
+        )
+        self.failure_threshold = failure_threshold or int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout or float(os.getenv('BREAKER_RESET_TIMEOUT', '10'))
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, rpc: str) -> CircuitBreaker:
+        breaker = self.breakers.get(rpc)
+        if breaker is None:
+            breaker = self.breakers[rpc] = CircuitBreaker(rpc, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        rpc = _rpc_name(client_call_details.method)
+        breaker = self.breaker(rpc)
+        cacheable = rpc in READ_METHODS
+
+        if not breaker.allow():
+            stale = self.cache.get(rpc, request) if cacheable else None
+            if stale is not None:
+                stale_served.inc(rpc)
+                return stale
+            breaker_rejected.inc(rpc)
+            raise grpc.aio.AioRpcError(
+                grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata(),
+                details=f"Circuit breaker open for {rpc}"
+            )
+
+        try:
+            if cacheable and self.hedge_delay > 0:
+                response = await self._hedged(rpc, continuation, client_call_details, request)
+            else:
+                response = await self._attempt(continuation, client_call_details, request)
+        except grpc.RpcError as e:
+            if e.code() not in FAILURE_CODES:
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            stale = self.cache.get(rpc, request) if cacheable else None
+            if stale is None:
+                raise
+            stale_served.inc(rpc)
+            return stale
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+
+        breaker.record_success()
+        # Raw (unparsed) responses are not cached: parsed callers share the cache
+        if cacheable and not isinstance(response, bytes):
+            self.cache.put(rpc, request, response)
+        return response
+
+    @staticmethod
+    async def _attempt(continuation, client_call_details, request):
+        call = await continuation(client_call_details, request)
+        return await call
+
+    async def _hedged(self, rpc, continuation, client_call_details, request):
+        """Send a second attempt if the first is slower than hedge_delay; first success wins"""
+        first = asyncio.ensure_future(self._attempt(continuation, client_call_details, request))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay)
+        if done:
+            return first.result()
+        hedged_calls.inc(rpc)
+        pending = {first, asyncio.ensure_future(self._attempt(continuation, client_call_details, request))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+upstream_resilience = ResilienceInterceptor()
+
+registry.gauge(
+    "gateway_upstream_breaker_state",
+    "Circuit breaker state per upstream RPC (0 closed, 1 open, 2 half-open).",
+    ("rpc",),
+    callback=lambda: [((rpc,), int(breaker.state)) for rpc, breaker in upstream_resilience.breakers.items()]
+)
@@ -0,0 +1,107 @@
+"""Protobuf list responses straight to JSON bytes
+
+Routes returning lists of dicts pay twice after the conversion loop:
+FastAPI walks the result again with jsonable_encoder, then stdlib json
+encodes it. A MessageEncoder is declared once per output shape and
+resolves each column to a reader (attrgetter, callable or table lookup)
+up front, so a call is one comprehension over the messages; orjson
+encodes the list in C and the bytes go out through ProtoJSONResponse
+untouched. benchmarks/bench_serialization.py
+compares the paths at 10k and 100k rows.
+"""
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+from fastapi.responses import Response
+
+from core.timing import timed
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class ProtoJSONResponse(Response):
+    """Response for content that is already encoded JSON"""
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+class Lookup:
+    """Column read from a per-call table keyed by a message field
+
+    ``Lookup("users", "member_id", lambda user_id: f"User {user_id}")`` reads
+    ``users[message.member_id]`` from the ``users=`` mapping passed to
+    rows()/response(); the default (a value, or a callable of the key) is
+    used for keys missing from it.
+    """
+
+    def __init__(self, table: str, key: str, default: Any = None):
+        self.table = table
+        self.key = key
+        self.default = default
+
+    def reader(self, tables: Dict[str, Dict]) -> Callable[[Any], Any]:
+        """Function of a message reading this column from ``tables``"""
+        table = tables[self.table]
+        key = attrgetter(self.key)
+        default = self.default
+        if callable(default):
+            def read(message):
+                value = key(message)
+                return table[value] if value in table else default(value)
+        else:
+            def read(message):
+                return table.get(key(message), default)
+        return read
+
+Column = Union[str, Callable[[Any], Any], Lookup]
+
+class MessageEncoder:
+    """Output dict shape for a protobuf message
+
+    Each column is a message attribute name, a callable of the message, or
+    a Lookup.
+    """
+
+    def __init__(self, columns: Dict[str, Column]):
+        self.columns = dict(columns)
+        self.tables = sorted({column.table for column in self.columns.values() if isinstance(column, Lookup)})
+        self._columns: List[Tuple[str, Union[Callable[[Any], Any], Lookup]]] = []
+        for name, column in self.columns.items():
+            if isinstance(column, str):
+                column = attrgetter(column)
+            elif not isinstance(column, Lookup) and not callable(column):
+                raise TypeError(f"Column {name!r} must be an attribute name, a callable or a Lookup")
+            self._columns.append((name, column))
+
+    def _rows(self, messages: Iterable, tables: Dict[str, Dict]) -> List[Dict[str, Any]]:
+        # Lookups bind this call's tables once, not per message
+        readers = [(name, column.reader(tables) if isinstance(column, Lookup) else column) for name, column in self._columns]
+        return [{name: read(m) for name, read in readers} for m in messages]
+
+    def rows(self, messages: Iterable, **tables: Dict) -> List[Dict[str, Any]]:
+        """The messages as a list of dicts"""
+        return self._rows(messages, tables)
+
+    def dumps(self, messages: Iterable, **tables: Dict) -> bytes:
+        """The messages as a JSON array"""
+        with timed("convert"):
+            rows = self._rows(messages, tables)
+        with timed("json"):
+            return _dumps(rows)
+
+    def ndjson(self, messages: Iterable, **tables: Dict) -> bytes:
+        """The messages as newline-delimited JSON, one object per line"""
+        rows = self._rows(messages, tables)
+        return b"".join(_dumps(row) + b"\n" for row in rows)
+
+    def response(self, messages: Iterable, **tables: Dict) -> ProtoJSONResponse:
+        return ProtoJSONResponse(self.dumps(messages, **tables))
@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import Optional, Tuple
+from fastapi import Header, HTTPException
+from core.enums import UserRole
+
+logger = logging.getLogger(__name__)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+class Session:
+    """Verified identity carried by a session token"""
+    __slots__ = ("user_id", "username", "role", "expires")
+
+    def __init__(self, user_id: int, username: str, role: str, expires: int):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.expires = expires
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN.value
+
+class SessionTokens:
+    """Signed session tokens: "<base64 claims>.<HMAC-SHA256 of the claims>"
+
+    Issued at login and verified locally by any gateway process sharing
+    SESSION_SECRET, so requests carry a trusted user ID and role without a
+    round trip to the grpc-server.
+    """
+
+    def __init__(self, secret: Optional[str] = None, ttl: Optional[int] = None, clock=time.time):
+        secret = secret or os.getenv('SESSION_SECRET')
+        if not secret:
+            logger.warning("SESSION_SECRET is not set - using a per-process secret", extra={"action": "session_ephemeral_secret"})
+            secret = secrets.token_urlsafe(32)
+        self._key = secret.encode()
+        self.ttl = ttl or int(os.getenv('SESSION_TTL', '28800'))
+        self.clock = clock
+
+    def _signature(self, claims: str) -> str:
+        return _b64encode(hmac.new(self._key, claims.encode(), hashlib.sha256).digest())
+
+    def issue(self, user_id: int, username: str, role: str) -> Tuple[str, int]:
+        """Returns the token and its expiry (epoch seconds)"""
+        expires = int(self.clock()) + self.ttl
+        claims = _b64encode(json.dumps(
+            {"sub": user_id, "name": username, "role": role, "exp": expires}, separators=(",", ":")
+        ).encode())
+        return f"{claims}.{self._signature(claims)}", expires
+
+    def verify(self, token: str) -> Optional[Session]:
+        claims, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, self._signature(claims)):
+            return None
+        try:
+            payload = json.loads(_b64decode(claims))
+            session = Session(int(payload["sub"]), payload["name"], payload["role"], int(payload["exp"]))
+        except (ValueError, KeyError, TypeError):
+            return None
+        if session.expires < self.clock():
+            return None
+        return session
+
+session_tokens = SessionTokens()
+
+def session_required() -> bool:
+    """Routes need a session token unless SESSION_REQUIRED=false (a migration opt-out)"""
+    return os.getenv('SESSION_REQUIRED', 'true').lower() not in ('0', 'false', 'no')
+
+async def optional_session(authorization: Optional[str] = Header(default=None)) -> Optional[Session]:
+    """Dependency: the caller's verified session, or None if no token was sent"""
+    if not authorization:
+        if session_required():
+            raise HTTPException(status_code=401, detail="Authentication required")
+        return None
+    scheme, _, token = authorization.partition(" ")
+    session = session_tokens.verify(token) if scheme.lower() == "bearer" else None
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+    return session
+
+def ensure_user_access(session: Optional[Session], user_id: int) -> None:
+    """Users may only act as themselves; admins may act for anyone
+
+    A missing session only gets here when SESSION_REQUIRED=false.
+    """
+    if session is not None and not session.is_admin and session.user_id != user_id:
+        logger.warning("User attempted to act for another user", extra={
+            "session_user_id": session.user_id,
+            "user_id": user_id,
+            "action": "session_user_mismatch"
+        })
+        raise HTTPException(status_code=403, detail="Not allowed to access another user's data")
+
+def ensure_admin(session: Optional[Session]) -> Session:
+    """Admin routes always need a verified admin session, whatever SESSION_REQUIRED says"""
+    if session is None:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    if not session.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return session
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    """Operational endpoints (/metrics, /debug) are disabled unless ADMIN_TOKEN is set, and require it"""
+    expected = os.getenv('ADMIN_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Admin token required")
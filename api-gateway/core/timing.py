@@ -0,0 +1,164 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import grpc
+import grpc.aio
+from fastapi.routing import APIRoute
+
+from core.metrics import registry
+
+request_duration = registry.histogram(
+    "gateway_http_request_duration_seconds",
+    "Total time to produce the response headers, per route.",
+    ("route", "method", "status")
+)
+phase_duration = registry.histogram(
+    "gateway_http_request_phase_seconds",
+    "Time spent per request in each phase (upstream RPCs, protobuf conversion, JSON serialization).",
+    ("route", "phase")
+)
+upstream_duration = registry.histogram(
+    "gateway_upstream_rpc_duration_seconds",
+    "Latency of upstream LibraryService calls as seen by the gateway.",
+    ("rpc", "code")
+)
+
+class RequestTiming:
+    """Per-request accumulator of phase durations (in seconds)"""
+    __slots__ = ("start", "phases", "handler_done")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.handler_done: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current_timing.get()
+
+@contextmanager
+def timed(phase: str):
+    """Attribute the wrapped block to a phase of the current request"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - start)
+
+class TimedRoute(APIRoute):
+    """APIRoute that marks when the endpoint returns
+
+    The gap between the endpoint returning and the response headers being
+    sent is FastAPI's response encoding, reported as the ``json`` phase.
+    """
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+            async def call(**kwargs):
+                try:
+                    return await endpoint(**kwargs)
+                finally:
+                    timing = _current_timing.get()
+                    if timing is not None:
+                        timing.handler_done = time.perf_counter()
+            self.dependant.call = call
+        return super().get_route_handler()
+
+class TimingMiddleware:
+    """Pure ASGI middleware recording per-route latency and phase breakdown
+
+    Adds a ``Server-Timing`` header to every HTTP response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        status = 500
+        total = None
+
+        async def send_with_timing(message):
+            nonlocal status, total
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status = message["status"]
+                total = now - timing.start
+                if timing.handler_done is not None:
+                    timing.add("json", now - timing.handler_done)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.server_timing(total).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            if total is None:
+                total = time.perf_counter() - timing.start
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(total, route_path, scope["method"], str(status))
+            for phase, seconds in timing.phases.items():
+                phase_duration.observe(seconds, route_path, phase)
+
+def _rpc_name(method) -> str:
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+class TimingClientInterceptor(grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor):
+    """Times upstream RPCs and attributes them to the current request"""
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        rpc = _rpc_name(client_call_details.method)
+        start = time.perf_counter()
+        code = grpc.StatusCode.OK
+        call = await continuation(client_call_details, request)
+        try:
+            await call
+        except grpc.RpcError as e:
+            code = e.code()
+            raise
+        finally:
+            self._record(rpc, time.perf_counter() - start, code)
+        return call
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        # Streams are timed until the call object is returned; consumption
+        # time belongs to the caller.
+        rpc = _rpc_name(client_call_details.method)
+        start = time.perf_counter()
+        call = await continuation(client_call_details, request)
+        self._record(rpc, time.perf_counter() - start, grpc.StatusCode.OK)
+        return call
+
+    @staticmethod
+    def _record(rpc: str, elapsed: float, code) -> None:
+        upstream_duration.observe(elapsed, rpc, getattr(code, "name", str(code)))
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.add(f"rpc.{rpc}", elapsed)
@@ -0,0 +1,101 @@
+from typing import Optional, Tuple
+
+import grpc
+import grpc.aio
+
+from shared.tracing import (
+    TRACEPARENT_HEADER, Span, SpanExporter, NoopExporter, StdoutJSONExporter, OTLPHTTPExporter,
+    to_otlp, configure_exporter, set_exporter, set_service_name, current_span, current_trace_id,
+    parse_traceparent, format_traceparent, start_span
+)
+
+SERVICE_NAME = "api-gateway"
+set_service_name(SERVICE_NAME)
+
+def _incoming_parent(headers) -> Optional[Tuple[str, str]]:
+    request_id = None
+    for key, value in headers:
+        if key == b"traceparent":
+            parent = parse_traceparent(value.decode("latin-1"))
+            if parent:
+                return parent
+        elif key == b"x-request-id":
+            request_id = value.decode("latin-1").replace("-", "").lower()
+    # Accept a bare 32-hex request ID as the trace ID of a new trace
+    if request_id and len(request_id) == 32:
+        try:
+            int(request_id, 16)
+            return request_id, None
+        except ValueError:
+            pass
+    return None
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the root span of each HTTP request
+
+    Continues an incoming W3C ``traceparent`` (or 32-hex ``X-Request-ID``)
+    and echoes the trace ID back in an ``X-Trace-Id`` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        remote_parent = _incoming_parent(scope.get("headers", ()))
+        with start_span(f"HTTP {scope['method']}", remote_parent, http_method=scope["method"]) as span:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http_status", message["status"])
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", span.trace_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get("route")
+                route_path = getattr(route, "path", None) or scope.get("path", "")
+                span.name = f"HTTP {scope['method']} {route_path}"
+
+def _with_traceparent(client_call_details, span: Span):
+    metadata = grpc.aio.Metadata()
+    for key, value in client_call_details.metadata or ():
+        if key != TRACEPARENT_HEADER:
+            metadata.add(key, value)
+    metadata.add(TRACEPARENT_HEADER, format_traceparent(span))
+    return grpc.aio.ClientCallDetails(
+        client_call_details.method,
+        client_call_details.timeout,
+        metadata,
+        client_call_details.credentials,
+        client_call_details.wait_for_ready
+    )
+
+def _rpc_name(method) -> str:
+    if isinstance(method, bytes):
+        method = method.decode()
+    return method.rsplit("/", 1)[-1]
+
+class TracingClientInterceptor(grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor):
+    """Opens a client span per upstream RPC and propagates it in metadata"""
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        rpc = _rpc_name(client_call_details.method)
+        with start_span(f"grpc.client/{rpc}", rpc_method=rpc) as span:
+            call = await continuation(_with_traceparent(client_call_details, span), request)
+            try:
+                await call
+            except grpc.RpcError as e:
+                span.set_attribute("grpc_code", e.code().name)
+                raise
+            return call
+
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        rpc = _rpc_name(client_call_details.method)
+        with start_span(f"grpc.client/{rpc}", rpc_method=rpc, stream=True) as span:
+            return await continuation(_with_traceparent(client_call_details, span), request)
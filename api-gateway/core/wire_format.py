@@ -0,0 +1,17 @@
+"""Reading the Timestamp and cents fields of library messages
+
+grpc-server fills these alongside the deprecated *_date strings and float
+amounts (LEGACY_PROTO_FIELDS); the deprecated fields are only read as a
+fallback, for a server that predates the new ones.
+"""
+
+def iso_time(message, field: str, legacy: str) -> str:
+    """ISO 8601 in UTC without offset, as the string fields had it; "" when unset"""
+    if message.HasField(field):
+        return getattr(message, field).ToDatetime().isoformat()
+    return getattr(message, legacy)
+
+def amount(message, field: str, legacy: str) -> float:
+    """Currency amount from an int64 cents field"""
+    cents = getattr(message, field)
+    return cents / 100 if cents else getattr(message, legacy)
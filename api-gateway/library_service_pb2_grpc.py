@@ -40,6 +40,16 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetBookRequest.SerializeToString,
                 response_deserializer=library__service__pb2.BookResponse.FromString,
                 )
+        self.WatchBookAvailability = channel.unary_stream(
+                '/library.LibraryService/WatchBookAvailability',
+                request_serializer=library__service__pb2.WatchBookAvailabilityReq.SerializeToString,
+                response_deserializer=library__service__pb2.BookAvailabilityEvent.FromString,
+                )
+        self.StreamBooks = channel.unary_stream(
+                '/library.LibraryService/StreamBooks',
+                request_serializer=library__service__pb2.GetBooksRequest.SerializeToString,
+                response_deserializer=library__service__pb2.Book.FromString,
+                )
         self.AuthenticateUser = channel.unary_unary(
                 '/library.LibraryService/AuthenticateUser',
                 request_serializer=library__service__pb2.AuthRequest.SerializeToString,
@@ -60,6 +70,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.UpdateUserRequest.SerializeToString,
                 response_deserializer=library__service__pb2.UserResponse.FromString,
                 )
+        self.StreamUsers = channel.unary_stream(
+                '/library.LibraryService/StreamUsers',
+                request_serializer=library__service__pb2.GetUsersRequest.SerializeToString,
+                response_deserializer=library__service__pb2.User.FromString,
+                )
         self.IssueBook = channel.unary_unary(
                 '/library.LibraryService/IssueBook',
                 request_serializer=library__service__pb2.IssueBookRequest.SerializeToString,
@@ -75,6 +90,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetTransactionsRequest.SerializeToString,
                 response_deserializer=library__service__pb2.GetTransactionsResponse.FromString,
                 )
+        self.StreamTransactions = channel.unary_stream(
+                '/library.LibraryService/StreamTransactions',
+                request_serializer=library__service__pb2.GetTransactionsRequest.SerializeToString,
+                response_deserializer=library__service__pb2.Transaction.FromString,
+                )
         self.CreateUserBookRequest = channel.unary_unary(
                 '/library.LibraryService/CreateUserBookRequest',
                 request_serializer=library__service__pb2.CreateBookRequestReq.SerializeToString,
@@ -95,6 +115,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.RejectBookRequestReq.SerializeToString,
                 response_deserializer=library__service__pb2.BookRequestResponse.FromString,
                 )
+        self.WatchBookRequestEvents = channel.unary_stream(
+                '/library.LibraryService/WatchBookRequestEvents',
+                request_serializer=library__service__pb2.WatchBookRequestEventsReq.SerializeToString,
+                response_deserializer=library__service__pb2.BookRequestEvent.FromString,
+                )
         self.GetUserStats = channel.unary_unary(
                 '/library.LibraryService/GetUserStats',
                 request_serializer=library__service__pb2.UserStatsRequest.SerializeToString,
@@ -105,6 +130,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetUserTransactionsRequest.SerializeToString,
                 response_deserializer=library__service__pb2.GetUserTransactionsResponse.FromString,
                 )
+        self.StreamUserTransactions = channel.unary_stream(
+                '/library.LibraryService/StreamUserTransactions',
+                request_serializer=library__service__pb2.GetUserTransactionsRequest.SerializeToString,
+                response_deserializer=library__service__pb2.UserTransaction.FromString,
+                )
 
 
 class LibraryServiceServicer(object):
@@ -142,6 +172,22 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchBookAvailability(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamBooks(self, request, context):
+        """Same rows as the Get* list RPCs, one message each as the database
+        returns them (exports, NDJSON). Each call holds a DB connection until
+        the client has read the last row; the server caps concurrent calls
+        (STREAM_MAX_CONCURRENT) and rejects the rest with RESOURCE_EXHAUSTED.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def AuthenticateUser(self, request, context):
         """User operations
         """
@@ -167,6 +213,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def IssueBook(self, request, context):
         """Transaction operations
         """
@@ -186,6 +238,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CreateUserBookRequest(self, request, context):
         """Request operations
         """
@@ -211,6 +269,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchBookRequestEvents(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetUserStats(self, request, context):
         """User dashboard operations
         """
@@ -224,6 +288,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamUserTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LibraryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -252,6 +322,16 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetBookRequest.FromString,
                     response_serializer=library__service__pb2.BookResponse.SerializeToString,
             ),
+            'WatchBookAvailability': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchBookAvailability,
+                    request_deserializer=library__service__pb2.WatchBookAvailabilityReq.FromString,
+                    response_serializer=library__service__pb2.BookAvailabilityEvent.SerializeToString,
+            ),
+            'StreamBooks': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamBooks,
+                    request_deserializer=library__service__pb2.GetBooksRequest.FromString,
+                    response_serializer=library__service__pb2.Book.SerializeToString,
+            ),
             'AuthenticateUser': grpc.unary_unary_rpc_method_handler(
                     servicer.AuthenticateUser,
                     request_deserializer=library__service__pb2.AuthRequest.FromString,
@@ -272,6 +352,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.UpdateUserRequest.FromString,
                     response_serializer=library__service__pb2.UserResponse.SerializeToString,
             ),
+            'StreamUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamUsers,
+                    request_deserializer=library__service__pb2.GetUsersRequest.FromString,
+                    response_serializer=library__service__pb2.User.SerializeToString,
+            ),
             'IssueBook': grpc.unary_unary_rpc_method_handler(
                     servicer.IssueBook,
                     request_deserializer=library__service__pb2.IssueBookRequest.FromString,
@@ -287,6 +372,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetTransactionsRequest.FromString,
                     response_serializer=library__service__pb2.GetTransactionsResponse.SerializeToString,
             ),
+            'StreamTransactions': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTransactions,
+                    request_deserializer=library__service__pb2.GetTransactionsRequest.FromString,
+                    response_serializer=library__service__pb2.Transaction.SerializeToString,
+            ),
             'CreateUserBookRequest': grpc.unary_unary_rpc_method_handler(
                     servicer.CreateUserBookRequest,
                     request_deserializer=library__service__pb2.CreateBookRequestReq.FromString,
@@ -307,6 +397,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.RejectBookRequestReq.FromString,
                     response_serializer=library__service__pb2.BookRequestResponse.SerializeToString,
             ),
+            'WatchBookRequestEvents': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchBookRequestEvents,
+                    request_deserializer=library__service__pb2.WatchBookRequestEventsReq.FromString,
+                    response_serializer=library__service__pb2.BookRequestEvent.SerializeToString,
+            ),
             'GetUserStats': grpc.unary_unary_rpc_method_handler(
                     servicer.GetUserStats,
                     request_deserializer=library__service__pb2.UserStatsRequest.FromString,
@@ -317,6 +412,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetUserTransactionsRequest.FromString,
                     response_serializer=library__service__pb2.GetUserTransactionsResponse.SerializeToString,
             ),
+            'StreamUserTransactions': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamUserTransactions,
+                    request_deserializer=library__service__pb2.GetUserTransactionsRequest.FromString,
+                    response_serializer=library__service__pb2.UserTransaction.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'library.LibraryService', rpc_method_handlers)
@@ -413,6 +513,40 @@ class LibraryService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchBookAvailability(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/WatchBookAvailability',
+            library__service__pb2.WatchBookAvailabilityReq.SerializeToString,
+            library__service__pb2.BookAvailabilityEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamBooks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/StreamBooks',
+            library__service__pb2.GetBooksRequest.SerializeToString,
+            library__service__pb2.Book.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def AuthenticateUser(request,
             target,
@@ -481,6 +615,23 @@ class LibraryService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StreamUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/StreamUsers',
+            library__service__pb2.GetUsersRequest.SerializeToString,
+            library__service__pb2.User.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def IssueBook(request,
             target,
@@ -532,6 +683,23 @@ class LibraryService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StreamTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/StreamTransactions',
+            library__service__pb2.GetTransactionsRequest.SerializeToString,
+            library__service__pb2.Transaction.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def CreateUserBookRequest(request,
             target,
@@ -600,6 +768,23 @@ class LibraryService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchBookRequestEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/WatchBookRequestEvents',
+            library__service__pb2.WatchBookRequestEventsReq.SerializeToString,
+            library__service__pb2.BookRequestEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetUserStats(request,
             target,
@@ -633,3 +818,20 @@ class LibraryService(object):
             library__service__pb2.GetUserTransactionsResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamUserTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/library.LibraryService/StreamUserTransactions',
+            library__service__pb2.GetUserTransactionsRequest.SerializeToString,
+            library__service__pb2.UserTransaction.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
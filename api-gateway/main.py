@@ -1,7 +1,13 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.logging_config import setup_logging
 from core.csrf import CSRFMiddleware
+from core.admission import AdmissionMiddleware
+from core.compression import CompressionMiddleware
+from core.timing import TimingMiddleware
+from core.tracing import TracingMiddleware, configure_exporter
+from core.grpc_client import close_grpc_channels
 from routes.auth import router as auth_router
 from routes.books import router as books_router
 from routes.requests import router as requests_router
@@ -9,12 +15,40 @@ from routes.websocket import router as websocket_router
 from routes.users import router as users_router
 from routes.transactions import router as transactions_router
 from routes.csrf import router as csrf_router
+from routes.metrics import router as metrics_router
+from routes.debug import router as debug_router
+from services.notification_service import notification_service
+from services.request_event_watcher import request_event_watcher
+from services.catalog_feed import catalog_feed, catalog_availability_watcher
 
 # Setup logging
 logger = setup_logging()
 
+# Span exporter selected by $TRACE_EXPORTER (none, stdout, otlp)
+configure_exporter()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Notifications go through a shared bus ($NOTIFICATION_BUS) so that every
+    # worker/replica delivers to the sockets it holds
+    await notification_service.start()
+    # Request decisions are pushed from the grpc-server event stream
+    request_event_watcher.start()
+    # Coalesced availability deltas for catalog subscribers on the / WebSocket
+    catalog_availability_watcher.start()
+    yield
+    await catalog_availability_watcher.stop()
+    catalog_feed.close()
+    await request_event_watcher.stop()
+    # Close WebSockets cleanly so clients reconnect to another replica
+    await notification_service.stop()
+    await close_grpc_channels()
+
 # Create FastAPI app
-app = FastAPI(title="Library API Gateway")
+app = FastAPI(title="Library API Gateway", lifespan=lifespan)
+
+# Rate limiting (innermost, so 429s still get CORS headers)
+app.add_middleware(AdmissionMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -28,6 +62,15 @@ app.add_middleware(
 # CSRF middleware
 app.add_middleware(CSRFMiddleware)
 
+# gzip/brotli for large responses (inside timing, so compression is measured)
+app.add_middleware(CompressionMiddleware)
+
+# Timing middleware (outermost, so it measures the whole request)
+app.add_middleware(TimingMiddleware)
+
+# Tracing middleware opens the root span and continues incoming traceparent
+app.add_middleware(TracingMiddleware)
+
 # API versioning
 API_V1_PREFIX = "/api/v1"
 
@@ -38,7 +81,9 @@ app.include_router(books_router, prefix=API_V1_PREFIX, tags=["Books"])
 app.include_router(requests_router, prefix=API_V1_PREFIX, tags=["Requests"])
 app.include_router(websocket_router, tags=["WebSocket"])
 app.include_router(users_router, prefix=API_V1_PREFIX, tags=["Users"])
-app.include_router(transactions_router, prefix=API_V1_PREFIX, tags=["Transactions"])}
+app.include_router(transactions_router, prefix=API_V1_PREFIX, tags=["Transactions"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(debug_router, tags=["Debug"])
 
 @app.get("/")
 async def root():
@@ -3,10 +3,11 @@ from pydantic import BaseModel, Field, validator
 from services.auth_service import AuthService
 from core.grpc_client import get_grpc_client
 from core.validation import validate_username, validate_password
+from core.admission import AdmittedRoute
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=AdmittedRoute)
 
 class LoginRequest(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
@@ -1,10 +1,21 @@
-from fastapi import APIRouter
+import hashlib
+from typing import Optional
+import grpc
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field, validator
-from services.book_service import BookService
+from services.book_service import BOOK_JSON, BookService
 from core.grpc_client import get_grpc_client
+from core.compression import mark_precompressed
+from core.negotiation import JSON, VARY, list_response, response_type, vary_on_accept
+from services.catalog_feed import catalog_availability_watcher
 from core.validation import validate_positive_integer
+from core.admission import AdmittedRoute
+from core.session import Session, optional_session, ensure_admin
+import library_service_pb2
+import logging
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=AdmittedRoute)
 
 class BookSearchRequest(BaseModel):
     query: str = Field(default="", max_length=200)
@@ -32,24 +43,64 @@ class ReturnBookRequest(BaseModel):
     def validate_transaction_id(cls, v):
         return validate_positive_integer(v, "Transaction ID")
 
+def catalog_etag(query: str) -> Optional[str]:
+    """Weak ETag of a catalog search at the current catalog version, if known"""
+    version = catalog_availability_watcher.version
+    if version is None:
+        return None
+    return f'W/"catalog-{version}-{hashlib.sha1(query.encode()).hexdigest()[:12]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match list"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
 @router.get('/user/books/search')
-async def search_books(q: str = ""):
+async def search_books(request: Request, q: str = ""):
+    media_type = response_type(request)
+    if media_type != JSON:
+        try:
+            return await list_response(media_type, library_service_pb2.GetBooksRequest(search_query=q), "GetBooks", "StreamBooks", BOOK_JSON)
+        except grpc.RpcError as e:
+            logger.error("gRPC service error during book export", extra={
+                "query": q,
+                "media_type": media_type,
+                "grpc_code": e.code().name,
+                "action": "book_export_grpc_error"
+            })
+            raise HTTPException(status_code=500, detail="Book search service unavailable")
+    # Read before fetching, so the body is at least as new as the version
+    etag = catalog_etag(q)
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, **VARY})
     client = await get_grpc_client()
     book_service = BookService(client)
-    return await book_service.search_books(q)
+    response = vary_on_accept(await book_service.search_books_response(q))
+    if etag is not None:
+        response.headers["ETag"] = etag
+        if not q:
+            # The full catalog is what most clients fetch: compress it once per version
+            mark_precompressed(request)
+    return response
 
 @router.get('/admin/books')
-async def list_books_admin(q: str = ""):
-    return await search_books(q)
+async def list_books_admin(request: Request, q: str = "", session: Optional[Session] = Depends(optional_session)):
+    ensure_admin(session)
+    return await search_books(request, q)
 
 @router.post('/admin/issue-book')
-async def issue_book(request: IssueBookRequest):
+async def issue_book(request: IssueBookRequest, session: Optional[Session] = Depends(optional_session)):
+    session = ensure_admin(session)
     client = await get_grpc_client()
     book_service = BookService(client)
-    return await book_service.issue_book(request.book_id, request.user_id)
+    return await book_service.issue_book(request.book_id, request.user_id, admin_id=session.user_id)
 
 @router.post('/admin/return-book')
-async def return_book(request: ReturnBookRequest):
+async def return_book(request: ReturnBookRequest, session: Optional[Session] = Depends(optional_session)):
+    session = ensure_admin(session)
     client = await get_grpc_client()
     book_service = BookService(client)
-    return await book_service.return_book(request.transaction_id)
\ No newline at end of file
+    return await book_service.return_book(request.transaction_id, admin_id=session.user_id)
\ No newline at end of file
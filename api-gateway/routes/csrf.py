@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Request
-from core.csrf import csrf_protection
+from core.csrf import csrf_protection, ANONYMOUS_SESSION
+from core.timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.get("/csrf-token")
 async def get_csrf_token(request: Request):
-    session_id = request.headers.get("Authorization", "anonymous")
-    token = csrf_protection.generate_token()
-    csrf_protection.store_token(token, session_id)
-    return {"token": token}
\ No newline at end of file
+    session_id = request.headers.get("Authorization", ANONYMOUS_SESSION)
+    return {"token": csrf_protection.generate_token(session_id)}
@@ -0,0 +1,22 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from core.session import require_admin_token
+from core.profiler import ProfilerBusyError, run_profile, DEFAULT_INTERVAL, MIN_INTERVAL, MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/debug/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin_token)])
+async def profile(
+    mode: str = Query(default="wall", pattern="^(wall|memory)$"),
+    seconds: float = Query(default=10, gt=0, le=MAX_SECONDS),
+    interval: float = Query(default=DEFAULT_INTERVAL, ge=MIN_INTERVAL),
+    limit: int = Query(default=25, gt=0)
+):
+    logger.info(f"Running {mode} profile for {seconds}s")
+    try:
+        body = await run_profile(mode, seconds, interval, limit)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(body)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from core.metrics import registry
+from core.session import require_admin_token
+
+router = APIRouter()
+
+# Same gate as /debug: this port is public, unlike grpc-server's admin listener
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_admin_token)])
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field, validator
 from typing import Optional
 from services.request_service import RequestService
 from services.notification_service import notification_service
+from services.request_event_watcher import request_event_watcher
 from core.grpc_client import get_grpc_client
 from core.validation import validate_positive_integer, validate_request_type
+from core.admission import AdmittedRoute
+from core.session import Session, optional_session, ensure_user_access, ensure_admin
 import logging
+from google.protobuf.field_mask_pb2 import FieldMask
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=AdmittedRoute)
+
+# What an approval/rejection notification needs
+NOTIFY_FIELDS = FieldMask(paths=["request_id", "user_id", "request_type"])
 
 class UserBookRequest(BaseModel):
     book_id: int = Field(..., ge=0)  # Can be 0 for return requests
@@ -51,7 +58,7 @@ class RejectBookRequestBody(BaseModel):
         return v.strip() if v else ""
 
 @router.post('/user/book-request')
-async def create_book_request(request: UserBookRequest):
+async def create_book_request(request: UserBookRequest, session: Optional[Session] = Depends(optional_session)):
     # Business rule validation
     if request.request_type == "ISSUE" and request.book_id <= 0:
         logger.warning("Issue request with invalid book_id", extra={
@@ -69,21 +76,26 @@ async def create_book_request(request: UserBookRequest):
         })
         raise HTTPException(status_code=400, detail="Valid transaction ID required for return requests")
     
+    ensure_user_access(session, request.user_id)
+    
     client = await get_grpc_client()
     request_service = RequestService(client)
+    # The session's role claim answers the admin check for the caller itself
+    user_role = session.role if session is not None and session.user_id == request.user_id else None
     return await request_service.create_book_request(
         request.user_id, request.book_id, request.request_type, 
-        request.transaction_id, request.notes or ""
+        request.transaction_id, request.notes or "", user_role=user_role
     )
 
 @router.get('/admin/book-requests')
-async def list_book_requests():
+async def list_book_requests(session: Optional[Session] = Depends(optional_session)):
+    ensure_admin(session)
     client = await get_grpc_client()
     request_service = RequestService(client)
     return await request_service.get_admin_book_requests()
 
 @router.get('/user/{user_id}/book-requests')
-async def get_user_book_requests(user_id: int):
+async def get_user_book_requests(user_id: int, session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if user_id <= 0:
         logger.warning("Invalid user_id for book requests", extra={
@@ -91,13 +103,14 @@ async def get_user_book_requests(user_id: int):
             "action": "get_user_requests_invalid_user_id"
         })
         raise HTTPException(status_code=400, detail="Valid user ID required")
+    ensure_user_access(session, user_id)
     
     client = await get_grpc_client()
     request_service = RequestService(client)
     return await request_service.get_user_book_requests(user_id)
 
 @router.post('/admin/book-requests/{request_id}/approve')
-async def approve_book_request(request_id: int):
+async def approve_book_request(request_id: int, session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if request_id <= 0:
         logger.warning("Invalid request_id for approval", extra={
@@ -105,6 +118,7 @@ async def approve_book_request(request_id: int):
             "action": "approve_invalid_request_id"
         })
         raise HTTPException(status_code=400, detail="Valid request ID required")
+    session = ensure_admin(session)
     
     logger.info("Book request approval initiated", extra={
         "request_id": request_id,
@@ -115,7 +129,7 @@ async def approve_book_request(request_id: int):
         response = await client.ApproveBookRequest(
             library_service_pb2.ApproveBookRequestReq(
                 request_id=request_id,
-                admin_id=1  # TODO: Get from auth
+                admin_id=session.user_id
             )
         )
         
@@ -125,10 +139,15 @@ async def approve_book_request(request_id: int):
                 "action": "request_approved"
             })
             
+            # With the event watcher running the notification arrives through
+            # WatchBookRequestEvents; otherwise notify inline
+            if request_event_watcher.running:
+                return {"message": response.message}
+            
             try:
                 # Get request details for notification
                 logger.debug("Fetching request details for notification", extra={"request_id": request_id})
-                requests_response = await client.GetBookRequests(library_service_pb2.GetBookRequestsReq(status=""))
+                requests_response = await client.GetBookRequests(library_service_pb2.GetBookRequestsReq(status="", fields=NOTIFY_FIELDS))
                 approved_request = next((req for req in requests_response.requests if req.request_id == request_id), None)
                 
                 if approved_request:
@@ -167,7 +186,8 @@ async def approve_book_request(request_id: int):
         raise HTTPException(status_code=500, detail="Service unavailable")
 
 @router.post('/admin/book-requests/{request_id}/reject')
-async def reject_book_request(request_id: int, request_body: RejectBookRequestBody):
+async def reject_book_request(request_id: int, request_body: RejectBookRequestBody,
+                              session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if request_id <= 0:
         logger.warning("Invalid request_id for rejection", extra={
@@ -175,13 +195,14 @@ async def reject_book_request(request_id: int, request_body: RejectBookRequestBo
             "action": "reject_invalid_request_id"
         })
         raise HTTPException(status_code=400, detail="Valid request ID required")
+    session = ensure_admin(session)
     
     client = await get_grpc_client()
     try:
         response = await client.RejectBookRequest(
             library_service_pb2.RejectBookRequestReq(
                 request_id=request_id,
-                admin_id=1,  # TODO: Get from auth
+                admin_id=session.user_id,
                 notes=request_body.notes
             )
         )
@@ -192,10 +213,13 @@ async def reject_book_request(request_id: int, request_body: RejectBookRequestBo
                 "action": "request_rejected"
             })
             
+            if request_event_watcher.running:
+                return {"message": response.message}
+            
             try:
                 # Get request details for notification
                 logger.debug("Fetching request details for rejection notification", extra={"request_id": request_id})
-                requests_response = await client.GetBookRequests(library_service_pb2.GetBookRequestsReq(status=""))
+                requests_response = await client.GetBookRequests(library_service_pb2.GetBookRequestsReq(status="", fields=NOTIFY_FIELDS))
                 rejected_request = next((req for req in requests_response.requests if req.request_id == request_id), None)
                 
                 if rejected_request:
@@ -1,14 +1,53 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from core.grpc_client import get_grpc_client
+from core.session import Session, optional_session, ensure_user_access, ensure_admin
 from core.enums import TransactionStatus
+from core.negotiation import JSON, NDJSON, PROTOBUF, list_response, response_type, vary_on_accept
+from core.serialization import Lookup, MessageEncoder
+from core.wire_format import amount, iso_time
+from core.admission import AdmittedRoute
+from google.protobuf.field_mask_pb2 import FieldMask
 import library_service_pb2
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=AdmittedRoute)
+
+# Only the names are joined onto the transactions
+USERNAMES = FieldMask(paths=["user_id", "username"])
+BOOK_TITLES = FieldMask(paths=["book_id", "title"])
+
+TRANSACTION_JSON = MessageEncoder({
+    "transaction_id": "transaction_id",
+    "user_id": "member_id",
+    "username": Lookup("users", "member_id", lambda user_id: f"User {user_id}"),
+    "book_id": "book_id",
+    "book_title": Lookup("books", "book_id", "Unknown Book"),
+    "transaction_type": "transaction_type",
+    "transaction_date": lambda txn: iso_time(txn, "transaction_time", "transaction_date"),
+    "due_date": lambda txn: iso_time(txn, "due_time", "due_date"),
+    "return_date": lambda txn: iso_time(txn, "return_time", "return_date"),
+    "status": "status",
+    "fine_amount": lambda txn: amount(txn, "fine_cents", "fine_amount")
+})
+
+USER_TRANSACTION_JSON = MessageEncoder({
+    "transaction_id": "transaction_id",
+    "book_id": "book_id",
+    "book_title": "book_title",
+    "book_author": "book_author",
+    "transaction_type": "transaction_type",
+    "transaction_date": lambda txn: iso_time(txn, "transaction_time", "transaction_date"),
+    "due_date": lambda txn: iso_time(txn, "due_time", "due_date"),
+    "return_date": lambda txn: iso_time(txn, "return_time", "return_date"),
+    "status": "status",
+    "fine_amount": lambda txn: amount(txn, "fine_cents", "fine_amount")
+})
 
 @router.get('/admin/transactions')
-async def list_transactions(user_id: int = None, status: str = ""):
+async def list_transactions(request: Request, user_id: int = None, status: str = "",
+                            session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if user_id is not None and user_id < 0:
         logger.warning("Invalid user_id for admin transactions", extra={
@@ -27,45 +66,34 @@ async def list_transactions(user_id: int = None, status: str = ""):
                 "action": "admin_transactions_invalid_status"
             })
             raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(valid_statuses)}")
+    ensure_admin(session)
     
+    media_type = response_type(request)
+    upstream_request = library_service_pb2.GetTransactionsRequest(
+        user_id=user_id or 0,
+        status=status
+    )
     client = await get_grpc_client()
     try:
-        response = await client.GetTransactions(
-            library_service_pb2.GetTransactionsRequest(
-                user_id=user_id or 0,
-                status=status
-            )
-        )
+        # Protobuf clients get the upstream message as is, without the joined names
+        if media_type == PROTOBUF:
+            return await list_response(media_type, upstream_request, "GetTransactions", "StreamTransactions", TRANSACTION_JSON)
         
         # Get users and books for additional info
-        users_response = await client.GetUsers(library_service_pb2.GetUsersRequest())
-        books_response = await client.GetBooks(library_service_pb2.GetBooksRequest(search_query=""))
+        users_response = await client.GetUsers(library_service_pb2.GetUsersRequest(fields=USERNAMES))
+        books_response = await client.GetBooks(library_service_pb2.GetBooksRequest(search_query="", fields=BOOK_TITLES))
+        users = {user.user_id: user.username for user in users_response.users}
+        books = {book.book_id: book.title for book in books_response.books}
         
-        users_dict = {user.user_id: user.username for user in users_response.users}
-        books_dict = {book.book_id: book.title for book in books_response.books}
-        
-        transactions = []
-        for txn in response.transactions:
-            transactions.append({
-                "transaction_id": txn.transaction_id,
-                "user_id": txn.member_id,
-                "username": users_dict.get(txn.member_id, f"User {txn.member_id}"),
-                "book_id": txn.book_id,
-                "book_title": books_dict.get(txn.book_id, "Unknown Book"),
-                "transaction_type": txn.transaction_type,
-                "transaction_date": txn.transaction_date,
-                "due_date": txn.due_date,
-                "return_date": txn.return_date,
-                "status": txn.status,
-                "fine_amount": txn.fine_amount
-            })
-        
-        return transactions
+        if media_type == NDJSON:
+            return await list_response(media_type, upstream_request, "GetTransactions", "StreamTransactions", TRANSACTION_JSON, users=users, books=books)
+        response = await client.GetTransactions(upstream_request)
+        return vary_on_accept(TRANSACTION_JSON.response(response.transactions, users=users, books=books))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Service unavailable")
 
 @router.get('/user/{user_id}/transactions')
-async def get_user_transactions(user_id: int, status: str = ""):
+async def get_user_transactions(request: Request, user_id: int, status: str = "", session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if user_id <= 0:
         logger.warning("Invalid user_id for transactions", extra={
@@ -73,6 +101,7 @@ async def get_user_transactions(user_id: int, status: str = ""):
             "action": "get_user_transactions_invalid_user_id"
         })
         raise HTTPException(status_code=400, detail="Valid user ID required")
+    ensure_user_access(session, user_id)
     
     # Validate status if provided
     if status and status.strip():
@@ -85,30 +114,17 @@ async def get_user_transactions(user_id: int, status: str = ""):
             })
             raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(valid_statuses)}")
     
-    client = await get_grpc_client()
+    media_type = response_type(request)
+    upstream_request = library_service_pb2.GetUserTransactionsRequest(
+        user_id=user_id,
+        status=status
+    )
     try:
-        response = await client.GetUserTransactions(
-            library_service_pb2.GetUserTransactionsRequest(
-                user_id=user_id,
-                status=status
-            )
-        )
-        
-        transactions = []
-        for txn in response.transactions:
-            transactions.append({
-                "transaction_id": txn.transaction_id,
-                "book_id": txn.book_id,
-                "book_title": txn.book_title,
-                "book_author": txn.book_author,
-                "transaction_type": txn.transaction_type,
-                "transaction_date": txn.transaction_date,
-                "due_date": txn.due_date,
-                "return_date": txn.return_date,
-                "status": txn.status,
-                "fine_amount": txn.fine_amount
-            })
+        if media_type != JSON:
+            return await list_response(media_type, upstream_request, "GetUserTransactions", "StreamUserTransactions", USER_TRANSACTION_JSON)
+        client = await get_grpc_client()
+        response = await client.GetUserTransactions(upstream_request)
         
-        return transactions
+        return vary_on_accept(USER_TRANSACTION_JSON.response(response.transactions))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Service unavailable")
\ No newline at end of file
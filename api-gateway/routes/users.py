@@ -1,36 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from core.grpc_client import get_grpc_client
+from core.session import Session, optional_session, ensure_user_access, ensure_admin
+from core.negotiation import JSON, list_response, response_type, vary_on_accept
+from core.serialization import MessageEncoder
+from core.wire_format import amount
+from core.admission import AdmittedRoute
 import library_service_pb2
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=AdmittedRoute)
+
+USER_JSON = MessageEncoder({
+    "user_id": "user_id",
+    "username": "username",
+    "email": "email",
+    "role": "role",
+    "is_active": "is_active"
+})
 
 @router.get('/admin/users')
-async def list_users():
+async def list_users(request: Request, session: Optional[Session] = Depends(optional_session)):
+    ensure_admin(session)
     logger.info("Admin fetching users list")
-    client = await get_grpc_client()
+    media_type = response_type(request)
     try:
+        if media_type != JSON:
+            return await list_response(media_type, library_service_pb2.GetUsersRequest(), "GetUsers", "StreamUsers", USER_JSON)
+        client = await get_grpc_client()
         response = await client.GetUsers(
             library_service_pb2.GetUsersRequest()
         )
         
-        users = []
-        for user in response.users:
-            users.append({
-                "user_id": user.user_id,
-                "username": user.username,
-                "email": user.email,
-                "role": user.role,
-                "is_active": user.is_active
-            })
-        
-        return users
+        return vary_on_accept(USER_JSON.response(response.users))
     except Exception as e:
         raise HTTPException(status_code=500, detail="Service unavailable")
 
 @router.get('/user/{user_id}/stats')
-async def get_user_stats(user_id: int):
+async def get_user_stats(user_id: int, session: Optional[Session] = Depends(optional_session)):
     # Input validation
     if user_id <= 0:
         logger.warning("Invalid user_id for stats", extra={
@@ -38,6 +46,7 @@ async def get_user_stats(user_id: int):
             "action": "get_user_stats_invalid_user_id"
         })
         raise HTTPException(status_code=400, detail="Valid user ID required")
+    ensure_user_access(session, user_id)
     
     logger.info(f"Fetching user stats: user_id={user_id}")
     client = await get_grpc_client()
@@ -50,7 +59,7 @@ async def get_user_stats(user_id: int):
             "total_books_taken": response.total_books_taken,
             "currently_borrowed": response.currently_borrowed,
             "overdue_books": response.overdue_books,
-            "total_fine": response.total_fine
+            "total_fine": amount(response, "total_fine_cents", "total_fine")
         }
         logger.info(f"User stats retrieved: user_id={user_id}, borrowed={stats['currently_borrowed']}, overdue={stats['overdue_books']}")
         return stats
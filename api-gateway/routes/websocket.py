@@ -1,44 +1,91 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from services.notification_service import notification_service
+from services.catalog_feed import catalog_feed, ALL_BOOKS
+from core.session import session_tokens
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _parse_books(value):
+    """SUBSCRIBE/UNSUBSCRIBE target: "all" or a list of book IDs"""
+    if value == ALL_BOOKS:
+        return ALL_BOOKS
+    if isinstance(value, list) and all(isinstance(book_id, int) and book_id > 0 for book_id in value):
+        return value
+    return None
+
 @router.websocket('/')
 async def websocket_endpoint(websocket: WebSocket):
-    # Validate WebSocket connection parameters
+    # The user comes from the signed session token (browsers cannot set an
+    # Authorization header on a WebSocket); without one the socket is
+    # anonymous and only receives catalog updates
     query_params = dict(websocket.query_params)
-    user_id = query_params.get('userId')
+    token = query_params.get('token')
+    user_id = None
+    if token:
+        session = session_tokens.verify(token)
+        if session is None:
+            logger.warning("WebSocket connection with invalid session token", extra={"action": "ws_invalid_token"})
+            await websocket.close(code=4001, reason="Invalid or expired session")
+            return
+        user_id = str(session.user_id)
     
-    if user_id and not user_id.isdigit():
-        logger.warning("WebSocket connection with invalid userId format", extra={
-            "user_id": user_id,
-            "action": "ws_invalid_user_id_format"
-        })
-        await websocket.close(code=4000, reason="Invalid userId format")
+    # Last notification cursor the client saw; missed notifications are replayed
+    cursor = query_params.get('cursor')
+    if cursor is not None and not cursor.isdigit():
+        await websocket.close(code=4000, reason="Invalid cursor format")
         return
     
+    connection = None
     try:
         logger.debug("WebSocket connection attempt", extra={"action": "ws_connect_start"})
         await websocket.accept()
         
         if user_id:
-            notification_service.add_connection(user_id, websocket)
+            connection = notification_service.add_connection(
+                user_id, websocket, int(cursor) if cursor is not None else None
+            )
         else:
-            logger.warning("WebSocket connection without user_id", extra={"action": "ws_no_user_id"})
+            logger.debug("Anonymous WebSocket connection", extra={"action": "ws_anonymous"})
         
         while True:
-            await websocket.receive_text()
+            text = await websocket.receive_text()
+            # Any client frame (including PONG replies to heartbeats) keeps the connection alive
+            if connection is not None:
+                connection.touch()
+            
+            try:
+                frame = json.loads(text)
+            except ValueError:
+                continue
+            if not isinstance(frame, dict) or frame.get('type') not in ('SUBSCRIBE', 'UNSUBSCRIBE'):
+                continue
+            books = _parse_books(frame.get('books'))
+            if books is None:
+                logger.debug("Ignoring malformed catalog subscription", extra={"action": "ws_bad_subscription"})
+                continue
+            if connection is None:
+                # Anonymous sockets only receive catalog updates; they get a
+                # hub connection (and its send queue) once they subscribe
+                connection = notification_service.hub.register("", websocket)
+            if frame['type'] == 'SUBSCRIBE':
+                catalog_feed.subscribe(connection, books)
+            else:
+                catalog_feed.unsubscribe(connection, books)
             
     except WebSocketDisconnect:
-        if user_id:
-            notification_service.remove_connection(user_id)
+        pass
     except Exception as e:
-        logger.error("WebSocket connection error", extra={
-            "user_id": user_id,
-            "error": str(e),
-            "action": "ws_error"
-        }, exc_info=True)
-        if user_id:
-            notification_service.remove_connection(user_id)
\ No newline at end of file
+        # The hub closes evicted sockets from its side; that is not an error
+        if connection is None or not connection.closed:
+            logger.error("WebSocket connection error", extra={
+                "user_id": user_id,
+                "error": str(e),
+                "action": "ws_error"
+            }, exc_info=True)
+    finally:
+        if connection is not None:
+            catalog_feed.unsubscribe(connection)
+            notification_service.remove_connection(connection)
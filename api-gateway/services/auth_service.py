@@ -2,6 +2,7 @@ import grpc
 import library_service_pb2
 import library_service_pb2_grpc
 from fastapi import HTTPException
+from core.session import session_tokens
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,11 +34,17 @@ class AuthService:
                     "user_id": response.user.user_id,
                     "action": "auth_success"
                 })
+                # Later requests present this token instead of re-authenticating
+                token, expires_at = session_tokens.issue(
+                    response.user.user_id, response.user.username, response.user.role
+                )
                 return {
                     "user_id": response.user.user_id,
                     "username": response.user.username,
                     "email": response.user.email,
                     "role": response.user.role,
+                    "token": token,
+                    "expires_at": expires_at,
                     "message": response.message
                 }
             else:
@@ -2,16 +2,41 @@ import grpc
 import library_service_pb2
 import library_service_pb2_grpc
 from fastapi import HTTPException
+from core.timing import timed
+from core.serialization import MessageEncoder
+from core.wire_format import amount
+from google.protobuf.field_mask_pb2 import FieldMask
 import logging
 
 logger = logging.getLogger(__name__)
 
+AVAILABILITY_FIELDS = FieldMask(paths=["book_id", "available_copies"])
+
+BOOK_JSON = MessageEncoder({
+    "book_id": "book_id",
+    "title": "title",
+    "author": "author",
+    "genre": "genre",
+    "published_year": "published_year",
+    "available_copies": "available_copies",
+    "can_request": lambda book: book.available_copies > 0
+})
+
 class BookService:
     def __init__(self, grpc_client):
         self.client = grpc_client
     
     async def search_books(self, query: str = ""):
         """Search books by query"""
+        books = await self._search_books(query)
+        with timed("convert"):
+            return BOOK_JSON.rows(books)
+    
+    async def search_books_response(self, query: str = ""):
+        """Search books by query, encoded straight to a JSON response"""
+        return BOOK_JSON.response(await self._search_books(query))
+    
+    async def _search_books(self, query: str):
         logger.info("Book search initiated", extra={"query": query, "action": "book_search_start"})
         
         try:
@@ -20,24 +45,12 @@ class BookService:
                 library_service_pb2.GetBooksRequest(search_query=query)
             )
             
-            books = []
-            for book in response.books:
-                books.append({
-                    "book_id": book.book_id,
-                    "title": book.title,
-                    "author": book.author,
-                    "genre": book.genre,
-                    "published_year": book.published_year,
-                    "available_copies": book.available_copies,
-                    "can_request": book.available_copies > 0
-                })
-            
             logger.info("Book search completed successfully", extra={
                 "query": query,
-                "results_count": len(books),
+                "results_count": len(response.books),
                 "action": "book_search_success"
             })
-            return books
+            return response.books
             
         except grpc.RpcError as e:
             logger.error("gRPC service error during book search", extra={
@@ -57,8 +70,8 @@ class BookService:
             }, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
     
-    async def issue_book(self, book_id: int, user_id: int):
-        """Issue book to user with validation"""
+    async def issue_book(self, book_id: int, user_id: int, admin_id: int):
+        """Issue book to user with validation, recorded against the issuing admin"""
         logger.info("Book issue initiated", extra={
             "book_id": book_id,
             "user_id": user_id,
@@ -67,7 +80,7 @@ class BookService:
         
         # Validate book exists and is available
         try:
-            books_response = await self.client.GetBooks(library_service_pb2.GetBooksRequest(search_query=""))
+            books_response = await self.client.GetBooks(library_service_pb2.GetBooksRequest(search_query="", fields=AVAILABILITY_FIELDS))
             book = next((b for b in books_response.books if b.book_id == book_id), None)
             
             if not book:
@@ -93,7 +106,7 @@ class BookService:
                 library_service_pb2.IssueBookRequest(
                     book_id=book_id,
                     member_id=user_id,
-                    admin_id=1  # TODO: Get from auth
+                    admin_id=admin_id
                 )
             )
             
@@ -139,8 +152,8 @@ class BookService:
             }, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
     
-    async def return_book(self, transaction_id: int):
-        """Return book by transaction ID"""
+    async def return_book(self, transaction_id: int, admin_id: int):
+        """Return book by transaction ID, recorded against the receiving admin"""
         logger.info("Book return initiated", extra={
             "transaction_id": transaction_id,
             "action": "book_return_start"
@@ -151,19 +164,20 @@ class BookService:
             response = await self.client.ReturnBook(
                 library_service_pb2.ReturnBookRequest(
                     transaction_id=transaction_id,
-                    admin_id=1  # TODO: Get from auth
+                    admin_id=admin_id
                 )
             )
             
             if response.success:
+                fine_amount = amount(response.transaction, "fine_cents", "fine_amount")
                 logger.info("Book returned successfully", extra={
                     "transaction_id": response.transaction.transaction_id,
-                    "fine_amount": response.transaction.fine_amount,
+                    "fine_amount": fine_amount,
                     "action": "book_return_success"
                 })
                 return {
                     "transaction_id": response.transaction.transaction_id,
-                    "fine_amount": response.transaction.fine_amount,
+                    "fine_amount": fine_amount,
                     "message": response.message
                 }
             else:
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+import library_service_pb2
+from core.metrics import registry
+from services.stream_watcher import StreamWatcher
+from services.websocket_hub import ClientConnection
+
+logger = logging.getLogger(__name__)
+
+ALL_BOOKS = "all"
+
+catalog_frames = registry.counter("gateway_catalog_frames_total", "Availability frames queued to WebSockets.")
+catalog_changes = registry.counter(
+    "gateway_catalog_changes_total", "Availability changes received from the grpc-server.", ("outcome",)
+)
+
+# book_id -> (available_copies, deleted)
+Change = Tuple[int, bool]
+
+class CatalogFeed:
+    """Per-connection book subscriptions with coalesced availability deltas
+
+    Changes are collected for coalesce_window seconds and flushed as one
+    AVAILABILITY frame per subscriber, so a burst of checkouts of the same
+    book (or of many books) costs each socket a single message carrying
+    only the latest value per book.
+    """
+
+    def __init__(self, coalesce_window: Optional[float] = None):
+        self.coalesce_window = coalesce_window if coalesce_window is not None else \
+            float(os.getenv('CATALOG_COALESCE_MS', '250')) / 1000
+        # connection -> subscribed book ids, or None for every book
+        self.subscribers: Dict[ClientConnection, Optional[Set[int]]] = {}
+        self.pending: Dict[int, Change] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def subscribe(self, connection: ClientConnection, books: Union[str, Iterable[int]]) -> None:
+        if books == ALL_BOOKS:
+            self.subscribers[connection] = None
+            return
+        current = self.subscribers.get(connection, set())
+        if current is None:
+            return
+        self.subscribers[connection] = current | {int(book_id) for book_id in books}
+
+    def unsubscribe(self, connection: ClientConnection, books: Union[str, Iterable[int], None] = None) -> None:
+        if books is None or books == ALL_BOOKS:
+            self.subscribers.pop(connection, None)
+            return
+        current = self.subscribers.get(connection)
+        if current:
+            current.difference_update(int(book_id) for book_id in books)
+
+    def publish(self, book_id: int, available_copies: int, deleted: bool = False) -> None:
+        """Record the latest availability of a book; flushed after the window"""
+        if book_id in self.pending:
+            catalog_changes.inc("coalesced")
+        else:
+            catalog_changes.inc("queued")
+        self.pending[book_id] = (available_copies, deleted)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.coalesce_window, self.flush)
+
+    def flush(self) -> None:
+        self._flush_handle = None
+        pending, self.pending = self.pending, {}
+        if not pending or not self.subscribers:
+            return
+        # Everyone subscribed to all books gets the same frame; serialize it once
+        everything = None
+        for connection, books in list(self.subscribers.items()):
+            if connection.closed or not connection.active:
+                del self.subscribers[connection]
+                continue
+            if books is None:
+                if everything is None:
+                    everything = self._frame(pending)
+                text = everything
+            else:
+                changes = {book_id: pending[book_id] for book_id in books if book_id in pending}
+                if not changes:
+                    continue
+                text = self._frame(changes)
+            if connection.offer(text):
+                catalog_frames.inc()
+
+    @staticmethod
+    def _frame(changes: Dict[int, Change]) -> str:
+        frame = {
+            "type": "AVAILABILITY",
+            "books": {str(book_id): copies for book_id, (copies, deleted) in changes.items() if not deleted}
+        }
+        deleted = [book_id for book_id, (_, is_deleted) in changes.items() if is_deleted]
+        if deleted:
+            frame["deleted"] = deleted
+        return json.dumps(frame, separators=(",", ":"))
+
+    def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.pending.clear()
+        self.subscribers.clear()
+
+class CatalogAvailabilityWatcher(StreamWatcher):
+    """Feeds WatchBookAvailability into the catalog feed"""
+
+    name = "book_availability"
+
+    def __init__(self, feed: CatalogFeed, max_backoff: float = 30.0):
+        super().__init__(max_backoff)
+        self.feed = feed
+
+    @property
+    def version(self) -> Optional[int]:
+        """Catalog version: the last availability event seen, None while disconnected
+
+        Every change to a book writes an availability event, so the cursor
+        moves whenever the catalog does. Disconnected, it may lag by any
+        amount and must not be used to answer a conditional request.
+        """
+        return self.cursor if self.connected else None
+
+    def open_stream(self, client, since_cursor: int):
+        return client.WatchBookAvailability(
+            library_service_pb2.WatchBookAvailabilityReq(since_cursor=since_cursor)
+        )
+
+    def handle_event(self, event) -> None:
+        if event.event_type == "AVAILABILITY_CHANGED":
+            self.feed.publish(event.book_id, event.available_copies, event.deleted)
+
+# Global feed and its upstream watcher
+catalog_feed = CatalogFeed()
+catalog_availability_watcher = CatalogAvailabilityWatcher(catalog_feed)
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Callable, List, Optional
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7999
+
+# Identifies this gateway process in published envelopes (useful in logs)
+INSTANCE_ID = uuid.uuid4().hex[:12]
+
+Handler = Callable[[dict], None]
+
+class NotificationBus:
+    """Pub/sub channel shared by every gateway process
+
+    Messages published by any process are delivered to the handler of every
+    started bus, including the publisher's own. A bus that is not connected
+    delivers locally so users on this process still get their notification.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    @property
+    def connected(self) -> bool:
+        return False
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def stop(self) -> None:
+        self._handler = None
+
+    async def publish(self, message: dict) -> None:
+        raise NotImplementedError
+
+    def _dispatch(self, message: dict) -> None:
+        if self._handler is None:
+            return
+        try:
+            self._handler(message)
+        except Exception as e:
+            logger.error("Notification handler failed", extra={
+                "error": str(e),
+                "action": "bus_dispatch_failed"
+            }, exc_info=True)
+
+class InMemoryBroker:
+    """Process-local stand-in for the shared channel"""
+
+    def __init__(self):
+        self.subscribers: List["InMemoryNotificationBus"] = []
+
+_default_broker = InMemoryBroker()
+
+class InMemoryNotificationBus(NotificationBus):
+    """Bus for tests and single-process runs; buses sharing a broker act as replicas"""
+
+    def __init__(self, broker: Optional[InMemoryBroker] = None):
+        super().__init__()
+        self.broker = broker or _default_broker
+
+    @property
+    def connected(self) -> bool:
+        return self in self.broker.subscribers
+
+    async def start(self, handler: Handler) -> None:
+        await super().start(handler)
+        self.broker.subscribers.append(self)
+
+    async def stop(self) -> None:
+        if self in self.broker.subscribers:
+            self.broker.subscribers.remove(self)
+        await super().stop()
+
+    async def publish(self, message: dict) -> None:
+        if not self.connected:
+            self._dispatch(message)
+            return
+        for subscriber in list(self.broker.subscribers):
+            subscriber._dispatch(message)
+
+class PostgresNotificationBus(NotificationBus):
+    """LISTEN/NOTIFY on a dedicated connection, NOTIFY through a small pool
+
+    The listener reconnects with backoff if the connection drops; while it
+    is down, publish() falls back to local delivery.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, channel: Optional[str] = None):
+        super().__init__()
+        self.dsn = dsn or os.getenv('NOTIFICATION_BUS_DSN') or self._dsn_from_env()
+        self.channel = channel or os.getenv('NOTIFICATION_CHANNEL', 'library_notifications')
+        self._listen_conn = None
+        self._pool = None
+        self._lost: Optional[asyncio.Event] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _dsn_from_env() -> str:
+        return "postgresql://{user}:{password}@{host}:{port}/{database}".format(
+            user=os.getenv('DB_USER', 'postgres'),
+            password=os.getenv('DB_PASSWORD', 'mypassword'),
+            host=os.getenv('DB_HOST', 'localhost'),
+            port=os.getenv('DB_PORT', '5432'),
+            database=os.getenv('DB_NAME', 'library_db')
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._listen_conn is not None and not self._listen_conn.is_closed()
+
+    async def start(self, handler: Handler) -> None:
+        await super().start(handler)
+        if asyncpg is None:
+            logger.error("asyncpg is not installed - notifications stay local to this process",
+                         extra={"action": "bus_unavailable"})
+            return
+        self._lost = asyncio.Event()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        await self._disconnect()
+        await super().stop()
+
+    async def _connect(self) -> None:
+        self._lost.clear()
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(lambda conn: self._lost.set())
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        logger.info("Notification bus listening", extra={
+            "channel": self.channel,
+            "instance_id": INSTANCE_ID,
+            "action": "bus_connected"
+        })
+
+    async def _disconnect(self) -> None:
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close()
+            except Exception:
+                pass
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+    async def _supervise(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                await self._connect()
+                backoff = 1.0
+                await self._lost.wait()
+                logger.warning("Notification bus connection lost", extra={"action": "bus_disconnected"})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Notification bus connect failed", extra={
+                    "error": str(e),
+                    "retry_in": backoff,
+                    "action": "bus_connect_failed"
+                })
+            await self._disconnect()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed bus payload", extra={"action": "bus_bad_payload"})
+            return
+        self._dispatch(message)
+
+    async def publish(self, message: dict) -> None:
+        payload = json.dumps(message)
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            logger.error("Notification too large for NOTIFY - delivering locally only", extra={
+                "size": len(payload),
+                "action": "bus_payload_too_large"
+            })
+            self._dispatch(message)
+            return
+        if not self.connected or self._pool is None:
+            self._dispatch(message)
+            return
+        try:
+            await self._pool.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception as e:
+            logger.warning("Notification publish failed - delivering locally", extra={
+                "error": str(e),
+                "action": "bus_publish_failed"
+            })
+            self._dispatch(message)
+
+_BUSES = {
+    "memory": InMemoryNotificationBus,
+    "postgres": PostgresNotificationBus
+}
+
+def create_bus(name: Optional[str] = None) -> NotificationBus:
+    """Build the bus named by $NOTIFICATION_BUS (postgres by default)"""
+    name = (name or os.getenv('NOTIFICATION_BUS', 'postgres')).lower()
+    if name not in _BUSES:
+        raise ValueError(f"Unknown notification bus: {name}")
+    return _BUSES[name]()
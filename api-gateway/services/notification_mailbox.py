@@ -0,0 +1,85 @@
+import bisect
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_mailboxes: "weakref.WeakSet[NotificationMailbox]" = weakref.WeakSet()
+
+def _entry_count() -> int:
+    return sum(mailbox.entry_count() for mailbox in list(_mailboxes))
+
+registry.gauge("gateway_notification_mailbox_entries", "Notifications retained for replay.", callback=_entry_count)
+mailbox_replayed = registry.counter(
+    "gateway_notification_mailbox_replayed_total", "Notifications replayed to reconnecting WebSockets."
+)
+
+# (cursor, stored_at, notification)
+Entry = Tuple[int, float, dict]
+
+class NotificationMailbox:
+    """Per-user ring buffer of recent notifications, expired after a TTL
+
+    Every gateway process receives every notification, so each keeps the
+    full mailbox and a user can resume on whichever process they reconnect
+    to. Cursors are outbox event IDs, which every process sees alike;
+    entries are kept in cursor order.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, max_per_user: Optional[int] = None, ttl: Optional[float] = None, clock=time.monotonic):
+        self.max_per_user = max_per_user or int(os.getenv('NOTIFICATION_MAILBOX_SIZE', '50'))
+        self.ttl = ttl or float(os.getenv('NOTIFICATION_MAILBOX_TTL', '86400'))
+        self.clock = clock
+        self.boxes: Dict[str, Deque[Entry]] = {}
+        self._appends = 0
+        _mailboxes.add(self)
+
+    def entry_count(self) -> int:
+        return sum(len(box) for box in self.boxes.values())
+
+    def append(self, user_id: Union[int, str], cursor: int, notification: dict) -> None:
+        user_id = str(user_id)
+        box = self.boxes.get(user_id)
+        if box is None:
+            box = self.boxes[user_id] = deque(maxlen=self.max_per_user)
+        entry = (cursor, self.clock(), notification)
+        if not box or cursor > box[-1][0]:
+            box.append(entry)
+        else:
+            # Notifications from different processes can arrive slightly out of order
+            entries = list(box)
+            index = bisect.bisect_left([e[0] for e in entries], cursor)
+            if index < len(entries) and entries[index][0] == cursor:
+                return
+            entries.insert(index, entry)
+            box.clear()
+            box.extend(entries[-self.max_per_user:])
+        self._appends += 1
+        if self._appends % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def since(self, user_id: Union[int, str], cursor: int) -> List[dict]:
+        """Live notifications newer than cursor, oldest first, each tagged with its cursor"""
+        box = self.boxes.get(str(user_id))
+        if not box:
+            return []
+        self._expire(box)
+        return [dict(notification, cursor=c) for c, _, notification in box if c > cursor]
+
+    def prune(self) -> None:
+        for user_id, box in list(self.boxes.items()):
+            self._expire(box)
+            if not box:
+                del self.boxes[user_id]
+
+    def _expire(self, box: Deque[Entry]) -> None:
+        deadline = self.clock() - self.ttl
+        while box and box[0][1] < deadline:
+            box.popleft()
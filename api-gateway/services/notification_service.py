@@ -1,64 +1,117 @@
 import json
 import logging
-from typing import Dict
+from typing import Optional
 from fastapi import WebSocket
+from services.websocket_hub import WebSocketHub, ClientConnection
+from services.notification_bus import NotificationBus, create_bus, INSTANCE_ID
+from services.notification_mailbox import NotificationMailbox, mailbox_replayed
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
-    def __init__(self):
-        self.user_connections: Dict[str, WebSocket] = {}
+    def __init__(self, hub: Optional[WebSocketHub] = None, bus: Optional[NotificationBus] = None,
+                 mailbox: Optional[NotificationMailbox] = None):
+        self.hub = hub or WebSocketHub()
+        self.bus = bus
+        # With a mailbox, notifications with a cursor (an outbox event ID)
+        # carry it and are kept for replay
+        self.mailbox = mailbox
     
-    def add_connection(self, user_id: str, websocket: WebSocket):
-        """Add WebSocket connection for user"""
-        self.user_connections[user_id] = websocket
-        logger.info("WebSocket connection established", extra={
-            "user_id": user_id,
-            "action": "ws_connected",
-            "total_connections": len(self.user_connections)
-        })
+    @property
+    def user_connections(self):
+        return self.hub.connections
+    
+    async def start(self, bus: Optional[NotificationBus] = None):
+        """Subscribe to the cross-replica bus so notifications reach every process"""
+        self.bus = bus or self.bus or create_bus()
+        await self.bus.start(self._deliver)
+    
+    async def stop(self):
+        if self.bus is not None:
+            await self.bus.stop()
+        await self.hub.close_all()
+    
+    def add_connection(self, user_id: str, websocket: WebSocket, cursor: Optional[int] = None) -> ClientConnection:
+        """Add WebSocket connection for user (a user may have several)
+
+        A cursor (the last one the client saw, 0 for none) replays the
+        retained notifications after it as a single NOTIFICATION_BATCH
+        frame, queued ahead of any live notification.
+        """
+        connection = self.hub.register(user_id, websocket)
+        if cursor is not None and self.mailbox is not None:
+            missed = self.mailbox.since(user_id, cursor)
+            if missed:
+                connection.offer(json.dumps({
+                    "type": "NOTIFICATION_BATCH",
+                    "notifications": missed,
+                    "cursor": missed[-1]["cursor"]
+                }))
+                mailbox_replayed.inc(amount=len(missed))
+                logger.info("Replayed missed notifications", extra={
+                    "user_id": user_id,
+                    "since_cursor": cursor,
+                    "count": len(missed),
+                    "action": "notification_replay"
+                })
+        return connection
+    
+    def remove_connection(self, connection: ClientConnection):
+        """Remove a WebSocket connection"""
+        self.hub.unregister(connection)
     
-    def remove_connection(self, user_id: str):
-        """Remove WebSocket connection for user"""
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
-            logger.info("WebSocket connection closed", extra={
-                "user_id": user_id,
-                "action": "ws_disconnected",
-                "total_connections": len(self.user_connections)
+    def _deliver(self, message: dict):
+        """Bus handler: hand the notification to this process's sockets"""
+        notification = message["notification"]
+        cursor = message.get("cursor")
+        if self.mailbox is not None and cursor is not None:
+            self.mailbox.append(message["user_id"], cursor, notification)
+            notification = dict(notification, cursor=cursor)
+        delivered = self.hub.publish(message["user_id"], notification)
+        if delivered:
+            logger.info("Notification queued", extra={
+                "user_id": message["user_id"],
+                "notification_type": message["notification"].get('type'),
+                "connections": delivered,
+                "origin": message.get("origin"),
+                "action": "notification_sent"
             })
     
+    def deliver_local(self, user_id: int, notification: dict, cursor: Optional[int] = None):
+        """Deliver to this process's sockets only
+
+        For sources every gateway process already receives on its own (the
+        request event stream), where publishing to the bus would duplicate.
+        Such sources pass the event's outbox ID as the cursor, so that all
+        processes agree on it.
+        """
+        self._deliver({
+            "user_id": str(user_id),
+            "notification": notification,
+            "origin": INSTANCE_ID,
+            "cursor": cursor
+        })
+    
     async def send_notification(self, user_id: int, notification: dict):
-        """Send notification to user via WebSocket"""
-        user_id_str = str(user_id)
+        """Publish notification to every gateway process
+
+        Never waits on the sockets themselves; each process queues it for
+        its own connections of the user. Without a started bus (e.g. a
+        single process in tests) it is delivered locally. These have no
+        outbox event, hence no cursor: they are delivered live only and not
+        kept in the mailbox.
+        """
         logger.debug("Attempting to send notification", extra={
             "user_id": user_id,
             "notification_type": notification.get('type'),
             "action": "notification_send_start"
         })
         
-        if user_id_str in self.user_connections:
-            try:
-                await self.user_connections[user_id_str].send_text(json.dumps(notification))
-                logger.info("Notification sent successfully", extra={
-                    "user_id": user_id,
-                    "notification_type": notification.get('type'),
-                    "action": "notification_sent"
-                })
-            except Exception as e:
-                logger.warning("Failed to send notification - removing dead connection", extra={
-                    "user_id": user_id,
-                    "error": str(e),
-                    "action": "notification_failed"
-                })
-                if user_id_str in self.user_connections:
-                    del self.user_connections[user_id_str]
+        message = {"user_id": str(user_id), "notification": notification, "origin": INSTANCE_ID}
+        if self.bus is None:
+            self._deliver(message)
         else:
-            logger.debug("User not connected - notification not sent", extra={
-                "user_id": user_id,
-                "notification_type": notification.get('type'),
-                "action": "notification_no_connection"
-            })
+            await self.bus.publish(message)
 
 # Global notification service instance
-notification_service = NotificationService()
\ No newline at end of file
+notification_service = NotificationService(mailbox=NotificationMailbox())
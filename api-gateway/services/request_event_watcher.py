@@ -0,0 +1,49 @@
+import logging
+from typing import Optional
+import library_service_pb2
+from services.notification_service import NotificationService, notification_service
+from services.stream_watcher import StreamWatcher
+
+logger = logging.getLogger(__name__)
+
+# Event types that produce a user notification, and the verb used in its message
+NOTIFIED_EVENTS = {
+    "REQUEST_APPROVED": "approved",
+    "REQUEST_REJECTED": "rejected"
+}
+
+class RequestEventWatcher(StreamWatcher):
+    """Follows WatchBookRequestEvents and turns request decisions into notifications
+
+    Every gateway process runs one watcher and delivers to the sockets it
+    holds, so a decision made through any replica (or any admin) reaches the
+    user. After a dropped stream it resumes from the last cursor it saw.
+    The event's cursor (its outbox position, the same on every process)
+    is also the notification's mailbox cursor.
+    """
+
+    name = "book_requests"
+
+    def __init__(self, service: Optional[NotificationService] = None, max_backoff: float = 30.0):
+        super().__init__(max_backoff)
+        self.notification_service = service or notification_service
+
+    def open_stream(self, client, since_cursor: int):
+        return client.WatchBookRequestEvents(
+            library_service_pb2.WatchBookRequestEventsReq(since_cursor=since_cursor)
+        )
+
+    def handle_event(self, event) -> None:
+        self.cursor = max(self.cursor, event.cursor)
+        verb = NOTIFIED_EVENTS.get(event.event_type)
+        if verb is None:
+            return
+        request = event.request
+        self.notification_service.deliver_local(request.user_id, {
+            "type": event.event_type,
+            "message": f"Your {request.request_type.lower()} request has been {verb}",
+            "requestId": request.request_id
+        }, cursor=event.cursor)
+
+# Global watcher instance
+request_event_watcher = RequestEventWatcher()
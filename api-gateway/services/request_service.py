@@ -2,18 +2,32 @@ import grpc
 import library_service_pb2
 import library_service_pb2_grpc
 from fastapi import HTTPException
+from core.timing import timed
+from core.wire_format import iso_time
 import logging
 import asyncio
 from core.enums import RequestType, RequestStatus, UserRole
+from google.protobuf.field_mask_pb2 import FieldMask
 
 logger = logging.getLogger(__name__)
 
+# Lookups joined onto the requests ask only for what they use
+USER_ROLES = FieldMask(paths=["user_id", "role"])
+USERNAMES = FieldMask(paths=["user_id", "username"])
+BOOK_DETAILS = FieldMask(paths=["book_id", "title", "author", "available_copies"])
+TRANSACTION_BOOKS = FieldMask(paths=["transaction_id", "book_id"])
+
 class RequestService:
     def __init__(self, grpc_client):
         self.client = grpc_client
     
-    async def create_book_request(self, user_id: int, book_id: int, request_type: str, transaction_id: int = None, notes: str = ""):
-        """Create user book request"""
+    async def create_book_request(self, user_id: int, book_id: int, request_type: str, transaction_id: int = None, notes: str = "",
+                                  user_role: str = None):
+        """Create user book request
+
+        user_role comes from a verified session; without it the role is
+        looked up with GetUsers.
+        """
         logger.info("User book request initiated", extra={
             "user_id": user_id,
             "book_id": book_id,
@@ -25,10 +39,11 @@ class RequestService:
         try:
             # Check if user is admin and trying to create ISSUE request
             if request_type == RequestType.ISSUE.value:
-                user_response = await self.client.GetUsers(library_service_pb2.GetUsersRequest())
-                for user in user_response.users:
-                    if user.user_id == user_id and user.role == UserRole.ADMIN.value:
-                        raise HTTPException(status_code=403, detail="Admin users cannot request book issues")
+                if user_role is None:
+                    user_response = await self.client.GetUsers(library_service_pb2.GetUsersRequest(fields=USER_ROLES))
+                    user_role = next((user.role for user in user_response.users if user.user_id == user_id), None)
+                if user_role == UserRole.ADMIN.value:
+                    raise HTTPException(status_code=403, detail="Admin users cannot request book issues")
             
             logger.debug("Sending book request to gRPC server", extra={
                 "user_id": user_id,
@@ -101,8 +116,8 @@ class RequestService:
             logger.debug("Fetching concurrent data: requests, books, users")
             # Get all data concurrently
             requests_task = self.client.GetBookRequests(library_service_pb2.GetBookRequestsReq(status=RequestStatus.PENDING.value))
-            books_task = self.client.GetBooks(library_service_pb2.GetBooksRequest(search_query=""))
-            users_task = self.client.GetUsers(library_service_pb2.GetUsersRequest())
+            books_task = self.client.GetBooks(library_service_pb2.GetBooksRequest(search_query="", fields=BOOK_DETAILS))
+            users_task = self.client.GetUsers(library_service_pb2.GetUsersRequest(fields=USERNAMES))
             
             requests_response, books_response, users_response = await asyncio.gather(
                 requests_task, books_task, users_task
@@ -114,32 +129,33 @@ class RequestService:
                 "users_count": len(users_response.users)
             })
             
-            # Create lookups
-            books_dict = {book.book_id: book for book in books_response.books}
-            users_dict = {user.user_id: user.username for user in users_response.users}
+            with timed("convert"):
+                # Create lookups
+                books_dict = {book.book_id: book for book in books_response.books}
+                users_dict = {user.user_id: user.username for user in users_response.users}
             
-            requests = []
-            for req in requests_response.requests:
-                book = books_dict.get(req.book_id)
-                if not book and req.book_id > 0:
-                    logger.warning("Book not found for request", extra={
+                requests = []
+                for req in requests_response.requests:
+                    book = books_dict.get(req.book_id)
+                    if not book and req.book_id > 0:
+                        logger.warning("Book not found for request", extra={
+                            "request_id": req.request_id,
+                            "book_id": req.book_id
+                        })
+                
+                    requests.append({
                         "request_id": req.request_id,
-                        "book_id": req.book_id
+                        "user_id": req.user_id,
+                        "user_name": users_dict.get(req.user_id, f"User {req.user_id}"),
+                        "book_id": req.book_id,
+                        "book_title": book.title if book else "Unknown",
+                        "book_author": book.author if book else "Unknown",
+                        "available_copies": book.available_copies if book else 0,
+                        "request_type": req.request_type,
+                        "status": req.status,
+                        "request_date": iso_time(req, "request_time", "request_date"),
+                        "notes": req.notes
                     })
-                
-                requests.append({
-                    "request_id": req.request_id,
-                    "user_id": req.user_id,
-                    "user_name": users_dict.get(req.user_id, f"User {req.user_id}"),
-                    "book_id": req.book_id,
-                    "book_title": book.title if book else "Unknown",
-                    "book_author": book.author if book else "Unknown",
-                    "available_copies": book.available_copies if book else 0,
-                    "request_type": req.request_type,
-                    "status": req.status,
-                    "request_date": req.request_date,
-                    "notes": req.notes
-                })
             
             logger.info("Admin book requests retrieved successfully", extra={
                 "total_requests": len(requests),
@@ -177,48 +193,49 @@ class RequestService:
             
             # Get books and transactions for additional info
             books_response = await self.client.GetBooks(
-                library_service_pb2.GetBooksRequest(search_query="")
+                library_service_pb2.GetBooksRequest(search_query="", fields=BOOK_DETAILS)
             )
             transactions_response = await self.client.GetTransactions(
-                library_service_pb2.GetTransactionsRequest(user_id=user_id, status="")
+                library_service_pb2.GetTransactionsRequest(user_id=user_id, status="", fields=TRANSACTION_BOOKS)
             )
             
-            books_dict = {book.book_id: book for book in books_response.books}
-            transactions_dict = {txn.transaction_id: txn for txn in transactions_response.transactions}
+            with timed("convert"):
+                books_dict = {book.book_id: book for book in books_response.books}
+                transactions_dict = {txn.transaction_id: txn for txn in transactions_response.transactions}
             
-            # Filter requests for specific user
-            user_requests = []
-            for req in response.requests:
-                if req.user_id == user_id:
-                    book_title = "Unknown"
-                    book_author = "Unknown"
+                # Filter requests for specific user
+                user_requests = []
+                for req in response.requests:
+                    if req.user_id == user_id:
+                        book_title = "Unknown"
+                        book_author = "Unknown"
                     
-                    if req.request_type == RequestType.RETURN.value and req.transaction_id and req.transaction_id > 0:
-                        # Use transaction_id to get book details for return requests
-                        transaction = transactions_dict.get(req.transaction_id)
-                        if transaction:
-                            book = books_dict.get(transaction.book_id)
+                        if req.request_type == RequestType.RETURN.value and req.transaction_id and req.transaction_id > 0:
+                            # Use transaction_id to get book details for return requests
+                            transaction = transactions_dict.get(req.transaction_id)
+                            if transaction:
+                                book = books_dict.get(transaction.book_id)
+                                if book:
+                                    book_title = book.title
+                                    book_author = book.author
+                        elif req.book_id > 0:
+                            # Use book_id for issue requests
+                            book = books_dict.get(req.book_id)
                             if book:
                                 book_title = book.title
                                 book_author = book.author
-                    elif req.book_id > 0:
-                        # Use book_id for issue requests
-                        book = books_dict.get(req.book_id)
-                        if book:
-                            book_title = book.title
-                            book_author = book.author
                     
-                    user_requests.append({
-                        "request_id": req.request_id,
-                        "user_id": req.user_id,
-                        "book_id": req.book_id,
-                        "book_title": book_title,
-                        "book_author": book_author,
-                        "request_type": req.request_type,
-                        "status": req.status,
-                        "request_date": req.request_date,
-                        "notes": req.notes
-                    })
+                        user_requests.append({
+                            "request_id": req.request_id,
+                            "user_id": req.user_id,
+                            "book_id": req.book_id,
+                            "book_title": book_title,
+                            "book_author": book_author,
+                            "request_type": req.request_type,
+                            "status": req.status,
+                            "request_date": iso_time(req, "request_time", "request_date"),
+                            "notes": req.notes
+                        })
             
             logger.info("User book requests retrieved successfully", extra={
                 "user_id": user_id,
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Optional
+import grpc
+from core.grpc_client import get_grpc_client
+
+logger = logging.getLogger(__name__)
+
+class StreamWatcher:
+    """Keeps one server-streaming Watch* RPC open and resumes it by cursor
+
+    Subclasses open the stream and handle events; every event carries a
+    cursor, and after a dropped stream the watcher reconnects with backoff
+    asking for everything after the last cursor it saw. The server sends
+    a SUBSCRIBED event once it has replayed what was missed.
+    """
+
+    name = "stream"
+
+    def __init__(self, max_backoff: float = 30.0):
+        self.max_backoff = max_backoff
+        self.cursor = 0
+        # True from SUBSCRIBED until the stream drops, i.e. while the cursor
+        # is caught up with the server
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def open_stream(self, client, since_cursor: int):
+        raise NotImplementedError
+
+    def handle_event(self, event) -> None:
+        raise NotImplementedError
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                client = await get_grpc_client()
+                stream = self.open_stream(client, self.cursor)
+                logger.info("Watching event stream", extra={
+                    "stream": self.name,
+                    "since_cursor": self.cursor,
+                    "action": "stream_watch_started"
+                })
+                async for event in stream:
+                    backoff = 1.0
+                    self.cursor = max(self.cursor, event.cursor)
+                    if event.event_type == "SUBSCRIBED":
+                        self.connected = True
+                    self.handle_event(event)
+                logger.info("Event stream ended", extra={"stream": self.name, "action": "stream_watch_ended"})
+            except asyncio.CancelledError:
+                raise
+            except grpc.RpcError as e:
+                logger.warning("Event stream failed", extra={
+                    "stream": self.name,
+                    "code": str(e.code()) if hasattr(e, "code") else None,
+                    "cursor": self.cursor,
+                    "retry_in": backoff,
+                    "action": "stream_watch_failed"
+                })
+            except Exception as e:
+                logger.error("Event stream watcher error", extra={
+                    "stream": self.name,
+                    "error": str(e),
+                    "retry_in": backoff,
+                    "action": "stream_watch_error"
+                }, exc_info=True)
+            finally:
+                self.connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from typing import Dict, Optional, Set, Union
+from fastapi import WebSocket
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "close")
+
+# Close code sent to clients evicted by the hub (application range 4000-4999)
+SLOW_CONSUMER_CLOSE_CODE = 4008
+IDLE_CLOSE_CODE = 4009
+
+PING_FRAME = json.dumps({"type": "PING"})
+
+_hubs: "weakref.WeakSet[WebSocketHub]" = weakref.WeakSet()
+
+def _connection_count() -> int:
+    return sum(hub.connection_count() for hub in list(_hubs))
+
+def _queued_messages() -> int:
+    return sum(hub.queued_messages() for hub in list(_hubs))
+
+def _max_queue_depth() -> int:
+    return max((hub.max_queue_depth() for hub in list(_hubs)), default=0)
+
+registry.gauge("gateway_ws_connections", "Open WebSocket connections.", callback=_connection_count)
+registry.gauge("gateway_ws_send_queue_messages", "Messages waiting in WebSocket send queues.", callback=_queued_messages)
+registry.gauge("gateway_ws_send_queue_max_depth", "Deepest WebSocket send queue.", callback=_max_queue_depth)
+messages_sent = registry.counter("gateway_ws_messages_sent_total", "Messages written to WebSockets.")
+messages_dropped = registry.counter(
+    "gateway_ws_messages_dropped_total", "Messages dropped before reaching a WebSocket.", ("reason",)
+)
+evictions = registry.counter("gateway_ws_evictions_total", "WebSocket connections closed by the hub.", ("reason",))
+
+class ClientConnection:
+    """One WebSocket with a bounded send queue drained by its own task
+
+    Producers never await the socket: offer() enqueues or applies the
+    overflow policy, and the sender task does the actual writes.
+    """
+
+    def __init__(self, hub: "WebSocketHub", user_id: str, websocket: WebSocket):
+        self.hub = hub
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=hub.max_queue)
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at
+        self.closed = False
+        self.active = True
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._sender = asyncio.create_task(self._drain())
+
+    def touch(self) -> None:
+        """Record client activity (any received frame)"""
+        self.last_seen = time.monotonic()
+
+    def offer(self, text: str) -> bool:
+        """Queue a frame without blocking; returns False if it was not queued"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        policy = self.hub.overflow_policy
+        if policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(text)
+            messages_dropped.inc("queue_full")
+            return True
+        messages_dropped.inc("queue_full")
+        if policy == "close":
+            self.hub.evict(self, "slow_consumer", SLOW_CONSUMER_CLOSE_CODE)
+        return False
+
+    async def _drain(self) -> None:
+        try:
+            # wait_for() can swallow a cancel that races with a completed
+            # write, so the loop also stops once the hub has let go of us
+            while self.active:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), self.hub.send_timeout)
+                messages_sent.inc()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.hub.evict(self, "send_timeout", SLOW_CONSUMER_CLOSE_CODE)
+        except Exception as e:
+            logger.warning("WebSocket send failed - removing connection", extra={
+                "user_id": self.user_id,
+                "error": str(e),
+                "action": "ws_send_failed"
+            })
+            self.hub.evict(self, "send_failed")
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        if self.queue.qsize():
+            messages_dropped.inc("connection_closed", amount=self.queue.qsize())
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            # Already closed by the peer
+            pass
+
+class WebSocketHub:
+    """Fan-out of notifications to any number of WebSockets per user
+
+    Environment:
+      WS_SEND_QUEUE_SIZE     per-connection queue bound (default 100)
+      WS_OVERFLOW_POLICY     drop_oldest (default), drop_newest or close
+      WS_SEND_TIMEOUT        seconds a single write may take (default 5)
+      WS_HEARTBEAT_INTERVAL  seconds between PING frames (default 30)
+      WS_IDLE_TIMEOUT        seconds without client frames before eviction (default 90)
+    """
+
+    def __init__(self, max_queue: Optional[int] = None, overflow_policy: Optional[str] = None,
+                 send_timeout: Optional[float] = None, heartbeat_interval: Optional[float] = None,
+                 idle_timeout: Optional[float] = None):
+        self.max_queue = max_queue or int(os.getenv('WS_SEND_QUEUE_SIZE', '100'))
+        self.overflow_policy = overflow_policy or os.getenv('WS_OVERFLOW_POLICY', 'drop_oldest')
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown WebSocket overflow policy: {self.overflow_policy}")
+        self.send_timeout = send_timeout or float(os.getenv('WS_SEND_TIMEOUT', '5'))
+        self.heartbeat_interval = heartbeat_interval or float(os.getenv('WS_HEARTBEAT_INTERVAL', '30'))
+        self.idle_timeout = idle_timeout or float(os.getenv('WS_IDLE_TIMEOUT', '90'))
+        self.connections: Dict[str, Set[ClientConnection]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        _hubs.add(self)
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.connections.values())
+
+    def queued_messages(self) -> int:
+        return sum(c.queue.qsize() for connections in self.connections.values() for c in connections)
+
+    def max_queue_depth(self) -> int:
+        return max((c.queue.qsize() for connections in self.connections.values() for c in connections), default=0)
+
+    def register(self, user_id: str, websocket: WebSocket) -> ClientConnection:
+        """Track an accepted WebSocket; must be called from the event loop"""
+        connection = ClientConnection(self, user_id, websocket)
+        self.connections.setdefault(user_id, set()).add(connection)
+        connection.start()
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info("WebSocket connection established", extra={
+            "user_id": user_id,
+            "action": "ws_connected",
+            "user_connections": len(self.connections[user_id]),
+            "total_connections": self.connection_count()
+        })
+        return connection
+
+    def unregister(self, connection: ClientConnection) -> None:
+        user_connections = self.connections.get(connection.user_id)
+        if not user_connections or connection not in user_connections:
+            return
+        user_connections.discard(connection)
+        connection.active = False
+        if not user_connections:
+            del self.connections[connection.user_id]
+        if connection._sender is not None and connection._sender is not asyncio.current_task():
+            connection._sender.cancel()
+        if not self.connections and self._heartbeat is not None and self._heartbeat is not asyncio.current_task():
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        logger.info("WebSocket connection closed", extra={
+            "user_id": connection.user_id,
+            "action": "ws_disconnected",
+            "total_connections": self.connection_count()
+        })
+
+    def evict(self, connection: ClientConnection, reason: str, code: int = 1011) -> None:
+        """Drop a connection from the hub and close its socket in the background"""
+        if connection.closed:
+            return
+        evictions.inc(reason)
+        logger.warning("Evicting WebSocket connection", extra={
+            "user_id": connection.user_id,
+            "reason": reason,
+            "action": "ws_evicted"
+        })
+        self.unregister(connection)
+        asyncio.get_running_loop().create_task(connection.close(code, reason))
+
+    def publish(self, user_id: Union[int, str], message: Union[dict, str]) -> int:
+        """Queue a message for every connection of a user; returns how many accepted it"""
+        user_connections = self.connections.get(str(user_id))
+        if not user_connections:
+            messages_dropped.inc("not_connected")
+            return 0
+        text = message if isinstance(message, str) else json.dumps(message)
+        return sum(1 for connection in list(user_connections) if connection.offer(text))
+
+    def broadcast(self, message: Union[dict, str]) -> int:
+        text = message if isinstance(message, str) else json.dumps(message)
+        return sum(
+            1 for connections in list(self.connections.values())
+            for connection in list(connections) if connection.offer(text)
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        while self.connections:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for connections in list(self.connections.values()):
+                for connection in list(connections):
+                    if now - connection.last_seen > self.idle_timeout:
+                        self.evict(connection, "idle", IDLE_CLOSE_CODE)
+                    else:
+                        connection.offer(PING_FRAME)
+
+    async def close_all(self) -> None:
+        senders = []
+        for connections in list(self.connections.values()):
+            for connection in list(connections):
+                if connection._sender is not None:
+                    senders.append(connection._sender)
+                self.unregister(connection)
+                await connection.close(1001, "server shutdown")
+        await asyncio.gather(*senders, return_exceptions=True)
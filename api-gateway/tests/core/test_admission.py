@@ -0,0 +1,213 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.admission import (
+    AdmissionMiddleware, AdmittedRoute, ConcurrencyLimiter, Priority, TokenBuckets, UpstreamOverloaded,
+    classify, upstream_admission
+)
+from core.session import SessionTokens
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+async def upstream(rpc):
+    """An upstream unary call going through the admission interceptor"""
+    async def continuation(details, request):
+        return asyncio.sleep(0)
+    details = SimpleNamespace(method=f"/library.LibraryService/{rpc}")
+    return await upstream_admission.intercept_unary_unary(continuation, details, None)
+
+def create_app(users, ips):
+    app = FastAPI()
+    router = APIRouter(route_class=AdmittedRoute)
+
+    @router.get('/user/books/search')
+    async def search():
+        try:
+            await upstream("GetBooks")
+        except Exception:
+            # Like the real routes, which turn upstream errors into 500s
+            raise HTTPException(status_code=500, detail="Service unavailable")
+        return []
+
+    @router.get('/admin/transactions')
+    async def transactions():
+        await upstream("GetUsers")
+        await upstream("GetBooks")
+        await upstream("GetTransactions")
+        return []
+
+    @router.post('/admin/issue-book')
+    async def issue():
+        await upstream("IssueBook")
+        return {"issued": True}
+
+    app.include_router(router)
+    app.add_middleware(AdmissionMiddleware, users=users, ips=ips)
+    return app
+
+class TestTokenBuckets:
+    """Test the one-float-per-key token buckets"""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        buckets = TokenBuckets(rate=2, burst=3, clock=clock)
+
+        assert [buckets.take("a") for _ in range(3)] == [0, 0, 0]
+        assert buckets.take("a") == pytest.approx(0.5)
+        assert buckets.take("b") == 0
+
+        clock.now += 0.5
+        assert buckets.take("a") == 0
+        assert buckets.take("a") > 0
+
+    def test_sweep_drops_full_buckets_only(self):
+        clock = FakeClock()
+        buckets = TokenBuckets(rate=1, burst=10, clock=clock)
+        buckets.take("idle")
+        clock.now += 5
+        for _ in range(5):
+            buckets.take("busy")
+        clock.now += 1
+
+        assert buckets.sweep() == 1
+        assert len(buckets) == 1
+        # A swept key starts again with a full bucket
+        assert all(buckets.take("idle") == 0 for _ in range(10))
+
+class TestConcurrencyLimiter:
+    """Test per-priority shares of the upstream slots"""
+
+    def test_lower_classes_leave_room_for_writes(self):
+        limiter = ConcurrencyLimiter(4)
+
+        assert limiter.try_acquire("GetBooks", Priority.READ)
+        assert limiter.try_acquire("GetBooks", Priority.READ)
+        assert not limiter.try_acquire("GetBooks", Priority.READ)
+        assert limiter.try_acquire("GetBooks", Priority.USER_WRITE)
+        assert not limiter.try_acquire("GetBooks", Priority.USER_WRITE)
+        assert limiter.try_acquire("GetBooks", Priority.ADMIN_WRITE)
+        assert not limiter.try_acquire("GetBooks", Priority.ADMIN_WRITE)
+        # Other upstream calls have their own slots
+        assert limiter.try_acquire("IssueBook", Priority.READ)
+
+        for _ in range(4):
+            limiter.release("GetBooks")
+        assert "GetBooks" not in limiter.in_flight
+        assert limiter.total == 1
+
+    def test_total_cap_across_rpcs(self):
+        limiter = ConcurrencyLimiter(4, total=4)
+
+        assert limiter.try_acquire("GetBooks", Priority.READ)
+        assert limiter.try_acquire("GetUsers", Priority.READ)
+        assert not limiter.try_acquire("GetTransactions", Priority.READ)
+        assert limiter.try_acquire("IssueBook", Priority.ADMIN_WRITE)
+
+    def test_classify(self):
+        assert classify("GET", "/api/v1/user/books/search", False) == Priority.READ
+        assert classify("POST", "/api/v1/user/request-book", False) == Priority.USER_WRITE
+        assert classify("POST", "/api/v1/user/request-book", True) == Priority.ADMIN_WRITE
+        # Only the verified role counts, not the path
+        assert classify("POST", "/api/v1/admin/issue-book", False) == Priority.USER_WRITE
+
+class TestAdmissionMiddleware:
+    """Test 429/503 responses with Retry-After"""
+
+    def test_ip_rate_limit_returns_429_with_retry_after(self):
+        clock = FakeClock()
+        client = TestClient(create_app(TokenBuckets(1, 100, clock=clock), TokenBuckets(1, 2, clock=clock)))
+
+        assert client.get('/user/books/search').status_code == 200
+        assert client.get('/user/books/search').status_code == 200
+        response = client.get('/user/books/search')
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"detail": "Too many requests"}
+
+    def test_users_have_their_own_bucket_and_admins_are_not_limited(self):
+        clock = FakeClock()
+        tokens = SessionTokens(secret="s3cret", ttl=60)
+        user_token, _ = tokens.issue(7, "reader", "USER")
+        admin_token, _ = tokens.issue(1, "admin", "ADMIN")
+        client = TestClient(create_app(TokenBuckets(1, 1, clock=clock), TokenBuckets(1, 100, clock=clock)))
+
+        with patch('core.admission.session_tokens', tokens):
+            assert client.get('/user/books/search', headers={"Authorization": f"Bearer {user_token}"}).status_code == 200
+            assert client.get('/user/books/search', headers={"Authorization": f"Bearer {user_token}"}).status_code == 429
+            for _ in range(5):
+                assert client.get('/user/books/search', headers={"Authorization": f"Bearer {admin_token}"}).status_code == 200
+
+    def test_no_upstream_slot_returns_503(self):
+        clock = FakeClock()
+        tokens = SessionTokens(secret="s3cret", ttl=60)
+        admin_token, _ = tokens.issue(1, "admin", "ADMIN")
+        client = TestClient(create_app(TokenBuckets(1, 100, clock=clock), TokenBuckets(1, 100, clock=clock)))
+        limiter = ConcurrencyLimiter(2)
+        limiter.in_flight['GetBooks'] = 1
+        limiter.in_flight['IssueBook'] = 1
+
+        with patch('core.admission.upstream_limiter', limiter), patch('core.admission.session_tokens', tokens):
+            response = client.get('/user/books/search')
+            # A non-admin write may not use the slot only admin writes can
+            refused = client.post('/admin/issue-book')
+            admitted = client.post('/admin/issue-book', headers={"Authorization": f"Bearer {admin_token}"})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert refused.status_code == 503
+        assert admitted.status_code == 200
+        assert limiter.in_flight == {'GetBooks': 1, 'IssueBook': 1}
+
+    def test_slots_are_per_rpc_across_routes(self):
+        clock = FakeClock()
+        client = TestClient(create_app(TokenBuckets(1, 100, clock=clock), TokenBuckets(1, 100, clock=clock)))
+        limiter = ConcurrencyLimiter(2)
+        limiter.in_flight['GetBooks'] = 1
+
+        with patch('core.admission.upstream_limiter', limiter):
+            # The third RPC of the route finds GetBooks full (another route holds it)
+            response = client.get('/admin/transactions')
+
+        assert response.status_code == 503
+        assert limiter.in_flight == {'GetBooks': 1}
+
+@pytest.mark.asyncio
+class TestAdmissionClientInterceptor:
+    """Test slots held for the duration of an upstream call"""
+
+    async def test_slot_released_after_call(self):
+        limiter = ConcurrencyLimiter(2)
+        seen = []
+
+        async def continuation(details, request):
+            seen.append(dict(limiter.in_flight))
+            return asyncio.sleep(0)
+
+        with patch('core.admission.upstream_limiter', limiter):
+            await upstream_admission.intercept_unary_unary(continuation, SimpleNamespace(method=b"/library.LibraryService/GetBooks"), None)
+
+        assert seen == [{'GetBooks': 1}]
+        assert limiter.in_flight == {}
+
+    async def test_rejected_without_calling_upstream(self):
+        limiter = ConcurrencyLimiter(1)
+        limiter.in_flight['GetBooks'] = 1
+
+        async def continuation(details, request):
+            raise AssertionError("must not be called")
+
+        with patch('core.admission.upstream_limiter', limiter):
+            with pytest.raises(UpstreamOverloaded):
+                await upstream_admission.intercept_unary_unary(continuation, SimpleNamespace(method="/library.LibraryService/GetBooks"), None)
@@ -0,0 +1,134 @@
+import gzip
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.compression import CompressionMiddleware, PrecompressedCache, choose_encoding
+
+pytestmark = pytest.mark.asyncio
+
+BODY = json.dumps([{"book_id": i, "title": f"Book {i}", "author": "Author"} for i in range(200)]).encode()
+
+def app_sending(body, headers=None, chunks=1):
+    headers = headers if headers is not None else [(b"content-type", b"application/json")]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": headers + [(b"content-length", str(len(body)).encode())]})
+        size = len(body) // chunks
+        for index in range(chunks):
+            last = index == chunks - 1
+            await send({"type": "http.response.body", "body": body[index * size:None if last else (index + 1) * size], "more_body": not last})
+    return app
+
+async def call(middleware, accept_encoding=b"gzip, deflate, br", path="/api/v1/admin/books", precompress=False):
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"",
+             "headers": [(b"accept-encoding", accept_encoding)] if accept_encoding else [],
+             "state": {"precompress": True} if precompress else {}}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    headers = dict(messages[0]["headers"])
+    return headers, b"".join(message.get("body", b"") for message in messages[1:])
+
+class TestChooseEncoding:
+    """Test picking a content coding from Accept-Encoding"""
+
+    def test_preference_and_quality(self):
+        assert choose_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+        assert choose_encoding("gzip, deflate, br", ("gzip",)) == "gzip"
+        assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+        assert choose_encoding("*", ("br", "gzip")) == "br"
+        assert choose_encoding("*, br;q=0", ("br", "gzip")) == "gzip"
+
+    def test_identity(self):
+        assert choose_encoding(None, ("br", "gzip")) is None
+        assert choose_encoding("identity", ("br", "gzip")) is None
+        assert choose_encoding("gzip;q=0", ("gzip",)) is None
+
+class TestCompressionMiddleware:
+    """Test compressing complete responses above the threshold"""
+
+    async def test_large_json_is_gzipped(self):
+        middleware = CompressionMiddleware(app_sending(BODY), min_bytes=1024)
+        middleware.encodings = ("gzip",)
+
+        headers, body = await call(middleware)
+
+        assert headers[b"content-encoding"] == b"gzip"
+        assert headers[b"content-length"] == str(len(body)).encode()
+        assert headers[b"vary"] == b"Accept-Encoding"
+        assert gzip.decompress(body) == BODY
+        assert len(body) < len(BODY) / 4
+
+    async def test_brotli_preferred(self):
+        brotli = pytest.importorskip("brotli")
+        middleware = CompressionMiddleware(app_sending(BODY, [(b"content-type", b"application/json"), (b"vary", b"Accept")]), min_bytes=1024)
+
+        headers, body = await call(middleware)
+
+        assert headers[b"content-encoding"] == b"br"
+        assert headers[b"vary"] == b"Accept, Accept-Encoding"
+        assert brotli.decompress(body) == BODY
+
+    @pytest.mark.parametrize("body, headers, chunks, accept_encoding", [
+        (b'{"ok":true}', None, 1, b"gzip"),
+        (BODY, None, 1, b"identity"),
+        (BODY, None, 1, None),
+        (BODY, None, 3, b"gzip"),
+        (BODY, [(b"content-type", b"image/png")], 1, b"gzip"),
+        (BODY, [(b"content-type", b"application/json"), (b"content-encoding", b"deflate")], 1, b"gzip"),
+    ], ids=["small", "identity", "no-accept-encoding", "streaming", "not-compressible", "already-encoded"])
+    async def test_passed_through(self, body, headers, chunks, accept_encoding):
+        middleware = CompressionMiddleware(app_sending(body, headers, chunks), min_bytes=1024)
+
+        sent_headers, sent = await call(middleware, accept_encoding)
+
+        assert sent == body
+        assert sent_headers.get(b"content-encoding") in (None, b"deflate")
+        assert b"vary" not in sent_headers
+
+    async def test_marked_responses_are_compressed_once_per_version(self):
+        headers = [(b"content-type", b"application/json"), (b"etag", b'W/"catalog-7-abc"')]
+        middleware = CompressionMiddleware(app_sending(BODY, headers), min_bytes=1024, executor=ThreadPoolExecutor(1))
+        middleware.encodings = ("gzip",)
+
+        with patch.object(middleware, "_compress", wraps=middleware._compress) as compress:
+            _, first = await call(middleware, precompress=True)
+            _, second = await call(middleware, precompress=True)
+            await call(middleware, path="/api/v1/user/books/search", precompress=True)
+
+        assert first == second
+        assert gzip.decompress(second) == BODY
+        assert compress.call_count == 2
+
+    async def test_unmarked_etag_responses_are_not_cached(self):
+        headers = [(b"content-type", b"application/json"), (b"etag", b'W/"catalog-7-def"')]
+        middleware = CompressionMiddleware(app_sending(BODY, headers), min_bytes=1024, executor=ThreadPoolExecutor(1))
+        middleware.encodings = ("gzip",)
+
+        with patch.object(middleware, "_compress", wraps=middleware._compress) as compress:
+            await call(middleware)
+            await call(middleware)
+
+        assert compress.call_count == 2
+        assert len(middleware.cache._entries) == 0
+
+class TestPrecompressedCache:
+    """Test the bounded cache of compressed bodies"""
+
+    async def test_lru_bound(self):
+        cache = PrecompressedCache(max_entries=2)
+        executor = ThreadPoolExecutor(1)
+
+        for version in range(3):
+            await cache.get_or_compress(("/books", version), lambda: executor.submit(bytes, 1))
+
+        assert cache.get(("/books", 0)) is None
+        assert cache.get(("/books", 2)) == b"\x00"
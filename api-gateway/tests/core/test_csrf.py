@@ -0,0 +1,90 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.csrf import CSRFProtection, CSRFMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+def create_app(protection):
+    app = FastAPI()
+
+    @app.get('/items')
+    async def list_items():
+        return []
+
+    @app.post('/items')
+    async def create_item():
+        return {"created": True}
+
+    app.add_middleware(CSRFMiddleware, protection=protection)
+    return app
+
+class TestCSRFProtection:
+    """Test stateless HMAC tokens"""
+
+    def test_token_roundtrip(self):
+        protection = CSRFProtection(secret="s3cret", ttl=60)
+        token = protection.generate_token("Bearer abc")
+
+        assert protection.validate_token(token, "Bearer abc")
+        assert not protection.validate_token(token, "Bearer other")
+
+    def test_tokens_verify_across_instances_sharing_secret(self):
+        issuer = CSRFProtection(secret="s3cret", ttl=60)
+        verifier = CSRFProtection(secret="s3cret", ttl=60)
+        stranger = CSRFProtection(secret="different", ttl=60)
+        token = issuer.generate_token()
+
+        assert verifier.validate_token(token, "anonymous")
+        assert not stranger.validate_token(token, "anonymous")
+        assert not hasattr(issuer, "tokens")
+
+    def test_expired_token_rejected(self):
+        clock = FakeClock()
+        protection = CSRFProtection(secret="s3cret", ttl=60, clock=clock)
+        token = protection.generate_token()
+        clock.now += 61
+
+        assert not protection.validate_token(token, "anonymous")
+
+    def test_tampered_or_malformed_token_rejected(self):
+        protection = CSRFProtection(secret="s3cret", ttl=60)
+        expires, signature = protection.generate_token().split(".")
+
+        assert not protection.validate_token(f"{int(expires) + 3600}.{signature}", "anonymous")
+        assert not protection.validate_token("not-a-token", "anonymous")
+        assert not protection.validate_token(f"{expires}.", "anonymous")
+
+class TestCSRFMiddleware:
+    """Test the pure ASGI middleware"""
+
+    def setup_method(self):
+        self.protection = CSRFProtection(secret="s3cret", ttl=60)
+        self.client = TestClient(create_app(self.protection))
+
+    def test_safe_methods_pass_without_token(self):
+        assert self.client.get('/items').status_code == 200
+
+    def test_missing_token_forbidden(self):
+        response = self.client.post('/items')
+
+        assert response.status_code == 403
+        assert response.json() == {"error": "CSRF token mismatch"}
+
+    def test_valid_token_for_session(self):
+        token = self.protection.generate_token("Bearer abc")
+
+        ok = self.client.post('/items', headers={"X-CSRF-Token": token, "Authorization": "Bearer abc"})
+        wrong_session = self.client.post('/items', headers={"X-CSRF-Token": token})
+
+        assert ok.status_code == 200
+        assert ok.json() == {"created": True}
+        assert wrong_session.status_code == 403
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+import pytest
+import grpc
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.inprocess import InProcessStub, load_servicer
+import library_service_pb2
+import library_service_pb2_grpc
+
+pytestmark = pytest.mark.asyncio
+
+class FakeLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def __init__(self):
+        self.stream_closed = threading.Event()
+
+    def GetBooks(self, request, context):
+        if request.search_query == "slow":
+            time.sleep(0.5)
+        if request.search_query == "crash":
+            raise ValueError("boom")
+        return library_service_pb2.GetBooksResponse(books=[library_service_pb2.Book(book_id=1, title=request.search_query)])
+
+    def GetBook(self, request, context):
+        context.set_code(grpc.StatusCode.NOT_FOUND)
+        context.set_details("Book not found")
+        return library_service_pb2.Book()
+
+    def DeleteBook(self, request, context):
+        context.abort(grpc.StatusCode.PERMISSION_DENIED, "Admins only")
+
+    def WatchBookAvailability(self, request, context):
+        try:
+            cursor = request.since_cursor
+            while context.is_active():
+                cursor += 1
+                yield library_service_pb2.BookAvailabilityEvent(cursor=cursor)
+                time.sleep(0.01)
+        finally:
+            self.stream_closed.set()
+
+    def WatchBookRequestEvents(self, request, context):
+        yield library_service_pb2.BookRequestEvent(cursor=1)
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Subscriber fell behind")
+
+@pytest.fixture
+def servicer():
+    return FakeLibraryService()
+
+@pytest.fixture
+def stub(servicer):
+    stub = InProcessStub(servicer)
+    yield stub
+    stub.close()
+
+class TestInProcessStub:
+    """Test the embedded backend behaves like a channel stub"""
+
+    async def test_unary_call(self, stub):
+        response = await stub.GetBooks(library_service_pb2.GetBooksRequest(search_query="dune"), timeout=5)
+
+        assert response.books[0].title == "dune"
+
+    async def test_calls_can_be_gathered(self, stub):
+        responses = await asyncio.gather(*(
+            stub.GetBooks(library_service_pb2.GetBooksRequest(search_query=str(i))) for i in range(5)
+        ))
+
+        assert [r.books[0].title for r in responses] == [str(i) for i in range(5)]
+
+    async def test_status_set_by_servicer_is_raised(self, stub):
+        with pytest.raises(grpc.RpcError) as raised:
+            await stub.GetBook(library_service_pb2.GetBookRequest(book_id=1))
+
+        assert raised.value.code() == grpc.StatusCode.NOT_FOUND
+        assert raised.value.details() == "Book not found"
+
+    async def test_abort(self, stub):
+        with pytest.raises(grpc.RpcError) as raised:
+            await stub.DeleteBook(library_service_pb2.GetBookRequest(book_id=1))
+
+        assert raised.value.code() == grpc.StatusCode.PERMISSION_DENIED
+
+    async def test_servicer_exception_is_unknown(self, stub):
+        with pytest.raises(grpc.RpcError) as raised:
+            await stub.GetBooks(library_service_pb2.GetBooksRequest(search_query="crash"))
+
+        assert raised.value.code() == grpc.StatusCode.UNKNOWN
+        assert "boom" in raised.value.details()
+
+    async def test_deadline(self, stub):
+        with pytest.raises(grpc.RpcError) as raised:
+            await stub.GetBooks(library_service_pb2.GetBooksRequest(search_query="slow"), timeout=0.05)
+
+        assert raised.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+    async def test_stream_and_cancel(self, stub, servicer):
+        stream = stub.WatchBookAvailability(library_service_pb2.WatchBookAvailabilityReq(since_cursor=10))
+        cursors = []
+        async for event in stream:
+            cursors.append(event.cursor)
+            if len(cursors) == 3:
+                stream.cancel()
+
+        assert cursors[:3] == [11, 12, 13]
+        assert await asyncio.to_thread(servicer.stream_closed.wait, 5)
+
+    async def test_stream_abort_raises_after_messages(self, stub):
+        events = []
+        with pytest.raises(grpc.RpcError) as raised:
+            async for event in stub.WatchBookRequestEvents(library_service_pb2.WatchBookRequestEventsReq()):
+                events.append(event)
+
+        assert [e.cursor for e in events] == [1]
+        assert raised.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+class TestLoadServicer:
+    """Test importing the server tree next to the gateway's own packages"""
+
+    def test_gateway_services_package_and_path_are_restored(self, tmp_path):
+        import services as gateway_services
+        path_before = list(sys.path)
+        package = tmp_path / "services"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "library_service_main.py").write_text(
+            "class LibraryServiceImpl:\n"
+            "    origin = 'server'\n"
+        )
+
+        servicer = load_servicer(str(tmp_path))
+
+        assert servicer.origin == "server"
+        assert sys.modules["services"] is gateway_services
+        assert sys.path == path_before
+
+    def test_restored_when_the_server_fails_to_import(self, tmp_path):
+        import services as gateway_services
+        path_before = list(sys.path)
+        package = tmp_path / "services"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "library_service_main.py").write_text("raise ImportError('no database driver')\n")
+
+        with pytest.raises(ImportError):
+            load_servicer(str(tmp_path))
+
+        assert sys.modules["services"] is gateway_services
+        assert sys.path == path_before
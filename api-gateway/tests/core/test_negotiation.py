@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import grpc
+import grpc.aio
+from core.negotiation import JSON, NDJSON, PROTOBUF, negotiate, ndjson_response
+from core.serialization import MessageEncoder
+import library_service_pb2
+
+BOOKS = MessageEncoder({"book_id": "book_id", "title": "title"})
+
+class Stream:
+    """Server-streaming call look-alike"""
+
+    def __init__(self, messages, error=None):
+        self.messages = list(messages)
+        self.error = error
+        self.cancelled = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        self.cancelled = True
+
+async def read(response):
+    return [chunk async for chunk in response.body_iterator]
+
+class TestNegotiate:
+    """Test choosing the response media type from Accept"""
+
+    def test_defaults_to_json(self):
+        assert negotiate(None) == JSON
+        assert negotiate("") == JSON
+        assert negotiate("*/*") == JSON
+        assert negotiate("text/html,application/xhtml+xml,*/*;q=0.8") == JSON
+        assert negotiate("text/csv") == JSON
+
+    def test_explicit_types(self):
+        assert negotiate("application/x-protobuf") == PROTOBUF
+        assert negotiate("application/x-ndjson") == NDJSON
+        assert negotiate("Application/X-Protobuf; charset=binary") == PROTOBUF
+
+    def test_quality(self):
+        assert negotiate("application/json;q=0.5, application/x-protobuf") == PROTOBUF
+        assert negotiate("application/x-ndjson;q=0.9, application/json") == JSON
+        assert negotiate("application/x-ndjson, */*;q=0.1") == NDJSON
+        assert negotiate("application/json;q=0, application/*") == NDJSON
+
+class TestNDJSONResponse:
+    """Test streaming rows as newline-delimited JSON"""
+    pytestmark = pytest.mark.asyncio
+
+    async def test_one_row_per_line(self):
+        stream = Stream(library_service_pb2.Book(book_id=i, title=f"Book {i}") for i in range(5))
+
+        with patch('core.negotiation.NDJSON_BATCH_ROWS', 2):
+            response = await ndjson_response(stream, BOOKS)
+            chunks = await read(response)
+
+        assert response.media_type == NDJSON
+        assert response.headers["vary"] == "Accept"
+        assert len(chunks) == 3
+        lines = b"".join(chunks).splitlines()
+        assert lines[0] == b'{"book_id":0,"title":"Book 0"}'
+        assert len(lines) == 5
+
+    async def test_empty_stream(self):
+        response = await ndjson_response(Stream([]), BOOKS)
+
+        assert await read(response) == []
+
+    async def test_failure_before_the_first_row_raises(self):
+        error = grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata())
+
+        with pytest.raises(grpc.RpcError):
+            await ndjson_response(Stream([], error), BOOKS)
+
+    async def test_upstream_is_cancelled_when_the_body_ends(self):
+        stream = Stream([library_service_pb2.Book(book_id=1)])
+        response = await ndjson_response(stream, BOOKS)
+        body = response.body_iterator
+
+        await body.__anext__()
+        await body.aclose()
+
+        assert stream.cancelled
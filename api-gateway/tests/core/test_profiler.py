@@ -0,0 +1,95 @@
+import pytest
+import threading
+import time
+from fastapi.testclient import TestClient
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.profiler import SamplingProfiler, AllocationTracker, ProfilerBusyError, run_profile
+from main import app
+from shared import profiler as shared_profiler
+
+client = TestClient(app)
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+class TestSamplingProfiler:
+    """Test collapsed-stack sampling"""
+
+    def test_collapsed_stacks_include_busy_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        time.sleep(0.1)
+        output = profiler.stop()
+        stop.set()
+        worker.join()
+
+        busy = [line for line in output.splitlines() if line.startswith("busy-worker;")]
+        assert busy
+        stack, count = busy[0].rsplit(" ", 1)
+        assert "busy_loop (test_profiler.py:" in stack
+        assert int(count) > 0
+        assert "sampling-profiler" not in output
+
+class TestAllocationTracker:
+    """Test tracemalloc snapshot diffs"""
+
+    def test_growth_reported(self):
+        tracker = AllocationTracker()
+        tracker.start()
+        retained = [bytearray(1024) for _ in range(200)]
+        report = tracker.stop()
+
+        assert "test_profiler.py" in report
+        assert len(retained) == 200
+
+class TestRunProfile:
+    """Test argument validation and concurrency guard"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            await run_profile("cpu", 1)
+
+    @pytest.mark.asyncio
+    async def test_rejects_interval_below_minimum(self):
+        with pytest.raises(ValueError):
+            await run_profile("wall", 1, interval=0.0001)
+
+    @pytest.mark.asyncio
+    async def test_rejects_concurrent_profiles(self):
+        shared_profiler._profile_lock.acquire()
+        try:
+            with pytest.raises(ProfilerBusyError):
+                await run_profile("wall", 0.01)
+        finally:
+            shared_profiler._profile_lock.release()
+
+class TestProfileEndpoint:
+    """Test admin gating of the profiling endpoint"""
+
+    def test_disabled_without_admin_token(self, monkeypatch):
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        response = client.get("/debug/profile?seconds=0.01")
+        assert response.status_code == 404
+
+    def test_wrong_token_forbidden(self, monkeypatch):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.get("/debug/profile?seconds=0.01", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
+
+    def test_wall_profile_returned(self, monkeypatch):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.get("/debug/profile?seconds=0.05&interval=0.001", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+
+    def test_interval_below_minimum_rejected(self, monkeypatch):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = client.get("/debug/profile?seconds=0.05&interval=0.00001", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 422
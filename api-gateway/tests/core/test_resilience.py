@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+import grpc
+import grpc.aio
+from unittest.mock import MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.resilience import BreakerState, CircuitBreaker, ResilienceInterceptor, StaleCache, method_config
+import library_service_pb2
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def rpc_error(code):
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details="boom")
+
+class FakeUpstream:
+    """continuation() stand-in: plays back a script of results/errors/delays"""
+
+    def __init__(self, *results, delay=0.0):
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, client_call_details, request):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        delay = self.delay if self.calls == 1 else 0.0
+
+        async def call():
+            await asyncio.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call()
+
+def details(method):
+    return MagicMock(method=f"/library.LibraryService/{method}")
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("GetBooks", failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow()
+
+        clock.now += 10
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert breaker.allow()
+        # Only one probe at a time
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("GetBooks", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow()
+
+    def test_stale_cache_is_bounded_and_expires(self):
+        clock = FakeClock()
+        cache = StaleCache(max_entries=1, max_age=60, clock=clock)
+        first = library_service_pb2.GetBooksRequest(search_query="a")
+        second = library_service_pb2.GetBooksRequest(search_query="b")
+        cache.put("GetBooks", first, "A")
+        cache.put("GetBooks", second, "B")
+
+        assert cache.get("GetBooks", first) is None
+        assert cache.get("GetBooks", second) == "B"
+        clock.now += 61
+        assert cache.get("GetBooks", second) is None
+
+    def test_method_config_retries_reads_only(self):
+        names = {entry["method"] for entry in method_config()[0]["name"]}
+
+        assert {"GetBooks", "GetUsers", "GetTransactions"} <= names
+        assert "IssueBook" not in names
+
+@pytest.mark.asyncio
+class TestResilienceInterceptor:
+    """Test breaker, stale fallback and hedging around upstream calls"""
+
+    async def test_serves_stale_response_when_backend_fails(self):
+        interceptor = ResilienceInterceptor(hedge_delay=0, failure_threshold=5, reset_timeout=10)
+        request = library_service_pb2.GetBooksRequest(search_query="x")
+        fresh = library_service_pb2.GetBooksResponse(books=[library_service_pb2.Book(book_id=1)])
+
+        assert await interceptor.intercept_unary_unary(FakeUpstream(fresh), details("GetBooks"), request) == fresh
+        stale = await interceptor.intercept_unary_unary(
+            FakeUpstream(rpc_error(grpc.StatusCode.UNAVAILABLE)), details("GetBooks"), request
+        )
+
+        assert stale == fresh
+        assert interceptor.breakers["GetBooks"].failures == 1
+
+    async def test_open_breaker_fails_fast_without_calling_upstream(self):
+        interceptor = ResilienceInterceptor(hedge_delay=0, failure_threshold=2, reset_timeout=10)
+        failing = FakeUpstream(rpc_error(grpc.StatusCode.UNAVAILABLE))
+        request = library_service_pb2.IssueBookRequest(book_id=1)
+
+        for _ in range(2):
+            with pytest.raises(grpc.RpcError):
+                await interceptor.intercept_unary_unary(failing, details("IssueBook"), request)
+        with pytest.raises(grpc.RpcError) as raised:
+            await interceptor.intercept_unary_unary(failing, details("IssueBook"), request)
+
+        assert raised.value.code() == grpc.StatusCode.UNAVAILABLE
+        assert "Circuit breaker open" in raised.value.details()
+        assert failing.calls == 2
+
+    async def test_request_errors_do_not_trip_breaker(self):
+        interceptor = ResilienceInterceptor(hedge_delay=0, failure_threshold=1, reset_timeout=10)
+        upstream = FakeUpstream(rpc_error(grpc.StatusCode.NOT_FOUND))
+
+        for _ in range(3):
+            with pytest.raises(grpc.RpcError):
+                await interceptor.intercept_unary_unary(upstream, details("GetUsers"), library_service_pb2.GetUsersRequest())
+
+        assert interceptor.breakers["GetUsers"].state == BreakerState.CLOSED
+        assert upstream.calls == 3
+
+    async def test_slow_read_is_hedged(self):
+        interceptor = ResilienceInterceptor(hedge_delay=0.01, failure_threshold=5, reset_timeout=10)
+        response = library_service_pb2.GetBooksResponse()
+        upstream = FakeUpstream(response, delay=5.0)
+
+        result = await asyncio.wait_for(
+            interceptor.intercept_unary_unary(upstream, details("GetBooks"), library_service_pb2.GetBooksRequest()),
+            timeout=1.0
+        )
+
+        assert result == response
+        assert upstream.calls == 2
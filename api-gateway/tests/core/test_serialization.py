@@ -0,0 +1,71 @@
+import json
+import pytest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from google.protobuf.timestamp_pb2 import Timestamp
+from core.serialization import Lookup, MessageEncoder, ProtoJSONResponse
+from core.wire_format import iso_time
+import library_service_pb2
+
+BOOKS = MessageEncoder({
+    "book_id": "book_id",
+    "title": "title",
+    "can_request": lambda book: book.available_copies > 0
+})
+
+class TestMessageEncoder:
+    """Test encoding protobuf messages straight to JSON"""
+
+    def test_rows(self):
+        books = [
+            library_service_pb2.Book(book_id=1, title="Dune", available_copies=2),
+            library_service_pb2.Book(book_id=2, title="Emma")
+        ]
+
+        assert BOOKS.rows(books) == [
+            {"book_id": 1, "title": "Dune", "can_request": True},
+            {"book_id": 2, "title": "Emma", "can_request": False}
+        ]
+        assert BOOKS.rows([]) == []
+
+    def test_dumps_matches_stdlib_json(self):
+        books = [library_service_pb2.Book(book_id=1, title="Cien años \"de\" soledad", available_copies=1)]
+
+        assert json.loads(BOOKS.dumps(books)) == BOOKS.rows(books)
+
+    def test_lookups(self):
+        encoder = MessageEncoder({
+            "username": Lookup("users", "member_id", lambda user_id: f"User {user_id}"),
+            "book_title": Lookup("books", "book_id", "Unknown Book"),
+            "transaction_date": lambda txn: iso_time(txn, "transaction_time", "transaction_date")
+        })
+        transactions = [
+            library_service_pb2.Transaction(member_id=1, book_id=5, transaction_time=Timestamp(seconds=1704067200)),
+            library_service_pb2.Transaction(member_id=9, book_id=6)
+        ]
+
+        rows = encoder.rows(transactions, users={1: "alice"}, books={5: "Dune"})
+
+        assert rows == [
+            {"username": "alice", "book_title": "Dune", "transaction_date": "2024-01-01T00:00:00"},
+            {"username": "User 9", "book_title": "Unknown Book", "transaction_date": ""}
+        ]
+
+    def test_missing_lookup_table(self):
+        encoder = MessageEncoder({"username": Lookup("users", "member_id")})
+
+        with pytest.raises(KeyError):
+            encoder.rows([])
+
+    def test_invalid_column(self):
+        with pytest.raises(TypeError):
+            MessageEncoder({"book_id": 1})
+
+    def test_response_passes_bytes_through(self):
+        response = BOOKS.response([library_service_pb2.Book(book_id=1, title="Dune")])
+
+        assert isinstance(response, ProtoJSONResponse)
+        assert response.media_type == "application/json"
+        assert response.body == b'[{"book_id":1,"title":"Dune","can_request":false}]'
+        assert response.headers["content-length"] == str(len(response.body))
@@ -0,0 +1,179 @@
+import pytest
+from fastapi import HTTPException
+from starlette.websockets import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.session import SessionTokens, session_tokens, optional_session, ensure_user_access, ensure_admin
+from services.request_service import RequestService
+from main import app
+
+client = TestClient(app)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+class TestSessionTokens:
+    """Test signing and local verification of session tokens"""
+
+    def test_issue_and_verify(self):
+        tokens = SessionTokens(secret="s3cret", ttl=60)
+        token, expires = tokens.issue(7, "alice", "USER")
+
+        session = tokens.verify(token)
+        assert (session.user_id, session.username, session.role, session.expires) == (7, "alice", "USER", expires)
+        assert not session.is_admin
+
+    def test_tampered_claims_rejected(self):
+        tokens = SessionTokens(secret="s3cret", ttl=60)
+        admin_token, _ = tokens.issue(1, "root", "ADMIN")
+        user_token, _ = tokens.issue(7, "alice", "USER")
+
+        forged = f"{admin_token.split('.')[0]}.{user_token.split('.')[1]}"
+        assert tokens.verify(forged) is None
+        assert SessionTokens(secret="other", ttl=60).verify(user_token) is None
+        assert tokens.verify("garbage") is None
+
+    def test_expired_token_rejected(self):
+        clock = FakeClock()
+        tokens = SessionTokens(secret="s3cret", ttl=60, clock=clock)
+        token, _ = tokens.issue(7, "alice", "USER")
+        clock.now += 61
+
+        assert tokens.verify(token) is None
+
+@pytest.mark.asyncio
+class TestSessionDependency:
+    """Test the optional_session dependency and access checks"""
+
+    async def test_missing_header_rejected_unless_opted_out(self, monkeypatch):
+        with pytest.raises(HTTPException) as exc_info:
+            await optional_session(None)
+        assert exc_info.value.status_code == 401
+        monkeypatch.setenv("SESSION_REQUIRED", "false")
+        assert await optional_session(None) is None
+
+    async def test_invalid_token_rejected(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await optional_session("Bearer nope")
+        assert exc_info.value.status_code == 401
+
+    async def test_access_rules(self):
+        user = session_tokens.verify(session_tokens.issue(7, "alice", "USER")[0])
+        admin = session_tokens.verify(session_tokens.issue(1, "root", "ADMIN")[0])
+
+        ensure_user_access(user, 7)
+        ensure_user_access(admin, 7)
+        ensure_user_access(None, 7)
+        assert ensure_admin(admin) is admin
+        with pytest.raises(HTTPException):
+            ensure_user_access(user, 8)
+        with pytest.raises(HTTPException) as exc_info:
+            ensure_admin(user)
+        assert exc_info.value.status_code == 403
+        with pytest.raises(HTTPException) as exc_info:
+            ensure_admin(None)
+        assert exc_info.value.status_code == 401
+
+class TestVerifiedIdentityOnRoutes:
+    """Test routes use the session instead of trusting the URL"""
+
+    def test_other_users_stats_forbidden(self):
+        token, _ = session_tokens.issue(7, "alice", "USER")
+
+        response = client.get("/api/v1/user/8/stats", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 403
+
+    @patch('routes.users.get_grpc_client')
+    def test_own_stats_allowed(self, mock_get_client):
+        stub = MagicMock()
+        stub.GetUserStats = AsyncMock(return_value=MagicMock(
+            total_books_taken=1, currently_borrowed=1, overdue_books=0, total_fine=0
+        ))
+        mock_get_client.return_value = stub
+        token, _ = session_tokens.issue(7, "alice", "USER")
+
+        response = client.get("/api/v1/user/7/stats", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert stub.GetUserStats.await_args[0][0].user_id == 7
+
+    @pytest.mark.parametrize("path", [
+        "/api/v1/user/7/stats",
+        "/api/v1/user/7/transactions",
+        "/api/v1/user/7/book-requests",
+    ])
+    def test_user_routes_need_session(self, path):
+        response = client.get(path)
+
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize("method, path", [
+        ("get", "/api/v1/admin/users"),
+        ("get", "/api/v1/admin/transactions"),
+        ("get", "/api/v1/admin/book-requests"),
+        ("get", "/api/v1/admin/books"),
+    ])
+    def test_admin_routes_need_admin_session(self, method, path):
+        user_token, _ = session_tokens.issue(7, "alice", "USER")
+
+        assert getattr(client, method)(path).status_code == 401
+        assert getattr(client, method)(path, headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+
+    def test_websocket_user_comes_from_token(self):
+        token, _ = session_tokens.issue(7, "alice", "USER")
+
+        with patch('routes.websocket.notification_service') as service:
+            with client.websocket_connect(f"/?token={token}&userId=8"):
+                pass
+
+        assert service.add_connection.call_args[0][0] == "7"
+
+    def test_websocket_replay_needs_token(self):
+        with patch('routes.websocket.notification_service') as service:
+            with client.websocket_connect("/?userId=8&cursor=0"):
+                pass
+
+        service.add_connection.assert_not_called()
+
+    def test_websocket_invalid_token_closed(self):
+        with patch('routes.websocket.notification_service') as service:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                with client.websocket_connect("/?token=forged&userId=8") as websocket:
+                    websocket.receive_text()
+
+        assert exc_info.value.code == 4001
+        service.add_connection.assert_not_called()
+
+@pytest.mark.asyncio
+class TestRoleClaim:
+    """Test the role claim replaces the GetUsers admin lookup"""
+
+    async def test_role_claim_skips_get_users(self):
+        stub = MagicMock()
+        stub.GetUsers = AsyncMock()
+        stub.CreateUserBookRequest = AsyncMock(return_value=MagicMock(success=True))
+        service = RequestService(stub)
+
+        await service.create_book_request(7, 3, "ISSUE", user_role="USER")
+
+        stub.GetUsers.assert_not_awaited()
+        stub.CreateUserBookRequest.assert_awaited_once()
+
+    async def test_admin_role_claim_rejected(self):
+        stub = MagicMock()
+        stub.GetUsers = AsyncMock()
+        service = RequestService(stub)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.create_book_request(1, 3, "ISSUE", user_role="ADMIN")
+
+        assert exc_info.value.status_code == 403
+        stub.GetUsers.assert_not_awaited()
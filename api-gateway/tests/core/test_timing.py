@@ -0,0 +1,149 @@
+import pytest
+import grpc
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.metrics import MetricsRegistry
+from main import app
+from core.timing import (
+    TimingMiddleware, TimedRoute, TimingClientInterceptor, RequestTiming,
+    timed, current_timing, request_duration, phase_duration
+)
+
+def create_app():
+    app = FastAPI()
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get('/items/{item_id}')
+    async def get_item(item_id: int):
+        current_timing().add("rpc.GetBooks", 0.004)
+        with timed("convert"):
+            items = [{"item_id": item_id}]
+        return items
+
+    app.include_router(router)
+    app.add_middleware(TimingMiddleware)
+    return app
+
+class TestTimingMiddleware:
+    """Test request timing middleware and Server-Timing header"""
+
+    def test_server_timing_header(self):
+        client = TestClient(create_app())
+
+        response = client.get('/items/1')
+
+        assert response.status_code == 200
+        header = response.headers["server-timing"]
+        assert "rpc.GetBooks;dur=4.00" in header
+        assert "convert;dur=" in header
+        assert "json;dur=" in header
+        assert "total;dur=" in header
+
+    def test_metrics_recorded_per_route_template(self):
+        client = TestClient(create_app())
+        before = request_duration.count('/items/{item_id}', 'GET', '200')
+
+        client.get('/items/1')
+        client.get('/items/2')
+
+        assert request_duration.count('/items/{item_id}', 'GET', '200') == before + 2
+        assert phase_duration.count('/items/{item_id}', 'convert') >= 2
+
+    def test_timed_outside_request_is_noop(self):
+        with timed("convert"):
+            pass
+        assert current_timing() is None
+
+class FakeCall:
+    """Awaitable stand-in for a grpc.aio call object"""
+
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+    def __await__(self):
+        if self.error:
+            raise self.error
+        return self.response
+        yield
+
+class TestTimingClientInterceptor:
+    """Test upstream RPC timing"""
+
+    @pytest.mark.asyncio
+    async def test_rpc_time_attributed_to_request(self):
+        interceptor = TimingClientInterceptor()
+        call = FakeCall(response=object())
+        continuation = AsyncMock(return_value=call)
+        details = MagicMock(method=b'/library.LibraryService/GetTransactions')
+        timing = RequestTiming()
+
+        from core import timing as timing_module
+        token = timing_module._current_timing.set(timing)
+        try:
+            result = await interceptor.intercept_unary_unary(continuation, details, object())
+        finally:
+            timing_module._current_timing.reset(token)
+
+        assert result is call
+        assert "rpc.GetTransactions" in timing.phases
+
+    @pytest.mark.asyncio
+    async def test_rpc_error_is_reraised(self):
+        class FakeRpcError(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNAVAILABLE
+
+        interceptor = TimingClientInterceptor()
+        call = FakeCall(error=FakeRpcError())
+        continuation = AsyncMock(return_value=call)
+        details = MagicMock(method=b'/library.LibraryService/GetBooks')
+
+        with pytest.raises(grpc.RpcError):
+            await interceptor.intercept_unary_unary(continuation, details, object())
+
+class TestMetricsRegistry:
+    """Test Prometheus text rendering"""
+
+    def test_render_histogram_and_counter(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        counter = registry.counter("requests_total", "Requests.", ("route",))
+
+        histogram.observe(0.05, "/a")
+        histogram.observe(2.0, "/a")
+        counter.inc("/a")
+
+        output = registry.render()
+
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in output
+        assert 'latency_seconds_count{route="/a"} 2' in output
+        assert 'requests_total{route="/a"} 1' in output
+
+    def test_gauge_callback(self):
+        registry = MetricsRegistry()
+        registry.gauge("connections", "Open connections.", callback=lambda: 3)
+
+        assert "connections 3" in registry.render()
+
+class TestMetricsEndpoint:
+    """Test /metrics is gated like the debug endpoints"""
+
+    def test_disabled_without_admin_token(self, monkeypatch):
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        assert TestClient(app).get("/metrics").status_code == 404
+
+    def test_token_required(self, monkeypatch):
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        client = TestClient(app)
+
+        assert client.get("/metrics").status_code == 403
+        assert client.get("/metrics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = client.get("/metrics", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core import tracing
+from core.tracing import (
+    TracingMiddleware, TracingClientInterceptor, SpanExporter,
+    start_span, current_trace_id, parse_traceparent
+)
+
+class CollectingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+@pytest.fixture
+def exporter():
+    collecting = CollectingExporter()
+    tracing.set_exporter(collecting)
+    yield collecting
+    tracing.set_exporter(tracing.NoopExporter())
+
+def create_app():
+    app = FastAPI()
+
+    @app.get('/items/{item_id}')
+    async def get_item(item_id: int):
+        return {"trace_id": current_trace_id()}
+
+    app.add_middleware(TracingMiddleware)
+    return app
+
+class TestTracingMiddleware:
+    """Test root span creation and traceparent continuation"""
+
+    def test_new_trace_started(self, exporter):
+        client = TestClient(create_app())
+
+        response = client.get('/items/1')
+
+        assert response.status_code == 200
+        trace_id = response.headers["x-trace-id"]
+        assert response.json()["trace_id"] == trace_id
+        assert exporter.spans[-1].name == "HTTP GET /items/{item_id}"
+        assert exporter.spans[-1].attributes["http_status"] == 200
+
+    def test_incoming_traceparent_continued(self, exporter):
+        client = TestClient(create_app())
+        trace_id, parent_id = "a" * 32, "b" * 16
+
+        response = client.get('/items/1', headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+        assert response.headers["x-trace-id"] == trace_id
+        assert exporter.spans[-1].parent_id == parent_id
+
+    def test_request_id_used_as_trace_id(self, exporter):
+        client = TestClient(create_app())
+        request_id = "c" * 32
+
+        response = client.get('/items/1', headers={"x-request-id": request_id})
+
+        assert response.headers["x-trace-id"] == request_id
+
+class FakeCall:
+    """Awaitable stand-in for a grpc.aio call object"""
+
+    def __await__(self):
+        return None
+        yield
+
+class TestTracingClientInterceptor:
+    """Test traceparent injection into upstream RPC metadata"""
+
+    @pytest.mark.asyncio
+    async def test_traceparent_injected(self, exporter):
+        interceptor = TracingClientInterceptor()
+        continuation = AsyncMock(return_value=FakeCall())
+        details = MagicMock(method=b'/library.LibraryService/GetBooks', metadata=[("x-user", "1")])
+
+        with start_span("root") as root:
+            await interceptor.intercept_unary_unary(continuation, details, object())
+
+        sent_details = continuation.call_args[0][0]
+        metadata = dict(list(sent_details.metadata))
+        assert metadata["x-user"] == "1"
+        trace_id, parent_id = parse_traceparent(metadata["traceparent"])
+        client_span = exporter.spans[0]
+        assert client_span.name == "grpc.client/GetBooks"
+        assert trace_id == root.trace_id
+        assert parent_id == client_span.span_id
@@ -0,0 +1,28 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from google.protobuf.timestamp_pb2 import Timestamp
+from core.wire_format import amount, iso_time
+import library_service_pb2
+
+class TestWireFormat:
+    """Test reading timestamp/cents fields with the deprecated ones as fallback"""
+
+    def test_timestamp_formats_like_the_string_field(self):
+        txn = library_service_pb2.Transaction(transaction_time=Timestamp(seconds=1704067200, nanos=5000))
+
+        assert iso_time(txn, "transaction_time", "transaction_date") == "2024-01-01T00:00:00.000005"
+        assert iso_time(txn, "return_time", "return_date") == ""
+
+    def test_falls_back_to_deprecated_fields(self):
+        txn = library_service_pb2.Transaction(transaction_date="2024-01-01T00:00:00", fine_amount=20.0)
+
+        assert iso_time(txn, "transaction_time", "transaction_date") == "2024-01-01T00:00:00"
+        assert amount(txn, "fine_cents", "fine_amount") == 20.0
+
+    def test_cents(self):
+        stats = library_service_pb2.UserStatsResponse(total_fine_cents=1050, total_fine=10.5)
+
+        assert amount(stats, "total_fine_cents", "total_fine") == 10.5
+        assert amount(library_service_pb2.UserStatsResponse(), "total_fine_cents", "total_fine") == 0
@@ -5,24 +5,27 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from main import app
+from core.session import session_tokens
+from services.catalog_feed import catalog_availability_watcher
 
 client = TestClient(app)
+ADMIN_HEADERS = {"Authorization": f"Bearer {session_tokens.issue(1, 'admin', 'ADMIN')[0]}"}
 
 class TestBookRoutes:
     """Test book management route endpoints"""
     
     def test_issue_book_negative_book_id(self):
-        response = client.post("/api/v1/admin/issue-book", json={"book_id": -1, "user_id": 1})
+        response = client.post("/api/v1/admin/issue-book", json={"book_id": -1, "user_id": 1}, headers=ADMIN_HEADERS)
         assert response.status_code == 422
         assert "greater than 0" in response.json()["detail"][0]["msg"]
     
     def test_issue_book_zero_user_id(self):
-        response = client.post("/api/v1/admin/issue-book", json={"book_id": 1, "user_id": 0})
+        response = client.post("/api/v1/admin/issue-book", json={"book_id": 1, "user_id": 0}, headers=ADMIN_HEADERS)
         assert response.status_code == 422
         assert "greater than 0" in response.json()["detail"][0]["msg"]
     
     def test_return_book_negative_transaction_id(self):
-        response = client.post("/api/v1/admin/return-book", json={"transaction_id": -1})
+        response = client.post("/api/v1/admin/return-book", json={"transaction_id": -1}, headers=ADMIN_HEADERS)
         assert response.status_code == 422
         assert "greater than 0" in response.json()["detail"][0]["msg"]
     
@@ -49,6 +52,38 @@ class TestBookRoutes:
         assert len(data) == 1
         assert data[0]["title"] == "Test Book"
     
+    @patch('routes.books.get_grpc_client')
+    def test_search_books_etag_and_not_modified(self, mock_grpc):
+        mock_client = AsyncMock()
+        mock_client.GetBooks.return_value.books = []
+        mock_grpc.return_value = mock_client
+
+        with patch.object(catalog_availability_watcher, "connected", True), \
+                patch.object(catalog_availability_watcher, "cursor", 41):
+            response = client.get("/api/v1/user/books/search?q=test")
+            etag = response.headers["etag"]
+            assert etag.startswith('W/"catalog-41-')
+
+            response = client.get("/api/v1/user/books/search?q=test", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert mock_client.GetBooks.call_count == 1
+
+            catalog_availability_watcher.cursor = 42
+            response = client.get("/api/v1/user/books/search?q=test", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
+
+    @patch('routes.books.get_grpc_client')
+    def test_search_books_no_etag_while_watcher_disconnected(self, mock_grpc):
+        mock_client = AsyncMock()
+        mock_client.GetBooks.return_value.books = []
+        mock_grpc.return_value = mock_client
+
+        with patch.object(catalog_availability_watcher, "connected", False):
+            response = client.get("/api/v1/user/books/search?q=test")
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+    
     @patch('routes.books.get_grpc_client')
     def test_issue_book_success(self, mock_grpc):
         mock_client = AsyncMock()
@@ -68,7 +103,7 @@ class TestBookRoutes:
         
         mock_grpc.return_value = mock_client
         
-        response = client.post("/api/v1/admin/issue-book", json={"book_id": 1, "user_id": 1})
+        response = client.post("/api/v1/admin/issue-book", json={"book_id": 1, "user_id": 1}, headers=ADMIN_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["transaction_id"] == 1
@@ -85,7 +120,7 @@ class TestBookRoutes:
         mock_client.ReturnBook.return_value = mock_response
         mock_grpc.return_value = mock_client
         
-        response = client.post("/api/v1/admin/return-book", json={"transaction_id": 1})
+        response = client.post("/api/v1/admin/return-book", json={"transaction_id": 1}, headers=ADMIN_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["transaction_id"] == 1
@@ -4,9 +4,14 @@ from unittest.mock import AsyncMock, patch
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from google.protobuf.timestamp_pb2 import Timestamp
 from main import app
+from core.session import session_tokens
+import library_service_pb2
 
 client = TestClient(app)
+ADMIN_HEADERS = {"Authorization": f"Bearer {session_tokens.issue(1, 'admin', 'ADMIN')[0]}"}
+USER_HEADERS = {"Authorization": f"Bearer {session_tokens.issue(1, 'alice', 'USER')[0]}"}
 
 class TestRequestRoutes:
     """Test request management route endpoints"""
@@ -41,12 +46,12 @@ class TestRequestRoutes:
         assert "Valid transaction ID required" in response.json()["detail"]
     
     def test_approve_request_invalid_id(self):
-        response = client.post("/api/v1/admin/book-requests/-1/approve")
+        response = client.post("/api/v1/admin/book-requests/-1/approve", headers=ADMIN_HEADERS)
         assert response.status_code == 400
         assert "Valid request ID required" in response.json()["detail"]
     
     def test_reject_request_invalid_id(self):
-        response = client.post("/api/v1/admin/book-requests/0/reject", json={"notes": "test"})
+        response = client.post("/api/v1/admin/book-requests/0/reject", json={"notes": "test"}, headers=ADMIN_HEADERS)
         assert response.status_code == 400
         assert "Valid request ID required" in response.json()["detail"]
     
@@ -55,49 +60,50 @@ class TestRequestRoutes:
         mock_client = AsyncMock()
         
         # Mock request with proper attributes
-        mock_request = type('MockRequest', (), {
-            'request_id': 1,
-            'user_id': 1,
-            'book_id': 1,
-            'request_type': "ISSUE",
-            'status': "PENDING",
-            'request_date': "2023-01-01",
-            'notes': "Test request"
-        })()
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=1,
+            request_type="ISSUE",
+            status="PENDING",
+            request_time=Timestamp(seconds=1672531200),
+            notes="Test request"
+        )
         
         mock_client.GetBookRequests.return_value.requests = [mock_request]
         mock_client.GetBooks.return_value.books = []
         mock_client.GetUsers.return_value.users = []
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/admin/book-requests")
+        response = client.get("/api/v1/admin/book-requests", headers=ADMIN_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["request_id"] == 1
+        assert data[0]["request_date"] == "2023-01-01T00:00:00"
     
     @patch('routes.requests.get_grpc_client')
     def test_get_user_book_requests_success(self, mock_grpc):
         mock_client = AsyncMock()
         
         # Mock request with proper attributes
-        mock_request = type('MockUserRequest', (), {
-            'request_id': 1,
-            'user_id': 1,
-            'book_id': 1,
-            'request_type': "ISSUE",
-            'status': "PENDING",
-            'request_date': "2023-01-01",
-            'notes': "Test request",
-            'transaction_id': 0
-        })()
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=1,
+            request_type="ISSUE",
+            status="PENDING",
+            request_time=Timestamp(seconds=1672531200),
+            notes="Test request",
+            transaction_id=0
+        )
         
         mock_client.GetBookRequests.return_value.requests = [mock_request]
         mock_client.GetBooks.return_value.books = []
         mock_client.GetTransactions.return_value.transactions = []
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/user/1/book-requests")
+        response = client.get("/api/v1/user/1/book-requests", headers=USER_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
@@ -114,7 +120,7 @@ class TestRequestRoutes:
         mock_client.GetBookRequests.return_value.requests = []
         mock_grpc.return_value = mock_client
         
-        response = client.post("/api/v1/admin/book-requests/1/approve")
+        response = client.post("/api/v1/admin/book-requests/1/approve", headers=ADMIN_HEADERS)
         assert response.status_code == 200
         assert response.json()["message"] == "Approved"
     
@@ -129,6 +135,6 @@ class TestRequestRoutes:
         mock_client.GetBookRequests.return_value.requests = []
         mock_grpc.return_value = mock_client
         
-        response = client.post("/api/v1/admin/book-requests/1/reject", json={"notes": "test"})
+        response = client.post("/api/v1/admin/book-requests/1/reject", json={"notes": "test"}, headers=ADMIN_HEADERS)
         assert response.status_code == 200
         assert response.json()["message"] == "Rejected"
\ No newline at end of file
@@ -1,12 +1,20 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import grpc
+import grpc.aio
+from google.protobuf.timestamp_pb2 import Timestamp
 from main import app
+from core.session import session_tokens
+import library_service_pb2
 
 client = TestClient(app)
+ADMIN_HEADERS = {"Authorization": f"Bearer {session_tokens.issue(1, 'admin', 'ADMIN')[0]}"}
+USER_HEADERS = {"Authorization": f"Bearer {session_tokens.issue(1, 'alice', 'USER')[0]}"}
 
 class TestUserRoutes:
     """Test user management route endpoints"""
@@ -24,7 +32,7 @@ class TestUserRoutes:
         mock_client.GetUsers.return_value.users = [mock_user]
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/admin/users")
+        response = client.get("/api/v1/admin/users", headers=ADMIN_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
@@ -36,17 +44,17 @@ class TestUserRoutes:
         mock_client.GetUsers.side_effect = Exception("Service error")
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/admin/users")
+        response = client.get("/api/v1/admin/users", headers=ADMIN_HEADERS)
         assert response.status_code == 500
         assert "Service unavailable" in response.json()["detail"]
     
     def test_get_user_stats_invalid_user_id(self):
-        response = client.get("/api/v1/user/-1/stats")
+        response = client.get("/api/v1/user/-1/stats", headers=USER_HEADERS)
         assert response.status_code == 400
         assert "Valid user ID required" in response.json()["detail"]
     
     def test_get_user_stats_zero_user_id(self):
-        response = client.get("/api/v1/user/0/stats")
+        response = client.get("/api/v1/user/0/stats", headers=USER_HEADERS)
         assert response.status_code == 400
         assert "Valid user ID required" in response.json()["detail"]
     
@@ -57,12 +65,12 @@ class TestUserRoutes:
         mock_response.total_books_taken = 5
         mock_response.currently_borrowed = 2
         mock_response.overdue_books = 1
-        mock_response.total_fine = 10.50
+        mock_response.total_fine_cents = 1050
         
         mock_client.GetUserStats.return_value = mock_response
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/user/1/stats")
+        response = client.get("/api/v1/user/1/stats", headers=USER_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["total_books_taken"] == 5
@@ -76,7 +84,7 @@ class TestUserRoutes:
         mock_client.GetUserStats.side_effect = Exception("Service error")
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/user/1/stats")
+        response = client.get("/api/v1/user/1/stats", headers=USER_HEADERS)
         assert response.status_code == 500
         assert "Service unavailable" in response.json()["detail"]
 
@@ -84,12 +92,12 @@ class TestTransactionRoutes:
     """Test transaction management route endpoints"""
     
     def test_admin_transactions_negative_user_id(self):
-        response = client.get("/api/v1/admin/transactions?user_id=-1")
+        response = client.get("/api/v1/admin/transactions?user_id=-1", headers=ADMIN_HEADERS)
         assert response.status_code == 400
         assert "non-negative" in response.json()["detail"]
     
     def test_admin_transactions_invalid_status(self):
-        response = client.get("/api/v1/admin/transactions?status=INVALID")
+        response = client.get("/api/v1/admin/transactions?status=INVALID", headers=ADMIN_HEADERS)
         assert response.status_code == 400
         assert "BORROWED, RETURNED, OVERDUE" in response.json()["detail"]
     
@@ -98,17 +106,16 @@ class TestTransactionRoutes:
         mock_client = AsyncMock()
         
         # Mock transaction with proper attributes
-        mock_transaction = type('MockTransaction', (), {
-            'transaction_id': 1,
-            'member_id': 1,
-            'book_id': 1,
-            'transaction_type': "ISSUE",
-            'transaction_date': "2023-01-01",
-            'due_date': "2023-01-15",
-            'return_date': "",
-            'status': "BORROWED",
-            'fine_amount': 0.0
-        })()
+        mock_transaction = library_service_pb2.Transaction(
+            transaction_id=1,
+            member_id=1,
+            book_id=1,
+            transaction_type="ISSUE",
+            transaction_time=Timestamp(seconds=1672531200),
+            due_time=Timestamp(seconds=1673740800),
+            status="BORROWED",
+            fine_cents=250
+        )
         
         # Mock user with proper attributes
         mock_user = type('MockUser', (), {
@@ -127,13 +134,17 @@ class TestTransactionRoutes:
         mock_client.GetBooks.return_value.books = [mock_book]
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/admin/transactions")
+        response = client.get("/api/v1/admin/transactions", headers=ADMIN_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["transaction_id"] == 1
         assert data[0]["username"] == "testuser"
         assert data[0]["book_title"] == "Test Book"
+        assert data[0]["transaction_date"] == "2023-01-01T00:00:00"
+        assert data[0]["due_date"] == "2023-01-15T00:00:00"
+        assert data[0]["return_date"] == ""
+        assert data[0]["fine_amount"] == 2.5
     
     @patch('routes.transactions.get_grpc_client')
     def test_admin_transactions_service_error(self, mock_grpc):
@@ -141,17 +152,17 @@ class TestTransactionRoutes:
         mock_client.GetTransactions.side_effect = Exception("Service error")
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/admin/transactions")
+        response = client.get("/api/v1/admin/transactions", headers=ADMIN_HEADERS)
         assert response.status_code == 500
         assert "Service unavailable" in response.json()["detail"]
     
     def test_user_transactions_invalid_user_id(self):
-        response = client.get("/api/v1/user/-1/transactions")
+        response = client.get("/api/v1/user/-1/transactions", headers=USER_HEADERS)
         assert response.status_code == 400
         assert "Valid user ID required" in response.json()["detail"]
     
     def test_user_transactions_invalid_status(self):
-        response = client.get("/api/v1/user/1/transactions?status=INVALID")
+        response = client.get("/api/v1/user/1/transactions?status=INVALID", headers=USER_HEADERS)
         assert response.status_code == 400
         assert "BORROWED, RETURNED, OVERDUE" in response.json()["detail"]
     
@@ -160,23 +171,21 @@ class TestTransactionRoutes:
         mock_client = AsyncMock()
         
         # Mock transaction with proper attributes
-        mock_transaction = type('MockUserTransaction', (), {
-            'transaction_id': 1,
-            'book_id': 1,
-            'book_title': "Test Book",
-            'book_author': "Test Author",
-            'transaction_type': "ISSUE",
-            'transaction_date': "2023-01-01",
-            'due_date': "2023-01-15",
-            'return_date': "",
-            'status': "BORROWED",
-            'fine_amount': 0.0
-        })()
+        mock_transaction = library_service_pb2.UserTransaction(
+            transaction_id=1,
+            book_id=1,
+            book_title="Test Book",
+            book_author="Test Author",
+            transaction_type="ISSUE",
+            transaction_time=Timestamp(seconds=1672531200),
+            due_time=Timestamp(seconds=1673740800),
+            status="BORROWED"
+        )
         
         mock_client.GetUserTransactions.return_value.transactions = [mock_transaction]
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/user/1/transactions")
+        response = client.get("/api/v1/user/1/transactions", headers=USER_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
@@ -189,6 +198,54 @@ class TestTransactionRoutes:
         mock_client.GetUserTransactions.side_effect = Exception("Service error")
         mock_grpc.return_value = mock_client
         
-        response = client.get("/api/v1/user/1/transactions")
+        response = client.get("/api/v1/user/1/transactions", headers=USER_HEADERS)
+        assert response.status_code == 500
+        assert "Service unavailable" in response.json()["detail"]
+class TestListResponseModes:
+    """Test protobuf and NDJSON responses of the list endpoints"""
+    
+    @patch('core.negotiation.get_raw_grpc_client')
+    def test_list_users_protobuf_is_passed_through(self, mock_raw):
+        body = library_service_pb2.GetUsersResponse(users=[library_service_pb2.User(user_id=1, username="alice")]).SerializeToString()
+        mock_raw.return_value.GetUsers = AsyncMock(return_value=body)
+        
+        response = client.get("/api/v1/admin/users", headers={**ADMIN_HEADERS, "Accept": "application/x-protobuf"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-protobuf"
+        assert response.headers["vary"] == "Accept"
+        assert response.content == body
+    
+    @patch('routes.transactions.get_grpc_client')
+    @patch('core.negotiation.get_grpc_client')
+    def test_admin_transactions_ndjson(self, mock_stream_grpc, mock_grpc):
+        mock_client = AsyncMock()
+        mock_client.GetUsers.return_value = library_service_pb2.GetUsersResponse(users=[library_service_pb2.User(user_id=1, username="alice")])
+        mock_client.GetBooks.return_value = library_service_pb2.GetBooksResponse(books=[library_service_pb2.Book(book_id=2, title="Dune")])
+        mock_grpc.return_value = mock_client
+        
+        async def stream():
+            for transaction_id in (1, 2):
+                yield library_service_pb2.Transaction(transaction_id=transaction_id, member_id=1, book_id=2, status="BORROWED")
+        mock_stream_grpc.return_value.StreamTransactions = lambda request: stream()
+        
+        response = client.get("/api/v1/admin/transactions", headers={**ADMIN_HEADERS, "Accept": "application/x-ndjson"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["transaction_id"] for row in rows] == [1, 2]
+        assert rows[0]["username"] == "alice"
+        assert rows[0]["book_title"] == "Dune"
+        mock_client.GetTransactions.assert_not_called()
+    
+    @patch('core.negotiation.get_grpc_client')
+    def test_ndjson_upstream_failure_is_500(self, mock_stream_grpc):
+        async def stream():
+            raise grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata())
+            yield
+        mock_stream_grpc.return_value.StreamUserTransactions = lambda request: stream()
+        
+        response = client.get("/api/v1/user/1/transactions", headers={**USER_HEADERS, "Accept": "application/x-ndjson"})
+        
         assert response.status_code == 500
-        assert "Service unavailable" in response.json()["detail"]
\ No newline at end of file
@@ -6,6 +6,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from services.book_service import BookService
 from services.request_service import RequestService
+from google.protobuf.timestamp_pb2 import Timestamp
+import library_service_pb2
 
 pytestmark = pytest.mark.asyncio
 
@@ -60,10 +62,12 @@ class TestBookService:
         mock_client.IssueBook.return_value = mock_response
         
         book_service = BookService(mock_client)
-        result = await book_service.issue_book(1, 1)
+        result = await book_service.issue_book(1, 1, admin_id=3)
         
         assert result["transaction_id"] == 1
         assert result["message"] == "Book issued"
+        assert list(mock_client.GetBooks.call_args[0][0].fields.paths) == ["book_id", "available_copies"]
+        assert mock_client.IssueBook.call_args[0][0].admin_id == 3
     
     async def test_issue_book_not_found(self):
         mock_client = AsyncMock()
@@ -72,7 +76,7 @@ class TestBookService:
         book_service = BookService(mock_client)
         
         with pytest.raises(HTTPException) as exc_info:
-            await book_service.issue_book(999, 1)
+            await book_service.issue_book(999, 1, admin_id=3)
         
         assert exc_info.value.status_code == 404
         assert "Book not found" in str(exc_info.value.detail)
@@ -89,7 +93,7 @@ class TestBookService:
         book_service = BookService(mock_client)
         
         with pytest.raises(HTTPException) as exc_info:
-            await book_service.issue_book(1, 1)
+            await book_service.issue_book(1, 1, admin_id=3)
         
         assert exc_info.value.status_code == 400
         assert "No copies available" in str(exc_info.value.detail)
@@ -98,18 +102,18 @@ class TestBookService:
         mock_client = AsyncMock()
         mock_response = AsyncMock()
         mock_response.success = True
-        mock_response.transaction.transaction_id = 1
-        mock_response.transaction.fine_amount = 5.0
+        mock_response.transaction = library_service_pb2.Transaction(transaction_id=1, fine_cents=500)
         mock_response.message = "Book returned"
         
         mock_client.ReturnBook.return_value = mock_response
         
         book_service = BookService(mock_client)
-        result = await book_service.return_book(1)
+        result = await book_service.return_book(1, admin_id=3)
         
         assert result["transaction_id"] == 1
         assert result["fine_amount"] == 5.0
         assert result["message"] == "Book returned"
+        assert mock_client.ReturnBook.call_args[0][0].admin_id == 3
     
     async def test_return_book_failure(self):
         mock_client = AsyncMock()
@@ -122,7 +126,7 @@ class TestBookService:
         book_service = BookService(mock_client)
         
         with pytest.raises(HTTPException) as exc_info:
-            await book_service.return_book(999)
+            await book_service.return_book(999, admin_id=3)
         
         assert exc_info.value.status_code == 400
         assert "Transaction not found" in str(exc_info.value.detail)
@@ -167,14 +171,15 @@ class TestRequestService:
         mock_client = AsyncMock()
         
         # Mock request
-        mock_request = AsyncMock()
-        mock_request.request_id = 1
-        mock_request.user_id = 1
-        mock_request.book_id = 1
-        mock_request.request_type = "ISSUE"
-        mock_request.status = "PENDING"
-        mock_request.notes = "Test request"
-        mock_request.request_date = "2023-01-01"
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=1,
+            request_type="ISSUE",
+            status="PENDING",
+            notes="Test request",
+            request_time=Timestamp(seconds=1672531200)
+        )
         
         # Mock book
         mock_book = AsyncMock()
@@ -199,19 +204,23 @@ class TestRequestService:
         assert result[0]["request_id"] == 1
         assert result[0]["book_title"] == "Test Book"
         assert result[0]["user_name"] == "testuser"
+        # Lookups ask only for the joined fields
+        assert list(mock_client.GetUsers.call_args[0][0].fields.paths) == ["user_id", "username"]
+        assert set(mock_client.GetBooks.call_args[0][0].fields.paths) == {"book_id", "title", "author", "available_copies"}
     
     async def test_get_admin_book_requests_missing_book(self):
         mock_client = AsyncMock()
         
         # Mock request with book_id that doesn't exist
-        mock_request = AsyncMock()
-        mock_request.request_id = 1
-        mock_request.user_id = 1
-        mock_request.book_id = 999
-        mock_request.request_type = "ISSUE"
-        mock_request.status = "PENDING"
-        mock_request.notes = "Test request"
-        mock_request.request_date = "2023-01-01"
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=999,
+            request_type="ISSUE",
+            status="PENDING",
+            notes="Test request",
+            request_time=Timestamp(seconds=1672531200)
+        )
         
         mock_client.GetBookRequests.return_value.requests = [mock_request]
         mock_client.GetBooks.return_value.books = []  # No books
@@ -228,15 +237,16 @@ class TestRequestService:
         mock_client = AsyncMock()
         
         # Mock request
-        mock_request = AsyncMock()
-        mock_request.request_id = 1
-        mock_request.user_id = 1
-        mock_request.book_id = 1
-        mock_request.request_type = "ISSUE"
-        mock_request.status = "PENDING"
-        mock_request.notes = "Test request"
-        mock_request.request_date = "2023-01-01"
-        mock_request.transaction_id = 0
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=1,
+            request_type="ISSUE",
+            status="PENDING",
+            notes="Test request",
+            request_time=Timestamp(seconds=1672531200),
+            transaction_id=0
+        )
         
         # Mock book
         mock_book = AsyncMock()
@@ -259,15 +269,16 @@ class TestRequestService:
         mock_client = AsyncMock()
         
         # Mock return request with transaction
-        mock_request = AsyncMock()
-        mock_request.request_id = 1
-        mock_request.user_id = 1
-        mock_request.book_id = 0
-        mock_request.request_type = "RETURN"
-        mock_request.status = "PENDING"
-        mock_request.notes = "Return request"
-        mock_request.request_date = "2023-01-01"
-        mock_request.transaction_id = 1
+        mock_request = library_service_pb2.BookRequest(
+            request_id=1,
+            user_id=1,
+            book_id=0,
+            request_type="RETURN",
+            status="PENDING",
+            notes="Return request",
+            request_time=Timestamp(seconds=1672531200),
+            transaction_id=1
+        )
         
         # Mock transaction
         mock_transaction = AsyncMock()
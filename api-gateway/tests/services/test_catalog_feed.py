@@ -0,0 +1,101 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import library_service_pb2
+from services.catalog_feed import CatalogFeed, CatalogAvailabilityWatcher, ALL_BOOKS
+from services.websocket_hub import WebSocketHub
+from routes.websocket import _parse_books
+
+pytestmark = pytest.mark.asyncio
+
+def sent_frames(websocket):
+    return [json.loads(call.args[0]) for call in websocket.send_text.await_args_list]
+
+class TestCatalogFeed:
+    """Test topic subscriptions and delta coalescing"""
+
+    async def test_burst_is_coalesced_into_one_frame(self):
+        hub = WebSocketHub()
+        feed = CatalogFeed(coalesce_window=0.01)
+        websocket = AsyncMock()
+        feed.subscribe(hub.register("", websocket), ALL_BOOKS)
+
+        for copies in (4, 3, 2):
+            feed.publish(7, copies)
+        feed.publish(9, 0)
+        await asyncio.sleep(0.05)
+
+        assert sent_frames(websocket) == [{"type": "AVAILABILITY", "books": {"7": 2, "9": 0}}]
+        await hub.close_all()
+
+    async def test_book_subscribers_only_get_their_books(self):
+        hub = WebSocketHub()
+        feed = CatalogFeed(coalesce_window=0.01)
+        interested, other = AsyncMock(), AsyncMock()
+        feed.subscribe(hub.register("1", interested), [7])
+        feed.subscribe(hub.register("2", other), [8])
+
+        feed.publish(7, 1)
+        await asyncio.sleep(0.05)
+
+        assert sent_frames(interested) == [{"type": "AVAILABILITY", "books": {"7": 1}}]
+        other.send_text.assert_not_awaited()
+        await hub.close_all()
+
+    async def test_unsubscribe_and_deleted_books(self):
+        hub = WebSocketHub()
+        feed = CatalogFeed(coalesce_window=0.01)
+        websocket = AsyncMock()
+        connection = hub.register("1", websocket)
+        feed.subscribe(connection, [7, 8])
+        feed.unsubscribe(connection, [8])
+
+        feed.publish(7, 0, deleted=True)
+        feed.publish(8, 5)
+        await asyncio.sleep(0.05)
+
+        assert sent_frames(websocket) == [{"type": "AVAILABILITY", "books": {}, "deleted": [7]}]
+        feed.unsubscribe(connection)
+        assert connection not in feed.subscribers
+        await hub.close_all()
+
+    async def test_closed_connections_are_dropped_on_flush(self):
+        hub = WebSocketHub()
+        feed = CatalogFeed(coalesce_window=0.01)
+        connection = hub.register("1", AsyncMock())
+        feed.subscribe(connection, ALL_BOOKS)
+        hub.unregister(connection)
+
+        feed.publish(7, 1)
+        await asyncio.sleep(0.05)
+
+        assert feed.subscribers == {}
+
+    async def test_watcher_feeds_availability_changes(self):
+        feed = CatalogFeed(coalesce_window=10)
+        watcher = CatalogAvailabilityWatcher(feed)
+
+        watcher.handle_event(library_service_pb2.BookAvailabilityEvent(cursor=1, event_type="SUBSCRIBED"))
+        watcher.handle_event(library_service_pb2.BookAvailabilityEvent(
+            cursor=2, event_type="AVAILABILITY_CHANGED", book_id=7, available_copies=3
+        ))
+
+        assert feed.pending == {7: (3, False)}
+        feed.close()
+
+class TestParseBooks:
+    """Test SUBSCRIBE frame validation"""
+
+    def test_accepts_all_and_id_lists(self):
+        assert _parse_books("all") == ALL_BOOKS
+        assert _parse_books([1, 2]) == [1, 2]
+
+    def test_rejects_malformed_targets(self):
+        assert _parse_books("some") is None
+        assert _parse_books([0]) is None
+        assert _parse_books(["1"]) is None
+        assert _parse_books(None) is None
@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from services import notification_bus
+from services.notification_bus import (
+    InMemoryBroker, InMemoryNotificationBus, PostgresNotificationBus, create_bus
+)
+from services.notification_service import NotificationService
+
+pytestmark = pytest.mark.asyncio
+
+class TestInMemoryBus:
+    """Test cross-replica delivery through a shared broker"""
+
+    async def test_notification_reaches_user_on_other_replica(self):
+        broker = InMemoryBroker()
+        replica_a = NotificationService()
+        replica_b = NotificationService()
+        await replica_a.start(InMemoryNotificationBus(broker))
+        await replica_b.start(InMemoryNotificationBus(broker))
+        websocket = AsyncMock()
+        replica_b.add_connection("42", websocket)
+
+        notification = {"type": "REQUEST_APPROVED", "message": "ok"}
+        await replica_a.send_notification(42, notification)
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once_with(json.dumps(notification))
+        await replica_a.stop()
+        await replica_b.stop()
+
+    async def test_stopped_bus_delivers_locally(self):
+        bus = InMemoryNotificationBus(InMemoryBroker())
+        received = []
+        await bus.start(received.append)
+        await bus.stop()
+
+        await bus.publish({"user_id": "1", "notification": {}})
+
+        assert not bus.connected
+        assert received == []
+
+class TestPostgresBus:
+    """Test LISTEN/NOTIFY payload handling and local fallback"""
+
+    async def test_publish_falls_back_locally_when_not_connected(self):
+        bus = PostgresNotificationBus(dsn="postgresql://invalid")
+        received = []
+        with patch.object(notification_bus, "asyncpg", None):
+            await bus.start(received.append)
+
+        await bus.publish({"user_id": "1", "notification": {"type": "TEST"}})
+
+        assert received == [{"user_id": "1", "notification": {"type": "TEST"}}]
+        await bus.stop()
+
+    async def test_publish_uses_pg_notify(self):
+        bus = PostgresNotificationBus(dsn="postgresql://invalid", channel="test_channel")
+        bus._listen_conn = AsyncMock()
+        bus._listen_conn.is_closed = lambda: False
+        bus._pool = AsyncMock()
+
+        await bus.publish({"user_id": "1", "notification": {}})
+
+        bus._pool.execute.assert_awaited_once_with(
+            "SELECT pg_notify($1, $2)", "test_channel", json.dumps({"user_id": "1", "notification": {}})
+        )
+
+    async def test_oversized_payload_not_sent(self):
+        bus = PostgresNotificationBus(dsn="postgresql://invalid")
+        bus._listen_conn = AsyncMock()
+        bus._listen_conn.is_closed = lambda: False
+        bus._pool = AsyncMock()
+        received = []
+        bus._handler = received.append
+
+        await bus.publish({"user_id": "1", "notification": {"message": "x" * 9000}})
+
+        bus._pool.execute.assert_not_awaited()
+        assert len(received) == 1
+
+    async def test_notify_payload_dispatched(self):
+        bus = PostgresNotificationBus(dsn="postgresql://invalid")
+        received = []
+        bus._handler = received.append
+
+        bus._on_notify(None, 1, bus.channel, json.dumps({"user_id": "7", "notification": {}}))
+        bus._on_notify(None, 1, bus.channel, "not json")
+
+        assert received == [{"user_id": "7", "notification": {}}]
+
+class TestCreateBus:
+    """Test backend selection"""
+
+    def test_backend_from_env(self, monkeypatch):
+        monkeypatch.setenv("NOTIFICATION_BUS", "memory")
+        assert isinstance(create_bus(), InMemoryNotificationBus)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_bus("redis")
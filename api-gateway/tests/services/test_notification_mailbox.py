@@ -0,0 +1,110 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from services.notification_mailbox import NotificationMailbox
+from services.notification_service import NotificationService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestNotificationMailbox:
+    """Test retention, ordering and expiry of the per-user ring buffer"""
+
+    def test_since_returns_newer_entries_with_cursor(self):
+        mailbox = NotificationMailbox(max_per_user=10, ttl=60)
+        mailbox.append(1, 100, {"type": "A"})
+        mailbox.append(1, 200, {"type": "B"})
+
+        assert mailbox.since(1, 100) == [{"type": "B", "cursor": 200}]
+        assert [n["cursor"] for n in mailbox.since("1", 0)] == [100, 200]
+        assert mailbox.since(2, 0) == []
+
+    def test_bounded_per_user(self):
+        mailbox = NotificationMailbox(max_per_user=2, ttl=60)
+        for cursor in (1, 2, 3):
+            mailbox.append(1, cursor, {"n": cursor})
+
+        assert [n["cursor"] for n in mailbox.since(1, 0)] == [2, 3]
+
+    def test_out_of_order_insert_and_duplicate(self):
+        mailbox = NotificationMailbox(max_per_user=10, ttl=60)
+        mailbox.append(1, 300, {})
+        mailbox.append(1, 100, {})
+        mailbox.append(1, 300, {})
+
+        assert [n["cursor"] for n in mailbox.since(1, 0)] == [100, 300]
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        mailbox = NotificationMailbox(max_per_user=10, ttl=60, clock=clock)
+        mailbox.append(1, 1, {})
+        clock.now += 30
+        mailbox.append(1, 2, {})
+        clock.now += 45
+
+        assert [n["cursor"] for n in mailbox.since(1, 0)] == [2]
+        clock.now += 60
+        mailbox.prune()
+        assert mailbox.boxes == {}
+
+@pytest.mark.asyncio
+class TestReplayOnReconnect:
+    """Test offline delivery through the mailbox"""
+
+    async def test_missed_notifications_replayed_in_one_frame(self):
+        service = NotificationService(mailbox=NotificationMailbox(max_per_user=10, ttl=60))
+        service.deliver_local(5, {"type": "REQUEST_APPROVED", "message": "one"}, cursor=11)
+        service.deliver_local(5, {"type": "REQUEST_REJECTED", "message": "two"}, cursor=12)
+
+        websocket = AsyncMock()
+        service.add_connection("5", websocket, cursor=11)
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once()
+        frame = json.loads(websocket.send_text.await_args[0][0])
+        assert frame["type"] == "NOTIFICATION_BATCH"
+        assert [n["message"] for n in frame["notifications"]] == ["two"]
+        assert frame["cursor"] == 12
+        await service.hub.close_all()
+
+    async def test_live_notifications_carry_cursor(self):
+        service = NotificationService(mailbox=NotificationMailbox(max_per_user=10, ttl=60))
+        websocket = AsyncMock()
+        service.add_connection("5", websocket)
+
+        service.deliver_local(5, {"type": "REQUEST_APPROVED"}, cursor=42)
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once_with(json.dumps({"type": "REQUEST_APPROVED", "cursor": 42}))
+        await service.hub.close_all()
+
+    async def test_notifications_without_event_are_not_retained(self):
+        service = NotificationService(mailbox=NotificationMailbox(max_per_user=10, ttl=60))
+        websocket = AsyncMock()
+        service.add_connection("5", websocket)
+
+        await service.send_notification(5, {"type": "REQUEST_APPROVED"})
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once_with(json.dumps({"type": "REQUEST_APPROVED"}))
+        assert service.mailbox.since(5, 0) == []
+        await service.hub.close_all()
+
+    async def test_connect_without_cursor_does_not_replay(self):
+        service = NotificationService(mailbox=NotificationMailbox(max_per_user=10, ttl=60))
+        service.deliver_local(5, {"type": "REQUEST_APPROVED"}, cursor=3)
+
+        websocket = AsyncMock()
+        service.add_connection("5", websocket)
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_not_awaited()
+        await service.hub.close_all()
@@ -1,28 +1,34 @@
 import pytest
+import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from services.notification_service import NotificationService
+from services.websocket_hub import WebSocketHub
+
+pytestmark = pytest.mark.asyncio
 
 class TestNotificationService:
     """Test notification service WebSocket management"""
     
-    def test_add_connection(self):
+    async def test_add_connection(self):
         service = NotificationService()
-        mock_websocket = MagicMock()
+        mock_websocket = AsyncMock()
         
-        service.add_connection("123", mock_websocket)
+        connection = service.add_connection("123", mock_websocket)
         
         assert "123" in service.user_connections
-        assert service.user_connections["123"] == mock_websocket
+        assert connection in service.user_connections["123"]
+        assert connection.websocket == mock_websocket
+        await service.hub.close_all()
     
-    def test_remove_connection(self):
+    async def test_remove_connection(self):
         service = NotificationService()
-        mock_websocket = MagicMock()
         
-        service.add_connection("123", mock_websocket)
-        service.remove_connection("123")
+        connection = service.add_connection("123", AsyncMock())
+        service.remove_connection(connection)
         
         assert "123" not in service.user_connections
     
@@ -31,14 +37,35 @@ class TestNotificationService:
         
         # Should not raise error when user not connected
         await service.send_notification(999, {"type": "TEST", "message": "test"})
-        # No assertion needed - should complete without error
     
     async def test_send_notification_dead_connection(self):
         service = NotificationService()
         mock_ws = AsyncMock()
         mock_ws.send_text.side_effect = Exception("Connection closed")
-        service.user_connections["123"] = mock_ws
+        service.add_connection("123", mock_ws)
         
-        # Should remove dead connection
+        # Should remove dead connection once the sender task hits the error
         await service.send_notification(123, {"type": "TEST", "message": "test"})
-        assert "123" not in service.user_connections
\ No newline at end of file
+        await asyncio.sleep(0.01)
+        assert "123" not in service.user_connections
+    
+    async def test_send_notification_does_not_wait_for_socket(self):
+        service = NotificationService()
+        blocked = asyncio.Event()
+        
+        async def slow_send(text):
+            await blocked.wait()
+        
+        mock_ws = AsyncMock()
+        mock_ws.send_text.side_effect = slow_send
+        service.add_connection("123", mock_ws)
+        
+        await asyncio.wait_for(
+            service.send_notification(123, {"type": "TEST", "message": "test"}), timeout=0.1
+        )
+        
+        # The write is still in progress on the connection's sender task
+        await asyncio.sleep(0.01)
+        mock_ws.send_text.assert_called_once()
+        blocked.set()
+        await service.hub.close_all()
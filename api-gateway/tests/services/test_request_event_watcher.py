@@ -0,0 +1,124 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+import grpc
+import library_service_pb2
+from services.notification_service import NotificationService
+from services.request_event_watcher import RequestEventWatcher
+
+pytestmark = pytest.mark.asyncio
+
+def make_event(cursor, event_type, user_id=42, request_type="ISSUE", request_id=7):
+    return library_service_pb2.BookRequestEvent(
+        cursor=cursor,
+        event_type=event_type,
+        request=library_service_pb2.BookRequest(
+            request_id=request_id, user_id=user_id, request_type=request_type
+        )
+    )
+
+class FakeStream:
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            yield event
+        if self.error is not None:
+            raise self.error
+
+class FakeRpcError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+class TestHandleEvent:
+    """Test event to notification mapping"""
+
+    async def test_approved_event_notifies_local_sockets(self):
+        service = NotificationService()
+        websocket = AsyncMock()
+        service.add_connection("42", websocket)
+        watcher = RequestEventWatcher(service)
+
+        watcher.handle_event(make_event(5, "REQUEST_APPROVED"))
+        await asyncio.sleep(0.01)
+
+        websocket.send_text.assert_awaited_once_with(json.dumps({
+            "type": "REQUEST_APPROVED",
+            "message": "Your issue request has been approved",
+            "requestId": 7
+        }))
+        assert watcher.cursor == 5
+        await service.hub.close_all()
+
+    async def test_created_and_subscribed_events_only_advance_cursor(self):
+        service = MagicMock()
+        watcher = RequestEventWatcher(service)
+
+        watcher.handle_event(make_event(0, "SUBSCRIBED"))
+        watcher.handle_event(make_event(3, "REQUEST_CREATED"))
+
+        service.deliver_local.assert_not_called()
+        assert watcher.cursor == 3
+
+    async def test_notification_cursor_is_the_event_cursor(self):
+        service = MagicMock()
+        watcher = RequestEventWatcher(service)
+
+        watcher.handle_event(make_event(5, "REQUEST_APPROVED"))
+
+        assert service.deliver_local.call_args[1]["cursor"] == 5
+
+class TestResume:
+    """Test reconnect from the last cursor"""
+
+    async def test_reconnects_with_last_cursor(self):
+        service = MagicMock()
+        watcher = RequestEventWatcher(service, max_backoff=0)
+        stub = MagicMock()
+        calls = []
+
+        def watch(request):
+            calls.append(request.since_cursor)
+            if len(calls) == 1:
+                return FakeStream([make_event(11, "SUBSCRIBED"), make_event(12, "REQUEST_REJECTED")], FakeRpcError())
+            return FakeStream([])
+
+        stub.WatchBookRequestEvents.side_effect = watch
+        with patch('services.stream_watcher.get_grpc_client', AsyncMock(return_value=stub)), \
+             patch('services.stream_watcher.asyncio.sleep', AsyncMock(side_effect=[None, asyncio.CancelledError()])):
+            watcher.start()
+            await asyncio.gather(watcher._task, return_exceptions=True)
+
+        assert calls == [0, 12]
+        service.deliver_local.assert_called_once()
+        assert service.deliver_local.call_args[0][1]["type"] == "REQUEST_REJECTED"
+        assert not watcher.running
+
+    async def test_connected_once_replay_is_done(self):
+        watcher = RequestEventWatcher(MagicMock(), max_backoff=0)
+        watcher.cursor = 10
+        stub = MagicMock()
+        stub.WatchBookRequestEvents.return_value = FakeStream(
+            [make_event(11, "REQUEST_APPROVED"), make_event(11, "SUBSCRIBED"), make_event(12, "REQUEST_REJECTED")],
+            FakeRpcError()
+        )
+        seen = []
+
+        with patch.object(watcher, 'handle_event', side_effect=lambda event: seen.append((event.event_type, watcher.connected))), \
+             patch('services.stream_watcher.get_grpc_client', AsyncMock(return_value=stub)), \
+             patch('services.stream_watcher.asyncio.sleep', AsyncMock(side_effect=asyncio.CancelledError())):
+            watcher.start()
+            await asyncio.gather(watcher._task, return_exceptions=True)
+
+        # Replayed events arrive before the watcher counts as caught up
+        assert seen == [("REQUEST_APPROVED", False), ("SUBSCRIBED", True), ("REQUEST_REJECTED", True)]
+        assert not watcher.connected
@@ -0,0 +1,122 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import AsyncMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from core.metrics import registry
+from services.websocket_hub import WebSocketHub, SLOW_CONSUMER_CLOSE_CODE, IDLE_CLOSE_CODE, messages_dropped
+
+pytestmark = pytest.mark.asyncio
+
+class BlockedWebSocket:
+    """WebSocket whose writes hang until released"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.sent = []
+        self.close = AsyncMock()
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(text)
+
+class TestWebSocketHub:
+    """Test per-connection queues, overflow policies and eviction"""
+
+    async def test_drop_oldest_keeps_newest_messages(self):
+        hub = WebSocketHub(max_queue=2, overflow_policy="drop_oldest")
+        websocket = BlockedWebSocket()
+        connection = hub.register("1", websocket)
+        await asyncio.sleep(0)
+        before = messages_dropped.value("queue_full")
+
+        hub.publish(1, {"n": 0})
+        await asyncio.sleep(0)
+        for i in range(1, 5):
+            hub.publish(1, {"n": i})
+        # One message is held by the sender task, two are queued
+        assert connection.queue.qsize() == 2
+        assert messages_dropped.value("queue_full") == before + 2
+
+        websocket.release.set()
+        await asyncio.sleep(0.01)
+        assert [json.loads(text)["n"] for text in websocket.sent] == [0, 3, 4]
+        await hub.close_all()
+
+    async def test_close_policy_evicts_slow_consumer(self):
+        hub = WebSocketHub(max_queue=1, overflow_policy="close")
+        websocket = BlockedWebSocket()
+        hub.register("1", websocket)
+        await asyncio.sleep(0)
+
+        hub.publish(1, "a")
+        hub.publish(1, "b")
+        assert hub.publish(1, "c") == 0
+        await asyncio.sleep(0)
+
+        assert "1" not in hub.connections
+        websocket.close.assert_awaited_once_with(code=SLOW_CONSUMER_CLOSE_CODE, reason="slow_consumer")
+
+    async def test_slow_consumer_does_not_block_others(self):
+        hub = WebSocketHub(max_queue=10)
+        slow = BlockedWebSocket()
+        fast = AsyncMock()
+        hub.register("1", slow)
+        hub.register("1", fast)
+
+        assert hub.publish("1", {"type": "TEST"}) == 2
+        await asyncio.sleep(0.01)
+
+        fast.send_text.assert_awaited_once()
+        assert slow.sent == []
+        slow.release.set()
+        await hub.close_all()
+
+    async def test_send_timeout_evicts(self):
+        hub = WebSocketHub(send_timeout=0.01)
+        websocket = BlockedWebSocket()
+        hub.register("1", websocket)
+
+        hub.publish(1, "hello")
+        await asyncio.sleep(0.05)
+
+        assert hub.connection_count() == 0
+
+    async def test_heartbeat_pings_and_evicts_idle(self):
+        hub = WebSocketHub(heartbeat_interval=0.01, idle_timeout=0.035)
+        active = AsyncMock()
+        idle = AsyncMock()
+        active_connection = hub.register("1", active)
+        hub.register("2", idle)
+
+        for _ in range(6):
+            await asyncio.sleep(0.01)
+            active_connection.touch()
+
+        assert "2" not in hub.connections
+        idle.close.assert_awaited_once_with(code=IDLE_CLOSE_CODE, reason="idle")
+        active.send_text.assert_any_await(json.dumps({"type": "PING"}))
+        await hub.close_all()
+
+    async def test_metrics_report_connections_and_depth(self):
+        hub = WebSocketHub()
+        websocket = BlockedWebSocket()
+        connection = hub.register("1", websocket)
+        await asyncio.sleep(0)
+        hub.publish(1, "a")
+        await asyncio.sleep(0)
+        hub.publish(1, "b")
+
+        assert hub.connection_count() == 1
+        assert hub.max_queue_depth() == 1
+        output = registry.render()
+        assert "gateway_ws_connections" in output
+        assert "gateway_ws_send_queue_max_depth" in output
+        websocket.release.set()
+        await hub.close_all()
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            WebSocketHub(overflow_policy="block")
@@ -56,7 +56,7 @@ class TestErrorHandling:
         book_service = BookService(mock_client)
         
         with pytest.raises(HTTPException) as exc_info:
-            await book_service.issue_book(999, 1)
+            await book_service.issue_book(999, 1, admin_id=3)
         
         assert exc_info.value.status_code == 404
         assert "Book not found" in str(exc_info.value.detail)
@@ -74,7 +74,7 @@ class TestErrorHandling:
         book_service = BookService(mock_client)
         
         with pytest.raises(HTTPException) as exc_info:
-            await book_service.issue_book(1, 1)
+            await book_service.issue_book(1, 1, admin_id=3)
         
         assert exc_info.value.status_code == 400
         assert "No copies available" in str(exc_info.value.detail)
\ No newline at end of file
@@ -1,9 +1,13 @@
+import json
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, ANY
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from core.grpc_client import get_grpc_client
+import grpc.aio
+import library_service_pb2
+import library_service_pb2_grpc
+from core.grpc_client import get_grpc_client, get_raw_grpc_client, close_grpc_channels, resolve_target, service_config, channel_options
 
 pytestmark = pytest.mark.asyncio
 
@@ -14,21 +18,130 @@ class TestGrpcClient:
     @patch('core.grpc_client.library_service_pb2_grpc.LibraryServiceStub')
     async def test_get_grpc_client_default_config(self, mock_stub, mock_channel):
         mock_stub.return_value = AsyncMock()
+        mock_channel.return_value = AsyncMock()
         
         client = await get_grpc_client()
         
-        mock_channel.assert_called_once_with('localhost:50051')
+        mock_channel.assert_called_once_with('localhost:50051', options=ANY, interceptors=ANY)
         mock_stub.assert_called_once()
         assert client is not None
+        await close_grpc_channels()
     
     @patch.dict(os.environ, {'GRPC_SERVER_HOST': 'testhost', 'GRPC_SERVER_PORT': '9999'})
     @patch('core.grpc_client.grpc.aio.insecure_channel')
     @patch('core.grpc_client.library_service_pb2_grpc.LibraryServiceStub')
     async def test_get_grpc_client_custom_config(self, mock_stub, mock_channel):
         mock_stub.return_value = AsyncMock()
+        mock_channel.return_value = AsyncMock()
         
         client = await get_grpc_client()
         
-        mock_channel.assert_called_once_with('testhost:9999')
+        mock_channel.assert_called_once_with('testhost:9999', options=ANY, interceptors=ANY)
         mock_stub.assert_called_once()
-        assert client is not None
\ No newline at end of file
+        assert client is not None
+        await close_grpc_channels()
+    
+    @patch('core.grpc_client.grpc.aio.insecure_channel')
+    @patch('core.grpc_client.library_service_pb2_grpc.LibraryServiceStub')
+    async def test_channel_shared_across_requests(self, mock_stub, mock_channel):
+        channel = mock_channel.return_value = AsyncMock()
+        
+        first = await get_grpc_client()
+        second = await get_grpc_client()
+        
+        assert first is second
+        mock_channel.assert_called_once()
+        config = json.loads(dict(mock_channel.call_args.kwargs['options'])['grpc.service_config'])
+        assert config == service_config()
+        await close_grpc_channels()
+        channel.close.assert_awaited_once()
+
+    @patch.dict(os.environ, {'GRPC_SERVER_TARGET': 'inprocess'})
+    @patch('core.grpc_client.grpc.aio.insecure_channel')
+    @patch('core.inprocess.load_servicer')
+    async def test_inprocess_target_skips_the_channel(self, mock_load, mock_channel):
+        with patch('core.inprocess._stub', None):
+            client = await get_grpc_client()
+            
+            assert client.servicer is mock_load.return_value
+            assert await get_grpc_client() is client
+        mock_load.assert_called_once()
+        mock_channel.assert_not_called()
+    
+    async def test_unix_socket_target(self, tmp_path):
+        class Books(library_service_pb2_grpc.LibraryServiceServicer):
+            async def GetBooks(self, request, context):
+                return library_service_pb2.GetBooksResponse(books=[library_service_pb2.Book(book_id=7)])
+        
+        server = grpc.aio.server()
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(Books(), server)
+        server.add_insecure_port(f"unix:{tmp_path}/grpc.sock")
+        await server.start()
+        try:
+            with patch.dict(os.environ, {'GRPC_SERVER_TARGET': f"unix:{tmp_path}/grpc.sock"}):
+                client = await get_grpc_client()
+                response = await client.GetBooks(library_service_pb2.GetBooksRequest(), timeout=5)
+            
+            assert [book.book_id for book in response.books] == [7]
+        finally:
+            await close_grpc_channels()
+            await server.stop(None)
+    
+    async def test_raw_client_passes_response_bytes_through(self, tmp_path):
+        expected = library_service_pb2.GetBooksResponse(books=[library_service_pb2.Book(book_id=7, title="Dune")])
+        
+        class Books(library_service_pb2_grpc.LibraryServiceServicer):
+            async def GetBooks(self, request, context):
+                assert request.search_query == "du"
+                return expected
+        
+        server = grpc.aio.server()
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(Books(), server)
+        server.add_insecure_port(f"unix:{tmp_path}/grpc.sock")
+        await server.start()
+        try:
+            with patch.dict(os.environ, {'GRPC_SERVER_TARGET': f"unix:{tmp_path}/grpc.sock"}):
+                raw_client = await get_raw_grpc_client()
+                body = await raw_client.GetBooks(library_service_pb2.GetBooksRequest(search_query="du"), timeout=5)
+            
+            assert body == expected.SerializeToString()
+        finally:
+            await close_grpc_channels()
+            await server.stop(None)
+    
+    @patch.dict(os.environ, {'GRPC_SERVER_TARGET': 'inprocess'})
+    async def test_raw_client_serializes_inprocess_responses(self):
+        stub = AsyncMock()
+        stub.GetUsers.return_value = library_service_pb2.GetUsersResponse(users=[library_service_pb2.User(user_id=3)])
+        
+        with patch('core.inprocess._stub', stub):
+            raw_client = await get_raw_grpc_client()
+            body = await raw_client.GetUsers(library_service_pb2.GetUsersRequest())
+        
+        assert library_service_pb2.GetUsersResponse.FromString(body).users[0].user_id == 3
+
+class TestResolveTarget:
+    """Test backend list handling"""
+    
+    def test_uris_pass_through(self):
+        assert resolve_target('dns:///grpc-server:50051') == 'dns:///grpc-server:50051'
+        assert resolve_target('ipv4:127.0.0.1:1,127.0.0.1:2') == 'ipv4:127.0.0.1:1,127.0.0.1:2'
+        assert resolve_target('localhost:50051') == 'localhost:50051'
+        assert resolve_target('unix:/run/grpc/library.0.sock,/run/grpc/library.1.sock') == 'unix:/run/grpc/library.0.sock,/run/grpc/library.1.sock'
+    
+    def test_host_list_becomes_static_address_list(self):
+        assert resolve_target('127.0.0.1:50051, 127.0.0.1:50052') == 'ipv4:127.0.0.1:50051,127.0.0.1:50052'
+    
+    def test_service_config_balances_healthy_backends(self):
+        config = service_config()
+        policy = config["loadBalancingConfig"][0]["outlier_detection_experimental"]
+        
+        assert policy["childPolicy"] == [{"round_robin": {}}]
+        assert config["healthCheckConfig"] == {"serviceName": "library.LibraryService"}
+    
+    @patch.dict(os.environ, {'GATEWAY_GRPC_MAX_RECEIVE_MESSAGE_BYTES': '-1'})
+    def test_message_size_limits(self):
+        options = dict(channel_options())
+        
+        assert options["grpc.max_receive_message_length"] == -1
+        assert options["grpc.max_send_message_length"] == 4 * 1024 * 1024
@@ -1,10 +1,16 @@
 import pytest
 import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from core.logging_config import JSONFormatter, setup_logging
+from core.logging_config import (
+    JSONFormatter, setup_logging, SamplingFilter, RateLimitFilter, ContextQueueHandler
+)
+from core.tracing import start_span
+from shared import logging_config as shared_logging
 
 class TestJSONFormatter:
     """Test JSON logging formatter"""
@@ -40,11 +46,74 @@ class TestJSONFormatter:
         assert parsed["action"] == "test_action"
         assert parsed["level"] == "ERROR"
 
+def make_record(name="test", level=logging.INFO, msg="message", args=()):
+    return logging.LogRecord(
+        name=name, level=level, pathname="", lineno=1,
+        msg=msg, args=args, exc_info=None
+    )
+
 class TestSetupLogging:
     """Test logging setup function"""
     
     def test_setup_logging_returns_logger(self):
         logger = setup_logging()
         assert isinstance(logger, logging.Logger)
-        assert len(logger.handlers) == 1
-        assert isinstance(logger.handlers[0].formatter, JSONFormatter)
\ No newline at end of file
+        root_handlers = logging.getLogger().handlers
+        assert len(root_handlers) == 1
+        assert isinstance(root_handlers[0], logging.handlers.QueueHandler)
+        listener_handlers = shared_logging._listener.handlers
+        assert len(listener_handlers) == 1
+        assert isinstance(listener_handlers[0].formatter, JSONFormatter)
+    
+    def test_log_level_from_env(self, monkeypatch):
+        monkeypatch.setenv("LOG_LEVEL", "warning")
+        setup_logging()
+        assert logging.getLogger().level == logging.WARNING
+        monkeypatch.delenv("LOG_LEVEL")
+        setup_logging()
+        assert logging.getLogger().level == logging.INFO
+
+class TestContextQueueHandler:
+    """Test record preparation before hand-off to the listener thread"""
+    
+    def test_prepare_resolves_message_and_trace(self):
+        handler = ContextQueueHandler(queue.Queue())
+        record = make_record(msg="user %s", args=(42,))
+        
+        with start_span("request") as span:
+            prepared = handler.prepare(record)
+        
+        assert prepared.msg == "user 42"
+        assert prepared.args is None
+        assert prepared.trace_id == span.trace_id
+        parsed = json.loads(JSONFormatter().format(prepared))
+        assert parsed["trace_id"] == span.trace_id
+    
+    def test_full_queue_drops_record(self):
+        handler = ContextQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record())
+        handler.handle(make_record())
+        assert handler.dropped == 1
+
+class TestFilters:
+    """Test per-logger sampling and rate limiting"""
+    
+    def test_sampling_uses_longest_prefix(self):
+        sampling = SamplingFilter({"services": 1.0, "services.book_service": 0.0})
+        assert not sampling.filter(make_record(name="services.book_service"))
+        assert sampling.filter(make_record(name="services.auth_service"))
+    
+    def test_sampling_never_drops_warnings(self):
+        sampling = SamplingFilter({"services": 0.0})
+        assert sampling.filter(make_record(name="services", level=logging.WARNING))
+    
+    def test_rate_limit_reports_suppressed(self):
+        rate_limit = RateLimitFilter(per_second=0.0001, burst=1)
+        assert rate_limit.filter(make_record())
+        assert not rate_limit.filter(make_record())
+        assert not rate_limit.filter(make_record())
+        
+        rate_limit._buckets[("test", logging.INFO)][0] = 1
+        record = make_record()
+        assert rate_limit.filter(record)
+        assert record.suppressed == 2
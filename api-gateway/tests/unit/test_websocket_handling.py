@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from unittest.mock import AsyncMock
 import json
 import sys
 import os
@@ -15,53 +16,65 @@ class TestWebSocketHandling:
         service = NotificationService()
         assert service.user_connections == {}
     
-    def test_add_multiple_connections(self):
+    async def test_add_multiple_connections(self):
         service = NotificationService()
-        ws1 = MagicMock()
-        ws2 = MagicMock()
         
-        service.add_connection("user1", ws1)
-        service.add_connection("user2", ws2)
+        service.add_connection("user1", AsyncMock())
+        service.add_connection("user2", AsyncMock())
         
         assert len(service.user_connections) == 2
-        assert service.user_connections["user1"] == ws1
-        assert service.user_connections["user2"] == ws2
+        assert service.hub.connection_count() == 2
+        await service.hub.close_all()
     
-    def test_remove_nonexistent_connection(self):
+    async def test_remove_nonexistent_connection(self):
         service = NotificationService()
+        other = NotificationService()
+        connection = other.add_connection("user1", AsyncMock())
         # Should not raise error
-        service.remove_connection("nonexistent")
+        service.remove_connection(connection)
         assert len(service.user_connections) == 0
+        await other.hub.close_all()
     
-    def test_overwrite_existing_connection(self):
+    async def test_second_tab_does_not_overwrite_first(self):
         service = NotificationService()
-        ws1 = MagicMock()
-        ws2 = MagicMock()
+        ws1 = AsyncMock()
+        ws2 = AsyncMock()
         
         service.add_connection("user1", ws1)
-        service.add_connection("user1", ws2)  # Overwrite
+        service.add_connection("user1", ws2)
         
         assert len(service.user_connections) == 1
-        assert service.user_connections["user1"] == ws2
+        assert len(service.user_connections["user1"]) == 2
+        
+        notification = {"type": "TEST", "message": "Hello"}
+        await service.send_notification("user1", notification)
+        await asyncio.sleep(0.01)
+        
+        ws1.send_text.assert_called_once_with(json.dumps(notification))
+        ws2.send_text.assert_called_once_with(json.dumps(notification))
+        await service.hub.close_all()
     
     async def test_send_notification_success(self):
         service = NotificationService()
         mock_ws = AsyncMock()
-        service.user_connections["123"] = mock_ws
+        service.add_connection("123", mock_ws)
         
         notification = {"type": "TEST", "message": "Hello"}
         await service.send_notification(123, notification)
+        await asyncio.sleep(0.01)
         
         mock_ws.send_text.assert_called_once_with(json.dumps(notification))
+        await service.hub.close_all()
     
     async def test_send_notification_connection_error_cleanup(self):
         service = NotificationService()
         mock_ws = AsyncMock()
         mock_ws.send_text.side_effect = Exception("Connection closed")
-        service.user_connections["123"] = mock_ws
+        service.add_connection("123", mock_ws)
         
         notification = {"type": "TEST", "message": "Hello"}
         await service.send_notification(123, notification)
+        await asyncio.sleep(0.01)
         
         # Connection should be removed after error
         assert "123" not in service.user_connections
@@ -70,13 +83,15 @@ class TestWebSocketHandling:
         service = NotificationService()
         mock_ws1 = AsyncMock()
         mock_ws2 = AsyncMock()
-        service.user_connections["1"] = mock_ws1
-        service.user_connections["2"] = mock_ws2
+        service.add_connection("1", mock_ws1)
+        service.add_connection("2", mock_ws2)
         
         notification = {"type": "BROADCAST", "message": "Hello all"}
         
         await service.send_notification(1, notification)
         await service.send_notification(2, notification)
+        await asyncio.sleep(0.01)
         
         mock_ws1.send_text.assert_called_once_with(json.dumps(notification))
-        mock_ws2.send_text.assert_called_once_with(json.dumps(notification))
\ No newline at end of file
+        mock_ws2.send_text.assert_called_once_with(json.dumps(notification))
+        await service.hub.close_all()
@@ -67,6 +67,22 @@ CREATE TABLE IF NOT EXISTS book_requests (
     transaction_id INTEGER
 );
 
+-- Transactional outbox: rows are written in the same transaction as the
+-- state change they describe. event_ids can commit out of order, so the
+-- dispatcher numbers committed rows from outbox_position_seq and streams
+-- them to subscribers in position order
+CREATE SEQUENCE IF NOT EXISTS outbox_position_seq;
+
+CREATE TABLE IF NOT EXISTS outbox_events (
+    event_id BIGSERIAL PRIMARY KEY,
+    aggregate_type VARCHAR(50) NOT NULL,
+    aggregate_id INTEGER NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    position BIGINT UNIQUE
+);
+
 -- ============================================================================
 -- 2. INSERT USERS (30 total: 3 admins + 27 users)
 -- ============================================================================
@@ -402,6 +418,11 @@ CREATE INDEX IF NOT EXISTS idx_requests_book ON book_requests(book_id);
 CREATE INDEX IF NOT EXISTS idx_requests_status ON book_requests(status);
 CREATE INDEX IF NOT EXISTS idx_requests_date ON book_requests(request_date);
 
+-- Outbox indexes
+CREATE INDEX IF NOT EXISTS idx_outbox_aggregate ON outbox_events(aggregate_type, position);
+CREATE INDEX IF NOT EXISTS idx_outbox_unpositioned ON outbox_events(event_id) WHERE position IS NULL;
+CREATE INDEX IF NOT EXISTS idx_outbox_created ON outbox_events(created_at);
+
 -- ============================================================================
 -- 7. VERIFY DATA INTEGRITY
 -- ============================================================================
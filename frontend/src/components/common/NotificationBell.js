@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Bell } from 'lucide-react';
 import ErrorBoundary from './ErrorBoundary';
+import { notificationSocketUrl, unpackNotifications } from '../../utils/notificationCursor';
 
 const NotificationBell = ({ user }) => {
   const [notifications, setNotifications] = useState([]);
@@ -10,21 +11,27 @@ const NotificationBell = ({ user }) => {
     if (!user?.user_id) return;
     
     const wsUrl = process.env.REACT_APP_WS_URL || 'ws://localhost:8001';
-    const ws = new WebSocket(`${wsUrl}?userId=${user.user_id}`);
+    const ws = new WebSocket(notificationSocketUrl(wsUrl, user));
     
     ws.onmessage = (event) => {
-      const notification = JSON.parse(event.data);
-      const newNotification = {
-        id: Date.now(),
+      const frame = JSON.parse(event.data);
+      if (frame.type === 'PING') {
+        ws.send(JSON.stringify({ type: 'PONG' }));
+        return;
+      }
+      const received = unpackNotifications(user.user_id, frame).map(notification => ({
+        id: notification.cursor || Date.now(),
         message: notification.message,
         type: notification.type === 'REQUEST_APPROVED' ? 'success' : 'error',
-        time: new Date().toLocaleDateString()
-      };
+        time: new Date(notification.cursor ? notification.cursor / 1000 : Date.now()).toLocaleDateString()
+      }));
       
-      setNotifications(prev => [newNotification, ...prev.slice(0, 4)]);
+      setNotifications(prev => [...received.reverse(), ...prev].slice(0, 5));
       
-      // Show toast notification
-      showToast(newNotification);
+      // Show toast notification (only the newest of a replayed batch)
+      if (received.length) {
+        showToast(received[0]);
+      }
     };
 
     return () => ws.close();
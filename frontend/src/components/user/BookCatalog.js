@@ -6,6 +6,7 @@ import { incrementPendingCount } from '../../store/slices/bookRequestsSlice';
 import axios from 'axios';
 import { API_CONFIG } from '../../config/api';
 import EnhancedDataTable from '../common/EnhancedDataTable';
+import { useAvailabilityFeed } from '../../hooks/useAvailabilityFeed';
 import '../../styles/BookCatalog.css';
 
 const BookCatalog = ({ user }) => {
@@ -35,6 +36,17 @@ const BookCatalog = ({ user }) => {
     fetchBooks();
   }, []);
 
+  // Keep available copies current without refetching the catalog
+  useAvailabilityFeed('all', (changes, deleted) => {
+    setBooks(prev => prev
+      .filter(book => !deleted.includes(book.book_id))
+      .map(book => (
+        changes[book.book_id] !== undefined
+          ? { ...book, available_copies: changes[book.book_id] }
+          : book
+      )));
+  });
+
 
 
   // Request book function
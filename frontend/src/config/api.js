@@ -9,8 +9,21 @@ export const API_CONFIG = {
 };
 
 // Configure axios interceptors for CSRF protection
+// Session token issued at login, stored with the user
+const getSessionToken = () => {
+  try {
+    return JSON.parse(localStorage.getItem('library_user'))?.token;
+  } catch (error) {
+    return null;
+  }
+};
+
 axios.interceptors.request.use(
   (config) => {
+    const sessionToken = getSessionToken();
+    if (sessionToken && !config.headers['Authorization']) {
+      config.headers['Authorization'] = `Bearer ${sessionToken}`;
+    }
     const token = csrfService.getToken();
     if (token && ['post', 'put', 'patch', 'delete'].includes(config.method?.toLowerCase())) {
       config.headers['X-CSRF-Token'] = token;
@@ -27,6 +40,15 @@ axios.interceptors.response.use(
       csrfService.clearToken();
       csrfService.fetchToken();
     }
+    // Shed by the gateway: retry reads once after Retry-After (capped)
+    const status = error.response?.status;
+    const config = error.config;
+    if ((status === 429 || status === 503) && config && !config._admissionRetried
+        && config.method?.toLowerCase() === 'get') {
+      config._admissionRetried = true;
+      const delay = Math.min(Number(error.response.headers?.['retry-after']) || 1, 5) * 1000;
+      return new Promise((resolve) => setTimeout(resolve, delay)).then(() => axios(config));
+    }
     return Promise.reject(error);
   }
 );}
\ No newline at end of file
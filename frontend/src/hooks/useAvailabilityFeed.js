@@ -0,0 +1,36 @@
+import { useEffect, useRef } from 'react';
+
+// Subscribes to coalesced availability deltas on the gateway WebSocket.
+// `books` is 'all' or a list of book IDs; onChange receives
+// ({ [bookId]: availableCopies }, deletedIds) once per frame.
+export const useAvailabilityFeed = (books, onChange) => {
+  const handler = useRef(onChange);
+  handler.current = onChange;
+  const topic = Array.isArray(books) ? books.join(',') : books;
+
+  useEffect(() => {
+    if (!topic) return;
+
+    const ws = new WebSocket(`${process.env.REACT_APP_WS_URL || 'ws://localhost:8001'}/`);
+
+    ws.onopen = () => {
+      ws.send(JSON.stringify({
+        type: 'SUBSCRIBE',
+        books: topic === 'all' ? 'all' : topic.split(',').map(Number)
+      }));
+    };
+
+    ws.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      if (frame.type === 'PING') {
+        ws.send(JSON.stringify({ type: 'PONG' }));
+        return;
+      }
+      if (frame.type === 'AVAILABILITY') {
+        handler.current(frame.books, frame.deleted || []);
+      }
+    };
+
+    return () => ws.close();
+  }, [topic]);
+};
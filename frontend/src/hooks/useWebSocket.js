@@ -1,6 +1,7 @@
 import { useEffect, useRef } from 'react';
 import { useDispatch } from 'react-redux';
 import { showNotification } from '../store/slices/uiSlice';
+import { notificationSocketUrl, unpackNotifications } from '../utils/notificationCursor';
 
 export const useWebSocket = (user) => {
   const ws = useRef(null);
@@ -9,15 +10,21 @@ export const useWebSocket = (user) => {
   useEffect(() => {
     if (!user?.user_id) return;
 
-    const wsUrl = `${process.env.REACT_APP_WS_URL || 'ws://localhost:8001'}/?userId=${user.user_id}`;
+    const wsUrl = notificationSocketUrl(process.env.REACT_APP_WS_URL || 'ws://localhost:8001', user);
     ws.current = new WebSocket(wsUrl);
 
     ws.current.onmessage = (event) => {
-      const notification = JSON.parse(event.data);
-      dispatch(showNotification({
-        message: notification.message,
-        type: notification.type === 'REQUEST_APPROVED' ? 'success' : 'error'
-      }));
+      const frame = JSON.parse(event.data);
+      if (frame.type === 'PING') {
+        ws.current.send(JSON.stringify({ type: 'PONG' }));
+        return;
+      }
+      unpackNotifications(user.user_id, frame).forEach(notification => {
+        dispatch(showNotification({
+          message: notification.message,
+          type: notification.type === 'REQUEST_APPROVED' ? 'success' : 'error'
+        }));
+      });
     };
 
     return () => {
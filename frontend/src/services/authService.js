@@ -6,6 +6,7 @@ export const authService = {
   async login(credentials) {
     await csrfService.fetchToken();
     const response = await axios.post(API_CONFIG.getVersionedUrl('/login'), credentials);
+    await csrfService.fetchToken(response.data.token);
     return response.data;
   },
 
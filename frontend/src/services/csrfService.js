@@ -21,9 +21,11 @@ class CSRFService {
     return this.token;
   }
 
-  async fetchToken() {
+  // CSRF tokens are bound to the session; pass the new session token right after login
+  async fetchToken(sessionToken = null) {
     try {
-      const response = await axios.get(API_CONFIG.getVersionedUrl('/csrf-token'));
+      const headers = sessionToken ? { Authorization: `Bearer ${sessionToken}` } : {};
+      const response = await axios.get(API_CONFIG.getVersionedUrl('/csrf-token'), { headers });
       this.token = response.data.token;
       sessionStorage.setItem(this.tokenKey, this.token);
       return this.token;
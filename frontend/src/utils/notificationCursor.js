@@ -0,0 +1,26 @@
+// Last notification cursor seen per user, so a reconnecting socket can ask
+// the gateway to replay what it missed instead of refetching everything.
+// v2: cursors are outbox event IDs (v1 held timestamps, which would hide them)
+const storageKey = (userId) => `notificationCursor:v2:${userId}`;
+
+export const getNotificationCursor = (userId) => {
+  const cursor = Number(localStorage.getItem(storageKey(userId)));
+  return Number.isFinite(cursor) && cursor > 0 ? cursor : 0;
+};
+
+export const saveNotificationCursor = (userId, cursor) => {
+  if (cursor && cursor > getNotificationCursor(userId)) {
+    localStorage.setItem(storageKey(userId), String(cursor));
+  }
+};
+
+// The gateway takes the user from the session token, not from the URL
+export const notificationSocketUrl = (baseUrl, user) =>
+  `${baseUrl}/?token=${encodeURIComponent(user.token || '')}&cursor=${getNotificationCursor(user.user_id)}`;
+
+// A frame is either a single notification or a NOTIFICATION_BATCH replay
+export const unpackNotifications = (userId, frame) => {
+  const notifications = frame.type === 'NOTIFICATION_BATCH' ? frame.notifications : [frame];
+  notifications.forEach(notification => saveNotificationCursor(userId, notification.cursor));
+  return notifications;
+};
@@ -0,0 +1,69 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+class AdminServer:
+    """Small HTTP server for operational endpoints (metrics, diagnostics)
+
+    Handlers are registered per path and receive the parsed query string
+    as a dict of single values. They return (status, content_type, body).
+    """
+
+    def __init__(self, host=None, port=None):
+        self.host = host or os.getenv('ADMIN_HTTP_HOST', '127.0.0.1')
+        self.port = int(port if port is not None else os.getenv('ADMIN_HTTP_PORT', '9090'))
+        self._routes = {}
+        self._httpd = None
+        self._thread = None
+
+    def route(self, path, handler):
+        self._routes[path] = handler
+
+    def start(self):
+        routes = self._routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                handler = routes.get(parts.path)
+                if handler is None:
+                    self._reply(404, "text/plain; charset=utf-8", b"not found\n")
+                    return
+                query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                try:
+                    status, content_type, body = handler(query)
+                except ValueError as e:
+                    status, content_type, body = 400, "text/plain; charset=utf-8", f"{e}\n"
+                except Exception as e:
+                    logger.error(f"Admin endpoint {parts.path} failed: {e}")
+                    status, content_type, body = 500, "text/plain; charset=utf-8", b"internal error\n"
+                self._reply(status, content_type, body)
+
+            def _reply(self, status, content_type, body):
+                if isinstance(body, str):
+                    body = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("Admin HTTP request: " + format % args)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="admin-http", daemon=True)
+        self._thread.start()
+        logger.info(f"Admin HTTP server listening on {self.host}:{self.port}")
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
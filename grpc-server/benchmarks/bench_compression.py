@@ -0,0 +1,132 @@
+"""CPU against bytes on the wire for the list RPCs, per compression algorithm
+
+Serves canned list responses of realistic catalog sizes through
+CompressionInterceptor (threshold 0) and fetches them over loopback. For
+each RPC, size and algorithm it reports the serialized and compressed
+message size, the wall time per call, and the CPU time per call of
+client and server together (both run in this process).
+
+    python benchmarks/bench_compression.py [calls_per_case]
+"""
+import gzip
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent import futures
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from compression import ALGORITHMS, CompressionInterceptor
+import library_service_pb2 as pb
+import library_service_pb2_grpc
+
+WORDS = ("the", "of", "night", "river", "house", "garden", "war", "peace", "secret", "history", "song", "city", "light", "shadow", "winter")
+GENRES = ("Fiction", "Science", "History", "Fantasy", "Biography", "Poetry")
+STATUSES = ("active", "returned", "overdue")
+
+def title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+
+def date(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+
+def books(n, rng):
+    return pb.GetBooksResponse(books=[
+        pb.Book(book_id=i, title=title(rng), author=f"{title(rng)} {rng.choice(WORDS).title()}", genre=rng.choice(GENRES),
+                published_year=rng.randint(1900, 2024), available_copies=rng.randint(0, 10))
+        for i in range(1, n + 1)
+    ])
+
+def users(n, rng):
+    return pb.GetUsersResponse(users=[
+        pb.User(user_id=i, username=f"member{i}", email=f"member{i}@library.example", role="member", is_active=True)
+        for i in range(1, n + 1)
+    ])
+
+def transactions(n, rng):
+    return pb.GetTransactionsResponse(transactions=[
+        pb.Transaction(transaction_id=i, member_id=rng.randint(1, 5000), book_id=rng.randint(1, 20000), transaction_type="issue",
+                       transaction_date=date(rng), due_date=date(rng), return_date=rng.choice(("", date(rng))),
+                       status=rng.choice(STATUSES), fine_amount=rng.choice((0.0, 0.0, 0.0, 2.5, 10.0)))
+        for i in range(1, n + 1)
+    ])
+
+def book_requests(n, rng):
+    return pb.GetBookRequestsResponse(requests=[
+        pb.BookRequest(request_id=i, user_id=rng.randint(1, 5000), book_id=rng.randint(1, 20000), request_type="issue",
+                       status="pending", request_date=date(rng), notes=rng.choice(("", "Needed for class")))
+        for i in range(1, n + 1)
+    ])
+
+def user_transactions(n, rng):
+    return pb.GetUserTransactionsResponse(transactions=[
+        pb.UserTransaction(transaction_id=i, book_id=rng.randint(1, 20000), book_title=title(rng), book_author=title(rng),
+                           transaction_type="issue", transaction_date=date(rng), due_date=date(rng),
+                           return_date=rng.choice(("", date(rng))), status=rng.choice(STATUSES), fine_amount=0.0)
+        for i in range(1, n + 1)
+    ])
+
+CASES = (
+    ("GetBooks", books, (1000, 10000, 50000)),
+    ("GetUsers", users, (1000, 10000)),
+    ("GetTransactions", transactions, (10000, 100000)),
+    ("GetBookRequests", book_requests, (100, 2000)),
+    ("GetUserTransactions", user_transactions, (50, 500)),
+)
+
+REQUESTS = {
+    "GetBooks": pb.GetBooksRequest, "GetUsers": pb.GetUsersRequest, "GetTransactions": pb.GetTransactionsRequest,
+    "GetBookRequests": pb.GetBookRequestsReq, "GetUserTransactions": pb.GetUserTransactionsRequest,
+}
+
+class CannedLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+    response = None
+
+    def GetBooks(self, request, context):
+        return self.response
+
+    GetUsers = GetTransactions = GetBookRequests = GetUserTransactions = GetBooks
+
+def wire_size(payload, algorithm):
+    if algorithm == "gzip":
+        return len(gzip.compress(payload))
+    if algorithm == "deflate":
+        return len(zlib.compress(payload))
+    return len(payload)
+
+def main(calls):
+    rng = random.Random(42)
+    service = CannedLibraryService()
+    print(f"{'rpc':<20} {'items':>7} {'algorithm':<8} {'message':>10} {'on wire':>10} {'wall ms':>8} {'cpu ms':>8}")
+    for method, build, sizes in CASES:
+        for size in sizes:
+            service.response = build(size, rng)
+            payload = service.response.SerializeToString()
+            for algorithm in ALGORITHMS:
+                server = grpc.server(
+                    futures.ThreadPoolExecutor(max_workers=2),
+                    interceptors=[CompressionInterceptor({method: ALGORITHMS[algorithm]}, min_bytes=0)],
+                    options=[("grpc.max_send_message_length", -1)]
+                )
+                library_service_pb2_grpc.add_LibraryServiceServicer_to_server(service, server)
+                port = server.add_insecure_port("127.0.0.1:0")
+                server.start()
+                channel = grpc.insecure_channel(f"127.0.0.1:{port}", options=[("grpc.max_receive_message_length", -1)])
+                call = getattr(library_service_pb2_grpc.LibraryServiceStub(channel), method)
+                call(REQUESTS[method](), timeout=60)
+
+                wall, cpu = time.perf_counter(), time.process_time()
+                for _ in range(calls):
+                    call(REQUESTS[method](), timeout=60)
+                wall = (time.perf_counter() - wall) / calls * 1000
+                cpu = (time.process_time() - cpu) / calls * 1000
+
+                channel.close()
+                server.stop(None)
+                print(f"{method:<20} {size:>7} {algorithm:<8} {len(payload):>10} {wire_size(payload, algorithm):>10} {wall:>8.1f} {cpu:>8.1f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
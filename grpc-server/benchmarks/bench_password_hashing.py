@@ -0,0 +1,75 @@
+"""Login throughput against the number of password hashing workers
+
+Runs the verify step of AuthenticateUser from the same number of threads
+as the gRPC executor, for workers=0 (inline on those threads) and pools of
+increasing size. Alongside, one thread keeps doing a small pure-Python task
+standing in for a DB-bound RPC, and its p99 shows how much the hashing
+load gets in the way of other requests.
+
+    python benchmarks/bench_password_hashing.py [seconds_per_run]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from passwords import LegacySHA256Hasher, PasswordHasher
+
+EXECUTOR_THREADS = 10
+
+def other_rpc():
+    # Roughly what building a small list response costs in Python
+    return [{"id": i, "title": str(i)} for i in range(200)]
+
+def run(workers, seconds):
+    hasher = PasswordHasher(workers=workers)
+    hasher.start()
+    encoded = hasher.hash("correct horse")
+    logins = []
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    def login_loop():
+        count = 0
+        while time.perf_counter() < deadline:
+            hasher.verify("correct horse", encoded)
+            count += 1
+        logins.append(count)
+
+    def other_loop():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            other_rpc()
+            latencies.append(time.perf_counter() - started)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(EXECUTOR_THREADS - 1)]
+    threads.append(threading.Thread(target=other_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    hasher.shutdown()
+
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else 0
+    return sum(logins) / seconds, p99
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    cpus = os.cpu_count() or 1
+    legacy = LegacySHA256Hasher()
+    print(f"cpus={cpus} scheme={PasswordHasher().preferred.tag} executor_threads={EXECUTOR_THREADS}")
+    started = time.perf_counter()
+    for _ in range(10000):
+        legacy.hash("correct horse")
+    print(f"legacy sha256 (for reference): {10000 / (time.perf_counter() - started):,.0f} hashes/s")
+    print(f"{'workers':>8} {'logins/s':>10} {'other p99 ms':>13}")
+    for workers in sorted({0, 1, 2, 4, cpus, cpus * 2}):
+        rate, p99 = run(workers, seconds)
+        print(f"{workers:>8} {rate:>10.1f} {p99 * 1000:>13.2f}")
+
+if __name__ == '__main__':
+    main()
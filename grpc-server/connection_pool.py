@@ -3,6 +3,7 @@ from psycopg2 import pool
 import logging
 from contextlib import contextmanager
 import os
+from tracing import TracingCursor, start_span
 
 logger = logging.getLogger(__name__)
 
@@ -15,17 +16,29 @@ class DatabasePool:
             cls._instance = super().__new__(cls)
         return cls._instance
     
+    @staticmethod
+    def connection_params():
+        return {
+            "host": os.getenv('DB_HOST', 'localhost'),
+            "port": os.getenv('DB_PORT', '5432'),
+            "database": os.getenv('DB_NAME', 'library_db'),
+            "user": os.getenv('DB_USER', 'postgres'),
+            "password": os.getenv('DB_PASSWORD', 'mypassword')
+        }
+    
+    def connect_dedicated(self):
+        """Open a connection outside the pool (for long-lived LISTEN sessions)"""
+        return psycopg2.connect(**self.connection_params())
+    
     def initialize_pool(self):
         """Initialize connection pool"""
         try:
+            # Workers of a multi-process server each get a share of the budget
             self._pool = psycopg2.pool.ThreadedConnectionPool(
-                minconn=2,
-                maxconn=20,
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5432'),
-                database=os.getenv('DB_NAME', 'library_db'),
-                user=os.getenv('DB_USER', 'postgres'),
-                password=os.getenv('DB_PASSWORD', 'mypassword')
+                minconn=int(os.getenv('DB_POOL_MIN', '2')),
+                maxconn=int(os.getenv('DB_POOL_MAX', '20')),
+                cursor_factory=TracingCursor,
+                **self.connection_params()
             )
             logger.info("Database connection pool initialized")
         except Exception as e:
@@ -37,7 +50,8 @@ class DatabasePool:
         """Get connection from pool with context manager"""
         connection = None
         try:
-            connection = self._pool.getconn()
+            with start_span("db.pool.checkout"):
+                connection = self._pool.getconn()
             yield connection
         except psycopg2.DatabaseError as e:
             if connection:
@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+import grpc
+from connection_pool import db_pool
+from metrics import SERVICE_NAME
+import health_pb2
+import health_pb2_grpc
+
+logger = logging.getLogger(__name__)
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+SERVICE_UNKNOWN = health_pb2.HealthCheckResponse.SERVICE_UNKNOWN
+
+def probe_database():
+    """True if a pooled connection can be checked out and answers a query"""
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                conn.commit()
+        return True
+    except Exception as e:
+        logger.warning(f"Health probe failed: {e}")
+        return False
+
+class HealthServicer(health_pb2_grpc.HealthServicer):
+    """grpc.health.v1.Health, SERVING while the DB pool is usable
+
+    A background thread probes the pool every check_interval seconds and
+    flips both the overall ("") and the LibraryService status. Watch
+    streams push every change, which is what client-side health checking
+    in round_robin channels subscribes to.
+    """
+
+    def __init__(self, check_interval=None, probe=probe_database):
+        self.check_interval = check_interval or float(os.getenv('HEALTH_CHECK_INTERVAL', '5'))
+        self.probe = probe
+        self._statuses = {"": NOT_SERVING, SERVICE_NAME: NOT_SERVING}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def set_status(self, service, status):
+        with self._condition:
+            if self._statuses.get(service) != status:
+                self._statuses[service] = status
+                self._condition.notify_all()
+
+    def set_all(self, status):
+        for service in list(self._statuses):
+            self.set_status(service, status)
+
+    def status(self, service):
+        with self._condition:
+            return self._statuses.get(service)
+
+    def Check(self, request, context):
+        status = self.status(request.service)
+        if status is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown service: {request.service}")
+        return health_pb2.HealthCheckResponse(status=status)
+
+    def Watch(self, request, context):
+        last = None
+        while context.is_active():
+            with self._condition:
+                status = self._statuses.get(request.service, SERVICE_UNKNOWN)
+                if status == last:
+                    self._condition.wait(timeout=1.0)
+                    continue
+            last = status
+            yield health_pb2.HealthCheckResponse(status=status)
+
+    def check_now(self):
+        healthy = self.probe()
+        status = SERVING if healthy else NOT_SERVING
+        if self.status("") != status:
+            logger.info(f"Health status changed: {health_pb2.HealthCheckResponse.ServingStatus.Name(status)}")
+        self.set_all(status)
+        return healthy
+
+    def start(self):
+        self.check_now()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="health-probe", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.check_interval):
+            self.check_now()
+
+    def stop(self):
+        """Stop probing and report NOT_SERVING so clients move elsewhere"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.set_all(NOT_SERVING)
@@ -0,0 +1,75 @@
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+from psycopg2.extras import execute_values
+from connection_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+class LastLoginRecorder:
+    """Collects successful logins and writes last_login in periodic batches
+
+    Keeps the UPDATE off the authentication path: a login only records the
+    timestamp in memory, and a background thread flushes all pending users
+    in one statement every flush_interval seconds. Repeated logins of the
+    same user between flushes collapse into one row.
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval or float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', '5'))
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def record(self, user_id, when=None):
+        with self._lock:
+            self.pending[user_id] = when or datetime.utcnow()
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="last-login-flusher", daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        with self._lock:
+            batch, self.pending = self.pending, {}
+        if not batch:
+            return 0
+        try:
+            with db_pool.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(
+                        cursor,
+                        "UPDATE users AS u SET last_login = v.last_login FROM (VALUES %s) AS v(user_id, last_login) "
+                        "WHERE u.user_id = v.user_id",
+                        list(batch.items()),
+                        template="(%s, %s::timestamp)"
+                    )
+                    conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to write last_login for {len(batch)} users, will retry: {e}")
+            with self._lock:
+                for user_id, when in batch.items():
+                    if user_id not in self.pending or self.pending[user_id] < when:
+                        self.pending[user_id] = when
+            return 0
+        logger.debug(f"Flushed last_login for {len(batch)} users")
+        return len(batch)
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+# Global recorder instance
+last_login_recorder = LastLoginRecorder()
+
+atexit.register(last_login_recorder.stop)
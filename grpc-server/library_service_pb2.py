@@ -22,81 +22,113 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15library_service.proto\x12\x07library\"\x8b\x01\n\x04\x42ook\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\r\n\x05genre\x18\x04 \x01(\t\x12\x16\n\x0epublished_year\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\x12\x12\n\nis_deleted\x18\x07 \x01(\x08\"Y\n\x04User\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\x12\x11\n\tis_active\x18\x05 \x01(\x08\"\xc9\x01\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x11\n\tmember_id\x18\x02 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x03 \x01(\x05\x12\x18\n\x10transaction_type\x18\x04 \x01(\t\x12\x18\n\x10transaction_date\x18\x05 \x01(\t\x12\x10\n\x08\x64ue_date\x18\x06 \x01(\t\x12\x13\n\x0breturn_date\x18\x07 \x01(\t\x12\x0e\n\x06status\x18\x08 \x01(\t\x12\x13\n\x0b\x66ine_amount\x18\t \x01(\x01\"\xa6\x01\n\x0b\x42ookRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x03 \x01(\x05\x12\x14\n\x0crequest_type\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x14\n\x0crequest_date\x18\x06 \x01(\t\x12\r\n\x05notes\x18\x07 \x01(\t\x12\x16\n\x0etransaction_id\x18\x08 \x01(\x05\"\'\n\x0fGetBooksRequest\x12\x14\n\x0csearch_query\x18\x01 \x01(\t\"0\n\x10GetBooksResponse\x12\x1c\n\x05\x62ooks\x18\x01 \x03(\x0b\x32\r.library.Book\"!\n\x0eGetBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\"s\n\x11\x43reateBookRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x02 \x01(\t\x12\r\n\x05genre\x18\x03 \x01(\t\x12\x16\n\x0epublished_year\x18\x04 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x05 \x01(\x05\"\x84\x01\n\x11UpdateBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\r\n\x05genre\x18\x04 \x01(\t\x12\x16\n\x0epublished_year\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\"1\n\x0b\x41uthRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"M\n\x0c\x41uthResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04user\x18\x02 \x01(\x0b\x32\r.library.User\x12\x0f\n\x07message\x18\x03 \x01(\t\"\x11\n\x0fGetUsersRequest\"0\n\x10GetUsersResponse\x12\x1c\n\x05users\x18\x01 \x03(\x0b\x32\r.library.User\"H\n\x10IssueBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\x11\n\tmember_id\x18\x02 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x03 \x01(\x05\"=\n\x11ReturnBookRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\"b\n\x13TransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12)\n\x0btransaction\x18\x02 \x01(\x0b\x32\x14.library.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t\"9\n\x16GetTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\"E\n\x17GetTransactionsResponse\x12*\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x14.library.Transaction\"u\n\x14\x43reateBookRequestReq\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\x12\x14\n\x0crequest_type\x18\x03 \x01(\t\x12\x16\n\x0etransaction_id\x18\x04 \x01(\x05\x12\r\n\x05notes\x18\x05 \x01(\t\"$\n\x12GetBookRequestsReq\x12\x0e\n\x06status\x18\x01 \x01(\t\"A\n\x17GetBookRequestsResponse\x12&\n\x08requests\x18\x01 \x03(\x0b\x32\x14.library.BookRequest\"=\n\x15\x41pproveBookRequestReq\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\"K\n\x14RejectBookRequestReq\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\x12\r\n\x05notes\x18\x03 \x01(\t\"^\n\x13\x42ookRequestResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12%\n\x07request\x18\x02 \x01(\x0b\x32\x14.library.BookRequest\x12\x0f\n\x07message\x18\x03 \x01(\t\"#\n\x10UserStatsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\"u\n\x11UserStatsResponse\x12\x19\n\x11total_books_taken\x18\x01 \x01(\x05\x12\x1a\n\x12\x63urrently_borrowed\x18\x02 \x01(\x05\x12\x15\n\roverdue_books\x18\x03 \x01(\x05\x12\x12\n\ntotal_fine\x18\x04 \x01(\x01\"\xe3\x01\n\x0fUserTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\x12\x12\n\nbook_title\x18\x03 \x01(\t\x12\x13\n\x0b\x62ook_author\x18\x04 \x01(\t\x12\x18\n\x10transaction_type\x18\x05 \x01(\t\x12\x18\n\x10transaction_date\x18\x06 \x01(\t\x12\x10\n\x08\x64ue_date\x18\x07 \x01(\t\x12\x13\n\x0breturn_date\x18\x08 \x01(\t\x12\x0e\n\x06status\x18\t \x01(\t\x12\x13\n\x0b\x66ine_amount\x18\n \x01(\x01\"=\n\x1aGetUserTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\"M\n\x1bGetUserTransactionsResponse\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.library.UserTransaction\"M\n\x0c\x42ookResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04\x62ook\x18\x02 \x01(\x0b\x32\r.library.Book\x12\x0f\n\x07message\x18\x03 \x01(\t\"T\n\x11\x43reateUserRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\"x\n\x11UpdateUserRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\x12\x11\n\tis_active\x18\x05 \x01(\x08\x12\x10\n\x08password\x18\x06 \x01(\t\"M\n\x0cUserResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04user\x18\x02 \x01(\x0b\x32\r.library.User\x12\x0f\n\x07message\x18\x03 \x01(\t2\xa3\n\n\x0eLibraryService\x12?\n\x08GetBooks\x12\x18.library.GetBooksRequest\x1a\x19.library.GetBooksResponse\x12\x31\n\x07GetBook\x12\x17.library.GetBookRequest\x1a\r.library.Book\x12?\n\nCreateBook\x12\x1a.library.CreateBookRequest\x1a\x15.library.BookResponse\x12?\n\nUpdateBook\x12\x1a.library.UpdateBookRequest\x1a\x15.library.BookResponse\x12<\n\nDeleteBook\x12\x17.library.GetBookRequest\x1a\x15.library.BookResponse\x12?\n\x10\x41uthenticateUser\x12\x14.library.AuthRequest\x1a\x15.library.AuthResponse\x12?\n\x08GetUsers\x12\x18.library.GetUsersRequest\x1a\x19.library.GetUsersResponse\x12?\n\nCreateUser\x12\x1a.library.CreateUserRequest\x1a\x15.library.UserResponse\x12?\n\nUpdateUser\x12\x1a.library.UpdateUserRequest\x1a\x15.library.UserResponse\x12\x44\n\tIssueBook\x12\x19.library.IssueBookRequest\x1a\x1c.library.TransactionResponse\x12\x46\n\nReturnBook\x12\x1a.library.ReturnBookRequest\x1a\x1c.library.TransactionResponse\x12T\n\x0fGetTransactions\x12\x1f.library.GetTransactionsRequest\x1a .library.GetTransactionsResponse\x12T\n\x15\x43reateUserBookRequest\x12\x1d.library.CreateBookRequestReq\x1a\x1c.library.BookRequestResponse\x12P\n\x0fGetBookRequests\x12\x1b.library.GetBookRequestsReq\x1a .library.GetBookRequestsResponse\x12R\n\x12\x41pproveBookRequest\x12\x1e.library.ApproveBookRequestReq\x1a\x1c.library.BookRequestResponse\x12P\n\x11RejectBookRequest\x12\x1d.library.RejectBookRequestReq\x1a\x1c.library.BookRequestResponse\x12\x45\n\x0cGetUserStats\x12\x19.library.UserStatsRequest\x1a\x1a.library.UserStatsResponse\x12`\n\x13GetUserTransactions\x12#.library.GetUserTransactionsRequest\x1a$.library.GetUserTransactionsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15library_service.proto\x12\x07library\x1a google/protobuf/field_mask.proto\x1a\x1fgoogle/protobuf/timestamp.proto\"\x8b\x01\n\x04\x42ook\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\r\n\x05genre\x18\x04 \x01(\t\x12\x16\n\x0epublished_year\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\x12\x12\n\nis_deleted\x18\x07 \x01(\x08\"Y\n\x04User\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\x12\x11\n\tis_active\x18\x05 \x01(\x08\"\x82\x03\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x11\n\tmember_id\x18\x02 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x03 \x01(\x05\x12\x18\n\x10transaction_type\x18\x04 \x01(\t\x12\x1c\n\x10transaction_date\x18\x05 \x01(\tB\x02\x18\x01\x12\x14\n\x08\x64ue_date\x18\x06 \x01(\tB\x02\x18\x01\x12\x17\n\x0breturn_date\x18\x07 \x01(\tB\x02\x18\x01\x12\x0e\n\x06status\x18\x08 \x01(\t\x12\x17\n\x0b\x66ine_amount\x18\t \x01(\x01\x42\x02\x18\x01\x12\x34\n\x10transaction_time\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x64ue_time\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12/\n\x0breturn_time\x18\x0c \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nfine_cents\x18\r \x01(\x03\"\xdc\x01\n\x0b\x42ookRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x03 \x01(\x05\x12\x14\n\x0crequest_type\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x18\n\x0crequest_date\x18\x06 \x01(\tB\x02\x18\x01\x12\r\n\x05notes\x18\x07 \x01(\t\x12\x16\n\x0etransaction_id\x18\x08 \x01(\x05\x12\x30\n\x0crequest_time\x18\t \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"S\n\x0fGetBooksRequest\x12\x14\n\x0csearch_query\x18\x01 \x01(\t\x12*\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"0\n\x10GetBooksResponse\x12\x1c\n\x05\x62ooks\x18\x01 \x03(\x0b\x32\r.library.Book\"!\n\x0eGetBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\"s\n\x11\x43reateBookRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x02 \x01(\t\x12\r\n\x05genre\x18\x03 \x01(\t\x12\x16\n\x0epublished_year\x18\x04 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x05 \x01(\x05\"\x84\x01\n\x11UpdateBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61uthor\x18\x03 \x01(\t\x12\r\n\x05genre\x18\x04 \x01(\t\x12\x16\n\x0epublished_year\x18\x05 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x06 \x01(\x05\"1\n\x0b\x41uthRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"M\n\x0c\x41uthResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04user\x18\x02 \x01(\x0b\x32\r.library.User\x12\x0f\n\x07message\x18\x03 \x01(\t\"=\n\x0fGetUsersRequest\x12*\n\x06\x66ields\x18\x01 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"0\n\x10GetUsersResponse\x12\x1c\n\x05users\x18\x01 \x03(\x0b\x32\r.library.User\"H\n\x10IssueBookRequest\x12\x0f\n\x07\x62ook_id\x18\x01 \x01(\x05\x12\x11\n\tmember_id\x18\x02 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x03 \x01(\x05\"=\n\x11ReturnBookRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\"b\n\x13TransactionResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12)\n\x0btransaction\x18\x02 \x01(\x0b\x32\x14.library.Transaction\x12\x0f\n\x07message\x18\x03 \x01(\t\"e\n\x16GetTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12*\n\x06\x66ields\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"E\n\x17GetTransactionsResponse\x12*\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x14.library.Transaction\"u\n\x14\x43reateBookRequestReq\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\x12\x14\n\x0crequest_type\x18\x03 \x01(\t\x12\x16\n\x0etransaction_id\x18\x04 \x01(\x05\x12\r\n\x05notes\x18\x05 \x01(\t\"P\n\x12GetBookRequestsReq\x12\x0e\n\x06status\x18\x01 \x01(\t\x12*\n\x06\x66ields\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"A\n\x17GetBookRequestsResponse\x12&\n\x08requests\x18\x01 \x03(\x0b\x32\x14.library.BookRequest\"=\n\x15\x41pproveBookRequestReq\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\"K\n\x14RejectBookRequestReq\x12\x12\n\nrequest_id\x18\x01 \x01(\x05\x12\x10\n\x08\x61\x64min_id\x18\x02 \x01(\x05\x12\r\n\x05notes\x18\x03 \x01(\t\"1\n\x19WatchBookRequestEventsReq\x12\x14\n\x0csince_cursor\x18\x01 \x01(\x03\"\xa7\x01\n\x10\x42ookRequestEvent\x12\x0e\n\x06\x63ursor\x18\x01 \x01(\x03\x12\x12\n\nevent_type\x18\x02 \x01(\t\x12%\n\x07request\x18\x03 \x01(\x0b\x32\x14.library.BookRequest\x12\x16\n\ncreated_at\x18\x04 \x01(\tB\x02\x18\x01\x12\x30\n\x0c\x63reated_time\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"0\n\x18WatchBookAvailabilityReq\x12\x14\n\x0csince_cursor\x18\x01 \x01(\x03\"w\n\x15\x42ookAvailabilityEvent\x12\x0e\n\x06\x63ursor\x18\x01 \x01(\x03\x12\x12\n\nevent_type\x18\x02 \x01(\t\x12\x0f\n\x07\x62ook_id\x18\x03 \x01(\x05\x12\x18\n\x10\x61vailable_copies\x18\x04 \x01(\x05\x12\x0f\n\x07\x64\x65leted\x18\x05 \x01(\x08\"^\n\x13\x42ookRequestResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12%\n\x07request\x18\x02 \x01(\x0b\x32\x14.library.BookRequest\x12\x0f\n\x07message\x18\x03 \x01(\t\"#\n\x10UserStatsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\"\x93\x01\n\x11UserStatsResponse\x12\x19\n\x11total_books_taken\x18\x01 \x01(\x05\x12\x1a\n\x12\x63urrently_borrowed\x18\x02 \x01(\x05\x12\x15\n\roverdue_books\x18\x03 \x01(\x05\x12\x16\n\ntotal_fine\x18\x04 \x01(\x01\x42\x02\x18\x01\x12\x18\n\x10total_fine_cents\x18\x05 \x01(\x03\"\x9c\x03\n\x0fUserTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x62ook_id\x18\x02 \x01(\x05\x12\x12\n\nbook_title\x18\x03 \x01(\t\x12\x13\n\x0b\x62ook_author\x18\x04 \x01(\t\x12\x18\n\x10transaction_type\x18\x05 \x01(\t\x12\x1c\n\x10transaction_date\x18\x06 \x01(\tB\x02\x18\x01\x12\x14\n\x08\x64ue_date\x18\x07 \x01(\tB\x02\x18\x01\x12\x17\n\x0breturn_date\x18\x08 \x01(\tB\x02\x18\x01\x12\x0e\n\x06status\x18\t \x01(\t\x12\x17\n\x0b\x66ine_amount\x18\n \x01(\x01\x42\x02\x18\x01\x12\x34\n\x10transaction_time\x18\x0b \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12,\n\x08\x64ue_time\x18\x0c \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12/\n\x0breturn_time\x18\r \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nfine_cents\x18\x0e \x01(\x03\"i\n\x1aGetUserTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12*\n\x06\x66ields\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"M\n\x1bGetUserTransactionsResponse\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.library.UserTransaction\"M\n\x0c\x42ookResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04\x62ook\x18\x02 \x01(\x0b\x32\r.library.Book\x12\x0f\n\x07message\x18\x03 \x01(\t\"T\n\x11\x43reateUserRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\"x\n\x11UpdateUserRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x0c\n\x04role\x18\x04 \x01(\t\x12\x11\n\tis_active\x18\x05 \x01(\x08\x12\x10\n\x08password\x18\x06 \x01(\t\"M\n\x0cUserResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x1b\n\x04user\x18\x02 \x01(\x0b\x32\r.library.User\x12\x0f\n\x07message\x18\x03 \x01(\t2\xfa\r\n\x0eLibraryService\x12?\n\x08GetBooks\x12\x18.library.GetBooksRequest\x1a\x19.library.GetBooksResponse\x12\x31\n\x07GetBook\x12\x17.library.GetBookRequest\x1a\r.library.Book\x12?\n\nCreateBook\x12\x1a.library.CreateBookRequest\x1a\x15.library.BookResponse\x12?\n\nUpdateBook\x12\x1a.library.UpdateBookRequest\x1a\x15.library.BookResponse\x12<\n\nDeleteBook\x12\x17.library.GetBookRequest\x1a\x15.library.BookResponse\x12\\\n\x15WatchBookAvailability\x12!.library.WatchBookAvailabilityReq\x1a\x1e.library.BookAvailabilityEvent0\x01\x12\x38\n\x0bStreamBooks\x12\x18.library.GetBooksRequest\x1a\r.library.Book0\x01\x12?\n\x10\x41uthenticateUser\x12\x14.library.AuthRequest\x1a\x15.library.AuthResponse\x12?\n\x08GetUsers\x12\x18.library.GetUsersRequest\x1a\x19.library.GetUsersResponse\x12?\n\nCreateUser\x12\x1a.library.CreateUserRequest\x1a\x15.library.UserResponse\x12?\n\nUpdateUser\x12\x1a.library.UpdateUserRequest\x1a\x15.library.UserResponse\x12\x38\n\x0bStreamUsers\x12\x18.library.GetUsersRequest\x1a\r.library.User0\x01\x12\x44\n\tIssueBook\x12\x19.library.IssueBookRequest\x1a\x1c.library.TransactionResponse\x12\x46\n\nReturnBook\x12\x1a.library.ReturnBookRequest\x1a\x1c.library.TransactionResponse\x12T\n\x0fGetTransactions\x12\x1f.library.GetTransactionsRequest\x1a .library.GetTransactionsResponse\x12M\n\x12StreamTransactions\x12\x1f.library.GetTransactionsRequest\x1a\x14.library.Transaction0\x01\x12T\n\x15\x43reateUserBookRequest\x12\x1d.library.CreateBookRequestReq\x1a\x1c.library.BookRequestResponse\x12P\n\x0fGetBookRequests\x12\x1b.library.GetBookRequestsReq\x1a .library.GetBookRequestsResponse\x12R\n\x12\x41pproveBookRequest\x12\x1e.library.ApproveBookRequestReq\x1a\x1c.library.BookRequestResponse\x12P\n\x11RejectBookRequest\x12\x1d.library.RejectBookRequestReq\x1a\x1c.library.BookRequestResponse\x12Y\n\x16WatchBookRequestEvents\x12\".library.WatchBookRequestEventsReq\x1a\x19.library.BookRequestEvent0\x01\x12\x45\n\x0cGetUserStats\x12\x19.library.UserStatsRequest\x1a\x1a.library.UserStatsResponse\x12`\n\x13GetUserTransactions\x12#.library.GetUserTransactionsRequest\x1a$.library.GetUserTransactionsResponse\x12Y\n\x16StreamUserTransactions\x12#.library.GetUserTransactionsRequest\x1a\x18.library.UserTransaction0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'library_service_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_BOOK']._serialized_start=35
-  _globals['_BOOK']._serialized_end=174
-  _globals['_USER']._serialized_start=176
-  _globals['_USER']._serialized_end=265
-  _globals['_TRANSACTION']._serialized_start=268
-  _globals['_TRANSACTION']._serialized_end=469
-  _globals['_BOOKREQUEST']._serialized_start=472
-  _globals['_BOOKREQUEST']._serialized_end=638
-  _globals['_GETBOOKSREQUEST']._serialized_start=640
-  _globals['_GETBOOKSREQUEST']._serialized_end=679
-  _globals['_GETBOOKSRESPONSE']._serialized_start=681
-  _globals['_GETBOOKSRESPONSE']._serialized_end=729
-  _globals['_GETBOOKREQUEST']._serialized_start=731
-  _globals['_GETBOOKREQUEST']._serialized_end=764
-  _globals['_CREATEBOOKREQUEST']._serialized_start=766
-  _globals['_CREATEBOOKREQUEST']._serialized_end=881
-  _globals['_UPDATEBOOKREQUEST']._serialized_start=884
-  _globals['_UPDATEBOOKREQUEST']._serialized_end=1016
-  _globals['_AUTHREQUEST']._serialized_start=1018
-  _globals['_AUTHREQUEST']._serialized_end=1067
-  _globals['_AUTHRESPONSE']._serialized_start=1069
-  _globals['_AUTHRESPONSE']._serialized_end=1146
-  _globals['_GETUSERSREQUEST']._serialized_start=1148
-  _globals['_GETUSERSREQUEST']._serialized_end=1165
-  _globals['_GETUSERSRESPONSE']._serialized_start=1167
-  _globals['_GETUSERSRESPONSE']._serialized_end=1215
-  _globals['_ISSUEBOOKREQUEST']._serialized_start=1217
-  _globals['_ISSUEBOOKREQUEST']._serialized_end=1289
-  _globals['_RETURNBOOKREQUEST']._serialized_start=1291
-  _globals['_RETURNBOOKREQUEST']._serialized_end=1352
-  _globals['_TRANSACTIONRESPONSE']._serialized_start=1354
-  _globals['_TRANSACTIONRESPONSE']._serialized_end=1452
-  _globals['_GETTRANSACTIONSREQUEST']._serialized_start=1454
-  _globals['_GETTRANSACTIONSREQUEST']._serialized_end=1511
-  _globals['_GETTRANSACTIONSRESPONSE']._serialized_start=1513
-  _globals['_GETTRANSACTIONSRESPONSE']._serialized_end=1582
-  _globals['_CREATEBOOKREQUESTREQ']._serialized_start=1584
-  _globals['_CREATEBOOKREQUESTREQ']._serialized_end=1701
-  _globals['_GETBOOKREQUESTSREQ']._serialized_start=1703
-  _globals['_GETBOOKREQUESTSREQ']._serialized_end=1739
-  _globals['_GETBOOKREQUESTSRESPONSE']._serialized_start=1741
-  _globals['_GETBOOKREQUESTSRESPONSE']._serialized_end=1806
-  _globals['_APPROVEBOOKREQUESTREQ']._serialized_start=1808
-  _globals['_APPROVEBOOKREQUESTREQ']._serialized_end=1869
-  _globals['_REJECTBOOKREQUESTREQ']._serialized_start=1871
-  _globals['_REJECTBOOKREQUESTREQ']._serialized_end=1946
-  _globals['_BOOKREQUESTRESPONSE']._serialized_start=1948
-  _globals['_BOOKREQUESTRESPONSE']._serialized_end=2042
-  _globals['_USERSTATSREQUEST']._serialized_start=2044
-  _globals['_USERSTATSREQUEST']._serialized_end=2079
-  _globals['_USERSTATSRESPONSE']._serialized_start=2081
-  _globals['_USERSTATSRESPONSE']._serialized_end=2198
-  _globals['_USERTRANSACTION']._serialized_start=2201
-  _globals['_USERTRANSACTION']._serialized_end=2428
-  _globals['_GETUSERTRANSACTIONSREQUEST']._serialized_start=2430
-  _globals['_GETUSERTRANSACTIONSREQUEST']._serialized_end=2491
-  _globals['_GETUSERTRANSACTIONSRESPONSE']._serialized_start=2493
-  _globals['_GETUSERTRANSACTIONSRESPONSE']._serialized_end=2570
-  _globals['_BOOKRESPONSE']._serialized_start=2572
-  _globals['_BOOKRESPONSE']._serialized_end=2649
-  _globals['_CREATEUSERREQUEST']._serialized_start=2651
-  _globals['_CREATEUSERREQUEST']._serialized_end=2735
-  _globals['_UPDATEUSERREQUEST']._serialized_start=2737
-  _globals['_UPDATEUSERREQUEST']._serialized_end=2857
-  _globals['_USERRESPONSE']._serialized_start=2859
-  _globals['_USERRESPONSE']._serialized_end=2936
-  _globals['_LIBRARYSERVICE']._serialized_start=2939
-  _globals['_LIBRARYSERVICE']._serialized_end=4254
+  _globals['_TRANSACTION'].fields_by_name['transaction_date']._loaded_options = None
+  _globals['_TRANSACTION'].fields_by_name['transaction_date']._serialized_options = b'\030\001'
+  _globals['_TRANSACTION'].fields_by_name['due_date']._loaded_options = None
+  _globals['_TRANSACTION'].fields_by_name['due_date']._serialized_options = b'\030\001'
+  _globals['_TRANSACTION'].fields_by_name['return_date']._loaded_options = None
+  _globals['_TRANSACTION'].fields_by_name['return_date']._serialized_options = b'\030\001'
+  _globals['_TRANSACTION'].fields_by_name['fine_amount']._loaded_options = None
+  _globals['_TRANSACTION'].fields_by_name['fine_amount']._serialized_options = b'\030\001'
+  _globals['_BOOKREQUEST'].fields_by_name['request_date']._loaded_options = None
+  _globals['_BOOKREQUEST'].fields_by_name['request_date']._serialized_options = b'\030\001'
+  _globals['_BOOKREQUESTEVENT'].fields_by_name['created_at']._loaded_options = None
+  _globals['_BOOKREQUESTEVENT'].fields_by_name['created_at']._serialized_options = b'\030\001'
+  _globals['_USERSTATSRESPONSE'].fields_by_name['total_fine']._loaded_options = None
+  _globals['_USERSTATSRESPONSE'].fields_by_name['total_fine']._serialized_options = b'\030\001'
+  _globals['_USERTRANSACTION'].fields_by_name['transaction_date']._loaded_options = None
+  _globals['_USERTRANSACTION'].fields_by_name['transaction_date']._serialized_options = b'\030\001'
+  _globals['_USERTRANSACTION'].fields_by_name['due_date']._loaded_options = None
+  _globals['_USERTRANSACTION'].fields_by_name['due_date']._serialized_options = b'\030\001'
+  _globals['_USERTRANSACTION'].fields_by_name['return_date']._loaded_options = None
+  _globals['_USERTRANSACTION'].fields_by_name['return_date']._serialized_options = b'\030\001'
+  _globals['_USERTRANSACTION'].fields_by_name['fine_amount']._loaded_options = None
+  _globals['_USERTRANSACTION'].fields_by_name['fine_amount']._serialized_options = b'\030\001'
+  _globals['_BOOK']._serialized_start=102
+  _globals['_BOOK']._serialized_end=241
+  _globals['_USER']._serialized_start=243
+  _globals['_USER']._serialized_end=332
+  _globals['_TRANSACTION']._serialized_start=335
+  _globals['_TRANSACTION']._serialized_end=721
+  _globals['_BOOKREQUEST']._serialized_start=724
+  _globals['_BOOKREQUEST']._serialized_end=944
+  _globals['_GETBOOKSREQUEST']._serialized_start=946
+  _globals['_GETBOOKSREQUEST']._serialized_end=1029
+  _globals['_GETBOOKSRESPONSE']._serialized_start=1031
+  _globals['_GETBOOKSRESPONSE']._serialized_end=1079
+  _globals['_GETBOOKREQUEST']._serialized_start=1081
+  _globals['_GETBOOKREQUEST']._serialized_end=1114
+  _globals['_CREATEBOOKREQUEST']._serialized_start=1116
+  _globals['_CREATEBOOKREQUEST']._serialized_end=1231
+  _globals['_UPDATEBOOKREQUEST']._serialized_start=1234
+  _globals['_UPDATEBOOKREQUEST']._serialized_end=1366
+  _globals['_AUTHREQUEST']._serialized_start=1368
+  _globals['_AUTHREQUEST']._serialized_end=1417
+  _globals['_AUTHRESPONSE']._serialized_start=1419
+  _globals['_AUTHRESPONSE']._serialized_end=1496
+  _globals['_GETUSERSREQUEST']._serialized_start=1498
+  _globals['_GETUSERSREQUEST']._serialized_end=1559
+  _globals['_GETUSERSRESPONSE']._serialized_start=1561
+  _globals['_GETUSERSRESPONSE']._serialized_end=1609
+  _globals['_ISSUEBOOKREQUEST']._serialized_start=1611
+  _globals['_ISSUEBOOKREQUEST']._serialized_end=1683
+  _globals['_RETURNBOOKREQUEST']._serialized_start=1685
+  _globals['_RETURNBOOKREQUEST']._serialized_end=1746
+  _globals['_TRANSACTIONRESPONSE']._serialized_start=1748
+  _globals['_TRANSACTIONRESPONSE']._serialized_end=1846
+  _globals['_GETTRANSACTIONSREQUEST']._serialized_start=1848
+  _globals['_GETTRANSACTIONSREQUEST']._serialized_end=1949
+  _globals['_GETTRANSACTIONSRESPONSE']._serialized_start=1951
+  _globals['_GETTRANSACTIONSRESPONSE']._serialized_end=2020
+  _globals['_CREATEBOOKREQUESTREQ']._serialized_start=2022
+  _globals['_CREATEBOOKREQUESTREQ']._serialized_end=2139
+  _globals['_GETBOOKREQUESTSREQ']._serialized_start=2141
+  _globals['_GETBOOKREQUESTSREQ']._serialized_end=2221
+  _globals['_GETBOOKREQUESTSRESPONSE']._serialized_start=2223
+  _globals['_GETBOOKREQUESTSRESPONSE']._serialized_end=2288
+  _globals['_APPROVEBOOKREQUESTREQ']._serialized_start=2290
+  _globals['_APPROVEBOOKREQUESTREQ']._serialized_end=2351
+  _globals['_REJECTBOOKREQUESTREQ']._serialized_start=2353
+  _globals['_REJECTBOOKREQUESTREQ']._serialized_end=2428
+  _globals['_WATCHBOOKREQUESTEVENTSREQ']._serialized_start=2430
+  _globals['_WATCHBOOKREQUESTEVENTSREQ']._serialized_end=2479
+  _globals['_BOOKREQUESTEVENT']._serialized_start=2482
+  _globals['_BOOKREQUESTEVENT']._serialized_end=2649
+  _globals['_WATCHBOOKAVAILABILITYREQ']._serialized_start=2651
+  _globals['_WATCHBOOKAVAILABILITYREQ']._serialized_end=2699
+  _globals['_BOOKAVAILABILITYEVENT']._serialized_start=2701
+  _globals['_BOOKAVAILABILITYEVENT']._serialized_end=2820
+  _globals['_BOOKREQUESTRESPONSE']._serialized_start=2822
+  _globals['_BOOKREQUESTRESPONSE']._serialized_end=2916
+  _globals['_USERSTATSREQUEST']._serialized_start=2918
+  _globals['_USERSTATSREQUEST']._serialized_end=2953
+  _globals['_USERSTATSRESPONSE']._serialized_start=2956
+  _globals['_USERSTATSRESPONSE']._serialized_end=3103
+  _globals['_USERTRANSACTION']._serialized_start=3106
+  _globals['_USERTRANSACTION']._serialized_end=3518
+  _globals['_GETUSERTRANSACTIONSREQUEST']._serialized_start=3520
+  _globals['_GETUSERTRANSACTIONSREQUEST']._serialized_end=3625
+  _globals['_GETUSERTRANSACTIONSRESPONSE']._serialized_start=3627
+  _globals['_GETUSERTRANSACTIONSRESPONSE']._serialized_end=3704
+  _globals['_BOOKRESPONSE']._serialized_start=3706
+  _globals['_BOOKRESPONSE']._serialized_end=3783
+  _globals['_CREATEUSERREQUEST']._serialized_start=3785
+  _globals['_CREATEUSERREQUEST']._serialized_end=3869
+  _globals['_UPDATEUSERREQUEST']._serialized_start=3871
+  _globals['_UPDATEUSERREQUEST']._serialized_end=3991
+  _globals['_USERRESPONSE']._serialized_start=3993
+  _globals['_USERRESPONSE']._serialized_end=4070
+  _globals['_LIBRARYSERVICE']._serialized_start=4073
+  _globals['_LIBRARYSERVICE']._serialized_end=5859
 # @@protoc_insertion_point(module_scope)
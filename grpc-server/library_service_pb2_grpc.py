@@ -60,6 +60,16 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetBookRequest.SerializeToString,
                 response_deserializer=library__service__pb2.BookResponse.FromString,
                 _registered_method=True)
+        self.WatchBookAvailability = channel.unary_stream(
+                '/library.LibraryService/WatchBookAvailability',
+                request_serializer=library__service__pb2.WatchBookAvailabilityReq.SerializeToString,
+                response_deserializer=library__service__pb2.BookAvailabilityEvent.FromString,
+                _registered_method=True)
+        self.StreamBooks = channel.unary_stream(
+                '/library.LibraryService/StreamBooks',
+                request_serializer=library__service__pb2.GetBooksRequest.SerializeToString,
+                response_deserializer=library__service__pb2.Book.FromString,
+                _registered_method=True)
         self.AuthenticateUser = channel.unary_unary(
                 '/library.LibraryService/AuthenticateUser',
                 request_serializer=library__service__pb2.AuthRequest.SerializeToString,
@@ -80,6 +90,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.UpdateUserRequest.SerializeToString,
                 response_deserializer=library__service__pb2.UserResponse.FromString,
                 _registered_method=True)
+        self.StreamUsers = channel.unary_stream(
+                '/library.LibraryService/StreamUsers',
+                request_serializer=library__service__pb2.GetUsersRequest.SerializeToString,
+                response_deserializer=library__service__pb2.User.FromString,
+                _registered_method=True)
         self.IssueBook = channel.unary_unary(
                 '/library.LibraryService/IssueBook',
                 request_serializer=library__service__pb2.IssueBookRequest.SerializeToString,
@@ -95,6 +110,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetTransactionsRequest.SerializeToString,
                 response_deserializer=library__service__pb2.GetTransactionsResponse.FromString,
                 _registered_method=True)
+        self.StreamTransactions = channel.unary_stream(
+                '/library.LibraryService/StreamTransactions',
+                request_serializer=library__service__pb2.GetTransactionsRequest.SerializeToString,
+                response_deserializer=library__service__pb2.Transaction.FromString,
+                _registered_method=True)
         self.CreateUserBookRequest = channel.unary_unary(
                 '/library.LibraryService/CreateUserBookRequest',
                 request_serializer=library__service__pb2.CreateBookRequestReq.SerializeToString,
@@ -115,6 +135,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.RejectBookRequestReq.SerializeToString,
                 response_deserializer=library__service__pb2.BookRequestResponse.FromString,
                 _registered_method=True)
+        self.WatchBookRequestEvents = channel.unary_stream(
+                '/library.LibraryService/WatchBookRequestEvents',
+                request_serializer=library__service__pb2.WatchBookRequestEventsReq.SerializeToString,
+                response_deserializer=library__service__pb2.BookRequestEvent.FromString,
+                _registered_method=True)
         self.GetUserStats = channel.unary_unary(
                 '/library.LibraryService/GetUserStats',
                 request_serializer=library__service__pb2.UserStatsRequest.SerializeToString,
@@ -125,6 +150,11 @@ class LibraryServiceStub(object):
                 request_serializer=library__service__pb2.GetUserTransactionsRequest.SerializeToString,
                 response_deserializer=library__service__pb2.GetUserTransactionsResponse.FromString,
                 _registered_method=True)
+        self.StreamUserTransactions = channel.unary_stream(
+                '/library.LibraryService/StreamUserTransactions',
+                request_serializer=library__service__pb2.GetUserTransactionsRequest.SerializeToString,
+                response_deserializer=library__service__pb2.UserTransaction.FromString,
+                _registered_method=True)
 
 
 class LibraryServiceServicer(object):
@@ -162,6 +192,22 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchBookAvailability(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamBooks(self, request, context):
+        """Same rows as the Get* list RPCs, one message each as the database
+        returns them (exports, NDJSON). Each call holds a DB connection until
+        the client has read the last row; the server caps concurrent calls
+        (STREAM_MAX_CONCURRENT) and rejects the rest with RESOURCE_EXHAUSTED.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def AuthenticateUser(self, request, context):
         """User operations
         """
@@ -187,6 +233,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def IssueBook(self, request, context):
         """Transaction operations
         """
@@ -206,6 +258,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CreateUserBookRequest(self, request, context):
         """Request operations
         """
@@ -231,6 +289,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchBookRequestEvents(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetUserStats(self, request, context):
         """User dashboard operations
         """
@@ -244,6 +308,12 @@ class LibraryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamUserTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LibraryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -272,6 +342,16 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetBookRequest.FromString,
                     response_serializer=library__service__pb2.BookResponse.SerializeToString,
             ),
+            'WatchBookAvailability': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchBookAvailability,
+                    request_deserializer=library__service__pb2.WatchBookAvailabilityReq.FromString,
+                    response_serializer=library__service__pb2.BookAvailabilityEvent.SerializeToString,
+            ),
+            'StreamBooks': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamBooks,
+                    request_deserializer=library__service__pb2.GetBooksRequest.FromString,
+                    response_serializer=library__service__pb2.Book.SerializeToString,
+            ),
             'AuthenticateUser': grpc.unary_unary_rpc_method_handler(
                     servicer.AuthenticateUser,
                     request_deserializer=library__service__pb2.AuthRequest.FromString,
@@ -292,6 +372,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.UpdateUserRequest.FromString,
                     response_serializer=library__service__pb2.UserResponse.SerializeToString,
             ),
+            'StreamUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamUsers,
+                    request_deserializer=library__service__pb2.GetUsersRequest.FromString,
+                    response_serializer=library__service__pb2.User.SerializeToString,
+            ),
             'IssueBook': grpc.unary_unary_rpc_method_handler(
                     servicer.IssueBook,
                     request_deserializer=library__service__pb2.IssueBookRequest.FromString,
@@ -307,6 +392,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetTransactionsRequest.FromString,
                     response_serializer=library__service__pb2.GetTransactionsResponse.SerializeToString,
             ),
+            'StreamTransactions': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTransactions,
+                    request_deserializer=library__service__pb2.GetTransactionsRequest.FromString,
+                    response_serializer=library__service__pb2.Transaction.SerializeToString,
+            ),
             'CreateUserBookRequest': grpc.unary_unary_rpc_method_handler(
                     servicer.CreateUserBookRequest,
                     request_deserializer=library__service__pb2.CreateBookRequestReq.FromString,
@@ -327,6 +417,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.RejectBookRequestReq.FromString,
                     response_serializer=library__service__pb2.BookRequestResponse.SerializeToString,
             ),
+            'WatchBookRequestEvents': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchBookRequestEvents,
+                    request_deserializer=library__service__pb2.WatchBookRequestEventsReq.FromString,
+                    response_serializer=library__service__pb2.BookRequestEvent.SerializeToString,
+            ),
             'GetUserStats': grpc.unary_unary_rpc_method_handler(
                     servicer.GetUserStats,
                     request_deserializer=library__service__pb2.UserStatsRequest.FromString,
@@ -337,6 +432,11 @@ def add_LibraryServiceServicer_to_server(servicer, server):
                     request_deserializer=library__service__pb2.GetUserTransactionsRequest.FromString,
                     response_serializer=library__service__pb2.GetUserTransactionsResponse.SerializeToString,
             ),
+            'StreamUserTransactions': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamUserTransactions,
+                    request_deserializer=library__service__pb2.GetUserTransactionsRequest.FromString,
+                    response_serializer=library__service__pb2.UserTransaction.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'library.LibraryService', rpc_method_handlers)
@@ -484,6 +584,60 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def WatchBookAvailability(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/WatchBookAvailability',
+            library__service__pb2.WatchBookAvailabilityReq.SerializeToString,
+            library__service__pb2.BookAvailabilityEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamBooks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/StreamBooks',
+            library__service__pb2.GetBooksRequest.SerializeToString,
+            library__service__pb2.Book.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def AuthenticateUser(request,
             target,
@@ -592,6 +746,33 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/StreamUsers',
+            library__service__pb2.GetUsersRequest.SerializeToString,
+            library__service__pb2.User.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def IssueBook(request,
             target,
@@ -673,6 +854,33 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/StreamTransactions',
+            library__service__pb2.GetTransactionsRequest.SerializeToString,
+            library__service__pb2.Transaction.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def CreateUserBookRequest(request,
             target,
@@ -781,6 +989,33 @@ class LibraryService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def WatchBookRequestEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/WatchBookRequestEvents',
+            library__service__pb2.WatchBookRequestEventsReq.SerializeToString,
+            library__service__pb2.BookRequestEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetUserStats(request,
             target,
@@ -834,3 +1069,30 @@ class LibraryService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamUserTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/library.LibraryService/StreamUserTransactions',
+            library__service__pb2.GetUserTransactionsRequest.SerializeToString,
+            library__service__pb2.UserTransaction.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,192 @@
+import logging
+import math
+import os
+import threading
+import time
+import grpc
+from psycopg2.pool import PoolError
+from metrics import SERVICE_NAME
+
+logger = logging.getLogger(__name__)
+
+# Writes always get the full limit; list RPCs only a share of it, so under
+# load they are shed first and writes keep finding a free slot.
+WRITE_METHODS = frozenset((
+    "IssueBook", "ReturnBook", "ApproveBookRequest", "RejectBookRequest", "CreateUserBookRequest",
+    "CreateBook", "UpdateBook", "DeleteBook", "CreateUser", "UpdateUser", "AuthenticateUser"
+))
+
+# Server-streaming exports hold a pooled DB connection (a server-side
+# cursor) and an executor thread until the client has read the last row,
+# so they get their own small cap instead of the adaptive limit
+EXPORT_METHODS = frozenset(("StreamBooks", "StreamUsers", "StreamTransactions", "StreamUserTransactions"))
+
+def default_max_streams():
+    """STREAM_MAX_CONCURRENT, else a quarter of this process's DB pool"""
+    configured = os.getenv('STREAM_MAX_CONCURRENT')
+    if configured:
+        return int(configured)
+    return max(1, int(os.getenv('DB_POOL_MAX', '20')) // 4)
+
+class GradientLimiter:
+    """Concurrency limit estimated from observed latency (gradient style)
+
+    Keeps a slow-moving average of each method's latency as its "no load"
+    baseline. A call slower than its baseline (requests queueing on threads
+    or on the DB) pulls the limit down in proportion; calls at or below the
+    baseline let it grow by about sqrt(limit). Failures that indicate
+    overload halve the limit's target. Callers are rejected once in_flight
+    reaches the limit for their class.
+    """
+
+    def __init__(self, initial_limit=10, min_limit=2, max_limit=10, list_share=0.75,
+                 tolerance=1.5, smoothing=0.2, baseline_window=500):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.list_share = list_share
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self.in_flight = 0
+        self.rejected = {}
+        self._baseline = {}
+        self._lock = threading.Lock()
+
+    def _class_limit(self, method):
+        limit = int(self.limit)
+        if method in WRITE_METHODS:
+            return limit
+        return max(1, int(limit * self.list_share))
+
+    def record_shed(self, method):
+        with self._lock:
+            self.rejected[method] = self.rejected.get(method, 0) + 1
+
+    def try_acquire(self, method):
+        with self._lock:
+            if self.in_flight >= self._class_limit(method):
+                self.rejected[method] = self.rejected.get(method, 0) + 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, method, latency, overloaded=False):
+        with self._lock:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            baseline = self._baseline.get(method)
+            if baseline is None:
+                self._baseline[method] = latency
+                return
+            if overloaded:
+                gradient = 0.5
+            else:
+                self._baseline[method] = baseline + (latency - baseline) / self.baseline_window
+                gradient = max(0.5, min(1.0, self.tolerance * baseline / max(latency, 1e-6)))
+                # Only grow when the limit is actually being used
+                if gradient == 1.0 and in_flight < self.limit / 2:
+                    return
+            target = self.limit * gradient + math.sqrt(self.limit)
+            limit = self.limit * (1 - self.smoothing) + target * self.smoothing
+            self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP grpc_server_concurrency_limit Current adaptive concurrency limit.",
+                "# TYPE grpc_server_concurrency_limit gauge",
+                f"grpc_server_concurrency_limit {self.limit:.2f}",
+                "# HELP grpc_server_shed_total Calls rejected with RESOURCE_EXHAUSTED by the concurrency limiter.",
+                "# TYPE grpc_server_shed_total counter",
+            ]
+            for method, count in sorted(self.rejected.items()):
+                lines.append(f'grpc_server_shed_total{{grpc_method="{method}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+class LoadSheddingInterceptor(grpc.ServerInterceptor):
+    """Rejects unary calls beyond the adaptive limit with RESOURCE_EXHAUSTED
+
+    The check runs as soon as the call gets an executor thread, before any
+    DB work. Latency samples are measured from when the call arrived, so
+    time spent queued for a thread counts as load. A list RPC that already
+    waited longer than max_queue_wait is shed outright.
+
+    Export streams (EXPORT_METHODS) are capped at max_streams concurrent
+    calls per process, so slow readers cannot take every pooled connection;
+    the rest are rejected with RESOURCE_EXHAUSTED. Watch* streams and
+    health checks are not limited: they hold no pooled connection.
+    """
+
+    def __init__(self, limiter=None, max_queue_wait=None, max_streams=None):
+        self.limiter = limiter or adaptive_limiter
+        self.max_queue_wait = max_queue_wait if max_queue_wait is not None else float(os.getenv('LOAD_SHED_MAX_QUEUE_WAIT', '1.0'))
+        self.max_streams = max_streams if max_streams is not None else default_max_streams()
+        self._stream_slots = threading.BoundedSemaphore(self.max_streams)
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or not handler_call_details.method.startswith(f"/{SERVICE_NAME}/"):
+            return handler
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        if handler.unary_stream and method in EXPORT_METHODS:
+            return grpc.unary_stream_rpc_method_handler(
+                self._wrap_stream(method, handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        if not handler.unary_unary:
+            return handler
+        return grpc.unary_unary_rpc_method_handler(
+            self._wrap_unary(method, handler.unary_unary, time.perf_counter()),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer
+        )
+
+    def _wrap_unary(self, method, behavior, arrived):
+        limiter = self.limiter
+        max_queue_wait = self.max_queue_wait
+
+        def handle(request, context):
+            queued = time.perf_counter() - arrived
+            if method not in WRITE_METHODS and queued > max_queue_wait:
+                limiter.record_shed(method)
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Server overloaded, retry later")
+            if not limiter.try_acquire(method):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Server overloaded, retry later")
+            overloaded = False
+            try:
+                return behavior(request, context)
+            except PoolError:
+                overloaded = True
+                logger.warning(f"Connection pool exhausted in {method}, shedding")
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Server overloaded, retry later")
+            finally:
+                limiter.release(method, time.perf_counter() - arrived, overloaded)
+        return handle
+
+    def _wrap_stream(self, method, behavior):
+        limiter = self.limiter
+        slots = self._stream_slots
+
+        def handle(request, context):
+            if not slots.acquire(blocking=False):
+                limiter.record_shed(method)
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many concurrent exports, retry later")
+            try:
+                yield from behavior(request, context)
+            except PoolError:
+                logger.warning(f"Connection pool exhausted in {method}, shedding")
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Server overloaded, retry later")
+            finally:
+                # Also runs when a cancelled call's generator is closed
+                slots.release()
+        return handle
+
+# Global limiter instance
+adaptive_limiter = GradientLimiter(
+    initial_limit=int(os.getenv('LOAD_SHED_INITIAL_LIMIT', '10')),
+    min_limit=int(os.getenv('LOAD_SHED_MIN_LIMIT', '2')),
+    max_limit=int(os.getenv('LOAD_SHED_MAX_LIMIT', '10'))
+)
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Add shared modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared import logging_config as _shared
+from shared.logging_config import SamplingFilter, RateLimitFilter, ContextQueueHandler
+
+class JSONFormatter(_shared.JSONFormatter):
+    service = "grpc-server"
+
+def setup_logging():
+    """Structured JSON logging for the gRPC server; see shared.logging_config.setup_logging"""
+    return _shared.setup_logging(JSONFormatter())
@@ -0,0 +1,218 @@
+import bisect
+import threading
+import time
+import grpc
+
+SERVICE_NAME = "library.LibraryService"
+
+# Latency buckets in seconds, size buckets in bytes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+class Histogram:
+    """Fixed-bucket histogram; callers are responsible for locking"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class RpcMetrics:
+    """Thread-safe per-method RPC statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._request_bytes = {}
+        self._response_bytes = {}
+        self._handled = {}
+        self._in_flight = {}
+
+    def _histogram(self, table, method, buckets):
+        histogram = table.get(method)
+        if histogram is None:
+            histogram = table[method] = Histogram(buckets)
+        return histogram
+
+    def call_started(self, method):
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def call_finished(self, method, elapsed, code):
+        with self._lock:
+            self._in_flight[method] -= 1
+            self._histogram(self._latency, method, LATENCY_BUCKETS).observe(elapsed)
+            key = (method, code)
+            self._handled[key] = self._handled.get(key, 0) + 1
+
+    def observe_request_size(self, method, size):
+        with self._lock:
+            self._histogram(self._request_bytes, method, SIZE_BUCKETS).observe(size)
+
+    def observe_response_size(self, method, size):
+        with self._lock:
+            self._histogram(self._response_bytes, method, SIZE_BUCKETS).observe(size)
+
+    def in_flight(self, method=None):
+        with self._lock:
+            if method is None:
+                return sum(self._in_flight.values())
+            return self._in_flight.get(method, 0)
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._request_bytes.clear()
+            self._response_bytes.clear()
+            self._handled.clear()
+            self._in_flight.clear()
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                "# HELP grpc_server_handling_seconds Time spent in the RPC handler.",
+                "# TYPE grpc_server_handling_seconds histogram",
+            ]
+            for method in sorted(self._latency):
+                lines.extend(self._latency[method].render("grpc_server_handling_seconds", _labels(method)))
+
+            lines.append("# HELP grpc_server_msg_received_bytes Size of request messages.")
+            lines.append("# TYPE grpc_server_msg_received_bytes histogram")
+            for method in sorted(self._request_bytes):
+                lines.extend(self._request_bytes[method].render("grpc_server_msg_received_bytes", _labels(method)))
+
+            lines.append("# HELP grpc_server_msg_sent_bytes Size of response messages.")
+            lines.append("# TYPE grpc_server_msg_sent_bytes histogram")
+            for method in sorted(self._response_bytes):
+                lines.extend(self._response_bytes[method].render("grpc_server_msg_sent_bytes", _labels(method)))
+
+            lines.append("# HELP grpc_server_handled_total RPCs completed, by status code.")
+            lines.append("# TYPE grpc_server_handled_total counter")
+            for (method, code), count in sorted(self._handled.items()):
+                lines.append(f'grpc_server_handled_total{{{_labels(method)},grpc_code="{code}"}} {count}')
+
+            lines.append("# HELP grpc_server_in_flight RPCs currently being handled.")
+            lines.append("# TYPE grpc_server_in_flight gauge")
+            for method, count in sorted(self._in_flight.items()):
+                lines.append(f'grpc_server_in_flight{{{_labels(method)}}} {count}')
+        return "\n".join(lines) + "\n"
+
+def _labels(method):
+    return f'grpc_service="{SERVICE_NAME}",grpc_method="{method}"'
+
+def _status_code(context, error=None):
+    """Resolve the final status code of a call from its servicer context"""
+    code = None
+    code_getter = getattr(context, "code", None)
+    if callable(code_getter):
+        try:
+            code = code_getter()
+        except Exception:
+            code = None
+    if isinstance(code, grpc.StatusCode):
+        return code.name
+    return "UNKNOWN" if error is not None else "OK"
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Records latency, message sizes, status codes and in-flight calls per method"""
+
+    def __init__(self, metrics=None):
+        self._metrics = metrics or rpc_metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        request_deserializer = self._measure_request(method, handler.request_deserializer)
+        response_serializer = self._measure_response(method, handler.response_serializer)
+
+        if handler.unary_unary:
+            return grpc.unary_unary_rpc_method_handler(
+                self._wrap_unary(method, handler.unary_unary),
+                request_deserializer=request_deserializer,
+                response_serializer=response_serializer
+            )
+        if handler.unary_stream:
+            return grpc.unary_stream_rpc_method_handler(
+                self._wrap_stream(method, handler.unary_stream),
+                request_deserializer=request_deserializer,
+                response_serializer=response_serializer
+            )
+        return handler
+
+    def _measure_request(self, method, deserializer):
+        if deserializer is None:
+            return None
+        metrics = self._metrics
+
+        def deserialize(data):
+            metrics.observe_request_size(method, len(data))
+            return deserializer(data)
+        return deserialize
+
+    def _measure_response(self, method, serializer):
+        if serializer is None:
+            return None
+        metrics = self._metrics
+
+        def serialize(message):
+            data = serializer(message)
+            metrics.observe_response_size(method, len(data))
+            return data
+        return serialize
+
+    def _wrap_unary(self, method, behavior):
+        metrics = self._metrics
+
+        def handle(request, context):
+            metrics.call_started(method)
+            start = time.perf_counter()
+            error = None
+            try:
+                return behavior(request, context)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                metrics.call_finished(method, time.perf_counter() - start, _status_code(context, error))
+        return handle
+
+    def _wrap_stream(self, method, behavior):
+        metrics = self._metrics
+
+        def handle(request, context):
+            metrics.call_started(method)
+            start = time.perf_counter()
+            error = None
+            try:
+                yield from behavior(request, context)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                metrics.call_finished(method, time.perf_counter() - start, _status_code(context, error))
+        return handle
+
+# Global metrics instance
+rpc_metrics = RpcMetrics()
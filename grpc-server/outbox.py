@@ -0,0 +1,269 @@
+import grpc
+import json
+import logging
+import os
+import queue
+import select
+import threading
+from connection_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CHANNEL = os.getenv('OUTBOX_CHANNEL', 'outbox_events')
+# Held only by dispatchers while they number committed events, never by writers
+OUTBOX_POSITION_LOCK_ID = 0x6f7574626f78  # "outbox"
+OUTBOX_POSITION_BATCH = int(os.getenv('OUTBOX_POSITION_BATCH', '500'))
+
+_EVENT_COLUMNS = "event_id, aggregate_type, aggregate_id, event_type, payload, created_at, position"
+
+class OutboxEvent:
+    __slots__ = ("event_id", "aggregate_type", "aggregate_id", "event_type", "payload", "created_at", "position")
+
+    def __init__(self, event_id, aggregate_type, aggregate_id, event_type, payload, created_at=None, position=None):
+        self.event_id = event_id
+        self.aggregate_type = aggregate_type
+        self.aggregate_id = aggregate_id
+        self.event_type = event_type
+        self.payload = payload if isinstance(payload, dict) else json.loads(payload)
+        self.created_at = created_at
+        self.position = position
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+def write_event(cursor, aggregate_type, aggregate_id, event_type, payload):
+    """Append an event using the caller's cursor, inside the caller's transaction
+
+    The NOTIFY is transactional too: subscribers are only woken once the
+    surrounding transaction commits. Writers take no lock: event_ids are
+    allocated at insert time and may commit out of order, so streams
+    follow the position a dispatcher assigns after commit instead
+    (assign_positions).
+    """
+    cursor.execute(
+        "INSERT INTO outbox_events (aggregate_type, aggregate_id, event_type, payload) VALUES (%s, %s, %s, %s) RETURNING event_id",
+        (aggregate_type, aggregate_id, event_type, json.dumps(payload))
+    )
+    event_id = cursor.fetchone()[0]
+    cursor.execute("SELECT pg_notify(%s, %s)", (OUTBOX_CHANNEL, str(event_id)))
+    return event_id
+
+def write_availability_event(cursor, book_id):
+    """Record a book's current availability after the caller changed it
+
+    Reads the row inside the caller's transaction, so the event carries the
+    value being committed without another round trip to fetch it.
+    """
+    cursor.execute(
+        "INSERT INTO outbox_events (aggregate_type, aggregate_id, event_type, payload) "
+        "SELECT 'book', book_id, 'AVAILABILITY_CHANGED', jsonb_build_object("
+        "'book_id', book_id, 'available_copies', available_copies, 'deleted', is_deleted) "
+        "FROM books WHERE book_id = %s",
+        (book_id,)
+    )
+    cursor.execute("SELECT pg_notify(%s, %s)", (OUTBOX_CHANNEL, f"book:{book_id}"))
+
+def assign_positions(limit=None):
+    """Number committed events that have no position yet; returns how many
+
+    Positions come from a sequence read after the events committed, in a
+    transaction that dispatchers take turns at (advisory lock), so they
+    become visible in increasing order and a reader that has seen position
+    N never gets a smaller one later. If another dispatcher is numbering,
+    this one skips: that one's NOTIFY wakes everybody when it is done.
+    """
+    with db_pool.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (OUTBOX_POSITION_LOCK_ID,))
+            if not cursor.fetchone()[0]:
+                conn.rollback()
+                return 0
+            cursor.execute(
+                "UPDATE outbox_events SET position = nextval('outbox_position_seq') WHERE event_id IN ("
+                "SELECT event_id FROM outbox_events WHERE position IS NULL ORDER BY event_id LIMIT %s)",
+                (limit or OUTBOX_POSITION_BATCH,)
+            )
+            assigned = cursor.rowcount
+            if assigned:
+                cursor.execute("SELECT pg_notify(%s, %s)", (OUTBOX_CHANNEL, "positions"))
+            conn.commit()
+    return assigned
+
+def read_events(after_position, aggregate_type=None, limit=500):
+    """Events with position > after_position, in position order"""
+    with db_pool.get_connection() as conn:
+        with conn.cursor() as cursor:
+            if aggregate_type:
+                cursor.execute(
+                    f"SELECT {_EVENT_COLUMNS} FROM outbox_events WHERE position > %s AND aggregate_type = %s ORDER BY position LIMIT %s",
+                    (after_position, aggregate_type, limit)
+                )
+            else:
+                cursor.execute(
+                    f"SELECT {_EVENT_COLUMNS} FROM outbox_events WHERE position > %s ORDER BY position LIMIT %s",
+                    (after_position, limit)
+                )
+            rows = cursor.fetchall()
+            conn.commit()
+    return [OutboxEvent.from_row(row) for row in rows]
+
+def head_position():
+    with db_pool.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(position), 0) FROM outbox_events")
+            head = cursor.fetchone()[0]
+            conn.commit()
+    return head
+
+class Subscription:
+    """Bounded per-stream buffer fed by the dispatcher thread
+
+    A subscriber that falls behind is marked overflowed instead of blocking
+    the dispatcher; the stream then ends and the client resumes from its
+    last cursor, replaying from the table.
+    """
+
+    def __init__(self, aggregate_type=None, max_pending=1000):
+        self.aggregate_type = aggregate_type
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def offer(self, event):
+        if self.aggregate_type and event.aggregate_type != self.aggregate_type:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class OutboxDispatcher:
+    """Single background reader of the outbox shared by all streaming RPCs
+
+    Wakes on LISTEN notifications (and every poll_interval as a fallback),
+    numbers newly committed events, reads new rows once by position, and
+    fans them out to subscriptions.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.last_position = None
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def head(self):
+        """Position a new stream starts after: the last dispatched, else the table's"""
+        last_position = self.last_position
+        return last_position if last_position is not None else head_position()
+
+    def subscribe(self, aggregate_type=None):
+        subscription = Subscription(aggregate_type)
+        # Query outside the lock; live dispatch only has to start from the
+        # head, streams replay from the table up to where they subscribed
+        head = head_position() if self._thread is None else None
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._thread is None:
+                if head is not None:
+                    self.last_position = head
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        conn = None
+        while not self._stopped.is_set():
+            try:
+                if conn is None:
+                    conn = db_pool.connect_dedicated()
+                    conn.autocommit = True
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"LISTEN {OUTBOX_CHANNEL}")
+                    # Catch up on anything committed while we were not listening
+                    self.dispatch_new()
+                if select.select([conn], [], [], self.poll_interval) != ([], [], []):
+                    conn.poll()
+                    conn.notifies.clear()
+                self.dispatch_new()
+            except Exception as e:
+                logger.warning(f"Outbox dispatcher error, reconnecting: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                self._stopped.wait(self.poll_interval)
+        if conn is not None:
+            conn.close()
+
+    def dispatch_new(self):
+        while assign_positions() >= OUTBOX_POSITION_BATCH:
+            pass
+        while True:
+            events = read_events(self.last_position)
+            if not events:
+                return
+            with self._lock:
+                subscriptions = list(self._subscriptions)
+            for event in events:
+                for subscription in subscriptions:
+                    subscription.offer(event)
+            self.last_position = events[-1].position
+
+# Global dispatcher instance
+outbox_dispatcher = OutboxDispatcher()
+
+def stream_events(since_cursor, aggregate_type, context, dispatcher=None):
+    """Generator behind the Watch* RPCs: replay, then follow live events
+
+    Cursors are outbox positions. since_cursor > 0 replays events after
+    it; since_cursor == 0 starts from the head, taken before subscribing
+    so nothing dispatched in between is lost. Either way the replay is
+    followed by a SUBSCRIBED marker carrying the cursor reached (the client
+    has a cursor to resume from even if nothing happens, and knows it is
+    caught up), then by live events, de-duplicated by position.
+    """
+    dispatcher = dispatcher or outbox_dispatcher
+    cursor = since_cursor if since_cursor > 0 else dispatcher.head()
+    subscription = dispatcher.subscribe(aggregate_type)
+    try:
+        # The subscription buffers anything newer while we replay
+        while True:
+            events = read_events(cursor, aggregate_type)
+            if not events:
+                break
+            for event in events:
+                yield event
+                cursor = event.position
+        yield OutboxEvent(None, aggregate_type, 0, 'SUBSCRIBED', {}, position=cursor)
+        
+        while context.is_active():
+            if subscription.overflowed:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Subscriber fell behind; resume from last cursor")
+            event = subscription.get(timeout=1.0)
+            if event is None or event.position <= cursor:
+                continue
+            yield event
+            cursor = event.position
+    finally:
+        dispatcher.unsubscribe(subscription)
@@ -0,0 +1,176 @@
+import base64
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import secrets
+import site
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip("=")
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+class LegacySHA256Hasher:
+    """Unsalted SHA-256 hex digests, as stored before tagged formats
+
+    Only verified (so existing users can still log in); a successful login
+    rehashes with the preferred scheme.
+    """
+    tag = "sha256"
+
+    def identify(self, encoded):
+        return "$" not in encoded and len(encoded) == 64
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_update(self, encoded):
+        return True
+
+class PBKDF2Hasher:
+    """pbkdf2_sha256$<iterations>$<salt>$<hash>"""
+    tag = "pbkdf2_sha256"
+
+    def __init__(self, iterations=None):
+        self.iterations = iterations or int(os.getenv('PBKDF2_ITERATIONS', '600000'))
+
+    def identify(self, encoded):
+        return encoded.startswith(self.tag + "$")
+
+    def _derive(self, password, salt, iterations):
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+    def hash(self, password):
+        salt = secrets.token_bytes(16)
+        return f"{self.tag}${self.iterations}${_b64(salt)}${_b64(self._derive(password, salt, self.iterations))}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, expected = encoded.split("$")
+        return hmac.compare_digest(_b64(self._derive(password, _unb64(salt), int(iterations))), expected)
+
+    def needs_update(self, encoded):
+        return int(encoded.split("$")[1]) != self.iterations
+
+class ScryptHasher:
+    """scrypt$<n>$<r>$<p>$<salt>$<hash> (memory-hard, stdlib only)"""
+    tag = "scrypt"
+
+    def __init__(self, n=None, r=8, p=1):
+        self.n = n or int(os.getenv('SCRYPT_N', str(2 ** 15)))
+        self.r = r
+        self.p = p
+
+    def identify(self, encoded):
+        return encoded.startswith(self.tag + "$")
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+    def hash(self, password):
+        salt = secrets.token_bytes(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.tag}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, expected = encoded.split("$")
+        return hmac.compare_digest(_b64(self._derive(password, _unb64(salt), int(n), int(r), int(p))), expected)
+
+    def needs_update(self, encoded):
+        _, n, r, p = encoded.split("$")[:4]
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+HASHERS = {hasher.tag: hasher for hasher in (ScryptHasher, PBKDF2Hasher)}
+
+def _check(hashers, preferred, password, encoded):
+    """Runs in a worker process: (matches, needs_rehash)"""
+    for hasher in hashers:
+        if hasher.identify(encoded):
+            if not hasher.verify(password, encoded):
+                return False, False
+            return True, hasher.tag != preferred.tag or hasher.needs_update(encoded)
+    return False, False
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a dedicated process pool
+
+    scheme is a tag from HASHERS (PASSWORD_HASHER, default scrypt) or a
+    configured hasher instance; hashes in any other known format still
+    verify and are reported as needing a rehash.
+
+    Slow KDFs cost tens to hundreds of milliseconds of CPU per call. Running
+    them in separate processes keeps that work off the gRPC executor threads
+    (and the GIL), so DB-bound RPCs are not starved during login bursts.
+    workers=0 hashes inline, for tests and tools.
+    """
+
+    def __init__(self, scheme=None, workers=None):
+        scheme = scheme or os.getenv('PASSWORD_HASHER', 'scrypt')
+        if isinstance(scheme, str):
+            if scheme not in HASHERS:
+                raise ValueError(f"Unknown password hasher: {scheme}")
+            scheme = HASHERS[scheme]()
+        self.preferred = scheme
+        # Every scheme we can still verify, preferred first
+        self.hashers = [scheme] + [cls() for tag, cls in HASHERS.items() if tag != scheme.tag] + [LegacySHA256Hasher()]
+        self.workers = workers if workers is not None else int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+        self._pool = None
+        self._lock = threading.Lock()
+        self._dummy = None
+
+    def start(self):
+        """Create the pool now rather than on the first login"""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if self._pool is None:
+                # spawn: the server is multi-threaded by the time the pool starts.
+                # Workers unpickle tasks by importing this module, so give them
+                # its directory even if it is not on sys.path here (the gateway
+                # imports the server in-process and then restores sys.path)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=site.addsitedir, initargs=(os.path.dirname(os.path.abspath(__file__)),)
+                )
+                logger.info(f"Password hashing pool started: workers={self.workers}, scheme={self.preferred.tag}")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if self._pool is None:
+            self.start()
+        return self._pool.submit(fn, *args).result()
+
+    def hash(self, password):
+        return self._run(self.preferred.hash, password)
+
+    def verify(self, password, encoded):
+        """Returns (matches, needs_rehash)
+
+        Pass encoded=None for an unknown user: a dummy hash is still checked
+        so response time does not reveal whether the username exists.
+        """
+        if encoded is None:
+            if self._dummy is None:
+                self._dummy = self.hash(secrets.token_urlsafe(16))
+            self._run(_check, self.hashers, self.preferred, password, self._dummy)
+            return False, False
+        return self._run(_check, self.hashers, self.preferred, password, encoded)
+
+# Global hasher instance
+password_hasher = PasswordHasher()
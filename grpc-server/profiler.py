@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+# Add shared modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.profiler import (
+    MAX_SECONDS, DEFAULT_INTERVAL, MIN_INTERVAL, ProfilerBusyError, SamplingProfiler, AllocationTracker,
+    collapse_stack, start_profile
+)
+
+def run_profile(mode, seconds, interval=DEFAULT_INTERVAL, limit=25):
+    """Profile the running process for ``seconds``; blocks the calling thread"""
+    stop = start_profile(mode, seconds, interval, limit)
+    try:
+        time.sleep(seconds)
+    finally:
+        report = stop()
+    return report
+
+def profile_handler(query):
+    """AdminServer handler for /debug/profile?mode=wall|memory&seconds=N"""
+    try:
+        seconds = float(query.get("seconds", "10"))
+        interval = float(query.get("interval", DEFAULT_INTERVAL))
+        limit = int(query.get("limit", "25"))
+    except ValueError:
+        raise ValueError("seconds, interval and limit must be numeric")
+    try:
+        body = run_profile(query.get("mode", "wall"), seconds, interval, limit)
+    except ProfilerBusyError as e:
+        return 409, "text/plain; charset=utf-8", f"{e}\n"
+    return 200, "text/plain; charset=utf-8", body
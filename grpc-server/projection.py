@@ -0,0 +1,96 @@
+import os
+import threading
+from connection_pool import db_pool
+import wire_format
+
+# Rows fetched per round trip by stream_rows' server-side cursor
+STREAM_BATCH_ROWS = int(os.getenv('STREAM_BATCH_ROWS', '1000'))
+# DB-side limits for a stream: per FETCH, and between FETCHes (a client
+# that stops reading leaves the transaction idle)
+STREAM_STATEMENT_TIMEOUT_MS = int(os.getenv('STREAM_STATEMENT_TIMEOUT_MS', '30000'))
+STREAM_IDLE_TIMEOUT_MS = int(os.getenv('STREAM_IDLE_TIMEOUT_MS', '60000'))
+
+class Projection:
+    """Message fields of a list RPC item and the SQL each is read from
+
+    A list request's field mask picks the fields; select() turns them into
+    the SELECT column list and a row -> message builder, so a narrow
+    lookup neither reads nor allocates the other columns. Each field has its
+    own expression (one column can feed both a deprecated string and its
+    Timestamp) and an optional converter for the DB value. Fields marked
+    legacy are left out of the default selection when LEGACY_PROTO_FIELDS
+    is off.
+    """
+
+    def __init__(self, message_class, columns):
+        self.message_class = message_class
+        # field -> (sql, convert, legacy)
+        self.columns = {}
+        for column in columns:
+            field, sql = column[0], column[1]
+            convert = column[2] if len(column) > 2 else None
+            legacy = column[3] if len(column) > 3 else False
+            if field not in message_class.DESCRIPTOR.fields_by_name:
+                raise ValueError(f"{message_class.DESCRIPTOR.name} has no field {field}")
+            self.columns[field] = (sql, convert, legacy)
+        self._selections = {}
+        self._lock = threading.Lock()
+
+    def select(self, mask=None):
+        """Selection for a FieldMask (None or empty: every field); ValueError on unknown paths"""
+        if mask is not None and mask.paths:
+            fields = tuple(dict.fromkeys(mask.paths))
+            unknown = [field for field in fields if field not in self.columns]
+            if unknown:
+                raise ValueError(f"Unknown {self.message_class.DESCRIPTOR.name} field(s) in mask: {', '.join(unknown)}")
+        else:
+            fields = tuple(field for field, (_, _, legacy) in self.columns.items() if wire_format.LEGACY_PROTO_FIELDS or not legacy)
+        selection = self._selections.get(fields)
+        if selection is None:
+            with self._lock:
+                selection = self._selections.setdefault(fields, Selection(self, fields))
+        return selection
+
+class Selection:
+    """SELECT column list plus a builder for rows fetched with it"""
+
+    def __init__(self, projection, fields):
+        self.fields = fields
+        # Fields read from the same expression share its column
+        expressions = list(dict.fromkeys(projection.columns[field][0] for field in fields))
+        self.sql = ", ".join(expressions)
+        message_class = projection.message_class
+        # (field, row index, converter) resolved once per field set
+        readers = tuple(
+            (field, expressions.index(projection.columns[field][0]), projection.columns[field][1])
+            for field in fields
+        )
+
+        def build(row):
+            return message_class(**{
+                field: row[index] if convert is None else convert(row[index])
+                for field, index, convert in readers
+            })
+        self.build = build
+
+def stream_rows(selection, query, params=None):
+    """Messages for the rows of a query, read through a server-side cursor
+
+    Memory stays at one batch of rows however large the result, but the
+    call holds a pooled connection (with an open transaction) and an
+    executor thread until the stream ends or the client cancels it: the
+    pace is set by the slowest reader, end to end. LoadSheddingInterceptor
+    caps concurrent export streams; if the client stalls for longer than
+    STREAM_IDLE_TIMEOUT_MS, Postgres ends the session and the stream fails.
+    """
+    with db_pool.get_connection() as conn:
+        with conn.cursor() as settings:
+            settings.execute(
+                "SET LOCAL statement_timeout = %s; SET LOCAL idle_in_transaction_session_timeout = %s",
+                (STREAM_STATEMENT_TIMEOUT_MS, STREAM_IDLE_TIMEOUT_MS)
+            )
+        with conn.cursor(name="stream_rows") as cursor:
+            cursor.itersize = STREAM_BATCH_ROWS
+            cursor.execute(query, params)
+            for row in cursor:
+                yield selection.build(row)
@@ -19,7 +19,20 @@ def run_tests():
         'tests.test_book_service', 
         'tests.test_transaction_service',
         'tests.test_request_service',
-        'tests.test_user_service'
+        'tests.test_user_service',
+        'tests.test_metrics',
+        'tests.test_tracing',
+        'tests.test_profiler',
+        'tests.test_logging_config',
+        'tests.test_outbox',
+        'tests.test_last_login',
+        'tests.test_passwords',
+        'tests.test_load_shedding',
+        'tests.test_health',
+        'tests.test_supervisor',
+        'tests.test_compression',
+        'tests.test_wire_format',
+        'tests.test_projection'
     ]
     
     print("Running gRPC Service Tests...")
@@ -1,7 +1,12 @@
 import grpc
 from concurrent import futures
+import argparse
+import logging
+import signal
 import sys
 import os
+import threading
+import time
 
 # Add shared modules to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -9,32 +14,113 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from shared.models import User, Book, Transaction, BookRequest
 from shared.database import SessionLocal, engine
 from services.library_service_main import LibraryServiceImpl
+from metrics import MetricsInterceptor, rpc_metrics
+from load_shedding import LoadSheddingInterceptor, adaptive_limiter
+from compression import CompressionInterceptor, message_size_options
+from tracing import TracingInterceptor, configure_exporter
+from logging_config import setup_logging
+from admin_server import AdminServer
+from profiler import profile_handler
+from passwords import password_hasher
+from connection_pool import db_pool
+from health import HealthServicer
+from supervisor import Supervisor
 
 # Import pre-generated proto files
 import library_service_pb2_grpc
+import health_pb2_grpc
 
 def serve():
     try:
+        setup_logging()
+        configure_exporter()
+        # Spawn the hashing workers before the first login needs them
+        password_hasher.start()
         print("Initializing gRPC server...")
-        server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        server = grpc.server(
+            # Unary calls are capped by the load shedding limit; the extra
+            # threads serve long-lived streams (health Watch, event feeds)
+            futures.ThreadPoolExecutor(max_workers=int(os.getenv('GRPC_MAX_WORKERS', '20'))),
+            interceptors=[TracingInterceptor(), MetricsInterceptor(rpc_metrics), LoadSheddingInterceptor(adaptive_limiter), CompressionInterceptor()],
+            # Lets the workers of a multi-process server share the port
+            options=[("grpc.so_reuseport", 1)] + message_size_options()
+        )
         
         print("Adding service to server...")
         library_service_pb2_grpc.add_LibraryServiceServicer_to_server(
             LibraryServiceImpl(), server
         )
+        # grpc.health.v1, driven by DB pool health, for round_robin clients
+        health_servicer = HealthServicer()
+        health_pb2_grpc.add_HealthServicer_to_server(health_servicer, server)
+        health_servicer.start()
         
-        listen_addr = '[::]:50051'
+        listen_addr = f"[::]:{os.getenv('GRPC_PORT', '50051')}"
         print(f"Binding to {listen_addr}...")
         server.add_insecure_port(listen_addr)
+        # Co-located gateways can skip TCP loopback
+        unix_socket = os.getenv('GRPC_UNIX_SOCKET')
+        if unix_socket:
+            print(f"Binding to unix:{unix_socket}...")
+            server.add_insecure_port(f"unix:{unix_socket}")
         
         print(f"Starting gRPC server on {listen_addr}")
         server.start()
         print("gRPC server started successfully!")
+        
+        admin_server = AdminServer()
+        admin_server.route('/metrics', lambda query: (200, "text/plain; version=0.0.4; charset=utf-8", rpc_metrics.render() + adaptive_limiter.render()))
+        admin_server.route('/debug/profile', profile_handler)
+        admin_server.start()
+        print(f"Metrics available on http://{admin_server.host}:{admin_server.port}/metrics")
+        drain_on_signal(server, health_servicer)
         server.wait_for_termination()
+        admin_server.stop()
+        release_resources()
+        print("gRPC server stopped")
     except Exception as e:
         print(f"Error starting gRPC server: {e}")
         import traceback
         traceback.print_exc()
 
+def drain(server, health_servicer, grace, delay):
+    """Report NOT_SERVING, keep serving for ``delay``, then stop with ``grace``
+
+    server.stop() refuses new calls at once, so the delay gives clients
+    watching health time to stop picking this server first; calls still
+    running after the grace period are cancelled.
+    """
+    print(f"Draining gRPC server (delay {delay:.0f}s, grace {grace:.0f}s)...")
+    health_servicer.stop()
+    time.sleep(delay)
+    server.stop(grace).wait()
+
+def release_resources():
+    """Stop the hashing workers and close pooled DB connections on exit"""
+    password_hasher.shutdown()
+    db_pool.close_pool()
+
+def drain_on_signal(server, health_servicer, grace=None, delay=None):
+    """On SIGTERM/SIGINT: drain() on a side thread, so the signal handler returns"""
+    grace = grace if grace is not None else float(os.getenv('GRPC_DRAIN_GRACE', '10'))
+    delay = delay if delay is not None else float(os.getenv('GRPC_DRAIN_DELAY', '5'))
+
+    def handle(signum, frame):
+        threading.Thread(target=drain, args=(server, health_servicer, grace, delay), name="grpc-drain", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+def main():
+    parser = argparse.ArgumentParser(description="Library gRPC server")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('GRPC_WORKERS', '1')),
+                        help="server processes sharing the port via SO_REUSEPORT (default: $GRPC_WORKERS or 1)")
+    args = parser.parse_args()
+    if args.workers > 1:
+        logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+        Supervisor(args.workers).run()
+    else:
+        serve()
+
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,8 +1,8 @@
-import hashlib
-from datetime import datetime
 import logging
 import psycopg2
 from connection_pool import db_pool
+from last_login import last_login_recorder
+from passwords import password_hasher
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
@@ -15,41 +15,59 @@ class AuthService:
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    password_hash = hashlib.sha256(request.password.encode()).hexdigest()
                     cursor.execute(
-                        "SELECT user_id, username, email, role, is_active FROM users WHERE username = %s AND password_hash = %s AND is_active = true",
-                        (request.username, password_hash)
+                        "SELECT user_id, username, email, role, is_active, password_hash FROM users WHERE username = %s AND is_active = true",
+                        (request.username,)
                     )
                     user_data = cursor.fetchone()
-                    
-                    if user_data:
-                        cursor.execute(
-                            "UPDATE users SET last_login = %s WHERE user_id = %s",
-                            (datetime.utcnow(), user_data[0])
-                        )
-                        conn.commit()
-                        logger.info("Authentication successful", extra={"username": request.username, "role": user_data[3], "user_id": user_data[0]})
-                        
-                        return library_service_pb2.AuthResponse(
-                            success=True,
-                            user=library_service_pb2.User(
-                                user_id=user_data[0],
-                                username=user_data[1],
-                                email=user_data[2],
-                                role=user_data[3],
-                                is_active=user_data[4]
-                            ),
-                            message="Authentication successful"
-                        )
-                    else:
-                        logger.warning("Authentication failed", extra={"username": request.username, "reason": "invalid_credentials"})
-                        return library_service_pb2.AuthResponse(
-                            success=False,
-                            message="Invalid credentials"
-                        )
+                    conn.commit()
+            
+            # Verified in the hashing pool, after the DB connection is released
+            matches, needs_rehash = password_hasher.verify(request.password, user_data[5] if user_data else None)
+            
+            if matches:
+                if needs_rehash:
+                    self._upgrade_hash(user_data[0], request.password)
+                # Written in batches off the request path
+                last_login_recorder.record(user_data[0])
+                logger.info("Authentication successful", extra={"username": request.username, "role": user_data[3], "user_id": user_data[0]})
+                
+                return library_service_pb2.AuthResponse(
+                    success=True,
+                    user=library_service_pb2.User(
+                        user_id=user_data[0],
+                        username=user_data[1],
+                        email=user_data[2],
+                        role=user_data[3],
+                        is_active=user_data[4]
+                    ),
+                    message="Authentication successful"
+                )
+            else:
+                logger.warning("Authentication failed", extra={"username": request.username, "reason": "invalid_credentials"})
+                return library_service_pb2.AuthResponse(
+                    success=False,
+                    message="Invalid credentials"
+                )
         except psycopg2.DatabaseError as e:
             logger.error("Database error during authentication", extra={"username": request.username, "error": str(e)})
             raise
         except Exception as e:
             logger.error("Error during authentication", extra={"username": request.username, "error": str(e), "error_type": "unexpected_error"})
-            raise
\ No newline at end of file
+            raise
+    
+    def _upgrade_hash(self, user_id, password):
+        """Re-hash with the current scheme while the plaintext is at hand
+        
+        Best effort: the login already succeeded, so a failure here only
+        leaves the old hash for the next attempt.
+        """
+        try:
+            password_hash = password_hasher.hash(password)
+            with db_pool.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("UPDATE users SET password_hash = %s WHERE user_id = %s", (password_hash, user_id))
+                    conn.commit()
+            logger.info("Password hash upgraded", extra={"user_id": user_id, "scheme": password_hasher.preferred.tag})
+        except Exception as e:
+            logger.warning("Password hash upgrade failed", extra={"user_id": user_id, "error": str(e)})
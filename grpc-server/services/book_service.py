@@ -1,40 +1,36 @@
 import logging
+import grpc
 import psycopg2
 from connection_pool import db_pool
+from outbox import write_availability_event, stream_events
+from projection import Projection, stream_rows
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
 
+BOOK_FIELDS = Projection(library_service_pb2.Book, [
+    ("book_id", "book_id"),
+    ("title", "title"),
+    ("author", "author", lambda value: value or ""),
+    ("genre", "genre", lambda value: value or ""),
+    ("published_year", "published_year", lambda value: value or 0),
+    ("available_copies", "available_copies"),
+    ("is_deleted", "is_deleted", lambda value: value or False),
+])
+
 class BookService:
     
     def get_books(self, request, context):
-        """Get books with optional search query"""
+        """Get books with optional search query, limited to the fields in request.fields"""
+        try:
+            selection = BOOK_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    if request.search_query:
-                        cursor.execute(
-                            "SELECT book_id, title, author, genre, published_year, available_copies, is_deleted FROM books WHERE is_deleted = false AND (title ILIKE %s OR author ILIKE %s OR genre ILIKE %s)",
-                            (f"%{request.search_query}%", f"%{request.search_query}%", f"%{request.search_query}%")
-                        )
-                    else:
-                        cursor.execute(
-                            "SELECT book_id, title, author, genre, published_year, available_copies, is_deleted FROM books WHERE is_deleted = false"
-                        )
-                    
-                    books_data = cursor.fetchall()
-                    book_list = []
-                    
-                    for book_data in books_data:
-                        book_list.append(library_service_pb2.Book(
-                            book_id=book_data[0],
-                            title=book_data[1],
-                            author=book_data[2] or "",
-                            genre=book_data[3] or "",
-                            published_year=book_data[4] or 0,
-                            available_copies=book_data[5],
-                            is_deleted=book_data[6] or False
-                        ))
+                    cursor.execute(*self._books_query(request, selection))
+                    book_list = [selection.build(book_data) for book_data in cursor.fetchall()]
                     
                     return library_service_pb2.GetBooksResponse(books=book_list)
         except psycopg2.DatabaseError as e:
@@ -44,6 +40,28 @@ class BookService:
             logger.error(f"Error fetching books: {e}")
             raise
     
+    def stream_books(self, request, context):
+        """GetBooks, one Book message per row"""
+        try:
+            selection = BOOK_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        try:
+            yield from stream_rows(selection, *self._books_query(request, selection))
+        except psycopg2.DatabaseError as e:
+            logger.error(f"Database error streaming books: {e}")
+            raise
+    
+    @staticmethod
+    def _books_query(request, selection):
+        if request.search_query:
+            pattern = f"%{request.search_query}%"
+            return (
+                f"SELECT {selection.sql} FROM books WHERE is_deleted = false AND (title ILIKE %s OR author ILIKE %s OR genre ILIKE %s)",
+                (pattern, pattern, pattern)
+            )
+        return f"SELECT {selection.sql} FROM books WHERE is_deleted = false", None
+    
     def create_book(self, request, context):
         """Create a new book"""
         try:
@@ -54,6 +72,7 @@ class BookService:
                         (request.title, request.author, request.genre, request.published_year, request.available_copies, False)
                     )
                     book_id = cursor.fetchone()[0]
+                    write_availability_event(cursor, book_id)
                     conn.commit()
                     
                     return library_service_pb2.BookResponse(
@@ -89,6 +108,7 @@ class BookService:
                     if cursor.rowcount == 0:
                         return library_service_pb2.BookResponse(success=False, message="Book not found")
                     
+                    write_availability_event(cursor, request.book_id)
                     conn.commit()
                     return library_service_pb2.BookResponse(
                         success=True,
@@ -123,6 +143,7 @@ class BookService:
                     if cursor.rowcount == 0:
                         return library_service_pb2.BookResponse(success=False, message="Book not found")
                     
+                    write_availability_event(cursor, request.book_id)
                     conn.commit()
                     return library_service_pb2.BookResponse(success=True, message="Book deleted successfully")
         except psycopg2.DatabaseError as e:
@@ -130,4 +151,20 @@ class BookService:
             return library_service_pb2.BookResponse(success=False, message="Database error occurred")
         except Exception as e:
             logger.error(f"Error deleting book: {e}")
-            return library_service_pb2.BookResponse(success=False, message="Internal server error")
\ No newline at end of file
+            return library_service_pb2.BookResponse(success=False, message="Internal server error")
+    
+    def watch_book_availability(self, request, context):
+        """Stream available_copies changes for all books, replaying from since_cursor first"""
+        logger.info(f"Book availability stream opened: since_cursor={request.since_cursor}")
+        try:
+            for event in stream_events(request.since_cursor, 'book', context):
+                payload = event.payload
+                yield library_service_pb2.BookAvailabilityEvent(
+                    cursor=event.position,
+                    event_type=event.event_type,
+                    book_id=payload.get("book_id", 0),
+                    available_copies=payload.get("available_copies", 0),
+                    deleted=payload.get("deleted", False)
+                )
+        finally:
+            logger.info("Book availability stream closed")
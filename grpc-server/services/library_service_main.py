@@ -35,6 +35,12 @@ class LibraryServiceImpl(library_service_pb2_grpc.LibraryServiceServicer):
     def DeleteBook(self, request, context):
         return self.book_service.delete_book(request, context)
     
+    def WatchBookAvailability(self, request, context):
+        return self.book_service.watch_book_availability(request, context)
+    
+    def StreamBooks(self, request, context):
+        return self.book_service.stream_books(request, context)
+    
     # Users
     def GetUsers(self, request, context):
         return self.user_service.get_users(request, context)
@@ -45,16 +51,25 @@ class LibraryServiceImpl(library_service_pb2_grpc.LibraryServiceServicer):
     def UpdateUser(self, request, context):
         return self.user_service.update_user(request, context)
     
+    def StreamUsers(self, request, context):
+        return self.user_service.stream_users(request, context)
+    
     def GetUserStats(self, request, context):
         return self.user_service.get_user_stats(request, context)
     
     def GetUserTransactions(self, request, context):
         return self.user_service.get_user_transactions(request, context)
     
+    def StreamUserTransactions(self, request, context):
+        return self.user_service.stream_user_transactions(request, context)
+    
     # Transactions
     def GetTransactions(self, request, context):
         return self.transaction_service.get_transactions(request, context)
     
+    def StreamTransactions(self, request, context):
+        return self.transaction_service.stream_transactions(request, context)
+    
     def IssueBook(self, request, context):
         return self.transaction_service.issue_book(request, context)
     
@@ -72,4 +87,7 @@ class LibraryServiceImpl(library_service_pb2_grpc.LibraryServiceServicer):
         return self.request_service.approve_book_request(request, context)
     
     def RejectBookRequest(self, request, context):
-        return self.request_service.reject_book_request(request, context)
\ No newline at end of file
+        return self.request_service.reject_book_request(request, context)
+    
+    def WatchBookRequestEvents(self, request, context):
+        return self.request_service.watch_book_request_events(request, context)
\ No newline at end of file
@@ -1,11 +1,27 @@
 import logging
 from datetime import datetime, timedelta
+import grpc
 import psycopg2
 from connection_pool import db_pool
+from outbox import write_event, write_availability_event, stream_events
+from projection import Projection
+from wire_format import legacy_date, timestamp
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
 
+BOOK_REQUEST_FIELDS = Projection(library_service_pb2.BookRequest, [
+    ("request_id", "request_id"),
+    ("user_id", "user_id"),
+    ("book_id", "book_id"),
+    ("request_type", "request_type"),
+    ("status", "status"),
+    ("request_date", "request_date", legacy_date, True),
+    ("notes", "notes", lambda value: value or ""),
+    ("transaction_id", "transaction_id", lambda value: value or 0),
+    ("request_time", "request_date", timestamp),
+])
+
 class RequestService:
     
     def create_book_request(self, request, context):
@@ -19,6 +35,15 @@ class RequestService:
                         (request.user_id, request.book_id, request.request_type, 'PENDING', request.notes, request.transaction_id if request.transaction_id else None)
                     )
                     request_id = cursor.fetchone()[0]
+                    write_event(cursor, 'book_request', request_id, 'REQUEST_CREATED', {
+                        "request_id": request_id,
+                        "user_id": request.user_id,
+                        "book_id": request.book_id,
+                        "request_type": request.request_type,
+                        "status": 'PENDING',
+                        "notes": request.notes,
+                        "transaction_id": request.transaction_id
+                    })
                     conn.commit()
                     
                     logger.info("Book request created successfully", extra={"request_id": request_id, "user_id": request.user_id, "book_id": request.book_id})
@@ -42,34 +67,25 @@ class RequestService:
             return library_service_pb2.BookRequestResponse(success=False, message="Internal server error")
     
     def get_book_requests(self, request, context):
-        """Get book requests with optional status filter"""
+        """Get book requests with optional status filter, limited to the fields in request.fields"""
+        try:
+            selection = BOOK_REQUEST_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
                     if request.status:
                         cursor.execute(
-                            "SELECT request_id, user_id, book_id, request_type, status, request_date, notes, transaction_id FROM book_requests WHERE status = %s ORDER BY request_date DESC",
+                            f"SELECT {selection.sql} FROM book_requests WHERE status = %s ORDER BY request_date DESC",
                             (request.status,)
                         )
                     else:
                         cursor.execute(
-                            "SELECT request_id, user_id, book_id, request_type, status, request_date, notes, transaction_id FROM book_requests ORDER BY request_date DESC"
+                            f"SELECT {selection.sql} FROM book_requests ORDER BY request_date DESC"
                         )
                     
-                    requests_data = cursor.fetchall()
-                    request_list = []
-                    
-                    for req_data in requests_data:
-                        request_list.append(library_service_pb2.BookRequest(
-                            request_id=req_data[0],
-                            user_id=req_data[1],
-                            book_id=req_data[2],
-                            request_type=req_data[3],
-                            status=req_data[4],
-                            request_date=req_data[5].isoformat() if req_data[5] else "",
-                            notes=req_data[6] or "",
-                            transaction_id=req_data[7] or 0
-                        ))
+                    request_list = [selection.build(req_data) for req_data in cursor.fetchall()]
                     
                     return library_service_pb2.GetBookRequestsResponse(requests=request_list)
         except psycopg2.DatabaseError as e:
@@ -110,6 +126,7 @@ class RequestService:
                             (user_id, book_id, 'BORROW', datetime.utcnow(), datetime.utcnow() + timedelta(days=30), 'BORROWED', 0)
                         )
                         cursor.execute("UPDATE books SET available_copies = available_copies - 1 WHERE book_id = %s", (book_id,))
+                        write_availability_event(cursor, book_id)
                         
                     elif request_type == 'RETURN' and transaction_id:
                         # Return book
@@ -130,12 +147,21 @@ class RequestService:
                                 (return_date, fine_amount, transaction_id)
                             )
                             cursor.execute("UPDATE books SET available_copies = available_copies + 1 WHERE book_id = %s", (txn_data[1],))
+                            write_availability_event(cursor, txn_data[1])
                     
                     # Update request status
                     cursor.execute(
                         "UPDATE book_requests SET status = 'APPROVED', admin_response_date = %s, admin_id = %s WHERE request_id = %s",
                         (datetime.utcnow(), request.admin_id, request.request_id)
                     )
+                    write_event(cursor, 'book_request', request.request_id, 'REQUEST_APPROVED', {
+                        "request_id": request.request_id,
+                        "user_id": user_id,
+                        "book_id": book_id,
+                        "request_type": request_type,
+                        "status": 'APPROVED',
+                        "transaction_id": transaction_id or 0
+                    })
                     conn.commit()
                     
                     logger.info(f"Book request approved successfully: request_id={request.request_id}, type={request_type}")
@@ -154,13 +180,23 @@ class RequestService:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(
-                        "UPDATE book_requests SET status = 'REJECTED', admin_response_date = %s, admin_id = %s WHERE request_id = %s AND status = 'PENDING'",
+                        "UPDATE book_requests SET status = 'REJECTED', admin_response_date = %s, admin_id = %s WHERE request_id = %s AND status = 'PENDING' RETURNING user_id, book_id, request_type, transaction_id",
                         (datetime.utcnow(), request.admin_id, request.request_id)
                     )
                     
                     if cursor.rowcount == 0:
                         return library_service_pb2.BookRequestResponse(success=False, message="Request not found or already processed")
                     
+                    user_id, book_id, request_type, transaction_id = cursor.fetchone()
+                    write_event(cursor, 'book_request', request.request_id, 'REQUEST_REJECTED', {
+                        "request_id": request.request_id,
+                        "user_id": user_id,
+                        "book_id": book_id,
+                        "request_type": request_type,
+                        "status": 'REJECTED',
+                        "notes": request.notes,
+                        "transaction_id": transaction_id or 0
+                    })
                     conn.commit()
                     return library_service_pb2.BookRequestResponse(success=True, message="Request rejected successfully")
                     
@@ -169,4 +205,35 @@ class RequestService:
             return library_service_pb2.BookRequestResponse(success=False, message="Database error occurred")
         except Exception as e:
             logger.error(f"Error rejecting book request: {e}")
-            return library_service_pb2.BookRequestResponse(success=False, message="Internal server error")
\ No newline at end of file
+            return library_service_pb2.BookRequestResponse(success=False, message="Internal server error")
+    
+    def watch_book_request_events(self, request, context):
+        """Stream book request events, replaying from since_cursor first"""
+        logger.info(f"Book request event stream opened: since_cursor={request.since_cursor}")
+        try:
+            for event in stream_events(request.since_cursor, 'book_request', context):
+                if event.event_type == 'SUBSCRIBED':
+                    yield library_service_pb2.BookRequestEvent(cursor=event.position, event_type='SUBSCRIBED')
+                else:
+                    yield self._event_to_proto(event)
+        finally:
+            logger.info("Book request event stream closed")
+    
+    @staticmethod
+    def _event_to_proto(event):
+        payload = event.payload
+        return library_service_pb2.BookRequestEvent(
+            cursor=event.position,
+            event_type=event.event_type,
+            request=library_service_pb2.BookRequest(
+                request_id=payload["request_id"],
+                user_id=payload["user_id"],
+                book_id=payload["book_id"],
+                request_type=payload["request_type"],
+                status=payload["status"],
+                notes=payload.get("notes") or "",
+                transaction_id=payload.get("transaction_id") or 0
+            ),
+            created_at=legacy_date(event.created_at),
+            created_time=timestamp(event.created_at)
+        )
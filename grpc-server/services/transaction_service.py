@@ -1,49 +1,44 @@
 import logging
 from datetime import datetime, timedelta
+import grpc
 import psycopg2
 from connection_pool import db_pool
+from outbox import write_availability_event
+from projection import Projection, stream_rows
+from wire_format import cents, legacy_amount, legacy_date, timestamp
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
 
+TRANSACTION_FIELDS = Projection(library_service_pb2.Transaction, [
+    ("transaction_id", "transaction_id"),
+    ("member_id", "user_id"),
+    ("book_id", "book_id"),
+    ("transaction_type", "transaction_type"),
+    ("transaction_date", "transaction_date", legacy_date, True),
+    ("due_date", "due_date", legacy_date, True),
+    ("return_date", "return_date", legacy_date, True),
+    ("status", "status"),
+    ("fine_amount", "fine_amount", legacy_amount, True),
+    ("transaction_time", "transaction_date", timestamp),
+    ("due_time", "due_date", timestamp),
+    ("return_time", "return_date", timestamp),
+    ("fine_cents", "fine_amount", cents),
+])
+
 class TransactionService:
     
     def get_transactions(self, request, context):
-        """Get transactions with optional filters"""
+        """Get transactions with optional filters, limited to the fields in request.fields"""
+        try:
+            selection = TRANSACTION_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    query = "SELECT transaction_id, user_id, book_id, transaction_type, transaction_date, due_date, return_date, status, fine_amount FROM transactions"
-                    params = []
-                    conditions = []
-                    
-                    if request.user_id:
-                        conditions.append("user_id = %s")
-                        params.append(request.user_id)
-                    if request.status:
-                        conditions.append("status = %s")
-                        params.append(request.status)
-                    
-                    if conditions:
-                        query += " WHERE " + " AND ".join(conditions)
-                    query += " ORDER BY transaction_date DESC"
-                    
-                    cursor.execute(query, params)
-                    transactions_data = cursor.fetchall()
-                    transaction_list = []
-                    
-                    for txn_data in transactions_data:
-                        transaction_list.append(library_service_pb2.Transaction(
-                            transaction_id=txn_data[0],
-                            member_id=txn_data[1],
-                            book_id=txn_data[2],
-                            transaction_type=txn_data[3],
-                            transaction_date=txn_data[4].isoformat() if txn_data[4] else "",
-                            due_date=txn_data[5].isoformat() if txn_data[5] else "",
-                            return_date=txn_data[6].isoformat() if txn_data[6] else "",
-                            status=txn_data[7],
-                            fine_amount=txn_data[8] or 0
-                        ))
+                    cursor.execute(*self._transactions_query(request, selection))
+                    transaction_list = [selection.build(txn_data) for txn_data in cursor.fetchall()]
                     
                     return library_service_pb2.GetTransactionsResponse(transactions=transaction_list)
         except psycopg2.DatabaseError as e:
@@ -53,6 +48,36 @@ class TransactionService:
             logger.error(f"Error fetching transactions: {e}")
             raise
     
+    def stream_transactions(self, request, context):
+        """GetTransactions, one Transaction message per row"""
+        try:
+            selection = TRANSACTION_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        try:
+            yield from stream_rows(selection, *self._transactions_query(request, selection))
+        except psycopg2.DatabaseError as e:
+            logger.error(f"Database error streaming transactions: {e}")
+            raise
+    
+    @staticmethod
+    def _transactions_query(request, selection):
+        query = f"SELECT {selection.sql} FROM transactions"
+        params = []
+        conditions = []
+        
+        if request.user_id:
+            conditions.append("user_id = %s")
+            params.append(request.user_id)
+        if request.status:
+            conditions.append("status = %s")
+            params.append(request.status)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY transaction_date DESC"
+        return query, params
+    
     def issue_book(self, request, context):
         """Issue a book to a user"""
         try:
@@ -96,6 +121,7 @@ class TransactionService:
                     
                     # Update book availability
                     cursor.execute("UPDATE books SET available_copies = available_copies - 1 WHERE book_id = %s", (request.book_id,))
+                    write_availability_event(cursor, request.book_id)
                     conn.commit()
                     
                     return library_service_pb2.TransactionResponse(
@@ -145,6 +171,7 @@ class TransactionService:
                     
                     # Update book availability
                     cursor.execute("UPDATE books SET available_copies = available_copies + 1 WHERE book_id = %s", (txn_data[0],))
+                    write_availability_event(cursor, txn_data[0])
                     conn.commit()
                     
                     return library_service_pb2.TransactionResponse(
@@ -154,7 +181,9 @@ class TransactionService:
                             book_id=txn_data[0],
                             transaction_type='RETURN',
                             status='RETURNED',
-                            fine_amount=fine_amount
+                            fine_amount=legacy_amount(fine_amount),
+                            return_time=timestamp(return_date),
+                            fine_cents=cents(fine_amount)
                         ),
                         message="Book returned successfully"
                     )
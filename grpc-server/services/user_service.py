@@ -1,31 +1,59 @@
-import hashlib
 import logging
-from datetime import datetime
+import grpc
 import psycopg2
 from connection_pool import db_pool
+from passwords import password_hasher
+from projection import Projection, stream_rows
+from wire_format import cents, legacy_amount, legacy_date, timestamp
 import library_service_pb2
 
 logger = logging.getLogger(__name__)
 
+USER_FIELDS = Projection(library_service_pb2.User, [
+    ("user_id", "user_id"),
+    ("username", "username"),
+    ("email", "email"),
+    ("role", "role"),
+    ("is_active", "is_active"),
+])
+
+# Current fine: overdue loans accrue 10 per full day past the due date
+_CURRENT_FINE = (
+    "CASE WHEN t.status = 'BORROWED' AND t.due_date < (NOW() AT TIME ZONE 'UTC')"
+    " THEN DATE_PART('day', (NOW() AT TIME ZONE 'UTC') - t.due_date)::int * 10"
+    " ELSE COALESCE(t.fine_amount, 0) END"
+)
+
+USER_TRANSACTION_FIELDS = Projection(library_service_pb2.UserTransaction, [
+    ("transaction_id", "t.transaction_id"),
+    ("book_id", "t.book_id"),
+    ("book_title", "COALESCE(NULLIF(b.title, ''), 'Unknown')"),
+    ("book_author", "COALESCE(NULLIF(b.author, ''), 'Unknown')"),
+    ("transaction_type", "t.transaction_type"),
+    ("transaction_date", "t.transaction_date", legacy_date, True),
+    ("due_date", "t.due_date", legacy_date, True),
+    ("return_date", "t.return_date", legacy_date, True),
+    ("status", "t.status"),
+    ("fine_amount", _CURRENT_FINE, legacy_amount, True),
+    ("transaction_time", "t.transaction_date", timestamp),
+    ("due_time", "t.due_date", timestamp),
+    ("return_time", "t.return_date", timestamp),
+    ("fine_cents", _CURRENT_FINE, cents),
+])
+
 class UserService:
     
     def get_users(self, request, context):
-        """Get all users"""
+        """Get all users, limited to the fields in request.fields"""
+        try:
+            selection = USER_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("SELECT user_id, username, email, role, is_active FROM users")
-                    users_data = cursor.fetchall()
-                    user_list = []
-                    
-                    for user_data in users_data:
-                        user_list.append(library_service_pb2.User(
-                            user_id=user_data[0],
-                            username=user_data[1],
-                            email=user_data[2],
-                            role=user_data[3],
-                            is_active=user_data[4]
-                        ))
+                    cursor.execute(f"SELECT {selection.sql} FROM users")
+                    user_list = [selection.build(user_data) for user_data in cursor.fetchall()]
                     
                     return library_service_pb2.GetUsersResponse(users=user_list)
         except psycopg2.DatabaseError as e:
@@ -35,12 +63,25 @@ class UserService:
             logger.error(f"Error fetching users: {e}")
             raise
     
+    def stream_users(self, request, context):
+        """GetUsers, one User message per row"""
+        try:
+            selection = USER_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        try:
+            yield from stream_rows(selection, f"SELECT {selection.sql} FROM users ORDER BY user_id")
+        except psycopg2.DatabaseError as e:
+            logger.error(f"Database error streaming users: {e}")
+            raise
+    
     def create_user(self, request, context):
         """Create a new user"""
         try:
+            # Hash before taking a connection; it is the slow part
+            password_hash = password_hasher.hash(request.password)
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    password_hash = hashlib.sha256(request.password.encode()).hexdigest()
                     cursor.execute(
                         "INSERT INTO users (username, email, password_hash, role, is_active) VALUES (%s, %s, %s, %s, %s) RETURNING user_id",
                         (request.username, request.email, password_hash, request.role, True)
@@ -69,10 +110,10 @@ class UserService:
     def update_user(self, request, context):
         """Update an existing user"""
         try:
+            password_hash = password_hasher.hash(request.password) if request.password else None
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    if request.password:
-                        password_hash = hashlib.sha256(request.password.encode()).hexdigest()
+                    if password_hash:
                         cursor.execute(
                             "UPDATE users SET username = %s, email = %s, role = %s, is_active = %s, password_hash = %s WHERE user_id = %s",
                             (request.username, request.email, request.role, request.is_active, password_hash, request.user_id)
@@ -139,7 +180,8 @@ class UserService:
                         total_books_taken=total_taken,
                         currently_borrowed=currently_borrowed,
                         overdue_books=total_overdue,
-                        total_fine=total_fine
+                        total_fine=legacy_amount(total_fine),
+                        total_fine_cents=cents(total_fine)
                     )
         except psycopg2.DatabaseError as e:
             logger.error(f"Database error fetching user stats: {e}")
@@ -149,48 +191,16 @@ class UserService:
             raise
     
     def get_user_transactions(self, request, context):
-        """Get user transactions with book details"""
+        """Get user transactions with book details, limited to the fields in request.fields"""
+        try:
+            selection = USER_TRANSACTION_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         try:
             with db_pool.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    query = """
-                        SELECT t.transaction_id, t.book_id, b.title, b.author, t.transaction_type, 
-                               t.transaction_date, t.due_date, t.return_date, t.status, t.fine_amount
-                        FROM transactions t
-                        LEFT JOIN books b ON t.book_id = b.book_id
-                        WHERE t.user_id = %s
-                    """
-                    params = [request.user_id]
-                    
-                    if request.status:
-                        query += " AND t.status = %s"
-                        params.append(request.status)
-                    
-                    query += " ORDER BY t.transaction_date DESC"
-                    
-                    cursor.execute(query, params)
-                    transactions_data = cursor.fetchall()
-                    transaction_list = []
-                    
-                    for txn_data in transactions_data:
-                        # Calculate current fine for overdue books
-                        current_fine = txn_data[9] or 0
-                        if txn_data[8] == 'BORROWED' and txn_data[6] and datetime.utcnow() > txn_data[6]:
-                            days_overdue = (datetime.utcnow() - txn_data[6]).days
-                            current_fine = days_overdue * 10
-                        
-                        transaction_list.append(library_service_pb2.UserTransaction(
-                            transaction_id=txn_data[0],
-                            book_id=txn_data[1],
-                            book_title=txn_data[2] if txn_data[2] else "Unknown",
-                            book_author=txn_data[3] if txn_data[3] else "Unknown",
-                            transaction_type=txn_data[4],
-                            transaction_date=txn_data[5].isoformat() if txn_data[5] else "",
-                            due_date=txn_data[6].isoformat() if txn_data[6] else "",
-                            return_date=txn_data[7].isoformat() if txn_data[7] else "",
-                            status=txn_data[8],
-                            fine_amount=current_fine
-                        ))
+                    cursor.execute(*self._user_transactions_query(request, selection))
+                    transaction_list = [selection.build(txn_data) for txn_data in cursor.fetchall()]
                     
                     return library_service_pb2.GetUserTransactionsResponse(transactions=transaction_list)
         except psycopg2.DatabaseError as e:
@@ -198,4 +208,32 @@ class UserService:
             raise
         except Exception as e:
             logger.error(f"Error fetching user transactions: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def stream_user_transactions(self, request, context):
+        """GetUserTransactions, one UserTransaction message per row"""
+        try:
+            selection = USER_TRANSACTION_FIELDS.select(request.fields)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        try:
+            yield from stream_rows(selection, *self._user_transactions_query(request, selection))
+        except psycopg2.DatabaseError as e:
+            logger.error(f"Database error streaming user transactions: {e}")
+            raise
+    
+    @staticmethod
+    def _user_transactions_query(request, selection):
+        query = f"SELECT {selection.sql} FROM transactions t"
+        # The books join is only needed for the title and author
+        if "book_title" in selection.fields or "book_author" in selection.fields:
+            query += " LEFT JOIN books b ON t.book_id = b.book_id"
+        query += " WHERE t.user_id = %s"
+        params = [request.user_id]
+        
+        if request.status:
+            query += " AND t.status = %s"
+            params.append(request.status)
+        
+        query += " ORDER BY t.transaction_date DESC"
+        return query, params
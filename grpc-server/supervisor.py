@@ -0,0 +1,121 @@
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def worker_socket(path, index):
+    """/run/grpc/library.sock -> /run/grpc/library.<index>.sock"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index}{ext}"
+
+def worker_env(index, workers, budget=None, cpus=None):
+    """Environment overrides for one worker process
+
+    The DB connection budget and the password hashing processes are split
+    between workers so that N workers together use what one server would.
+    Every worker listens on the same gRPC port (SO_REUSEPORT); the admin
+    HTTP port is offset by the worker index, and so is the unix socket
+    (GRPC_UNIX_SOCKET), since a socket path cannot be shared.
+    """
+    budget = budget or int(os.getenv('DB_CONNECTION_BUDGET', '20'))
+    cpus = cpus or os.cpu_count() or 1
+    pool_max = max(2, budget // workers)
+    env = {
+        "GRPC_WORKERS": "1",
+        "GRPC_WORKER_INDEX": str(index),
+        "DB_POOL_MIN": str(min(2, pool_max)),
+        "DB_POOL_MAX": str(pool_max),
+        "ADMIN_HTTP_PORT": str(int(os.getenv('ADMIN_HTTP_PORT', '9090')) + index),
+    }
+    if os.getenv('GRPC_UNIX_SOCKET'):
+        env["GRPC_UNIX_SOCKET"] = worker_socket(os.environ['GRPC_UNIX_SOCKET'], index)
+    if 'PASSWORD_HASH_WORKERS' not in os.environ:
+        env["PASSWORD_HASH_WORKERS"] = str(max(1, cpus // workers))
+    return env
+
+class Supervisor:
+    """Runs N single-process servers and keeps them running
+
+    Workers are separate interpreters (not forks: gRPC must not be
+    initialized before fork), each started as `server.py` with its share of
+    the resources from worker_env(). A worker that exits is restarted, with
+    exponential backoff if it keeps dying shortly after start. SIGTERM or
+    SIGINT is passed on to every worker, which drains; workers still alive
+    after the drain delay plus the grace period are killed.
+    """
+
+    def __init__(self, workers, command=None, grace=None, drain_delay=None, min_uptime=10.0, max_backoff=30.0):
+        self.workers = workers
+        self.command = command or [sys.executable, "-u", os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")]
+        self.grace = grace if grace is not None else float(os.getenv('GRPC_DRAIN_GRACE', '10'))
+        self.drain_delay = drain_delay if drain_delay is not None else float(os.getenv('GRPC_DRAIN_DELAY', '5'))
+        self.min_uptime = min_uptime
+        self.max_backoff = max_backoff
+        self.processes = {}
+        self.restarts = 0
+        self._backoff = {}
+        self._started_at = {}
+        self._next_start = {}
+        self._stopping = threading.Event()
+
+    def _start(self, index):
+        env = dict(os.environ, **worker_env(index, self.workers))
+        self.processes[index] = subprocess.Popen(self.command, env=env)
+        self._started_at[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {self.processes[index].pid})")
+
+    def poll(self):
+        """Restart workers that exited; returns the number started"""
+        started = 0
+        now = time.monotonic()
+        for index in range(self.workers):
+            process = self.processes.get(index)
+            if process is not None and process.poll() is None:
+                continue
+            if process is not None:
+                uptime = now - self._started_at[index]
+                # Crash loops back off; a worker that ran for a while restarts at once
+                backoff = 0.0 if uptime >= self.min_uptime else min(self.max_backoff, max(1.0, self._backoff.get(index, 0.5) * 2))
+                self._backoff[index] = backoff
+                self._next_start[index] = now + backoff
+                logger.warning(f"Worker {index} (pid {process.pid}) exited with {process.returncode}, restarting in {backoff:.0f}s")
+                self.processes[index] = None
+                self.restarts += 1
+            if now >= self._next_start.get(index, 0):
+                self._start(index)
+                started += 1
+        return started
+
+    def stop(self):
+        self._stopping.set()
+        running = [p for p in self.processes.values() if p is not None and p.poll() is None]
+        for process in running:
+            process.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + self.drain_delay + self.grace + 5
+        for process in running:
+            try:
+                process.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Worker pid {process.pid} did not drain in time, killing")
+                process.kill()
+                process.wait()
+
+    def run(self):
+        def request_stop(signum, frame):
+            self._stopping.set()
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        logger.info(f"Supervising {self.workers} gRPC server workers")
+        if os.getenv('GRPC_UNIX_SOCKET'):
+            sockets = ",".join(worker_socket(os.environ['GRPC_UNIX_SOCKET'], index) for index in range(self.workers))
+            logger.info(f"Workers listen on unix:{sockets}")
+        while not self._stopping.is_set():
+            self.poll()
+            self._stopping.wait(0.5)
+        logger.info("Stopping workers")
+        self.stop()
@@ -5,23 +5,32 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from services.auth_service import AuthService
+from passwords import LegacySHA256Hasher, PasswordHasher, ScryptHasher
 import library_service_pb2
 
+# Inline, cheap scrypt so tests don't spawn a pool or burn CPU
+test_hasher = PasswordHasher(ScryptHasher(n=16), workers=0)
+
 class TestAuthService(unittest.TestCase):
     
     def setUp(self):
         self.auth_service = AuthService()
     
-    @patch('services.auth_service.db_pool')
-    def test_authenticate_user_success(self, mock_db_pool):
-        # Mock database connection
+    def _mock_db(self, mock_db_pool):
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
         mock_db_pool.get_connection.return_value.__enter__.return_value = mock_conn
+        return mock_cursor
+    
+    @patch('services.auth_service.password_hasher', test_hasher)
+    @patch('services.auth_service.last_login_recorder')
+    @patch('services.auth_service.db_pool')
+    def test_authenticate_user_success(self, mock_db_pool, mock_recorder):
+        mock_cursor = self._mock_db(mock_db_pool)
         
-        # Mock user data
-        mock_cursor.fetchone.return_value = (1, 'testuser', 'test@test.com', 'USER', True)
+        # Mock user data, hash already in the current scheme
+        mock_cursor.fetchone.return_value = (1, 'testuser', 'test@test.com', 'USER', True, test_hasher.hash('password'))
         
         # Create request
         request = library_service_pb2.AuthRequest(username='testuser', password='password')
@@ -33,14 +42,44 @@ class TestAuthService(unittest.TestCase):
         self.assertTrue(response.success)
         self.assertEqual(response.user.username, 'testuser')
         self.assertEqual(response.message, 'Authentication successful')
+        # last_login is recorded for a batched write, not updated inline
+        mock_recorder.record.assert_called_once_with(1)
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+    
+    @patch('services.auth_service.password_hasher', test_hasher)
+    @patch('services.auth_service.last_login_recorder')
+    @patch('services.auth_service.db_pool')
+    def test_legacy_hash_is_upgraded_on_login(self, mock_db_pool, mock_recorder):
+        mock_cursor = self._mock_db(mock_db_pool)
+        legacy = LegacySHA256Hasher().hash('password')
+        mock_cursor.fetchone.return_value = (1, 'testuser', 'test@test.com', 'USER', True, legacy)
+        
+        request = library_service_pb2.AuthRequest(username='testuser', password='password')
+        response = self.auth_service.authenticate_user(request, None)
+        
+        self.assertTrue(response.success)
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertTrue(query.startswith("UPDATE users SET password_hash"))
+        self.assertTrue(params[0].startswith("scrypt$"))
+        self.assertEqual(params[1], 1)
+        self.assertEqual(test_hasher.verify('password', params[0]), (True, False))
     
+    @patch('services.auth_service.password_hasher', test_hasher)
+    @patch('services.auth_service.db_pool')
+    def test_authenticate_user_wrong_password(self, mock_db_pool):
+        mock_cursor = self._mock_db(mock_db_pool)
+        mock_cursor.fetchone.return_value = (1, 'testuser', 'test@test.com', 'USER', True, test_hasher.hash('password'))
+        
+        request = library_service_pb2.AuthRequest(username='testuser', password='wrong')
+        response = self.auth_service.authenticate_user(request, None)
+        
+        self.assertFalse(response.success)
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+    
+    @patch('services.auth_service.password_hasher', test_hasher)
     @patch('services.auth_service.db_pool')
     def test_authenticate_user_invalid_credentials(self, mock_db_pool):
-        # Mock database connection
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-        mock_db_pool.get_connection.return_value.__enter__.return_value = mock_conn
+        mock_cursor = self._mock_db(mock_db_pool)
         
         # Mock no user found
         mock_cursor.fetchone.return_value = None
@@ -56,4 +95,4 @@ class TestAuthService(unittest.TestCase):
         self.assertEqual(response.message, 'Invalid credentials')
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from concurrent import futures
+from unittest.mock import MagicMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from compression import CompressionInterceptor, message_size_options, parse_policy
+import library_service_pb2
+import library_service_pb2_grpc
+
+class SizedLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+    """Returns as many books/users as the request asks for"""
+
+    def GetBooks(self, request, context):
+        count = int(request.search_query or 0)
+        return library_service_pb2.GetBooksResponse(books=[
+            library_service_pb2.Book(book_id=i, title=f"Book {i}", author="Author") for i in range(count)
+        ])
+
+    def GetUsers(self, request, context):
+        return library_service_pb2.GetUsersResponse(users=[
+            library_service_pb2.User(user_id=i, username=f"user{i}") for i in range(2000)
+        ])
+
+class TestParsePolicy(unittest.TestCase):
+
+    def test_default_and_explicit_algorithms(self):
+        policy = parse_policy("GetBooks, GetTransactions:deflate,GetUsers:none", "gzip")
+
+        self.assertEqual(policy, {"GetBooks": grpc.Compression.Gzip, "GetTransactions": grpc.Compression.Deflate})
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            parse_policy("GetBooks:brotli")
+
+    @patch.dict(os.environ, {'GRPC_SERVER_MAX_SEND_MESSAGE_BYTES': '1024'})
+    def test_message_size_options(self):
+        self.assertEqual(dict(message_size_options())["grpc.max_send_message_length"], 1024)
+
+class TestCompressionInterceptor(unittest.TestCase):
+
+    def start_server(self, options=()):
+        interceptor = CompressionInterceptor({"GetBooks": grpc.Compression.Gzip}, min_bytes=1024)
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[interceptor], options=list(options))
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(SizedLibraryService(), server)
+        port = server.add_insecure_port('127.0.0.1:0')
+        server.start()
+        self.addCleanup(server.stop, None)
+        return port
+
+    def stub(self, port, options=()):
+        channel = grpc.insecure_channel(f'127.0.0.1:{port}', options=list(options))
+        self.addCleanup(channel.close)
+        return library_service_pb2_grpc.LibraryServiceStub(channel)
+
+    def handle(self, method, count, interceptor=None):
+        interceptor = interceptor or CompressionInterceptor({"GetBooks": grpc.Compression.Gzip}, min_bytes=1024)
+        service = SizedLibraryService()
+        handler = interceptor.intercept_service(
+            lambda details: grpc.unary_unary_rpc_method_handler(getattr(service, method)),
+            MagicMock(method=f"/library.LibraryService/{method}")
+        )
+        context = MagicMock()
+        response = handler.unary_unary(library_service_pb2.GetBooksRequest(search_query=str(count)), context)
+        return response, context
+
+    def test_large_response_is_compressed(self):
+        response, context = self.handle("GetBooks", 500)
+
+        self.assertEqual(len(response.books), 500)
+        context.set_compression.assert_called_once_with(grpc.Compression.Gzip)
+
+    def test_small_response_and_other_methods_are_not(self):
+        _, context = self.handle("GetBooks", 5)
+        context.set_compression.assert_not_called()
+
+        _, context = self.handle("GetUsers", 0)
+        context.set_compression.assert_not_called()
+
+    def test_compressed_response_round_trips(self):
+        port = self.start_server()
+
+        response = self.stub(port).GetBooks(library_service_pb2.GetBooksRequest(search_query="5000"), timeout=5)
+
+        self.assertEqual(len(response.books), 5000)
+        self.assertEqual(response.books[-1].title, "Book 4999")
+
+    def test_send_limit(self):
+        port = self.start_server([("grpc.max_send_message_length", 4096)])
+
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.stub(port).GetUsers(library_service_pb2.GetUsersRequest(), timeout=5)
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+if __name__ == '__main__':
+    unittest.main()
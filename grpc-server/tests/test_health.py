@@ -0,0 +1,140 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from concurrent import futures
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from health import HealthServicer, SERVING, NOT_SERVING, SERVICE_UNKNOWN
+import health_pb2
+import health_pb2_grpc
+import library_service_pb2
+import library_service_pb2_grpc
+import server
+
+class CountingLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def __init__(self):
+        self.calls = 0
+
+    def GetBooks(self, request, context):
+        self.calls += 1
+        return library_service_pb2.GetBooksResponse()
+
+class TestHealthServicer(unittest.TestCase):
+
+    def setUp(self):
+        self.healthy = True
+        self.servicer = HealthServicer(check_interval=3600, probe=lambda: self.healthy)
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        health_pb2_grpc.add_HealthServicer_to_server(self.servicer, self.server)
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.stub = health_pb2_grpc.HealthStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+
+    def test_check_follows_probe(self):
+        self.servicer.check_now()
+        response = self.stub.Check(health_pb2.HealthCheckRequest(service='library.LibraryService'))
+        self.assertEqual(response.status, SERVING)
+
+        self.healthy = False
+        self.servicer.check_now()
+        response = self.stub.Check(health_pb2.HealthCheckRequest(service=''))
+        self.assertEqual(response.status, NOT_SERVING)
+
+    def test_check_unknown_service(self):
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.stub.Check(health_pb2.HealthCheckRequest(service='other.Service'))
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.NOT_FOUND)
+
+    def test_watch_streams_changes(self):
+        self.servicer.check_now()
+        stream = self.stub.Watch(health_pb2.HealthCheckRequest(service='library.LibraryService'), timeout=10)
+        self.assertEqual(next(stream).status, SERVING)
+
+        self.healthy = False
+        self.servicer.check_now()
+        self.assertEqual(next(stream).status, NOT_SERVING)
+
+        self.servicer.stop()
+        stream.cancel()
+
+    def test_watch_unknown_service(self):
+        stream = self.stub.Watch(health_pb2.HealthCheckRequest(service='other.Service'), timeout=10)
+        self.assertEqual(next(stream).status, SERVICE_UNKNOWN)
+        stream.cancel()
+
+class TestHealthAwareRoundRobin(unittest.TestCase):
+    """Several grpc-server processes, as the gateway's channel sees them"""
+
+    def setUp(self):
+        self.servers = []
+        self.services = []
+        self.health = []
+        ports = []
+        for _ in range(3):
+            service = CountingLibraryService()
+            health = HealthServicer(check_interval=3600, probe=lambda: True)
+            health.check_now()
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+            library_service_pb2_grpc.add_LibraryServiceServicer_to_server(service, server)
+            health_pb2_grpc.add_HealthServicer_to_server(health, server)
+            ports.append(server.add_insecure_port('127.0.0.1:0'))
+            server.start()
+            self.servers.append(server)
+            self.services.append(service)
+            self.health.append(health)
+        self.target = "ipv4:" + ",".join(f"127.0.0.1:{port}" for port in ports)
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop(None)
+
+    def test_unhealthy_backend_receives_no_traffic(self):
+        self.health[2].set_all(NOT_SERVING)
+        config = {
+            "loadBalancingConfig": [{"round_robin": {}}],
+            "healthCheckConfig": {"serviceName": "library.LibraryService"}
+        }
+        channel = grpc.insecure_channel(self.target, options=[("grpc.service_config", json.dumps(config))])
+        self.addCleanup(channel.close)
+        stub = library_service_pb2_grpc.LibraryServiceStub(channel)
+
+        for _ in range(30):
+            stub.GetBooks(library_service_pb2.GetBooksRequest(), timeout=5, wait_for_ready=True)
+
+        self.assertEqual(self.services[2].calls, 0)
+        self.assertGreater(self.services[0].calls, 0)
+        self.assertGreater(self.services[1].calls, 0)
+
+class TestDrain(unittest.TestCase):
+
+    @patch('server.time.sleep')
+    def test_not_serving_then_delay_then_stop(self, mock_sleep):
+        calls = MagicMock()
+        calls.server.stop.return_value = MagicMock()
+        mock_sleep.side_effect = lambda delay: calls.sleep(delay)
+
+        server.drain(calls.server, calls.health, grace=10, delay=5)
+
+        self.assertEqual([name for name, _, _ in calls.mock_calls[:3]], ['health.stop', 'sleep', 'server.stop'])
+        calls.sleep.assert_called_once_with(5)
+        calls.server.stop.assert_called_once_with(10)
+
+    @patch('server.db_pool')
+    @patch('server.password_hasher')
+    def test_release_resources_closes_pool_and_hashers(self, mock_hasher, mock_pool):
+        server.release_resources()
+
+        mock_hasher.shutdown.assert_called_once()
+        mock_pool.close_pool.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
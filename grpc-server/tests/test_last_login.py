@@ -0,0 +1,52 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from last_login import LastLoginRecorder
+
+class TestLastLoginRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = LastLoginRecorder(flush_interval=3600)
+        self.addCleanup(self.recorder._stopped.set)
+
+    @patch('last_login.execute_values')
+    @patch('last_login.db_pool')
+    def test_flush_writes_one_batch_per_interval(self, mock_db_pool, mock_execute_values):
+        mock_conn = MagicMock()
+        mock_db_pool.get_connection.return_value.__enter__.return_value = mock_conn
+        first, second = datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10)
+
+        self.recorder.record(1, first)
+        self.recorder.record(2, first)
+        self.recorder.record(1, second)
+        flushed = self.recorder.flush()
+
+        self.assertEqual(flushed, 2)
+        mock_execute_values.assert_called_once()
+        self.assertEqual(sorted(mock_execute_values.call_args[0][2]), [(1, second), (2, first)])
+        mock_conn.commit.assert_called_once()
+        self.assertEqual(self.recorder.flush(), 0)
+
+    @patch('last_login.db_pool')
+    def test_failed_flush_is_retried(self, mock_db_pool):
+        when = datetime(2024, 1, 1, 9)
+        newer = datetime(2024, 1, 1, 10)
+        self.recorder.record(1, when)
+        self.recorder.record(2, when)
+
+        def fail_after_newer_login():
+            # A login lands while the failing flush is in flight
+            self.recorder.record(2, newer)
+            raise Exception("database down")
+
+        mock_db_pool.get_connection.side_effect = fail_after_newer_login
+
+        self.assertEqual(self.recorder.flush(), 0)
+        self.assertEqual(self.recorder.pending, {1: when, 2: newer})
+
+if __name__ == '__main__':
+    unittest.main()
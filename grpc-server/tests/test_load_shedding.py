@@ -0,0 +1,140 @@
+import threading
+import unittest
+from concurrent import futures
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from psycopg2.pool import PoolError
+from load_shedding import GradientLimiter, LoadSheddingInterceptor
+import library_service_pb2
+import library_service_pb2_grpc
+
+class BlockingLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+    """GetBooks blocks until released; IssueBook returns at once"""
+
+    def __init__(self):
+        self.entered = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def GetBooks(self, request, context):
+        self.entered.release()
+        self.release.wait(5)
+        return library_service_pb2.GetBooksResponse()
+
+    def IssueBook(self, request, context):
+        return library_service_pb2.TransactionResponse(success=True)
+
+    def GetUsers(self, request, context):
+        raise PoolError("connection pool exhausted")
+
+    def StreamBooks(self, request, context):
+        yield library_service_pb2.Book(book_id=1)
+        self.release.wait(5)
+
+class TestGradientLimiter(unittest.TestCase):
+
+    def test_latency_above_baseline_lowers_limit(self):
+        limiter = GradientLimiter(initial_limit=10, min_limit=2, max_limit=10)
+        for _ in range(5):
+            self.assertTrue(limiter.try_acquire("GetBooks"))
+            limiter.release("GetBooks", 0.01)
+        for _ in range(60):
+            limiter.try_acquire("GetBooks")
+            limiter.release("GetBooks", 0.2)
+
+        self.assertLess(limiter.limit, 5)
+        self.assertGreaterEqual(limiter.limit, 2)
+
+    def test_limit_recovers_when_latency_returns_to_baseline(self):
+        limiter = GradientLimiter(initial_limit=2, min_limit=1, max_limit=10)
+        limiter.try_acquire("IssueBook")
+        limiter.release("IssueBook", 0.01)
+        for _ in range(40):
+            admitted = 0
+            while limiter.try_acquire("IssueBook"):
+                admitted += 1
+            for _ in range(admitted):
+                limiter.release("IssueBook", 0.01)
+
+        self.assertEqual(limiter.limit, 10)
+
+    def test_idle_limit_does_not_grow(self):
+        limiter = GradientLimiter(initial_limit=4, min_limit=1, max_limit=10)
+        for _ in range(20):
+            limiter.try_acquire("IssueBook")
+            limiter.release("IssueBook", 0.01)
+
+        self.assertEqual(limiter.limit, 4)
+
+    def test_writes_keep_slots_that_lists_cannot_use(self):
+        limiter = GradientLimiter(initial_limit=4, list_share=0.5)
+
+        self.assertTrue(limiter.try_acquire("GetBooks"))
+        self.assertTrue(limiter.try_acquire("GetUsers"))
+        self.assertFalse(limiter.try_acquire("GetBooks"))
+        self.assertTrue(limiter.try_acquire("IssueBook"))
+        self.assertTrue(limiter.try_acquire("ApproveBookRequest"))
+        self.assertFalse(limiter.try_acquire("IssueBook"))
+        self.assertIn('grpc_server_shed_total{grpc_method="GetBooks"} 1', limiter.render())
+
+class TestLoadSheddingInterceptor(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = GradientLimiter(initial_limit=2, min_limit=2, max_limit=2, list_share=0.5)
+        self.service = BlockingLibraryService()
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=4),
+            interceptors=[LoadSheddingInterceptor(self.limiter, max_streams=1)]
+        )
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(self.service, self.server)
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.stub = library_service_pb2_grpc.LibraryServiceStub(self.channel)
+
+    def tearDown(self):
+        self.service.release.set()
+        self.channel.close()
+        self.server.stop(None)
+
+    def test_excess_list_calls_rejected_while_writes_admitted(self):
+        pending = self.stub.GetBooks.future(library_service_pb2.GetBooksRequest())
+        self.assertTrue(self.service.entered.acquire(timeout=5))
+
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.stub.GetBooks(library_service_pb2.GetBooksRequest(), timeout=5)
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+        response = self.stub.IssueBook(library_service_pb2.IssueBookRequest(book_id=1), timeout=5)
+        self.assertTrue(response.success)
+
+        self.service.release.set()
+        pending.result(timeout=5)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_pool_exhaustion_becomes_resource_exhausted(self):
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.stub.GetUsers(library_service_pb2.GetUsersRequest(), timeout=5)
+
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_concurrent_exports_capped(self):
+        first = self.stub.StreamBooks(library_service_pb2.GetBooksRequest(), timeout=5)
+        self.assertEqual(next(first).book_id, 1)
+
+        with self.assertRaises(grpc.RpcError) as raised:
+            list(self.stub.StreamBooks(library_service_pb2.GetBooksRequest(), timeout=5))
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        # Unary calls are not affected by the export cap
+        self.assertTrue(self.stub.IssueBook(library_service_pb2.IssueBookRequest(book_id=1), timeout=5).success)
+
+        self.service.release.set()
+        list(first)
+        second = self.stub.StreamBooks(library_service_pb2.GetBooksRequest(), timeout=5)
+        self.assertEqual([book.book_id for book in second], [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from logging_config import (
+    JSONFormatter, setup_logging, SamplingFilter, RateLimitFilter, ContextQueueHandler
+)
+from tracing import start_span
+from shared import logging_config as shared_logging
+
+def make_record(name="test", level=logging.INFO, msg="message", args=()):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+class TestJSONFormatter(unittest.TestCase):
+
+    def test_extra_fields_included(self):
+        record = make_record()
+        record.book_id = 7
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry["service"], "grpc-server")
+        self.assertEqual(entry["book_id"], 7)
+        self.assertNotIn("levelno", entry)
+
+class TestQueuePipeline(unittest.TestCase):
+
+    def tearDown(self):
+        shared_logging._stop_listener()
+        logging.getLogger().handlers = []
+
+    def test_setup_logging_installs_queue_handler(self):
+        os.environ["LOG_LEVEL"] = "DEBUG"
+        try:
+            setup_logging()
+        finally:
+            del os.environ["LOG_LEVEL"]
+
+        root = logging.getLogger()
+        self.assertEqual(root.level, logging.DEBUG)
+        self.assertIsInstance(root.handlers[0], logging.handlers.QueueHandler)
+        self.assertIsInstance(shared_logging._listener.handlers[0].formatter, JSONFormatter)
+
+    def test_prepare_captures_trace_in_calling_thread(self):
+        handler = ContextQueueHandler(queue.Queue())
+
+        with start_span("grpc.server/GetBooks") as span:
+            prepared = handler.prepare(make_record(msg="book %d", args=(3,)))
+
+        self.assertEqual(prepared.getMessage(), "book 3")
+        self.assertEqual(json.loads(JSONFormatter().format(prepared))["trace_id"], span.trace_id)
+
+class TestFilters(unittest.TestCase):
+
+    def test_sampling_only_applies_below_warning(self):
+        sampling = SamplingFilter({"services": 0.0})
+
+        self.assertFalse(sampling.filter(make_record(name="services.book_service")))
+        self.assertTrue(sampling.filter(make_record(name="services.book_service", level=logging.ERROR)))
+        self.assertTrue(sampling.filter(make_record(name="connection_pool")))
+
+    def test_rate_limit_per_logger(self):
+        rate_limit = RateLimitFilter(per_second=0.0001, burst=1)
+
+        self.assertTrue(rate_limit.filter(make_record(name="a")))
+        self.assertFalse(rate_limit.filter(make_record(name="a")))
+        self.assertTrue(rate_limit.filter(make_record(name="b")))
+
+if __name__ == '__main__':
+    unittest.main()
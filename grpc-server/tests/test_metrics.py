@@ -0,0 +1,94 @@
+import unittest
+import urllib.request
+from concurrent import futures
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from metrics import RpcMetrics, MetricsInterceptor, Histogram
+from admin_server import AdminServer
+import library_service_pb2
+import library_service_pb2_grpc
+
+class FakeLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def GetBooks(self, request, context):
+        return library_service_pb2.GetBooksResponse(books=[
+            library_service_pb2.Book(book_id=1, title='Test Book', author='Test Author')
+        ])
+
+    def GetUsers(self, request, context):
+        context.abort(grpc.StatusCode.UNAVAILABLE, "Database unavailable")
+
+class TestHistogram(unittest.TestCase):
+
+    def test_render_is_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        lines = histogram.render("latency", 'm="x"')
+
+        self.assertIn('latency_bucket{m="x",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{m="x",le="1.0"} 2', lines)
+        self.assertIn('latency_bucket{m="x",le="+Inf"} 3', lines)
+        self.assertIn('latency_count{m="x"} 3', lines)
+
+class TestMetricsInterceptor(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = RpcMetrics()
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=2),
+            interceptors=[MetricsInterceptor(self.metrics)]
+        )
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(FakeLibraryService(), self.server)
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.stub = library_service_pb2_grpc.LibraryServiceStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+
+    def test_successful_call_recorded(self):
+        self.stub.GetBooks(library_service_pb2.GetBooksRequest(search_query='test'))
+
+        output = self.metrics.render()
+
+        self.assertIn('grpc_server_handled_total{grpc_service="library.LibraryService",grpc_method="GetBooks",grpc_code="OK"} 1', output)
+        self.assertIn('grpc_server_handling_seconds_count{grpc_service="library.LibraryService",grpc_method="GetBooks"} 1', output)
+        self.assertIn('grpc_server_msg_sent_bytes_count{grpc_service="library.LibraryService",grpc_method="GetBooks"} 1', output)
+        self.assertIn('grpc_server_msg_received_bytes_count{grpc_service="library.LibraryService",grpc_method="GetBooks"} 1', output)
+        self.assertEqual(self.metrics.in_flight(), 0)
+
+    def test_aborted_call_records_status_code(self):
+        with self.assertRaises(grpc.RpcError):
+            self.stub.GetUsers(library_service_pb2.GetUsersRequest())
+
+        output = self.metrics.render()
+
+        self.assertIn('grpc_method="GetUsers",grpc_code="UNAVAILABLE"} 1', output)
+        self.assertEqual(self.metrics.in_flight("GetUsers"), 0)
+
+class TestAdminServer(unittest.TestCase):
+
+    def test_metrics_endpoint(self):
+        metrics = RpcMetrics()
+        metrics.call_started("GetBooks")
+        admin_server = AdminServer(host='127.0.0.1', port=0)
+        admin_server.route('/metrics', lambda query: (200, "text/plain", metrics.render()))
+        admin_server.start()
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{admin_server.port}/metrics') as response:
+                body = response.read().decode()
+        finally:
+            admin_server.stop()
+
+        self.assertIn('grpc_server_in_flight{grpc_service="library.LibraryService",grpc_method="GetBooks"} 1', body)
+
+if __name__ == '__main__':
+    unittest.main()
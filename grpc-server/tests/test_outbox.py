@@ -0,0 +1,233 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+import library_service_pb2
+from outbox import OutboxEvent, Subscription, OutboxDispatcher, write_event, write_availability_event, assign_positions, stream_events
+from services.request_service import RequestService
+from services.book_service import BookService
+
+def make_event(position, event_type='REQUEST_APPROVED', aggregate_type='book_request'):
+    payload = {
+        "request_id": 7,
+        "user_id": 3,
+        "book_id": 11,
+        "request_type": 'ISSUE',
+        "status": 'APPROVED',
+        "transaction_id": 0
+    }
+    return OutboxEvent(position, aggregate_type, 7, event_type, payload, datetime(2024, 1, 1), position)
+
+class FakeContext:
+    def __init__(self, active_polls=1):
+        self.active_polls = active_polls
+        self.aborted = None
+
+    def is_active(self):
+        self.active_polls -= 1
+        return self.active_polls >= 0
+
+    def abort(self, code, details):
+        self.aborted = code
+        raise grpc.RpcError(details)
+
+class TestWriteEvent(unittest.TestCase):
+
+    def test_insert_and_notify_in_callers_transaction(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (42,)
+
+        event_id = write_event(cursor, 'book_request', 7, 'REQUEST_CREATED', {"request_id": 7})
+
+        self.assertEqual(event_id, 42)
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertIn("INSERT INTO outbox_events", statements[0])
+        self.assertIn("pg_notify", statements[1])
+        self.assertEqual(cursor.execute.call_args_list[1][0][1][1], "42")
+        # Writers never serialize on a shared lock
+        self.assertFalse(any("advisory" in statement for statement in statements))
+
+    def test_availability_event_reads_row_in_transaction(self):
+        cursor = MagicMock()
+
+        write_availability_event(cursor, 11)
+
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertIn("INSERT INTO outbox_events", statements[0])
+        self.assertIn("FROM books WHERE book_id = %s", statements[0])
+        self.assertEqual(cursor.execute.call_args_list[0][0][1], (11,))
+        cursor.fetchone.assert_not_called()
+
+    def test_payload_parsed_from_json_row(self):
+        event = OutboxEvent.from_row((1, 'book_request', 7, 'REQUEST_CREATED', '{"request_id": 7}', None, 3))
+        self.assertEqual(event.payload, {"request_id": 7})
+        self.assertEqual(event.position, 3)
+
+class TestSubscription(unittest.TestCase):
+
+    def test_filters_by_aggregate_type(self):
+        subscription = Subscription('book_request')
+        subscription.offer(make_event(1, aggregate_type='book'))
+        subscription.offer(make_event(2))
+        self.assertEqual(subscription.get(timeout=0).event_id, 2)
+        self.assertIsNone(subscription.get(timeout=0))
+
+    def test_overflow_marks_subscription(self):
+        subscription = Subscription(max_pending=2)
+        for position in range(3):
+            subscription.offer(make_event(position))
+        self.assertTrue(subscription.overflowed)
+
+class TestOutboxDispatcher(unittest.TestCase):
+
+    @patch('outbox.assign_positions', return_value=0)
+    @patch('outbox.read_events')
+    def test_dispatch_new_fans_out_and_advances(self, mock_read_events, mock_assign):
+        dispatcher = OutboxDispatcher()
+        dispatcher.last_position = 4
+        first, second = Subscription(), Subscription()
+        dispatcher._subscriptions.update({first, second})
+        mock_read_events.side_effect = [[make_event(5), make_event(6)], []]
+
+        dispatcher.dispatch_new()
+
+        self.assertEqual(dispatcher.last_position, 6)
+        mock_assign.assert_called_once()
+        mock_read_events.assert_any_call(4)
+        for subscription in (first, second):
+            self.assertEqual(subscription.get(timeout=0).event_id, 5)
+            self.assertEqual(subscription.get(timeout=0).event_id, 6)
+
+    @patch('outbox.head_position')
+    def test_subscribe_reads_head_outside_lock(self, mock_head):
+        dispatcher = OutboxDispatcher()
+        held = []
+        mock_head.side_effect = lambda: held.append(dispatcher._lock.locked()) or 0
+
+        with patch.object(OutboxDispatcher, '_run'):
+            dispatcher.subscribe()
+
+        self.assertEqual(held, [False])
+        self.assertEqual(dispatcher.last_position, 0)
+
+    @patch('outbox.db_pool')
+    def test_assign_positions_skips_when_another_dispatcher_numbers(self, mock_pool):
+        conn = mock_pool.get_connection.return_value.__enter__.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (False,)
+
+        self.assertEqual(assign_positions(), 0)
+
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertEqual(len(statements), 1)
+        self.assertIn("pg_try_advisory_xact_lock", statements[0])
+
+    @patch('outbox.db_pool')
+    def test_assign_positions_numbers_in_commit_order_and_notifies(self, mock_pool):
+        conn = mock_pool.get_connection.return_value.__enter__.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (True,)
+        cursor.rowcount = 2
+
+        self.assertEqual(assign_positions(), 2)
+
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        self.assertIn("nextval('outbox_position_seq')", statements[1])
+        self.assertIn("position IS NULL", statements[1])
+        self.assertIn("pg_notify", statements[2])
+        conn.commit.assert_called_once()
+
+class TestStreamEvents(unittest.TestCase):
+
+    @patch('outbox.read_events', return_value=[])
+    def test_head_taken_before_subscribing(self, mock_read_events):
+        dispatcher = MagicMock()
+        calls = []
+        dispatcher.head.side_effect = lambda: calls.append('head') or 9
+        dispatcher.subscribe.side_effect = lambda aggregate_type: calls.append('subscribe') or Subscription(aggregate_type)
+
+        events = list(stream_events(0, 'book', FakeContext(active_polls=0), dispatcher))
+
+        self.assertEqual(calls, ['head', 'subscribe'])
+        self.assertEqual([(e.position, e.event_type) for e in events], [(9, 'SUBSCRIBED')])
+        mock_read_events.assert_called_once_with(9, 'book')
+
+class TestWatchBookRequestEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.request_service = RequestService()
+        self.subscription = Subscription('book_request')
+        patcher = patch('outbox.outbox_dispatcher')
+        self.dispatcher = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dispatcher.subscribe.return_value = self.subscription
+        self.dispatcher.head.return_value = 9
+        read_patcher = patch('outbox.read_events', return_value=[])
+        self.read_events = read_patcher.start()
+        self.addCleanup(read_patcher.stop)
+
+    def test_new_stream_starts_with_subscribed_cursor(self):
+        self.subscription.offer(make_event(10))
+        request = library_service_pb2.WatchBookRequestEventsReq()
+
+        events = list(self.request_service.watch_book_request_events(request, FakeContext(active_polls=1)))
+
+        self.assertEqual([(e.cursor, e.event_type) for e in events], [(9, 'SUBSCRIBED'), (10, 'REQUEST_APPROVED')])
+        self.assertEqual(events[1].request.user_id, 3)
+        self.dispatcher.unsubscribe.assert_called_once_with(self.subscription)
+
+    def test_resume_replays_then_skips_duplicates(self):
+        mock_read_events = self.read_events
+        mock_read_events.side_effect = [[make_event(4), make_event(5)], []]
+        # Live events overlapping the replay are de-duplicated by cursor
+        self.subscription.offer(make_event(5))
+        self.subscription.offer(make_event(6))
+        request = library_service_pb2.WatchBookRequestEventsReq(since_cursor=3)
+
+        events = list(self.request_service.watch_book_request_events(request, FakeContext(active_polls=2)))
+
+        self.assertEqual([(e.cursor, e.event_type) for e in events],
+                         [(4, 'REQUEST_APPROVED'), (5, 'REQUEST_APPROVED'), (5, 'SUBSCRIBED'), (6, 'REQUEST_APPROVED')])
+        mock_read_events.assert_any_call(3, 'book_request')
+
+    def test_overflowed_subscriber_is_aborted(self):
+        self.subscription.overflowed = True
+        context = FakeContext(active_polls=1)
+        request = library_service_pb2.WatchBookRequestEventsReq()
+
+        with self.assertRaises(grpc.RpcError):
+            list(self.request_service.watch_book_request_events(request, context))
+
+        self.assertEqual(context.aborted, grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.dispatcher.unsubscribe.assert_called_once_with(self.subscription)
+
+class TestWatchBookAvailability(unittest.TestCase):
+
+    def setUp(self):
+        self.subscription = Subscription('book')
+        patcher = patch('outbox.outbox_dispatcher')
+        self.dispatcher = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dispatcher.subscribe.return_value = self.subscription
+        self.dispatcher.head.return_value = 20
+        read_patcher = patch('outbox.read_events', return_value=[])
+        read_patcher.start()
+        self.addCleanup(read_patcher.stop)
+
+    def test_streams_availability_deltas(self):
+        self.subscription.offer(OutboxEvent(21, 'book', 11, 'AVAILABILITY_CHANGED', {"book_id": 11, "available_copies": 2, "deleted": False}, position=21))
+        request = library_service_pb2.WatchBookAvailabilityReq()
+
+        events = list(BookService().watch_book_availability(request, FakeContext(active_polls=1)))
+
+        self.assertEqual(events[0].event_type, 'SUBSCRIBED')
+        self.assertEqual(events[0].cursor, 20)
+        self.assertEqual((events[1].cursor, events[1].book_id, events[1].available_copies), (21, 11, 2))
+        self.dispatcher.subscribe.assert_called_once_with('book')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from passwords import LegacySHA256Hasher, PBKDF2Hasher, PasswordHasher, ScryptHasher
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def setUp(self):
+        # Cheap parameters; the formats are what is under test
+        self.hasher = PasswordHasher(ScryptHasher(n=16), workers=0)
+
+    def test_hash_is_tagged_salted_and_verifies(self):
+        first = self.hasher.hash('secret')
+        second = self.hasher.hash('secret')
+
+        self.assertTrue(first.startswith('scrypt$16$8$1$'))
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.hasher.verify('secret', first), (True, False))
+        self.assertEqual(self.hasher.verify('wrong', first), (False, False))
+
+    def test_legacy_and_other_schemes_verify_and_need_rehash(self):
+        legacy = LegacySHA256Hasher().hash('secret')
+        pbkdf2 = PBKDF2Hasher(iterations=10).hash('secret')
+
+        self.assertEqual(self.hasher.verify('secret', legacy), (True, True))
+        self.assertEqual(self.hasher.verify('wrong', legacy), (False, False))
+        self.assertEqual(self.hasher.verify('secret', pbkdf2), (True, True))
+
+    def test_changed_cost_parameters_need_rehash(self):
+        old = PasswordHasher(ScryptHasher(n=8), workers=0).hash('secret')
+
+        self.assertEqual(self.hasher.verify('secret', old), (True, True))
+
+    def test_unknown_user_and_unknown_format_never_match(self):
+        self.assertEqual(self.hasher.verify('secret', None), (False, False))
+        self.assertEqual(self.hasher.verify('secret', 'bcrypt$whatever'), (False, False))
+
+    def test_unknown_scheme_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PasswordHasher('md5', workers=0)
+
+    def test_process_pool_round_trip(self):
+        hasher = PasswordHasher(ScryptHasher(n=16), workers=1)
+        self.addCleanup(hasher.shutdown)
+
+        encoded = hasher.hash('secret')
+
+        self.assertEqual(hasher.verify('secret', encoded), (True, False))
+        self.assertEqual(self.hasher.verify('secret', encoded), (True, False))
+
+if __name__ == '__main__':
+    unittest.main()
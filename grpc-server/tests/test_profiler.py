@@ -0,0 +1,89 @@
+import unittest
+import threading
+import urllib.error
+import urllib.request
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from profiler import run_profile, profile_handler, ProfilerBusyError
+from shared import profiler as shared_profiler
+from admin_server import AdminServer
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+class TestRunProfile(unittest.TestCase):
+
+    def test_wall_profile_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            output = run_profile("wall", 0.1, interval=0.001)
+        finally:
+            stop.set()
+            worker.join()
+
+        lines = [line for line in output.splitlines() if line.startswith("busy-worker;")]
+        self.assertTrue(lines)
+        self.assertIn("busy_loop (test_profiler.py:", lines[0])
+        self.assertTrue(lines[0].rsplit(" ", 1)[1].isdigit())
+
+    def test_memory_profile_reports_growth(self):
+        retained = []
+
+        def allocate():
+            retained.extend(bytearray(1024) for _ in range(200))
+
+        timer = threading.Timer(0.02, allocate)
+        timer.start()
+        output = run_profile("memory", 0.1)
+        timer.join()
+
+        self.assertTrue(output.startswith("# top 25 allocation sites"))
+        self.assertIn("test_profiler.py", output)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            run_profile("cpu", 1)
+        with self.assertRaises(ValueError):
+            run_profile("wall", 600)
+        with self.assertRaises(ValueError):
+            run_profile("wall", 1, interval=0.0001)
+
+    def test_concurrent_profile_rejected(self):
+        shared_profiler._profile_lock.acquire()
+        try:
+            with self.assertRaises(ProfilerBusyError):
+                run_profile("wall", 0.01)
+            status, _, _ = profile_handler({"seconds": "0.01"})
+            self.assertEqual(status, 409)
+        finally:
+            shared_profiler._profile_lock.release()
+
+class TestProfileEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.admin_server = AdminServer(host='127.0.0.1', port=0)
+        self.admin_server.route('/debug/profile', profile_handler)
+        self.admin_server.start()
+
+    def tearDown(self):
+        self.admin_server.stop()
+
+    def test_profile_over_http(self):
+        url = f'http://127.0.0.1:{self.admin_server.port}/debug/profile?seconds=0.05&interval=0.001'
+        with urllib.request.urlopen(url) as response:
+            self.assertEqual(response.status, 200)
+            self.assertIn("admin-http", response.read().decode())
+
+    def test_bad_query_is_400(self):
+        url = f'http://127.0.0.1:{self.admin_server.port}/debug/profile?seconds=abc'
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(url)
+        self.assertEqual(ctx.exception.code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
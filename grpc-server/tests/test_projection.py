@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from google.protobuf.field_mask_pb2 import FieldMask
+import library_service_pb2
+import wire_format
+import projection
+from projection import Projection, stream_rows
+from services.book_service import BookService
+from services.transaction_service import TRANSACTION_FIELDS, TransactionService
+from services.user_service import UserService
+
+class _Abort(Exception):
+    pass
+
+class TestProjection(unittest.TestCase):
+
+    def test_default_selection_reads_each_column_once(self):
+        selection = TRANSACTION_FIELDS.select()
+
+        self.assertEqual(selection.sql, "transaction_id, user_id, book_id, transaction_type, transaction_date, due_date, return_date, status, fine_amount")
+        txn = selection.build((7, 2, 3, 'BORROW', datetime(2024, 3, 1), datetime(2024, 3, 31), None, 'BORROWED', 20))
+        self.assertEqual(txn.member_id, 2)
+        self.assertEqual(txn.transaction_date, "2024-03-01T00:00:00")
+        self.assertEqual(txn.due_time.ToDatetime(), datetime(2024, 3, 31))
+        self.assertEqual(txn.fine_cents, 2000)
+
+    def test_mask_selects_only_its_fields(self):
+        selection = TRANSACTION_FIELDS.select(FieldMask(paths=["transaction_id", "fine_cents"]))
+
+        self.assertEqual(selection.sql, "transaction_id, fine_amount")
+        txn = selection.build((7, 1.5))
+        self.assertEqual(txn, library_service_pb2.Transaction(transaction_id=7, fine_cents=150))
+
+    def test_unknown_path(self):
+        with self.assertRaises(ValueError):
+            TRANSACTION_FIELDS.select(FieldMask(paths=["transaction_id", "password_hash"]))
+
+    def test_selections_are_cached(self):
+        mask = FieldMask(paths=["book_id", "status"])
+
+        self.assertIs(TRANSACTION_FIELDS.select(mask), TRANSACTION_FIELDS.select(FieldMask(paths=["book_id", "status", "book_id"])))
+
+    def test_default_leaves_out_legacy_fields_when_turned_off(self):
+        with patch.object(wire_format, 'LEGACY_PROTO_FIELDS', False):
+            selection = TRANSACTION_FIELDS.select()
+
+        self.assertNotIn("transaction_date", selection.fields)
+        self.assertIn("transaction_time", selection.fields)
+        self.assertEqual(selection.sql.count("transaction_date"), 1)
+
+    def test_columns_must_be_message_fields(self):
+        with self.assertRaises(ValueError):
+            Projection(library_service_pb2.User, [("password_hash", "password_hash")])
+
+class TestStreamRows(unittest.TestCase):
+
+    @patch('projection.db_pool')
+    def test_rows_come_from_a_server_side_cursor(self, mock_db_pool):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_db_pool.get_connection.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.__iter__.return_value = iter([(1, 'BORROWED'), (2, 'RETURNED')])
+        selection = TRANSACTION_FIELDS.select(FieldMask(paths=["transaction_id", "status"]))
+
+        messages = list(stream_rows(selection, "SELECT transaction_id, status FROM transactions", None))
+
+        self.assertEqual([m.status for m in messages], ['BORROWED', 'RETURNED'])
+        self.assertIn("name", mock_conn.cursor.call_args[1])
+        self.assertEqual(mock_cursor.itersize, projection.STREAM_BATCH_ROWS)
+        self.assertIn("SET LOCAL idle_in_transaction_session_timeout", mock_cursor.execute.call_args_list[0][0][0])
+
+    @patch('projection.db_pool')
+    def test_stream_books_uses_the_get_books_query(self, mock_db_pool):
+        mock_cursor = MagicMock()
+        mock_db_pool.get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.__iter__.return_value = iter([(1, 'Dune')])
+
+        request = library_service_pb2.GetBooksRequest(search_query="dun", fields=FieldMask(paths=["book_id", "title"]))
+        books = list(BookService().stream_books(request, None))
+
+        self.assertEqual(books, [library_service_pb2.Book(book_id=1, title='Dune')])
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertTrue(query.startswith("SELECT book_id, title FROM books WHERE is_deleted = false AND"))
+        self.assertEqual(params, ("%dun%", "%dun%", "%dun%"))
+
+class TestMaskedListRpcs(unittest.TestCase):
+
+    @patch('services.user_service.db_pool')
+    def test_get_users_selects_masked_columns(self, mock_db_pool):
+        mock_cursor = MagicMock()
+        mock_db_pool.get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(1, 'user1'), (2, 'admin')]
+
+        request = library_service_pb2.GetUsersRequest(fields=FieldMask(paths=["user_id", "username"]))
+        response = UserService().get_users(request, None)
+
+        mock_cursor.execute.assert_called_once_with("SELECT user_id, username FROM users")
+        self.assertEqual(response.users[1], library_service_pb2.User(user_id=2, username='admin'))
+
+    @patch('services.user_service.db_pool')
+    def test_user_transactions_join_books_only_when_needed(self, mock_db_pool):
+        mock_cursor = MagicMock()
+        mock_db_pool.get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+        service = UserService()
+
+        service.get_user_transactions(library_service_pb2.GetUserTransactionsRequest(
+            user_id=1, fields=FieldMask(paths=["transaction_id", "status"])), None)
+        self.assertNotIn("JOIN books", mock_cursor.execute.call_args[0][0])
+
+        service.get_user_transactions(library_service_pb2.GetUserTransactionsRequest(
+            user_id=1, fields=FieldMask(paths=["book_title"])), None)
+        self.assertIn("LEFT JOIN books", mock_cursor.execute.call_args[0][0])
+
+    def test_unknown_path_is_invalid_argument(self):
+        context = MagicMock()
+        context.abort.side_effect = _Abort
+
+        request = library_service_pb2.GetTransactionsRequest(fields=FieldMask(paths=["nope"]))
+        with self.assertRaises(_Abort):
+            TransactionService().get_transactions(request, context)
+
+        self.assertEqual(context.abort.call_args[0][0], grpc.StatusCode.INVALID_ARGUMENT)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,8 +12,9 @@ class TestRequestService(unittest.TestCase):
     def setUp(self):
         self.request_service = RequestService()
     
+    @patch('services.request_service.write_event')
     @patch('services.request_service.db_pool')
-    def test_create_book_request_success(self, mock_db_pool):
+    def test_create_book_request_success(self, mock_db_pool, mock_write_event):
         # Mock database connection
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -38,8 +39,9 @@ class TestRequestService(unittest.TestCase):
         self.assertTrue(response.success)
         self.assertEqual(response.message, 'Request created successfully')
     
+    @patch('services.request_service.write_event')
     @patch('services.request_service.db_pool')
-    def test_approve_book_request_issue(self, mock_db_pool):
+    def test_approve_book_request_issue(self, mock_db_pool, mock_write_event):
         # Mock database connection
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -61,9 +63,12 @@ class TestRequestService(unittest.TestCase):
         # Assertions
         self.assertTrue(response.success)
         self.assertEqual(response.message, 'Request approved successfully')
+        mock_write_event.assert_called_once()
+        self.assertEqual(mock_write_event.call_args[0][3], 'REQUEST_APPROVED')
     
+    @patch('services.request_service.write_event')
     @patch('services.request_service.db_pool')
-    def test_reject_book_request_success(self, mock_db_pool):
+    def test_reject_book_request_success(self, mock_db_pool, mock_write_event):
         # Mock database connection
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -72,6 +77,7 @@ class TestRequestService(unittest.TestCase):
         
         # Mock successful rejection
         mock_cursor.rowcount = 1
+        mock_cursor.fetchone.return_value = (1, 1, 'ISSUE', None)
         
         # Create request
         request = library_service_pb2.RejectBookRequestReq(request_id=1, admin_id=2)
@@ -82,6 +88,7 @@ class TestRequestService(unittest.TestCase):
         # Assertions
         self.assertTrue(response.success)
         self.assertEqual(response.message, 'Request rejected successfully')
+        self.assertEqual(mock_write_event.call_args[0][3], 'REQUEST_REJECTED')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
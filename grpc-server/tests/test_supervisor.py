@@ -0,0 +1,108 @@
+import signal
+import tempfile
+import time
+import unittest
+from concurrent import futures
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+from supervisor import Supervisor, worker_env, worker_socket
+import library_service_pb2
+import library_service_pb2_grpc
+
+# Stands in for server.py: exits cleanly on SIGTERM
+WORKER = (
+    "import signal, sys, time\n"
+    "signal.signal(signal.SIGTERM, lambda *a: sys.exit(0))\n"
+    "while True: time.sleep(0.05)\n"
+)
+
+class EmptyLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def GetBooks(self, request, context):
+        return library_service_pb2.GetBooksResponse()
+
+class TestWorkerEnv(unittest.TestCase):
+
+    @patch.dict(os.environ, {}, clear=False)
+    def test_budget_is_split_between_workers(self):
+        os.environ.pop('PASSWORD_HASH_WORKERS', None)
+        env = worker_env(2, workers=4, budget=20, cpus=8)
+
+        self.assertEqual(env["DB_POOL_MAX"], "5")
+        self.assertEqual(env["DB_POOL_MIN"], "2")
+        self.assertEqual(env["PASSWORD_HASH_WORKERS"], "2")
+        self.assertEqual(env["GRPC_WORKERS"], "1")
+        self.assertEqual(env["GRPC_WORKER_INDEX"], "2")
+
+    @patch.dict(os.environ, {'GRPC_UNIX_SOCKET': '/run/grpc/library.sock'})
+    def test_each_worker_gets_its_own_socket(self):
+        self.assertEqual(worker_env(1, workers=2, budget=20, cpus=2)["GRPC_UNIX_SOCKET"], "/run/grpc/library.1.sock")
+        self.assertEqual(worker_socket("/tmp/grpc", 0), "/tmp/grpc.0")
+
+    def test_pool_never_below_two(self):
+        self.assertEqual(worker_env(0, workers=16, budget=20, cpus=1)["DB_POOL_MAX"], "2")
+
+class TestSupervisor(unittest.TestCase):
+
+    def setUp(self):
+        self.supervisor = Supervisor(2, command=[sys.executable, "-c", WORKER], grace=2, drain_delay=0, min_uptime=0)
+        self.addCleanup(self.supervisor.stop)
+
+    def test_restarts_exited_worker_and_drains_on_stop(self):
+        self.assertEqual(self.supervisor.poll(), 2)
+        first = self.supervisor.processes[0]
+        first.kill()
+        first.wait()
+
+        self.assertEqual(self.supervisor.poll(), 1)
+        self.assertEqual(self.supervisor.restarts, 1)
+        self.assertIsNot(self.supervisor.processes[0], first)
+        self.assertIsNone(self.supervisor.processes[0].poll())
+
+        # Let the workers install their SIGTERM handler
+        time.sleep(0.5)
+        self.supervisor.stop()
+        self.assertEqual([p.returncode for p in self.supervisor.processes.values()], [0, 0])
+
+    def test_crash_loop_backs_off(self):
+        self.supervisor.min_uptime = 60
+        self.supervisor.poll()
+        process = self.supervisor.processes[1]
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+
+        self.assertEqual(self.supervisor.poll(), 0)
+        self.assertIsNone(self.supervisor.processes[1])
+
+class TestListeners(unittest.TestCase):
+
+    def test_workers_bind_the_same_port(self):
+        options = [("grpc.so_reuseport", 1)]
+        first = grpc.server(futures.ThreadPoolExecutor(max_workers=1), options=options)
+        port = first.add_insecure_port('127.0.0.1:0')
+        second = grpc.server(futures.ThreadPoolExecutor(max_workers=1), options=options)
+        self.addCleanup(first.stop, None)
+        self.addCleanup(second.stop, None)
+
+        self.assertEqual(second.add_insecure_port(f'127.0.0.1:{port}'), port)
+
+    def test_unix_socket_listener(self):
+        path = os.path.join(tempfile.mkdtemp(), "library.sock")
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(EmptyLibraryService(), server)
+        server.add_insecure_port(f"unix:{path}")
+        server.start()
+        self.addCleanup(server.stop, None)
+        channel = grpc.insecure_channel(f"unix:{path}")
+        self.addCleanup(channel.close)
+
+        response = library_service_pb2_grpc.LibraryServiceStub(channel).GetBooks(library_service_pb2.GetBooksRequest(), timeout=5)
+
+        self.assertEqual(len(response.books), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import json
+import logging
+from concurrent import futures
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import grpc
+import tracing
+from tracing import (
+    TracingInterceptor, SpanExporter, parse_traceparent, format_traceparent,
+    start_span, current_span, _statement
+)
+from logging_config import JSONFormatter
+import library_service_pb2
+import library_service_pb2_grpc
+
+class CollectingExporter(SpanExporter):
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+class FakeLibraryService(library_service_pb2_grpc.LibraryServiceServicer):
+
+    def GetBooks(self, request, context):
+        with start_span("db.query", statement="SELECT 1"):
+            pass
+        return library_service_pb2.GetBooksResponse()
+
+class TestTraceparent(unittest.TestCase):
+
+    def test_round_trip(self):
+        with start_span("root") as span:
+            parsed = parse_traceparent(format_traceparent(span))
+
+        self.assertEqual(parsed, (span.trace_id, span.span_id))
+
+    def test_invalid_values_ignored(self):
+        self.assertIsNone(parse_traceparent(None))
+        self.assertIsNone(parse_traceparent("garbage"))
+        self.assertIsNone(parse_traceparent("00-" + "z" * 32 + "-" + "1" * 16 + "-01"))
+
+class TestSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = CollectingExporter()
+        tracing.set_exporter(self.exporter)
+
+    def tearDown(self):
+        tracing.set_exporter(tracing.NoopExporter())
+
+    def test_child_span_inherits_trace(self):
+        with start_span("parent") as parent:
+            with start_span("child") as child:
+                pass
+
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertIsNone(current_span())
+        self.assertEqual([s.name for s in self.exporter.spans], ["child", "parent"])
+
+    def test_error_marks_span(self):
+        with self.assertRaises(RuntimeError):
+            with start_span("failing"):
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.exporter.spans[0].status, "ERROR")
+
+    def test_statement_is_collapsed_and_capped(self):
+        self.assertEqual(_statement("SELECT *\n   FROM books"), "SELECT * FROM books")
+        self.assertEqual(len(_statement("x" * 1000)), 500)
+
+    def test_log_records_carry_trace_id(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello", None, None)
+
+        with start_span("root") as span:
+            entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry["trace_id"], span.trace_id)
+        self.assertEqual(entry["span_id"], span.span_id)
+
+class TestTracingInterceptor(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = CollectingExporter()
+        tracing.set_exporter(self.exporter)
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=2),
+            interceptors=[TracingInterceptor()]
+        )
+        library_service_pb2_grpc.add_LibraryServiceServicer_to_server(FakeLibraryService(), self.server)
+        port = self.server.add_insecure_port('127.0.0.1:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'127.0.0.1:{port}')
+        self.stub = library_service_pb2_grpc.LibraryServiceStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+        tracing.set_exporter(tracing.NoopExporter())
+
+    def test_server_span_continues_caller_trace(self):
+        trace_id, parent_id = "a" * 32, "b" * 16
+        self.stub.GetBooks(
+            library_service_pb2.GetBooksRequest(),
+            metadata=[("traceparent", f"00-{trace_id}-{parent_id}-01")]
+        )
+
+        spans = {span.name: span for span in self.exporter.spans}
+        server_span = spans["grpc.server/GetBooks"]
+        self.assertEqual(server_span.trace_id, trace_id)
+        self.assertEqual(server_span.parent_id, parent_id)
+        self.assertEqual(spans["db.query"].parent_id, server_span.span_id)
+
+if __name__ == '__main__':
+    unittest.main()
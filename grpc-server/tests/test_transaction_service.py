@@ -82,6 +82,30 @@ class TestTransactionService(unittest.TestCase):
         # Assertions
         self.assertTrue(response.success)
         self.assertEqual(response.message, 'Book returned successfully')
+    
+    @patch('services.transaction_service.db_pool')
+    def test_get_transactions_times_and_fines(self, mock_db_pool):
+        from datetime import datetime
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_db_pool.get_connection.return_value.__enter__.return_value = mock_conn
+        issued = datetime(2024, 3, 1, 10, 30, 0, 250000)
+        mock_cursor.fetchall.return_value = [
+            (7, 2, 3, 'BORROW', issued, datetime(2024, 3, 31, 10, 30), None, 'BORROWED', 20)
+        ]
+        
+        response = self.transaction_service.get_transactions(library_service_pb2.GetTransactionsRequest(), None)
+        
+        txn = response.transactions[0]
+        self.assertEqual(txn.transaction_time.ToDatetime(), issued)
+        self.assertEqual(txn.due_time.ToDatetime(), datetime(2024, 3, 31, 10, 30))
+        self.assertFalse(txn.HasField('return_time'))
+        self.assertEqual(txn.fine_cents, 2000)
+        # Deprecated fields still filled for older clients
+        self.assertEqual(txn.transaction_date, issued.isoformat())
+        self.assertEqual(txn.return_date, "")
+        self.assertEqual(txn.fine_amount, 20.0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
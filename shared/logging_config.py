@@ -0,0 +1,225 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+from shared.tracing import current_span
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:
+    import json
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str, separators=(",", ":"))
+
+# Standard LogRecord attributes; anything else on a record came from extra=
+_RESERVED_ATTRS = frozenset((
+    'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename', 'module',
+    'lineno', 'funcName', 'created', 'msecs', 'relativeCreated', 'thread', 'threadName',
+    'processName', 'process', 'getMessage', 'exc_info', 'exc_text', 'stack_info',
+    'message', 'asctime', 'taskName'
+))
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; services subclass it to set their name"""
+
+    service = "unknown"
+    # Add the emitting function and line to every entry
+    source_location = False
+
+    def __init__(self):
+        super().__init__()
+        self._cached_second: Optional[int] = None
+        self._cached_prefix = ""
+
+    def _timestamp(self, record) -> str:
+        # strftime dominates formatTime; it only changes once per second
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_prefix = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(second))
+            self._cached_second = second
+        return f"{self._cached_prefix},{int(record.msecs):03d}"
+
+    def format(self, record):
+        log_entry = {
+            "timestamp": self._timestamp(record),
+            "service": self.service,
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.name
+        }
+        if self.source_location:
+            log_entry["function"] = record.funcName
+            log_entry["line"] = record.lineno
+
+        # Correlate with the active trace, if any (QueueHandler captures it
+        # in the calling thread or task, since formatting happens on the listener thread)
+        if "trace_id" not in record.__dict__:
+            span = current_span()
+            if span is not None:
+                log_entry["trace_id"] = span.trace_id
+                log_entry["span_id"] = span.span_id
+
+        # Add exception info if present
+        if record.exc_info:
+            log_entry["exception"] = traceback.format_exception(*record.exc_info)
+
+        # Add extra fields if present
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                log_entry[key] = value
+        return _dumps(log_entry)
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of DEBUG/INFO records per logger name prefix
+
+    Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first so "services.book_service" beats "services"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._cache: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix, prefix_rate in self.rates:
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = prefix_rate
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per (logger, level) for DEBUG/INFO records
+
+    The next record let through after drops carries a ``suppressed`` count.
+    """
+
+    def __init__(self, per_second: float, burst: Optional[float] = None):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst if burst is not None else per_second
+        self._buckets: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.levelno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener thread
+
+    The stock prepare() formats the record in the caller; this one only
+    resolves the message, captures trace context and renders exceptions,
+    which must happen before the record leaves the calling thread or task.
+    """
+    dropped = 0
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        if record.exc_info:
+            record.exception = traceback.format_exception(*record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+    def enqueue(self, record):
+        # Never block or raise in the request path; drop when the listener lags
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _parse_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_listener():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(_stop_listener)
+
+def setup_logging(formatter: logging.Formatter):
+    """Route all records through a queue to ``formatter`` on a listener thread
+
+    Environment:
+      LOG_LEVEL         root level (default INFO)
+      LOG_SAMPLE_RATES  per-logger DEBUG/INFO sampling, e.g. "tracing=0.01,services=0.5"
+      LOG_RATE_LIMIT    DEBUG/INFO records per second per logger and level (default 0, off)
+      LOG_QUEUE_SIZE    bounded queue size (default 10000); records are dropped when full
+    """
+    global _listener
+    _stop_listener()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000')))
+    queue_handler = ContextQueueHandler(log_queue)
+    rates = _parse_rates(os.getenv('LOG_SAMPLE_RATES', ''))
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    rate_limit = float(os.getenv('LOG_RATE_LIMIT', '0'))
+    if rate_limit > 0:
+        queue_handler.addFilter(RateLimitFilter(rate_limit))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return logging.getLogger(__name__)
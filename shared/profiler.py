@@ -0,0 +1,138 @@
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Callable, Optional
+
+MAX_SECONDS = 60
+DEFAULT_INTERVAL = 0.005
+# Below this the sampler thread's own stack walks start to dominate the process
+MIN_INTERVAL = 0.001
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+# Only one profile may run per process; overlapping samplers skew each other
+_profile_lock = threading.Lock()
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse_stack(frame, thread_name: str) -> str:
+    """Render a frame chain root-first in flamegraph collapsed format"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+class SamplingProfiler:
+    """Statistical wall-clock profiler sampling every thread's stack from a side thread
+
+    Threads blocked in waits (idle executor workers, the event loop in
+    select) are sampled like running ones, so counts show where threads
+    spend their time, not CPU. Overhead is one ``sys._current_frames()``
+    walk per interval, so it is safe to run against a live server for
+    short windows.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.collapsed()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                self.samples[collapse_stack(frame, names.get(ident, f"thread-{ident}"))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class AllocationTracker:
+    """tracemalloc snapshot diff between start() and stop()"""
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self._owns_tracing = False
+        self._before = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._before = self._snapshot()
+
+    def stop(self, limit: int = 25) -> str:
+        try:
+            stats = self._snapshot().compare_to(self._before, "lineno")
+        finally:
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+        lines = [f"# top {limit} allocation sites by growth (size_diff count_diff location)"]
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff:+d} {stat.count_diff:+d} {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+        ))
+
+def start_profile(mode: str, seconds: float, interval: float = DEFAULT_INTERVAL,
+                  limit: int = 25) -> Callable[[], str]:
+    """Validate the request and start profiling this process
+
+    Returns a function that stops the profile and returns its report. The
+    caller waits out ``seconds`` in between, the way its thread allows.
+    """
+    if mode not in ("wall", "memory"):
+        raise ValueError(f"Unknown profile mode: {mode}")
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ValueError(f"seconds must be between 0 and {MAX_SECONDS}")
+    if interval < MIN_INTERVAL:
+        raise ValueError(f"interval must be at least {MIN_INTERVAL}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        if mode == "wall":
+            profiler = SamplingProfiler(interval)
+            profiler.start()
+            finish = profiler.stop
+        else:
+            tracker = AllocationTracker()
+            tracker.start()
+            finish = lambda: tracker.stop(limit)
+    except BaseException:
+        _profile_lock.release()
+        raise
+
+    def stop() -> str:
+        try:
+            return finish()
+        finally:
+            _profile_lock.release()
+    return stop
@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+# Set once per process by the service's own tracing module
+_service_name = "unknown"
+
+def set_service_name(name: str) -> None:
+    global _service_name
+    _service_name = name
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start", "end", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, attributes: Optional[Dict] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": _service_name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+class SpanExporter:
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+class NoopExporter(SpanExporter):
+    def export(self, span: Span) -> None:
+        pass
+
+class StdoutJSONExporter(SpanExporter):
+    """Writes one JSON object per finished span to stdout"""
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps({"span": span.to_dict()}) + "\n"
+        with self._lock:
+            self._stream.write(line)
+            self._stream.flush()
+
+class OTLPHTTPExporter(SpanExporter):
+    """Batches spans and posts them as OTLP/JSON to a collector endpoint
+
+    Export never blocks the caller (thread or event loop): spans go through
+    a bounded queue drained by a background thread, and are dropped when it
+    is full.
+    """
+
+    def __init__(self, endpoint: Optional[str] = None, batch_size: int = 256,
+                 flush_interval: float = 2.0, max_queue: int = 10000):
+        self.endpoint = endpoint or os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._post(batch)
+
+    def _post(self, batch) -> None:
+        body = json.dumps(to_otlp(batch)).encode()
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def to_otlp(spans) -> Dict:
+    """Convert spans to an OTLP/JSON ExportTraceServiceRequest"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": _service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "library.tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int((span.end or span.start) * 1e9)),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                    "status": {"code": 2 if span.status == "ERROR" else 1}
+                } for span in spans]
+            }]
+        }]
+    }
+
+_EXPORTERS = {
+    "none": NoopExporter,
+    "stdout": StdoutJSONExporter,
+    "otlp": OTLPHTTPExporter
+}
+
+_exporter: SpanExporter = NoopExporter()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def configure_exporter(name: Optional[str] = None) -> SpanExporter:
+    """Select the span exporter by name (none, stdout, otlp); defaults to $TRACE_EXPORTER"""
+    global _exporter
+    name = (name or os.getenv('TRACE_EXPORTER', 'none')).lower()
+    if name not in _EXPORTERS:
+        raise ValueError(f"Unknown trace exporter: {name}")
+    _exporter.shutdown()
+    _exporter = _EXPORTERS[name]()
+    return _exporter
+
+def set_exporter(exporter: SpanExporter) -> None:
+    global _exporter
+    _exporter = exporter
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Parse a W3C traceparent header into (trace_id, parent_span_id)"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+@contextmanager
+def start_span(name: str, remote_parent: Optional[Tuple[str, str]] = None, **attributes):
+    """Open a child of the current span (or of remote_parent, or a new trace)"""
+    parent = _current_span.get()
+    if remote_parent is not None:
+        trace_id, parent_id = remote_parent
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), None
+
+    span = Span(name, trace_id, parent_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.status = "ERROR"
+        span.attributes["error"] = str(e)
+        raise
+    finally:
+        span.end = time.time()
+        _current_span.reset(token)
+        _exporter.export(span)